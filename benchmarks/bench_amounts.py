@@ -0,0 +1,73 @@
+# benchmarks/bench_amounts.py
+
+"""
+Fee/tax computation: per-transaction float path vs vectorized integer path,
+plus end-to-end Ledger.add_transaction vs Ledger.add_transactions.
+
+Usage:
+    python -m benchmarks.bench_amounts --transactions 100000
+"""
+
+import argparse
+import random
+import time
+from n1c_core.amount import batch_fee_and_tax, batch_to_minor
+from n1c_core.ledger import Ledger
+
+
+def float_charges(amounts, spread, tax_rate):
+    """
+    The previous float path: one multiplication pair per transaction.
+    """
+    fees = [amount * (spread / 100) for amount in amounts]
+    taxes = [amount * (tax_rate / 100) for amount in amounts]
+    return fees, taxes
+
+
+def vector_charges(amounts, spread, tax_rate):
+    return batch_fee_and_tax(batch_to_minor(amounts), spread, tax_rate)
+
+
+def timed(fn, *args, repeat: int = 1) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(*args)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def ledger_run(transactions: int, batched: bool) -> float:
+    ledger = Ledger()
+    ledger.create_wallet("alice")
+    ledger.create_wallet("bob")
+    ledger.register_anchor("anchor1", spread=2.5, tax_rate=0.02)
+    ledger.deposit("alice", 1_000_000_000.0)
+    items = [(f"tx{i}", "alice", "bob", 1.25, "sig", "anchor1") for i in range(transactions)]
+    if batched:
+        return timed(ledger.add_transactions, items)
+    return timed(lambda: [ledger.add_transaction(*item) for item in items])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--transactions", type=int, default=100_000)
+    args = parser.parse_args()
+
+    rng = random.Random(1)
+    amounts = [round(rng.uniform(0.01, 10_000.0), 6) for _ in range(args.transactions)]
+
+    vector_charges(amounts[:1], 2.5, 0.02)  # keep the NumPy import out of the timings
+    rows = [
+        ("float charges", timed(float_charges, amounts, 2.5, 0.02, repeat=5)),
+        ("vector charges", timed(vector_charges, amounts, 2.5, 0.02, repeat=5)),
+        ("ledger single", ledger_run(args.transactions, batched=False)),
+        ("ledger batch", ledger_run(args.transactions, batched=True)),
+    ]
+    print(f"{'path':<16}{'seconds':>10}{'tx/s':>14}")
+    for name, seconds in rows:
+        print(f"{name:<16}{seconds:>10.3f}{args.transactions / seconds:>14,.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+# benchmarks/bench_anchor_batch.py
+
+"""
+Verification cost per transaction: one Ed25519 check per transaction
+against one anchor signature over a Merkle root per batch, by batch size.
+Also times ledger ingestion both ways and single-transaction audits.
+
+Usage:
+    python -m benchmarks.bench_anchor_batch --transactions 8192
+"""
+
+import argparse
+import time
+from n1c_core.envelope import seal_batch, verify_inclusion
+from n1c_core.keyring import KeyRegistry
+from n1c_core.ledger import Ledger
+from n1c_core.utils import generate_raw_keypair, verify_signature
+from benchmarks.bench_verify_batch import build_transactions
+
+
+def per_tx(elapsed: float, count: int) -> float:
+    return elapsed / count * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--transactions", type=int, default=8192)
+    parser.add_argument("--senders", type=int, default=100)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1, 4, 16, 64, 256, 1024, 4096])
+    args = parser.parse_args()
+
+    registry = KeyRegistry()
+    transactions = build_transactions(args.transactions, args.senders, registry)
+    anchor_private, anchor_public = generate_raw_keypair()
+
+    start = time.perf_counter()
+    for tx in transactions:
+        verify_signature(tx, registry.get_public_key(tx.sender))
+    baseline = per_tx(time.perf_counter() - start, len(transactions))
+
+    print(f"{'batch size':<12}{'seal us/tx':>12}{'verify us/tx':>14}{'speedup':>10}{'proof hashes':>14}")
+    print(f"{'per-tx sig':<12}{'':>12}{baseline:>14.2f}{1.0:>10.2f}{'':>14}")
+    for size in args.sizes:
+        batches = [transactions[i:i + size] for i in range(0, len(transactions) - size + 1, size)]
+        count = sum(map(len, batches))
+
+        start = time.perf_counter()
+        envelopes = [seal_batch("anchor1", batch, anchor_private) for batch in batches]
+        seal = per_tx(time.perf_counter() - start, count)
+
+        for envelope in envelopes:
+            envelope._levels = None  # verify from scratch, as a receiving node would
+        start = time.perf_counter()
+        assert all(envelope.verify(anchor_public) for envelope in envelopes)
+        verify = per_tx(time.perf_counter() - start, count)
+        print(f"{size:<12}{seal:>12.2f}{verify:>14.2f}{baseline / verify:>10.2f}"
+              f"{len(envelopes[0].proof(0).siblings):>14}")
+
+    # Ledger ingestion: per-sender signature checks vs one trusted envelope
+    size = max(args.sizes)
+    batch = transactions[:size]
+    rows = []
+    for trusted in (False, True):
+        ledger = Ledger(key_registry=registry, verify_signatures=True)
+        ledger.register_anchor("anchor1", spread=0.0, tax_rate=0.0)
+        for address in {tx.sender for tx in batch} | {tx.receiver for tx in batch}:
+            ledger.create_wallet(address)
+            ledger.deposit(address, 1e9)
+        envelope = seal_batch("anchor1", batch, anchor_private)
+        envelope._levels = None
+        if trusted:
+            ledger.trust_anchor("anchor1", anchor_public)
+        start = time.perf_counter()
+        ledger.add_anchor_batch(envelope)
+        rows.append(per_tx(time.perf_counter() - start, len(batch)))
+    print()
+    print(f"{'ledger ingest, ' + str(size) + ' tx':<28}{'us/tx':>10}")
+    print(f"{'sender signatures':<28}{rows[0]:>10.2f}")
+    print(f"{'trusted anchor envelope':<28}{rows[1]:>10.2f}")
+
+    # Auditing one transaction later: header signature is checked once, then a proof per transaction
+    proofs = [(tx, envelope.proof(index)) for index, tx in enumerate(batch)]
+    start = time.perf_counter()
+    assert all(verify_inclusion(tx, proof, envelope.header) for tx, proof in proofs)
+    print(f"{'inclusion proof check':<28}{per_tx(time.perf_counter() - start, len(proofs)):>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+# benchmarks/bench_keystore.py
+
+"""
+Bulk wallet provisioning: create_wallet in a loop against create_wallets
+into an on-disk Keystore, then keystore reopen time and key lookup rate.
+
+Usage:
+    python -m benchmarks.bench_keystore --wallets 100000
+"""
+
+import argparse
+import os
+import random
+import tempfile
+import time
+from n1c_core.keyring import KeyRegistry
+from n1c_core.keystore import Keystore
+from n1c_core.wallet import WalletManager
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--wallets", type=int, default=100_000)
+    parser.add_argument("--loop-wallets", type=int, default=10_000, help="Wallets created one at a time")
+    parser.add_argument("--lookups", type=int, default=100_000)
+    args = parser.parse_args()
+
+    print(f"CPUs: {os.cpu_count()}")
+    manager = WalletManager(key_registry=KeyRegistry())
+    start = time.perf_counter()
+    for i in range(args.loop_wallets):
+        manager.create_wallet(f"owner-{i}")
+    rate = args.loop_wallets / (time.perf_counter() - start)
+    print(f"{'create_wallet loop, in memory':<36}{rate:>12,.0f} wallets/s")
+
+    with tempfile.TemporaryDirectory() as directory:
+        with Keystore(directory) as keystore:
+            manager = WalletManager(keystore=keystore)
+            start = time.perf_counter()
+            wallets = manager.create_wallets(args.wallets)
+            rate = args.wallets / (time.perf_counter() - start)
+        print(f"{'create_wallets, keystore':<36}{rate:>12,.0f} wallets/s")
+
+        start = time.perf_counter()
+        keystore = Keystore(directory)
+        print(f"{'reopen keystore':<36}{(time.perf_counter() - start) * 1e3:>12.2f} ms")
+
+        addresses = [wallet.address for wallet in random.choices(wallets, k=args.lookups)]
+        start = time.perf_counter()
+        for address in addresses:
+            keystore.get_private_key_bytes(address)
+        rate = args.lookups / (time.perf_counter() - start)
+        print(f"{'private key lookups':<36}{rate:>12,.0f} lookups/s")
+        keystore.close()
+
+
+if __name__ == "__main__":
+    main()
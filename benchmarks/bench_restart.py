@@ -0,0 +1,71 @@
+# benchmarks/bench_restart.py
+
+"""
+Ledger restart time against history length, with and without snapshots.
+
+Each run writes a log of N transfers, checkpoints near the end (leaving a
+short tail), then times a cold restart from the log alone and from the
+newest snapshot plus the tail. The pause column is how long a checkpoint
+after the tail holds up writers: it copies only the tail's changes, so it
+should not grow with history.
+
+Usage:
+    python -m benchmarks.bench_restart --history 1000 10000 100000
+"""
+
+import argparse
+import os
+import tempfile
+import time
+from n1c_core.ledger import Ledger
+from n1c_core.snapshot import SnapshotStore
+from n1c_core.wal import WriteAheadLog
+
+
+def build_history(directory: str, history: int, wallets: int, tail: int):
+    store = SnapshotStore(os.path.join(directory, "snapshots"))
+    with WriteAheadLog(os.path.join(directory, "ledger.wal"), group_commit_size=4096) as wal:
+        ledger = Ledger(wal=wal)
+        addresses = [f"wallet-{i}" for i in range(wallets)]
+        for address in addresses:
+            ledger.create_wallet(address)
+            ledger.deposit(address, 1_000_000.0)
+        for i in range(history):
+            if i == history - tail:
+                store.checkpoint(ledger, background=False)
+            ledger.add_transaction(
+                f"tx-{i}", addresses[i % wallets], addresses[(i * 7 + 1) % wallets], 1.0, "sig"
+            )
+        start = time.perf_counter()
+        build = ledger.prepare_snapshot()
+        pause = time.perf_counter() - start
+        build()
+    return store, pause
+
+
+def time_restart(directory: str, store) -> float:
+    start = time.perf_counter()
+    with WriteAheadLog(os.path.join(directory, "ledger.wal")) as wal:
+        Ledger(wal=wal, snapshots=store)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--history", type=int, nargs="+", default=[1_000, 10_000, 100_000])
+    parser.add_argument("--wallets", type=int, default=1_000)
+    parser.add_argument("--tail", type=int, default=100, help="transactions after the snapshot")
+    args = parser.parse_args()
+
+    print(f"{'history':>10}{'log only (s)':>15}{'snapshot (s)':>15}{'speedup':>10}{'pause (ms)':>12}")
+    for history in args.history:
+        with tempfile.TemporaryDirectory() as directory:
+            store, pause = build_history(directory, history, args.wallets, min(args.tail, history))
+            log_only = time_restart(directory, None)
+            with_snapshot = time_restart(directory, store)
+        print(f"{history:>10}{log_only:>15.3f}{with_snapshot:>15.3f}{log_only / with_snapshot:>10.1f}"
+              f"{pause * 1e3:>12.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+# benchmarks/bench_seen_filter.py
+
+"""
+Duplicate tx_id checks with and without a SeenFilter.
+
+Builds a SQLite-backed ledger holding N transactions, then times:
+  * has_transaction() on N new ids (a filter miss skips the query),
+  * has_transaction() on N known ids (every hit is still confirmed),
+  * a mix of the two with the given share of duplicates,
+and reports the filter's size, fill and false-positive rates.
+
+Usage:
+    python -m benchmarks.bench_seen_filter --transactions 100000 --duplicates 0.2
+"""
+
+import argparse
+import os
+import tempfile
+import time
+from datetime import datetime, timedelta
+from n1c_core.bloom import SeenFilter
+from n1c_core.ledger import Ledger
+from n1c_core.storage import SQLiteStorage
+
+START = datetime(2026, 1, 1)
+
+
+def build(path: str, n: int):
+    ledger = Ledger(storage=SQLiteStorage(path))
+    ledger.create_wallet("alice")
+    ledger.create_wallet("bob")
+    ledger.deposit("alice", float(n))
+    ledger.add_transactions(
+        (f"tx{i}", "alice", "bob", 0.5, "", None, START + timedelta(microseconds=i)) for i in range(n)
+    )
+    ledger.storage.flush()
+    ledger.storage.close()
+
+
+def timed(fn) -> float:
+    start = time.perf_counter()
+    fn()
+    return (time.perf_counter() - start) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--transactions", type=int, default=100_000)
+    parser.add_argument("--duplicates", type=float, default=0.5, help="Share of known ids in the mixed run")
+    args = parser.parse_args()
+    n = args.transactions
+
+    mixed = [f"tx{i}" if i < n * args.duplicates else f"new{i}" for i in range(n)]
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "ledger.db")
+        build(path, n)
+
+        print(f"{'':>10}{'new ids ms':>12}{'known ids ms':>14}{'mixed ms':>10}")
+        for label in ("exact", "filter"):
+            seen = SeenFilter() if label == "filter" else None
+            ledger = Ledger(storage=SQLiteStorage(path), seen_filter=seen)
+
+            new_ms = timed(lambda: [ledger.has_transaction(f"new{i}") for i in range(n)])
+            known_ms = timed(lambda: [ledger.has_transaction(f"tx{i}") for i in range(n)])
+            mixed_ms = timed(lambda: [ledger.has_transaction(tx_id) for tx_id in mixed])
+
+            print(f"{label:>10}{new_ms:>12.1f}{known_ms:>14.1f}{mixed_ms:>10.1f}")
+            ledger.storage.close()
+
+        print()
+        print(f"filter: {len(seen):,} ids in {seen.nbytes:,} bytes, fill {seen.fill_ratio:.3f}, "
+              f"estimated fp {seen.estimated_fp_rate:.5f}, observed fp {seen.observed_fp_rate:.5f}, "
+              f"exact checks {seen.exact_checks:,} of {seen.checks:,}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+# benchmarks/bench_sharding.py
+
+"""
+ShardedLedger throughput against shard count, with a mix of same-shard
+and cross-shard transfers, next to a single in-process Ledger.
+
+Usage:
+    python -m benchmarks.bench_sharding --shards 1 2 4 8 --cross 0.1 0.5
+"""
+
+import argparse
+import os
+import random
+import time
+from n1c_core.ledger import Ledger
+from n1c_core.sharding import ShardedLedger
+
+
+def workload(shard_of, addresses, transfers: int, cross: float, seed: int = 1):
+    """
+    Transfers whose receiver is on another shard with probability `cross`.
+    """
+    rng = random.Random(seed)
+    by_shard = {}
+    for address in addresses:
+        by_shard.setdefault(shard_of(address), []).append(address)
+    batch = []
+    for i in range(transfers):
+        sender = rng.choice(addresses)
+        home = shard_of(sender)
+        others = [shard for shard in by_shard if shard != home]
+        shard = rng.choice(others) if others and rng.random() < cross else home
+        receiver = rng.choice(by_shard[shard])
+        batch.append((f"tx{i}", sender, receiver, 0.01, "sig"))
+    return batch
+
+
+def run(ledger, batch, batch_size: int) -> float:
+    start = time.perf_counter()
+    for offset in range(0, len(batch), batch_size):
+        ledger.add_transactions(batch[offset:offset + batch_size])
+    return len(batch) / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--shards", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--cross", type=float, nargs="+", default=[0.0, 0.1, 0.5])
+    parser.add_argument("--transfers", type=int, default=100_000)
+    parser.add_argument("--wallets", type=int, default=1_000)
+    parser.add_argument("--batch-size", type=int, default=1_000)
+    args = parser.parse_args()
+    addresses = [f"wallet-{i}" for i in range(args.wallets)]
+
+    print(f"CPUs: {os.cpu_count()}")
+    single = Ledger()
+    for address in addresses:
+        single.create_wallet(address)
+        single.deposit(address, 1_000_000.0)
+    rate = run(single, workload(lambda address: 0, addresses, args.transfers, 0.0), args.batch_size)
+    print(f"{'Ledger':>8}{'':>8}{rate:>12,.0f} tx/s")
+
+    print(f"{'shards':>8}{'cross':>8}{'tx/s':>12}")
+    for shards in args.shards:
+        for cross in args.cross:
+            with ShardedLedger(shards=shards) as ledger:
+                for address in addresses:
+                    ledger.create_wallet(address)
+                    ledger.deposit(address, 1_000_000.0)
+                rate = run(ledger, workload(ledger.shard_of, addresses, args.transfers, cross), args.batch_size)
+            print(f"{shards:>8}{cross:>8.0%}{rate:>12,.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+# benchmarks/bench_sync.py
+
+"""
+Merkle-diff sync vs shipping the whole transaction set, by divergence size.
+
+Usage:
+    python -m benchmarks.bench_sync --transactions 50000
+"""
+
+import argparse
+import time
+from datetime import datetime, timedelta
+from n1c_core.codec import TransactionBuffer, encode_transactions
+from n1c_core.ledger import Ledger
+from n1c_core.merkle import MerkleIndex
+from n1c_core.sync import LoopbackTransport, SyncClient, SyncServer
+
+ADDRESSES = [f"w{i}" for i in range(100)]
+START = datetime(2026, 1, 1)
+
+
+def make_ledger(depth: int) -> Ledger:
+    ledger = Ledger(merkle_index=MerkleIndex(depth))
+    for address in ADDRESSES:
+        ledger.create_wallet(address)
+        ledger.deposit(address, 1_000_000.0)
+    return ledger
+
+
+def fill(ledger: Ledger, start: int, stop: int):
+    ledger.add_transactions(
+        (f"tx{i}", ADDRESSES[i % 100], ADDRESSES[(i * 7 + 1) % 100], 1.0, "ab" * 64, None,
+         START + timedelta(microseconds=i))
+        for i in range(start, stop)
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--transactions", type=int, default=50_000)
+    parser.add_argument("--depth", type=int, default=3)
+    args = parser.parse_args()
+    n = args.transactions
+
+    print(f"{'divergence':>10}{'round trips':>13}{'sync bytes':>12}{'sync ms':>10}{'full bytes':>12}{'full ms':>10}")
+    for divergence in (0, 1, 10, 100, 1000):
+        local, remote = make_ledger(args.depth), make_ledger(args.depth)
+        fill(local, 0, n)
+        fill(remote, 0, n + divergence)
+        local.merkle_index.root()      # hash outside the timings, as live nodes would have
+        remote.merkle_index.root()
+
+        client = SyncClient(local, LoopbackTransport(SyncServer(remote)))
+        start = time.perf_counter()
+        result = client.sync()
+        sync_ms = (time.perf_counter() - start) * 1000
+        assert result.applied == divergence
+
+        # Baseline: ship every transaction and decode it on the other side
+        start = time.perf_counter()
+        full = encode_transactions(remote.iter_transactions())
+        for _ in TransactionBuffer(full):
+            pass
+        full_ms = (time.perf_counter() - start) * 1000
+
+        print(f"{divergence:>10}{result.round_trips:>13}{result.bytes_sent + result.bytes_received:>12,}"
+              f"{sync_ms:>10.1f}{len(full):>12,}{full_ms:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+# benchmarks/bench_verify_batch.py
+
+"""
+Signature verification throughput: serial is_valid-style loop vs verify_batch.
+
+Usage:
+    python -m benchmarks.bench_verify_batch --transactions 20000
+"""
+
+import argparse
+import time
+from n1c_core.keyring import KeyRegistry
+from n1c_core.wallet import WalletManager
+from n1c_core.transaction import TransactionManager
+from n1c_core.utils import verify_signature
+from n1c_core.verify import BatchVerifier
+
+
+def build_transactions(count: int, senders: int, registry: KeyRegistry):
+    wallet_manager = WalletManager(key_registry=registry)
+    wallets = [wallet_manager.create_wallet(f"bench-{i}") for i in range(senders + 1)]
+    receiver = wallets[-1]
+    return [
+        TransactionManager.create_transaction(
+            sender_wallet=wallets[i % senders],
+            receiver_wallet=receiver,
+            amount=1.0,
+            key_registry=registry
+        )
+        for i in range(count)
+    ]
+
+
+def bench_serial(transactions, registry: KeyRegistry) -> float:
+    start = time.perf_counter()
+    for tx in transactions:
+        verify_signature(tx, registry.get_public_key(tx.sender))
+    return time.perf_counter() - start
+
+
+def bench_pool(transactions, registry: KeyRegistry, workers: int, chunk_size: int) -> float:
+    with BatchVerifier(workers=workers, chunk_size=chunk_size, key_registry=registry) as verifier:
+        verifier.verify(transactions[:workers * chunk_size])  # warm up the pool
+        start = time.perf_counter()
+        bitmap = verifier.verify(transactions)
+        elapsed = time.perf_counter() - start
+    assert all(bitmap), "benchmark transactions must all verify"
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--transactions", type=int, default=20_000)
+    parser.add_argument("--senders", type=int, default=100)
+    parser.add_argument("--chunk-size", type=int, default=512)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    args = parser.parse_args()
+
+    registry = KeyRegistry()
+    transactions = build_transactions(args.transactions, args.senders, registry)
+
+    serial = bench_serial(transactions, registry)
+    print(f"{'mode':<12}{'seconds':>10}{'tx/s':>12}{'speedup':>10}")
+    print(f"{'serial':<12}{serial:>10.3f}{len(transactions) / serial:>12.0f}{1.0:>10.2f}")
+    for workers in args.workers:
+        elapsed = bench_pool(transactions, registry, workers, args.chunk_size)
+        print(f"{f'pool x{workers}':<12}{elapsed:>10.3f}"
+              f"{len(transactions) / elapsed:>12.0f}{serial / elapsed:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,308 @@
+# benchmarks/suite.py
+
+"""
+Micro-benchmark suite for the core hot paths, with JSON results and a
+regression check against a saved baseline.
+
+Each benchmark times `scale` operations per run and records seconds per
+operation; every (benchmark, scale) pair is run `--repeat` times.
+
+compare flags a case as a regression when its median slowed down by more
+than --threshold and a one-sided permutation test on the samples gives
+p < --alpha. With 5 repeats on each side the smallest possible p is
+1/252, so use at least 5 for alpha 0.01. Exits 1 if anything regressed.
+
+Usage:
+    python -m benchmarks.suite run --scales 1000 10000 --output baseline.json
+    python -m benchmarks.suite run --scales 1000 10000 --output current.json
+    python -m benchmarks.suite compare baseline.json current.json
+"""
+
+import argparse
+import gc
+import itertools
+import json
+import math
+import os
+import platform
+import random
+import statistics
+import sys
+import time
+import uuid
+from datetime import datetime
+from typing import Callable, Dict, List, Sequence, Tuple
+from n1c_core.config import PROJECT_VERSION
+from n1c_core.keyring import KeyRegistry, load_private_key
+from n1c_core.ledger import Ledger
+from n1c_core.models import Transaction, Wallet
+from n1c_core.transaction import TransactionManager
+from n1c_core.utils import generate_keypair, generate_raw_keypair, sign_transaction, verify_signature
+from n1c_core.wallet import WalletManager
+
+# Wallets used by the transfer benchmarks, whatever the scale
+LEDGER_WALLETS = 1_000
+
+
+def _timed(run: Callable[[], None]) -> float:
+    """
+    Time one call with the garbage collector paused, as timeit does.
+    """
+    gc.collect()
+    gc.disable()
+    try:
+        start = time.perf_counter()
+        run()
+        return time.perf_counter() - start
+    finally:
+        gc.enable()
+
+
+def _transactions(n: int) -> List[Transaction]:
+    now = datetime.utcnow()
+    return [
+        Transaction(str(uuid.uuid4()), "n1c_sender", "n1c_receiver", 1.0 + i % 100, 0.0, now, "")
+        for i in range(n)
+    ]
+
+
+def _funded_ledger(wallets: int) -> Tuple[Ledger, List[str]]:
+    ledger = Ledger(key_registry=KeyRegistry())
+    addresses = [f"wallet-{i}" for i in range(wallets)]
+    for address in addresses:
+        ledger.create_wallet(address)
+        ledger.deposit(address, 1_000_000.0)
+    return ledger, addresses
+
+
+# ---------------------------
+# Benchmarks
+# ---------------------------
+
+def bench_add_transaction(n: int) -> float:
+    ledger, addresses = _funded_ledger(min(n, LEDGER_WALLETS))
+    w = len(addresses)
+    transfers = [(f"tx{i}", addresses[i % w], addresses[(i * 7 + 1) % w]) for i in range(n)]
+
+    def run():
+        for tx_id, sender, receiver in transfers:
+            ledger.add_transaction(tx_id, sender, receiver, 0.01, "sig")
+    return _timed(run)
+
+
+def bench_sign_transaction(n: int) -> float:
+    private_key = load_private_key(generate_raw_keypair()[0])
+    transactions = _transactions(n)
+
+    def run():
+        for tx in transactions:
+            sign_transaction(tx, private_key)
+    return _timed(run)
+
+
+def bench_verify_signature(n: int) -> float:
+    private_key = load_private_key(generate_raw_keypair()[0])
+    public_key = private_key.public_key()
+    transactions = _transactions(n)
+    for tx in transactions:
+        tx.signature = sign_transaction(tx, private_key)
+
+    def run():
+        for tx in transactions:
+            verify_signature(tx, public_key)
+    return _timed(run)
+
+
+def bench_create_transaction(n: int) -> float:
+    """
+    n payouts from one sender, one create_transaction call each.
+    """
+    private_key = generate_raw_keypair()[0]
+    sender = Wallet(address="n1c_sender", balance=float(n), transactions=[])
+    receivers = [Wallet(address=f"n1c_receiver{i}", balance=0.0, transactions=[]) for i in range(n)]
+
+    def run():
+        for receiver in receivers:
+            TransactionManager.create_transaction(sender, receiver, 0.5, private_key)
+    return _timed(run)
+
+
+def bench_create_transactions(n: int) -> float:
+    """
+    The same payouts as one create_transactions batch.
+    """
+    private_key = generate_raw_keypair()[0]
+    sender = Wallet(address="n1c_sender", balance=float(n), transactions=[])
+    payouts = [(f"n1c_receiver{i}", 0.5) for i in range(n)]
+    return _timed(lambda: TransactionManager.create_transactions(sender, payouts, private_key=private_key))
+
+
+def bench_generate_keypair(n: int) -> float:
+    def run():
+        for _ in range(n):
+            generate_keypair()
+    return _timed(run)
+
+
+def bench_create_wallet(n: int) -> float:
+    manager = WalletManager(key_registry=KeyRegistry())
+
+    def run():
+        for i in range(n):
+            manager.create_wallet(f"owner-{i}")
+    return _timed(run)
+
+
+def bench_verify_integrity(n: int) -> float:
+    """
+    A full audit of n wallets, each of which has sent and received.
+    """
+    ledger, addresses = _funded_ledger(n)
+    ledger.add_transactions(
+        (f"tx{i}", addresses[i], addresses[(i + 1) % n], 0.01, "sig") for i in range(n)
+    )
+    return _timed(ledger.verify_integrity)
+
+
+BENCHMARKS: Dict[str, Callable[[int], float]] = {
+    "ledger.add_transaction": bench_add_transaction,
+    "utils.sign_transaction": bench_sign_transaction,
+    "utils.verify_signature": bench_verify_signature,
+    "utils.generate_keypair": bench_generate_keypair,
+    "transaction.create_transaction": bench_create_transaction,
+    "transaction.create_transactions": bench_create_transactions,
+    "wallet.create_wallet": bench_create_wallet,
+    "ledger.verify_integrity": bench_verify_integrity,
+}
+
+
+# ---------------------------
+# Running
+# ---------------------------
+
+def run_suite(names: Sequence[str], scales: Sequence[int], repeat: int) -> dict:
+    results = []
+    for name in names:
+        for scale in scales:
+            samples = [BENCHMARKS[name](scale) / scale for _ in range(repeat)]
+            median = statistics.median(samples)
+            results.append({
+                "benchmark": name,
+                "scale": scale,
+                "unit": "s/op",
+                "samples": samples,
+                "median": median,
+                "mean": statistics.fmean(samples),
+                "stdev": statistics.stdev(samples) if len(samples) > 1 else 0.0,
+            })
+            print(f"{name:<26}{scale:>10,}{median * 1e6:>12.2f} us/op{1 / median:>14,.0f} ops/s", file=sys.stderr)
+    return {
+        "meta": {
+            "version": PROJECT_VERSION,
+            "created": datetime.utcnow().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+            "repeat": repeat,
+        },
+        "results": results,
+    }
+
+
+# ---------------------------
+# Comparing
+# ---------------------------
+
+def permutation_pvalue(baseline: Sequence[float], current: Sequence[float], rounds: int = 20_000) -> float:
+    """
+    One-sided p-value that `current` is slower than `baseline` by chance:
+    the share of relabelings of the pooled samples whose mean difference
+    is at least the observed one. Exhaustive when there are at most
+    `rounds` relabelings, sampled (with a fixed seed) otherwise.
+    """
+    pooled = list(baseline) + list(current)
+    n, k = len(pooled), len(current)
+    total = sum(pooled)
+
+    def difference(current_sum: float) -> float:
+        return current_sum / k - (total - current_sum) / (n - k)
+
+    observed = difference(sum(current))
+    if math.comb(n, k) <= rounds:
+        splits = itertools.combinations(pooled, k)
+        count = math.comb(n, k)
+    else:
+        rng = random.Random(0)
+        splits = (rng.sample(pooled, k) for _ in range(rounds))
+        count = rounds
+    # Tolerance keeps the observed split itself from being lost to rounding
+    tolerance = 1e-12 * abs(observed)
+    extreme = sum(difference(sum(split)) >= observed - tolerance for split in splits)
+    return extreme / count
+
+
+def compare(baseline: dict, current: dict, threshold: float, alpha: float) -> List[dict]:
+    previous = {(r["benchmark"], r["scale"]): r for r in baseline["results"]}
+    rows = []
+    for result in current["results"]:
+        before = previous.get((result["benchmark"], result["scale"]))
+        if before is None:
+            continue
+        ratio = result["median"] / before["median"]
+        p_value = permutation_pvalue(before["samples"], result["samples"])
+        rows.append({
+            "benchmark": result["benchmark"],
+            "scale": result["scale"],
+            "ratio": ratio,
+            "p_value": p_value,
+            "regression": ratio > 1 + threshold and p_value < alpha,
+        })
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run = commands.add_parser("run", help="Run the suite and write JSON results")
+    run.add_argument("--scales", type=int, nargs="+", default=[1_000, 10_000])
+    run.add_argument("--repeat", type=int, default=5)
+    run.add_argument("--only", nargs="+", choices=sorted(BENCHMARKS), help="Benchmarks to run (default: all)")
+    run.add_argument("--output", help="JSON file to write (default: stdout)")
+
+    check = commands.add_parser("compare", help="Flag significant slowdowns against a baseline")
+    check.add_argument("baseline")
+    check.add_argument("current")
+    check.add_argument("--threshold", type=float, default=0.05, help="Minimum median slowdown to flag")
+    check.add_argument("--alpha", type=float, default=0.01, help="Significance level")
+    check.add_argument("--json", action="store_true", help="Print the comparison as JSON")
+
+    args = parser.parse_args()
+
+    if args.command == "run":
+        report = run_suite(args.only or list(BENCHMARKS), args.scales, args.repeat)
+        text = json.dumps(report, indent=2)
+        if args.output:
+            with open(args.output, "w") as f:
+                f.write(text + "\n")
+        else:
+            print(text)
+        return
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    with open(args.current) as f:
+        current = json.load(f)
+    rows = compare(baseline, current, args.threshold, args.alpha)
+    if args.json:
+        print(json.dumps(rows, indent=2))
+    else:
+        print(f"{'benchmark':<26}{'scale':>10}{'change':>10}{'p':>8}")
+        for row in rows:
+            flag = "  REGRESSION" if row["regression"] else ""
+            print(f"{row['benchmark']:<26}{row['scale']:>10,}{row['ratio'] - 1:>+10.1%}{row['p_value']:>8.3f}{flag}")
+    sys.exit(1 if any(row["regression"] for row in rows) else 0)
+
+
+if __name__ == "__main__":
+    main()
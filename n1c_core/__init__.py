@@ -12,16 +12,71 @@ Provides the main components for the N1C decentralized currency system:
 - Configuration settings
 """
 
-# Expose core modules
-from .wallet import WalletManager
-from .transaction import TransactionManager
-from .ledger import Ledger
-from .anchor import AnchorManager
-from .utils import (
-    generate_wallet_address,
-    generate_keypair,
-    sign_transaction,
-    verify_signature
-)
+import importlib
+from typing import Any, List
+
 from .config import *
-from .models import Wallet, Transaction, Anchor
+
+# Public name -> submodule. Submodules are imported on first attribute
+# access, so `import n1c_core` stays cheap and cryptography is only loaded
+# once something signs, verifies or decodes a key.
+_EXPORTS = {
+    "WalletManager": "wallet",
+    "TransactionManager": "transaction",
+    "Ledger": "ledger",
+    "BatchRejectedError": "errors",
+    "TransactionRejectedError": "errors",
+    "AnchorManager": "anchor",
+    "AnchorQuote": "anchor",
+    "KeyRegistry": "keyring",
+    "get_key_registry": "keyring",
+    "Keystore": "keystore",
+    "BatchVerifier": "verify",
+    "verify_batch": "verify",
+    "WriteAheadLog": "wal",
+    "Snapshot": "snapshot",
+    "SnapshotStore": "snapshot",
+    "LedgerStorage": "storage",
+    "MemoryStorage": "storage",
+    "SQLiteStorage": "storage",
+    "ColumnarStorage": "columnar",
+    "TransactionStore": "columnar",
+    "IngestQueue": "ingest",
+    "Mempool": "mempool",
+    "TransactionBuffer": "codec",
+    "encode_transactions": "codec",
+    "decode_transactions": "codec",
+    "BatchEnvelope": "envelope",
+    "seal_batch": "envelope",
+    "verify_inclusion": "envelope",
+    "MerkleIndex": "merkle",
+    "SeenFilter": "bloom",
+    "AnchorRollups": "rollups",
+    "ShardedLedger": "sharding",
+    "LedgerMetrics": "metrics",
+    "SyncClient": "sync",
+    "SyncServer": "sync",
+    "LoopbackTransport": "sync",
+    "generate_wallet_address": "utils",
+    "generate_keypair": "utils",
+    "sign_transaction": "utils",
+    "verify_signature": "utils",
+    "Wallet": "models",
+    "Transaction": "models",
+    "Anchor": "models",
+}
+
+__all__ = [name for name in globals() if name.isupper()] + list(_EXPORTS)
+
+
+def __getattr__(name: str) -> Any:
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f".{module}", __name__), name)
+    globals()[name] = value  # later lookups skip __getattr__
+    return value
+
+
+def __dir__() -> List[str]:
+    return sorted(set(globals()) | set(_EXPORTS))
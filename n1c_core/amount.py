@@ -0,0 +1,149 @@
+# n1c_core/amount.py
+
+"""
+Integer fixed-point amounts.
+
+Amounts are held as integer minor units (10**-AMOUNT_DECIMALS N1C) and
+percentage rates as integer rate units (10**-4 percent), so fee and tax
+arithmetic is exact. Public APIs keep accepting and returning major-unit
+floats; every value crossing into the ledger is quantized with to_minor().
+
+Rounding policy: charges are rounded half-to-even to the nearest minor
+unit, identically in the scalar and vectorized paths.
+"""
+
+from typing import Tuple
+from n1c_core.config import AMOUNT_DECIMALS
+from n1c_core.errors import TransactionRejectedError
+
+MinorUnits = int
+
+AMOUNT_SCALE = 10 ** AMOUNT_DECIMALS
+RATE_SCALE = 10 ** 4                       # rate units per percent
+CHARGE_DIVISOR = 100 * RATE_SCALE          # amount * rate_units / divisor = charge
+
+# Largest absolute amount or balance, in minor units: what an int64 column holds
+MAX_MINOR = 2 ** 63 - 1
+
+# Largest absolute amount the int64 vectorized path accepts at a 100% rate
+MAX_VECTOR_AMOUNT = MAX_MINOR // (100 * RATE_SCALE)
+
+
+# ---------------------------
+# Conversion
+# ---------------------------
+
+def to_minor(amount: float) -> MinorUnits:
+    """
+    Convert a major-unit amount to integer minor units (half-to-even).
+    Raises TransactionRejectedError ("validation") for NaN, infinity or an
+    amount beyond MAX_MINOR minor units.
+    """
+    try:
+        minor = round(amount * AMOUNT_SCALE)
+    except (ValueError, OverflowError):
+        raise TransactionRejectedError("validation", f"Amount {amount!r} is not a finite number") from None
+    return _checked(minor, amount)
+
+
+def _checked(minor: MinorUnits, amount) -> MinorUnits:
+    if not -MAX_MINOR <= minor <= MAX_MINOR:
+        raise TransactionRejectedError("validation", f"Amount {amount!r} is out of range")
+    return minor
+
+
+def batch_to_minor(amounts):
+    """
+    Vectorized to_minor(): major-unit floats to an int64 array, same rounding.
+    Raises ValueError for NaN, infinity or amounts too large for the
+    vectorized charge computation; the int64 cast would wrap them silently.
+    """
+    import numpy as np
+
+    scaled = np.rint(np.asarray(amounts, dtype=np.float64) * AMOUNT_SCALE)
+    if scaled.size:
+        finite = np.isfinite(scaled)
+        if not finite.all():
+            bad = np.asarray(amounts, dtype=np.float64).ravel()[~finite.ravel()][0]
+            raise ValueError(f"Amount {bad!r} is not a finite number")
+        if np.abs(scaled).max() > MAX_VECTOR_AMOUNT:
+            raise ValueError("Amount out of range for vectorized charge computation")
+    return scaled.astype(np.int64)
+
+
+def from_minor(minor: MinorUnits) -> float:
+    """
+    Convert integer minor units back to a major-unit float.
+    """
+    return minor / AMOUNT_SCALE
+
+
+def to_rate_units(percent: float) -> int:
+    """
+    Convert a percentage rate (e.g. 2.5 for 2.5%) to integer rate units.
+    """
+    return round(percent * RATE_SCALE)
+
+
+def add_minor(balance: float, delta: MinorUnits) -> float:
+    """
+    Apply an integer minor-unit change to a major-unit balance exactly.
+    Raises TransactionRejectedError if the result is out of range.
+    """
+    result = to_minor(balance) + delta
+    return from_minor(_checked(result, from_minor(result)))
+
+
+# ---------------------------
+# Fee & Tax Calculation
+# ---------------------------
+
+def charge(amount: MinorUnits, rate_units: int) -> MinorUnits:
+    """
+    Charge at `rate_units` on a minor-unit amount, rounded half-to-even.
+    """
+    quotient, remainder = divmod(amount * rate_units, CHARGE_DIVISOR)
+    twice = 2 * remainder
+    if twice > CHARGE_DIVISOR or (twice == CHARGE_DIVISOR and quotient % 2):
+        quotient += 1
+    return quotient
+
+
+def fee_and_tax(amount: MinorUnits, spread: float, tax_rate: float) -> Tuple[MinorUnits, MinorUnits]:
+    """
+    Anchor fee and tax for one minor-unit amount.
+    """
+    return charge(amount, to_rate_units(spread)), charge(amount, to_rate_units(tax_rate))
+
+
+def batch_charge(amounts, rate_units):
+    """
+    Vectorized charge(): `amounts` and `rate_units` are int64 arrays (or
+    scalars) broadcast against each other. Same rounding as charge().
+    """
+    import numpy as np
+
+    amounts = np.asarray(amounts, dtype=np.int64)
+    rate_units = np.asarray(rate_units, dtype=np.int64)
+    # Compare both bounds: np.abs() of INT64_MIN is still negative
+    if amounts.size and ((amounts > MAX_VECTOR_AMOUNT) | (amounts < -MAX_VECTOR_AMOUNT)).any():
+        raise ValueError("Amount out of range for vectorized charge computation")
+
+    product = amounts * rate_units
+    quotient, remainder = np.divmod(product, CHARGE_DIVISOR)
+    twice = 2 * remainder
+    round_up = (twice > CHARGE_DIVISOR) | ((twice == CHARGE_DIVISOR) & (quotient % 2 == 1))
+    return quotient + round_up
+
+
+def batch_fee_and_tax(amounts, spread, tax_rate):
+    """
+    Anchor fees and taxes for a batch of minor-unit amounts in one call.
+    `spread` and `tax_rate` are percentages, either scalars or one per amount.
+    Returns (fees, taxes) as int64 arrays.
+    """
+    import numpy as np
+
+    spread_units = np.rint(np.asarray(spread, dtype=np.float64) * RATE_SCALE).astype(np.int64)
+    tax_units = np.rint(np.asarray(tax_rate, dtype=np.float64) * RATE_SCALE).astype(np.int64)
+    return batch_charge(amounts, spread_units), batch_charge(amounts, tax_units)
@@ -1,7 +1,35 @@
 # n1c_core/anchor.py
 
-from typing import Dict, Optional
+from typing import Any, Dict, List, NamedTuple, Optional, Sequence, Tuple
 from n1c_core.models import Anchor
+from n1c_core.amount import (
+    AMOUNT_SCALE,
+    batch_charge,
+    batch_fee_and_tax,
+    batch_to_minor,
+    charge,
+    from_minor,
+    to_minor,
+    to_rate_units,
+)
+
+
+class AnchorQuote(NamedTuple):
+    """
+    Fees and taxes for N amounts across M anchors. `fees`, `taxes` and
+    `totals` are float64 arrays of shape (N, M); column j is anchor_ids[j].
+    """
+    anchor_ids: Tuple[str, ...]
+    fees: Any
+    taxes: Any
+    totals: Any
+
+
+class _RateTable(NamedTuple):
+    anchor_ids: Tuple[str, ...]
+    columns: Dict[str, int]
+    spreads: Any      # int64 rate units, one per anchor
+    tax_rates: Any
 
 
 class AnchorManager:
@@ -14,6 +42,9 @@ class AnchorManager:
         # Anchor storage: anchor_id -> Anchor object
         self.anchors: Dict[str, Anchor] = {}
 
+        # Array view of anchor rates for batch quotes, rebuilt after registration
+        self._rate_table: Optional[_RateTable] = None
+
     # ---------------------------
     # Anchor Registration
     # ---------------------------
@@ -32,6 +63,7 @@ class AnchorManager:
 
         anchor = Anchor(anchor_id=anchor_id, spread=spread, tax_rate=tax_rate)
         self.anchors[anchor_id] = anchor
+        self._rate_table = None
         return anchor
 
     # ---------------------------
@@ -54,18 +86,104 @@ class AnchorManager:
     # ---------------------------
     def calculate_fee(self, anchor_id: str, amount: float) -> float:
         """
-        Calculate fee based on anchor spread.
+        Calculate fee based on anchor spread, rounded to the minor unit.
         """
         anchor = self.get_anchor(anchor_id)
         if not anchor:
             return 0.0
-        return amount * (anchor.spread / 100)
+        return from_minor(charge(to_minor(amount), to_rate_units(anchor.spread)))
 
     def calculate_tax(self, anchor_id: str, amount: float) -> float:
         """
-        Calculate tax based on anchor tax rate.
+        Calculate tax based on anchor tax rate, rounded to the minor unit.
         """
         anchor = self.get_anchor(anchor_id)
         if not anchor:
             return 0.0
-        return amount * (anchor.tax_rate / 100)
+        return from_minor(charge(to_minor(amount), to_rate_units(anchor.tax_rate)))
+
+    def calculate_charges(self, anchor_id: str, amounts: Sequence[float]):
+        """
+        Fees and taxes for a batch of amounts in one vectorized call.
+        Returns two float64 arrays matching calculate_fee/calculate_tax.
+        """
+        import numpy as np
+
+        amounts_minor = self._amounts_minor(amounts)
+        anchor = self.get_anchor(anchor_id)
+        if not anchor:
+            zeros = np.zeros(len(amounts))
+            return zeros, zeros.copy()
+        fees, taxes = batch_fee_and_tax(amounts_minor, anchor.spread, anchor.tax_rate)
+        return fees / AMOUNT_SCALE, taxes / AMOUNT_SCALE
+
+    # ---------------------------
+    # Batch Quotes
+    # ---------------------------
+    @staticmethod
+    def _amounts_minor(amounts: Sequence[float]):
+        # Raises ValueError for non-finite, negative or out-of-range amounts
+        amounts_minor = batch_to_minor(amounts)
+        if amounts_minor.size and amounts_minor.min() < 0:
+            raise ValueError("Amounts must not be negative")
+        return amounts_minor
+
+    def _rates(self) -> _RateTable:
+        if self._rate_table is None:
+            import numpy as np
+
+            anchors = list(self.anchors.values())
+            self._rate_table = _RateTable(
+                anchor_ids=tuple(a.anchor_id for a in anchors),
+                columns={a.anchor_id: i for i, a in enumerate(anchors)},
+                spreads=np.array([to_rate_units(a.spread) for a in anchors], dtype=np.int64),
+                tax_rates=np.array([to_rate_units(a.tax_rate) for a in anchors], dtype=np.int64),
+            )
+        return self._rate_table
+
+    def _quote_minor(self, amounts: Sequence[float], anchor_ids: Optional[Sequence[str]]):
+        table = self._rates()
+        spreads, tax_rates, ids = table.spreads, table.tax_rates, table.anchor_ids
+        if anchor_ids is not None:
+            missing = [a for a in anchor_ids if a not in table.columns]
+            if missing:
+                raise ValueError(f"Unknown anchors: {missing}")
+            columns = [table.columns[a] for a in anchor_ids]
+            spreads, tax_rates, ids = spreads[columns], tax_rates[columns], tuple(anchor_ids)
+
+        amounts_minor = self._amounts_minor(amounts)[:, None]
+        fees = batch_charge(amounts_minor, spreads[None, :])
+        taxes = batch_charge(amounts_minor, tax_rates[None, :])
+        return ids, fees, taxes
+
+    def quote(self, amounts: Sequence[float], anchor_ids: Optional[Sequence[str]] = None) -> AnchorQuote:
+        """
+        Price every amount against every anchor (or the given anchors) in
+        one vectorized call. Values match calculate_fee/calculate_tax.
+        Raises ValueError for non-finite, negative or out-of-range amounts.
+        """
+        ids, fees, taxes = self._quote_minor(amounts, anchor_ids)
+        return AnchorQuote(ids, fees / AMOUNT_SCALE, taxes / AMOUNT_SCALE, (fees + taxes) / AMOUNT_SCALE)
+
+    def best_anchors(
+        self,
+        amounts: Sequence[float],
+        anchor_ids: Optional[Sequence[str]] = None,
+    ) -> List[Optional[Tuple[str, float]]]:
+        """
+        Cheapest anchor for each amount as (anchor_id, fee + tax), or None
+        when no anchor is registered. Ties go to the earliest registered.
+        """
+        ids, fees, taxes = self._quote_minor(amounts, anchor_ids)
+        if not ids:
+            return [None] * len(amounts)
+        totals = fees + taxes
+        best = totals.argmin(axis=1)
+        charges = totals.min(axis=1)
+        return [(ids[j], from_minor(c)) for j, c in zip(best.tolist(), charges.tolist())]
+
+    def best_anchor(self, amount: float, anchor_ids: Optional[Sequence[str]] = None) -> Optional[Tuple[str, float]]:
+        """
+        Cheapest anchor for one amount as (anchor_id, fee + tax).
+        """
+        return self.best_anchors([amount], anchor_ids)[0]
@@ -0,0 +1,87 @@
+# n1c_core/audit.py
+
+from typing import Dict, List, Mapping, Set
+from n1c_core.models import Wallet
+from n1c_core.amount import MinorUnits, to_minor
+
+
+class IntegrityAuditor:
+    """
+    Incremental balance auditor.
+
+    Keeps running credit and debit totals per wallet as the ledger applies
+    changes, and remembers which wallets changed since the last audit. An
+    audit compares each changed wallet's balance with
+    opening + credits - debits; it never touches wallet balances.
+
+    Totals are integer minor units, so the comparison is exact. Recording
+    a change for a wallet that was never tracked starts tracking it from a
+    zero opening balance, so the change is kept and a prior balance shows
+    up as inconsistent instead of failing the ledger write.
+    """
+
+    def __init__(self):
+        self.opening: Dict[str, MinorUnits] = {}   # balance when tracking started
+        self.credits: Dict[str, MinorUnits] = {}
+        self.debits: Dict[str, MinorUnits] = {}
+        self.dirty: Set[str] = set()
+        self.changed: Set[str] = set()             # since take_changed(), for incremental snapshots
+
+    # ---------------------------
+    # Recording
+    # ---------------------------
+    def track(self, address: str, opening_balance: float = 0.0):
+        self.opening[address] = to_minor(opening_balance)
+        self.credits[address] = 0
+        self.debits[address] = 0
+        self.dirty.add(address)
+        self.changed.add(address)
+
+    def record_credit(self, address: str, amount: MinorUnits):
+        self._touch(address)
+        self.credits[address] += amount
+
+    def record_debit(self, address: str, amount: MinorUnits):
+        self._touch(address)
+        self.debits[address] += amount
+
+    def record_transfer(self, sender: str, receiver: str, amount: MinorUnits, fee: MinorUnits, tax: MinorUnits):
+        self._touch(sender)
+        self._touch(receiver)
+        self.debits[sender] += amount + fee + tax
+        self.credits[receiver] += amount
+
+    def _touch(self, address: str):
+        if address not in self.opening:
+            self.track(address)
+        else:
+            self.dirty.add(address)
+            self.changed.add(address)
+
+    def take_changed(self) -> Set[str]:
+        """
+        Addresses tracked or changed since the previous call.
+        """
+        changed, self.changed = self.changed, set()
+        return changed
+
+    def expected_balance(self, address: str) -> MinorUnits:
+        return self.opening[address] + self.credits[address] - self.debits[address]
+
+    # ---------------------------
+    # Auditing
+    # ---------------------------
+    def audit(self, wallets: Mapping[str, Wallet], full: bool = False) -> List[str]:
+        """
+        Check wallets changed since the last audit (or every tracked wallet
+        when `full`). Returns the addresses whose balance does not match
+        their recorded totals; those stay pending for the next audit.
+        """
+        addresses = list(self.opening) if full else list(self.dirty)
+        inconsistent = []
+        for address in addresses:
+            wallet = wallets.get(address)
+            if wallet is None or to_minor(wallet.balance) != self.expected_balance(address):
+                inconsistent.append(address)
+        self.dirty = set(inconsistent) if full else (self.dirty - set(addresses)) | set(inconsistent)
+        return inconsistent
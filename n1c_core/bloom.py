@@ -0,0 +1,317 @@
+# n1c_core/bloom.py
+
+"""
+Bloom filters for cheap "seen before?" checks on transaction ids.
+
+A BloomFilter never forgets an id it was given, but may claim to have
+seen one it was not (a false positive). Callers must therefore treat a
+hit as "maybe" and confirm it with an exact check; a miss is exact for
+as long as the filter holds every id it was given.
+
+ScalableBloomFilter grows by adding slices, each larger and with a
+tighter error rate than the last, so the overall false-positive rate
+stays under its target however many ids arrive. RotatingBloomFilter
+keeps a few scalable generations within a byte budget, dropping the
+oldest when the budget runs out; after that its misses are no longer
+exact and SeenFilter.contains() falls back to the exact check for them.
+"""
+
+import math
+import threading
+from typing import Callable, Iterable, List
+from n1c_core.config import (
+    SEEN_FILTER_CAPACITY,
+    SEEN_FILTER_ERROR_RATE,
+    SEEN_FILTER_GENERATIONS,
+    SEEN_FILTER_MAX_BYTES,
+)
+
+# Each slice grows by GROWTH and tightens its error rate by TIGHTENING;
+# starting at error_rate * (1 - TIGHTENING) keeps the compound rate under
+# error_rate however many slices are added
+GROWTH = 2
+TIGHTENING = 0.5
+
+_MASK64 = (1 << 64) - 1
+
+
+def _hashes(key: str):
+    """
+    Two 32-bit hashes of a key, combined by double hashing (h1 + i * h2)
+    into as many bit positions as a slice needs.
+
+    Python's string hash is cached on the string and salted per process,
+    which makes it free to reuse and hard to aim collisions at; filters
+    therefore only make sense within one process and are never persisted.
+    """
+    value = hash(key) & _MASK64
+    return value & 0xFFFFFFFF, (value >> 32) | 1
+
+
+def slice_bytes(capacity: int, error_rate: float) -> int:
+    """
+    Bytes of bit array a BloomFilter needs for `capacity` ids at `error_rate`.
+    """
+    bits = math.ceil(capacity * -math.log(error_rate) / math.log(2) ** 2)
+    return (bits + 7) // 8
+
+
+class BloomFilter:
+    """
+    Fixed-size Bloom filter sized for `capacity` ids at `error_rate`.
+    """
+
+    def __init__(self, capacity: int, error_rate: float):
+        if capacity <= 0:
+            raise ValueError("capacity must be positive")
+        if not 0.0 < error_rate < 1.0:
+            raise ValueError("error_rate must be between 0 and 1")
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.num_bits = slice_bytes(capacity, error_rate) * 8
+        self.num_hashes = max(1, round(self.num_bits / capacity * math.log(2)))
+        self._bits = bytearray(self.num_bits // 8)
+        self.count = 0       # ids added
+        self.bits_set = 0
+
+    @property
+    def nbytes(self) -> int:
+        return len(self._bits)
+
+    @property
+    def full(self) -> bool:
+        return self.count >= self.capacity
+
+    @property
+    def fill_ratio(self) -> float:
+        return self.bits_set / self.num_bits
+
+    @property
+    def estimated_fp_rate(self) -> float:
+        """
+        False-positive rate implied by the current fill.
+        """
+        return self.fill_ratio ** self.num_hashes
+
+    def add_hashed(self, h1: int, h2: int):
+        bits, m = self._bits, self.num_bits
+        for i in range(self.num_hashes):
+            position = (h1 + i * h2) % m
+            byte, mask = position >> 3, 1 << (position & 7)
+            if not bits[byte] & mask:
+                bits[byte] |= mask
+                self.bits_set += 1
+        self.count += 1
+
+    def contains_hashed(self, h1: int, h2: int) -> bool:
+        bits, m = self._bits, self.num_bits
+        for i in range(self.num_hashes):
+            position = (h1 + i * h2) % m
+            if not bits[position >> 3] & (1 << (position & 7)):
+                return False
+        return True
+
+    def add(self, key: str):
+        self.add_hashed(*_hashes(key))
+
+    def __contains__(self, key: str) -> bool:
+        return self.contains_hashed(*_hashes(key))
+
+
+class ScalableBloomFilter:
+    """
+    Bloom filter that grows with its contents (Almeida et al., 2007).
+
+    Ids go into the newest slice; when it is full a new slice with GROWTH
+    times the capacity and TIGHTENING times the error rate is added. A
+    lookup checks every slice.
+    """
+
+    def __init__(self, capacity: int, error_rate: float):
+        self.initial_capacity = capacity
+        self.error_rate = error_rate
+        self.slices: List[BloomFilter] = [BloomFilter(capacity, error_rate * (1 - TIGHTENING))]
+
+    def __len__(self):
+        return sum(s.count for s in self.slices)
+
+    @property
+    def nbytes(self) -> int:
+        return sum(s.nbytes for s in self.slices)
+
+    def next_slice_bytes(self) -> int:
+        """
+        Size of the slice the next add would allocate, or 0 if none is due.
+        """
+        last = self.slices[-1]
+        if not last.full:
+            return 0
+        return slice_bytes(last.capacity * GROWTH, last.error_rate * TIGHTENING)
+
+    def add_hashed(self, h1: int, h2: int):
+        last = self.slices[-1]
+        if last.full:
+            last = BloomFilter(last.capacity * GROWTH, last.error_rate * TIGHTENING)
+            self.slices.append(last)
+        last.add_hashed(h1, h2)
+
+    def contains_hashed(self, h1: int, h2: int) -> bool:
+        return any(s.contains_hashed(h1, h2) for s in reversed(self.slices))
+
+    def add(self, key: str):
+        self.add_hashed(*_hashes(key))
+
+    def __contains__(self, key: str) -> bool:
+        return self.contains_hashed(*_hashes(key))
+
+    @property
+    def estimated_fp_rate(self) -> float:
+        """
+        Chance a lookup hits in at least one slice by accident.
+        """
+        miss = 1.0
+        for s in self.slices:
+            miss *= 1.0 - s.estimated_fp_rate
+        return 1.0 - miss
+
+
+class RotatingBloomFilter:
+    """
+    Up to `generations` ScalableBloomFilters sharing a `max_bytes` budget.
+
+    New ids go into the newest generation. When it cannot grow within its
+    share of the budget a fresh generation is started and, once there are
+    more than `generations`, the oldest one is dropped with the ids it
+    held. `complete` stays True until that first happens.
+    """
+
+    def __init__(
+        self,
+        capacity: int = SEEN_FILTER_CAPACITY,
+        error_rate: float = SEEN_FILTER_ERROR_RATE,
+        max_bytes: int = SEEN_FILTER_MAX_BYTES,
+        generations: int = SEEN_FILTER_GENERATIONS,
+    ):
+        if generations < 1:
+            raise ValueError("generations must be at least 1")
+        # Each generation's error budget is split so the union stays on target
+        self.capacity = capacity
+        self.error_rate = error_rate / generations
+        self.max_bytes = max_bytes
+        self.generation_bytes = max_bytes // generations
+        if slice_bytes(capacity, self.error_rate * (1 - TIGHTENING)) > self.generation_bytes:
+            raise ValueError("max_bytes is too small for the initial capacity")
+        self.max_generations = generations
+        self.generations: List[ScalableBloomFilter] = [ScalableBloomFilter(capacity, self.error_rate)]
+        self.complete = True
+        self.rotations = 0
+        self._lock = threading.Lock()
+        self._refresh_probes()
+
+    def _refresh_probes(self):
+        # Every slice, newest first, flattened so lookups make no nested calls
+        self._probes = tuple(
+            (s._bits, s.num_bits, s.num_hashes)
+            for g in reversed(self.generations) for s in reversed(g.slices)
+        )
+
+    def __len__(self):
+        return sum(len(g) for g in self.generations)
+
+    @property
+    def nbytes(self) -> int:
+        return sum(g.nbytes for g in self.generations)
+
+    @property
+    def fill_ratio(self) -> float:
+        """
+        Fraction of all allocated bits that are set.
+        """
+        slices = [s for g in self.generations for s in g.slices]
+        return sum(s.bits_set for s in slices) / sum(s.num_bits for s in slices)
+
+    @property
+    def estimated_fp_rate(self) -> float:
+        miss = 1.0
+        for g in self.generations:
+            miss *= 1.0 - g.estimated_fp_rate
+        return 1.0 - miss
+
+    def add(self, key: str):
+        self.add_many((key,))
+
+    def add_many(self, keys: Iterable[str]):
+        with self._lock:
+            for key in keys:
+                current = self.generations[-1]
+                grow = current.next_slice_bytes()
+                if grow:
+                    if current.nbytes + grow > self.generation_bytes:
+                        self._rotate_locked()
+                        current = self.generations[-1]
+                    current.add_hashed(*_hashes(key))
+                    self._refresh_probes()
+                else:
+                    current.add_hashed(*_hashes(key))
+
+    def _rotate_locked(self):
+        generations = self.generations + [ScalableBloomFilter(self.capacity, self.error_rate)]
+        if len(generations) > self.max_generations:
+            del generations[0]
+            self.complete = False
+        # Swap the list whole so lock-free readers see old or new, never half
+        self.generations = generations
+        self.rotations += 1
+
+    def __contains__(self, key: str) -> bool:
+        h1, h2 = _hashes(key)
+        for bits, m, k in self._probes:
+            for i in range(k):
+                position = (h1 + i * h2) % m
+                if not bits[position >> 3] & (1 << (position & 7)):
+                    break
+            else:
+                return True
+        return False
+
+
+class SeenFilter(RotatingBloomFilter):
+    """
+    RotatingBloomFilter in front of an exact membership check.
+
+    contains() answers exactly: a miss skips the exact check while the
+    filter is complete, and a hit is always confirmed, so a false
+    positive costs one exact lookup and never rejects a new id. The
+    counters are for monitoring and may undercount under concurrent use.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.checks = 0
+        self.hits = 0
+        self.false_positives = 0
+        self.exact_checks = 0
+        self.known = 0
+
+    def contains(self, key: str, exact: Callable[[str], bool]) -> bool:
+        self.checks += 1
+        hit = key in self
+        if hit:
+            self.hits += 1
+        elif self.complete:
+            return False
+        self.exact_checks += 1
+        if exact(key):
+            self.known += 1
+            return True
+        if hit:
+            self.false_positives += 1
+        return False
+
+    @property
+    def observed_fp_rate(self) -> float:
+        """
+        Share of new ids that nevertheless hit the filter.
+        """
+        new = self.checks - self.known
+        return self.false_positives / new if new else 0.0
@@ -0,0 +1,245 @@
+# n1c_core/codec.py
+
+"""
+Fixed-layout binary encoding of transactions.
+
+Every record is RECORD_SIZE bytes, little-endian:
+
+    offset  size  field
+         0     1  format version
+         1    36  tx_id      (UTF-8, NUL padded)
+        37    36  sender     (UTF-8, NUL padded)
+        73    36  receiver   (UTF-8, NUL padded)
+       109     8  amount     int64, minor units
+       117     8  fee        int64, minor units
+       125     8  timestamp  int64, microseconds since the Unix epoch (UTC)
+       133    64  signature  raw Ed25519 signature, zeros when unsigned
+
+The first PAYLOAD_SIZE bytes are the canonical signing payload. Records
+are packed back to back, so a buffer of n transactions is exactly
+n * RECORD_SIZE bytes and record i starts at i * RECORD_SIZE.
+"""
+
+import struct
+from datetime import datetime
+from typing import Iterable, Iterator, Sequence, Union
+from n1c_core.models import Transaction
+from n1c_core.amount import from_minor, to_minor
+from n1c_core.timeutil import from_micros, to_micros
+
+VERSION = 1
+FIELD_SIZE = 36
+SIGNATURE_SIZE = 64
+
+_PAYLOAD = struct.Struct(f"<B{FIELD_SIZE}s{FIELD_SIZE}s{FIELD_SIZE}sqqq")
+_RECORD = struct.Struct(f"<B{FIELD_SIZE}s{FIELD_SIZE}s{FIELD_SIZE}sqqq{SIGNATURE_SIZE}s")
+PAYLOAD_SIZE = _PAYLOAD.size    # 133
+RECORD_SIZE = _RECORD.size      # 197
+
+_NO_SIGNATURE = bytes(SIGNATURE_SIZE)
+_INT64_MIN = -2 ** 63
+_INT64_MAX = 2 ** 63 - 1
+
+Buffer = Union[bytes, bytearray, memoryview]
+
+
+# ---------------------------
+# Field Helpers
+# ---------------------------
+
+def _text(value: str, name: str) -> bytes:
+    data = value.encode()
+    if len(data) > FIELD_SIZE or b"\0" in data:
+        raise ValueError(f"{name} {value!r} does not fit the {FIELD_SIZE}-byte codec field")
+    return data
+
+
+def _signature(value: str) -> bytes:
+    if not value:
+        return _NO_SIGNATURE
+    try:
+        data = bytes.fromhex(value)
+    except ValueError:
+        raise ValueError("Signature must be hex-encoded")
+    if len(data) != SIGNATURE_SIZE:
+        raise ValueError(f"Signature must be {SIGNATURE_SIZE} bytes")
+    return data
+
+
+def signature_fits(value: str) -> bool:
+    """
+    True if `value` fits the signature field: empty, or the hex of a
+    SIGNATURE_SIZE-byte signature.
+    """
+    try:
+        _signature(value)
+    except ValueError:
+        return False
+    return True
+
+
+def _int64(value: int, name: str) -> int:
+    if not _INT64_MIN <= value <= _INT64_MAX:
+        raise ValueError(f"{name} {value} does not fit the int64 codec field")
+    return value
+
+
+def _micros(timestamp) -> int:
+    if not isinstance(timestamp, datetime) or timestamp.tzinfo is not None:
+        raise ValueError(f"Timestamp {timestamp!r} must be a naive UTC datetime")
+    return _int64(to_micros(timestamp), "timestamp")
+
+
+def _payload_fields(tx: Transaction):
+    """
+    Payload values in _PAYLOAD order. Raises ValueError for anything the
+    layout cannot hold, never struct.error or TypeError.
+    """
+    return (
+        VERSION,
+        _text(tx.tx_id, "tx_id"),
+        _text(tx.sender, "sender"),
+        _text(tx.receiver, "receiver"),
+        _int64(to_minor(tx.amount), "amount"),
+        _int64(to_minor(tx.fee), "fee"),
+        _micros(tx.timestamp),
+    )
+
+
+def _from_fields(version, tx_id, sender, receiver, amount, fee, timestamp, signature) -> Transaction:
+    if version != VERSION:
+        raise ValueError(f"Unsupported transaction record version {version}")
+    return Transaction(
+        tx_id=tx_id.rstrip(b"\0").decode(),
+        sender=sender.rstrip(b"\0").decode(),
+        receiver=receiver.rstrip(b"\0").decode(),
+        amount=from_minor(amount),
+        fee=from_minor(fee),
+        timestamp=from_micros(timestamp),
+        signature="" if signature == _NO_SIGNATURE else signature.hex(),
+    )
+
+
+# ---------------------------
+# Encoding
+# ---------------------------
+
+def signing_payload(tx: Transaction) -> bytes:
+    """
+    Canonical bytes signed for a transaction: its record minus the signature.
+    """
+    return _PAYLOAD.pack(*_payload_fields(tx))
+
+
+def encode_transaction(tx: Transaction) -> bytes:
+    return _RECORD.pack(*_payload_fields(tx), _signature(tx.signature))
+
+
+def encode_transactions(transactions: Iterable[Transaction]) -> bytes:
+    """
+    Pack transactions back to back into one buffer.
+    """
+    transactions = list(transactions)
+    buffer = bytearray(len(transactions) * RECORD_SIZE)
+    pack_into = _RECORD.pack_into
+    for i, tx in enumerate(transactions):
+        pack_into(buffer, i * RECORD_SIZE, *_payload_fields(tx), _signature(tx.signature))
+    return bytes(buffer)
+
+
+# ---------------------------
+# Decoding
+# ---------------------------
+
+def decode_transaction(buffer: Buffer, offset: int = 0) -> Transaction:
+    return _from_fields(*_RECORD.unpack_from(buffer, offset))
+
+
+def decode_transactions(buffer: Buffer) -> Iterator[Transaction]:
+    """
+    Stream transactions out of a packed buffer.
+    """
+    if len(buffer) % RECORD_SIZE:
+        raise ValueError("Buffer is not a whole number of transaction records")
+    for fields in _RECORD.iter_unpack(buffer):
+        yield _from_fields(*fields)
+
+
+class TransactionBuffer(Sequence):
+    """
+    Read-only view of packed transaction records.
+
+    Nothing is copied up front: records are materialized as Transaction
+    objects on access, payload() and signature() return memoryview slices
+    of the underlying buffer (enough to verify a signature), and columns()
+    exposes every fixed-width field as a NumPy structured array over the
+    same memory.
+    """
+
+    def __init__(self, buffer: Buffer):
+        view = memoryview(buffer).cast("B")
+        if len(view) % RECORD_SIZE:
+            raise ValueError("Buffer is not a whole number of transaction records")
+        self._view = view
+
+    def __len__(self):
+        return len(self._view) // RECORD_SIZE
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            start, stop, step = index.indices(len(self))
+            if step != 1:
+                return [self[i] for i in range(start, stop, step)]
+            return TransactionBuffer(self._view[start * RECORD_SIZE:stop * RECORD_SIZE])
+        return decode_transaction(self._view, self._offset(index))
+
+    def __iter__(self) -> Iterator[Transaction]:
+        for fields in _RECORD.iter_unpack(self._view):
+            yield _from_fields(*fields)
+
+    def _offset(self, index: int) -> int:
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("Transaction index out of range")
+        return index * RECORD_SIZE
+
+    def record(self, index: int) -> memoryview:
+        offset = self._offset(index)
+        return self._view[offset:offset + RECORD_SIZE]
+
+    def payload(self, index: int) -> memoryview:
+        offset = self._offset(index)
+        return self._view[offset:offset + PAYLOAD_SIZE]
+
+    def tx_id(self, index: int) -> str:
+        """
+        Decode only a record's tx_id, e.g. to drop a known transaction
+        before paying for the rest of the record.
+        """
+        offset = self._offset(index) + 1
+        return bytes(self._view[offset:offset + FIELD_SIZE]).rstrip(b"\0").decode()
+
+    def signature(self, index: int) -> memoryview:
+        offset = self._offset(index) + PAYLOAD_SIZE
+        return self._view[offset:offset + SIGNATURE_SIZE]
+
+    def columns(self):
+        """
+        The records as a NumPy structured array sharing this buffer.
+        Fields: version, tx_id, sender, receiver, amount, fee, timestamp,
+        signature.
+        """
+        import numpy as np
+
+        dtype = np.dtype([
+            ("version", "u1"),
+            ("tx_id", f"S{FIELD_SIZE}"),
+            ("sender", f"S{FIELD_SIZE}"),
+            ("receiver", f"S{FIELD_SIZE}"),
+            ("amount", "<i8"),
+            ("fee", "<i8"),
+            ("timestamp", "<i8"),
+            ("signature", f"V{SIGNATURE_SIZE}"),
+        ])
+        return np.frombuffer(self._view, dtype=dtype)
@@ -0,0 +1,326 @@
+# n1c_core/columnar.py
+
+from array import array
+from collections.abc import Mapping, Sequence
+from typing import Dict, Iterator, List, Optional
+from n1c_core.models import Wallet, Transaction, Anchor
+from n1c_core.amount import from_minor, to_minor
+from n1c_core.storage import LedgerStorage, _minute_totals
+from n1c_core.timeutil import from_micros, to_micros
+
+# Signature encodings in the `sig_kinds` column
+_SIG_HEX = 0    # stored as the raw bytes of a lowercase hex signature
+_SIG_TEXT = 1   # stored as UTF-8 text (anything that would not round-trip)
+
+_INT64_MIN = -2 ** 63
+_INT64_MAX = 2 ** 63 - 1
+
+
+class AddressTable:
+    """
+    Interns strings (wallet addresses, anchor ids) to dense integer IDs.
+    """
+
+    def __init__(self):
+        self._ids: Dict[str, int] = {}
+        self._values: List[str] = []
+
+    def intern(self, value: str) -> int:
+        index = self._ids.get(value)
+        if index is None:
+            index = len(self._values)
+            self._ids[value] = index
+            self._values.append(value)
+        return index
+
+    def lookup(self, value: str) -> Optional[int]:
+        return self._ids.get(value)
+
+    def __getitem__(self, index: int) -> str:
+        return self._values[index]
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+
+class IdTable(Sequence):
+    """
+    Append-only strings (transaction ids) packed into one UTF-8 buffer,
+    with an open-addressing hash index of row numbers, so a stored id
+    costs its bytes plus a few array slots instead of a str and a dict
+    entry.
+    """
+
+    _EMPTY = -1
+
+    def __init__(self):
+        self.data = bytearray()
+        self.ends = array("Q")
+        self.slots = array("q", [self._EMPTY]) * 8
+
+    def _key(self, row: int) -> bytearray:
+        return self.data[self.ends[row - 1] if row else 0:self.ends[row]]
+
+    def _probe(self, key: bytes) -> int:
+        """
+        Slot holding `key`, or the empty slot where it would go.
+        """
+        slots, mask = self.slots, len(self.slots) - 1
+        slot = hash(key) & mask
+        while True:
+            row = slots[slot]
+            if row == self._EMPTY or self._key(row) == key:
+                return slot
+            slot = (slot + 1) & mask
+
+    def _grow(self):
+        self.slots = array("q", [self._EMPTY]) * (len(self.slots) * 2)
+        for row in range(len(self.ends)):
+            self.slots[self._probe(bytes(self._key(row)))] = row
+
+    def append(self, value: str) -> int:
+        """
+        Store a new id and return its row. Raises ValueError if it is
+        already stored.
+        """
+        key = value.encode()
+        slot = self._probe(key)
+        if self.slots[slot] != self._EMPTY:
+            raise ValueError(f"{value} already stored")
+        row = len(self.ends)
+        self.data += key
+        self.ends.append(len(self.data))
+        self.slots[slot] = row
+        if 2 * len(self.ends) > len(self.slots):
+            self._grow()
+        return row
+
+    def row_of(self, value: str) -> Optional[int]:
+        row = self.slots[self._probe(value.encode())]
+        return None if row == self._EMPTY else row
+
+    def __getitem__(self, row):
+        if isinstance(row, slice):
+            return [self[i] for i in range(*row.indices(len(self)))]
+        return self._key(row if row >= 0 else row + len(self)).decode()
+
+    def __iter__(self) -> Iterator[str]:
+        data, start = self.data, 0
+        for end in self.ends:
+            yield data[start:end].decode()
+            start = end
+
+    def __contains__(self, value) -> bool:
+        return isinstance(value, str) and self.row_of(value) is not None
+
+    def __len__(self) -> int:
+        return len(self.ends)
+
+    def nbytes(self) -> int:
+        return len(self.data) + self.ends.itemsize * len(self.ends) + self.slots.itemsize * len(self.slots)
+
+
+class TransactionStore:
+    """
+    Column-oriented transaction storage.
+
+    Each field is a typed array indexed by row number; addresses and anchor
+    ids are interned to integers, amounts, fees and taxes are int64 minor
+    units, and transaction ids and signatures are packed into byte buffers.
+    Transaction objects are only built when a row is read.
+    """
+
+    def __init__(self):
+        self.addresses = AddressTable()
+        self.anchor_ids = AddressTable()
+
+        self.tx_ids = IdTable()
+
+        self.senders = array("I")
+        self.receivers = array("I")
+        self.amounts = array("q")             # minor units
+        self.fees = array("q")
+        self.timestamps = array("q")          # microseconds since the epoch
+        self.anchors = array("i")             # interned anchor id, -1 for none
+        self.taxes = array("q")
+
+        self.sig_kinds = array("B")
+        self.sig_ends = array("Q")
+        self.signatures = bytearray()
+
+    # ---------------------------
+    # Writes
+    # ---------------------------
+    def append(self, tx: Transaction, anchor_id: Optional[str] = None, tax: float = 0.0) -> int:
+        """
+        Store a transaction and return its row number.
+        """
+        if tx.tx_id in self.tx_ids:
+            raise ValueError(f"Transaction {tx.tx_id} already stored")
+
+        # fromhex() also takes uppercase and whitespace, which would not read back
+        try:
+            signature = bytes.fromhex(tx.signature)
+        except ValueError:
+            signature = None
+        if signature is not None and signature.hex() == tx.signature:
+            kind = _SIG_HEX
+        else:
+            signature = tx.signature.encode()
+            kind = _SIG_TEXT
+
+        # Convert every field before touching a column, so a value that does
+        # not fit leaves the columns aligned
+        amount, fee, tax_minor = to_minor(tx.amount), to_minor(tx.fee), to_minor(tax)
+        timestamp = to_micros(tx.timestamp)
+        if not _INT64_MIN <= timestamp <= _INT64_MAX:
+            raise ValueError(f"Timestamp {tx.timestamp!r} is out of range")
+
+        row = self.tx_ids.append(tx.tx_id)
+        self.senders.append(self.addresses.intern(tx.sender))
+        self.receivers.append(self.addresses.intern(tx.receiver))
+        self.amounts.append(amount)
+        self.fees.append(fee)
+        self.timestamps.append(timestamp)
+        self.anchors.append(self.anchor_ids.intern(anchor_id) if anchor_id else -1)
+        self.taxes.append(tax_minor)
+        self.signatures += signature
+        self.sig_kinds.append(kind)
+        self.sig_ends.append(len(self.signatures))
+        return row
+
+    # ---------------------------
+    # Reads
+    # ---------------------------
+    def row_of(self, tx_id: str) -> Optional[int]:
+        return self.tx_ids.row_of(tx_id)
+
+    def get(self, row: int) -> Transaction:
+        """
+        Materialize the Transaction stored at a row.
+        """
+        start = self.sig_ends[row - 1] if row else 0
+        raw = self.signatures[start:self.sig_ends[row]]
+        signature = raw.hex() if self.sig_kinds[row] == _SIG_HEX else raw.decode()
+        return Transaction(
+            tx_id=self.tx_ids[row],
+            sender=self.addresses[self.senders[row]],
+            receiver=self.addresses[self.receivers[row]],
+            amount=from_minor(self.amounts[row]),
+            fee=from_minor(self.fees[row]),
+            timestamp=from_micros(self.timestamps[row]),
+            signature=signature,
+        )
+
+    def tax_of(self, row: int) -> float:
+        return from_minor(self.taxes[row])
+
+    def anchor_of(self, row: int) -> Optional[str]:
+        index = self.anchors[row]
+        return self.anchor_ids[index] if index >= 0 else None
+
+    def __contains__(self, tx_id: str) -> bool:
+        return tx_id in self.tx_ids
+
+    def __len__(self) -> int:
+        return len(self.tx_ids)
+
+    def nbytes(self) -> int:
+        """
+        Approximate bytes held by the typed columns, id table and signature
+        buffer.
+        """
+        columns = (
+            self.senders, self.receivers, self.amounts, self.fees,
+            self.timestamps, self.anchors, self.taxes, self.sig_kinds, self.sig_ends,
+        )
+        return (
+            sum(column.itemsize * len(column) for column in columns)
+            + self.tx_ids.nbytes()
+            + len(self.signatures)
+        )
+
+
+class WalletHistory(Sequence):
+    """
+    A wallet's transaction history as row offsets into a TransactionStore.
+    """
+
+    def __init__(self, store: TransactionStore):
+        self._store = store
+        self.rows = array("Q")
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self._store.get(row) for row in self.rows[index]]
+        return self._store.get(self.rows[index])
+
+    def __iter__(self) -> Iterator[Transaction]:
+        get = self._store.get
+        return (get(row) for row in self.rows)
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+
+class _TransactionMap(Mapping):
+    def __init__(self, store: TransactionStore):
+        self._store = store
+
+    def __getitem__(self, tx_id):
+        row = self._store.row_of(tx_id)
+        if row is None:
+            raise KeyError(tx_id)
+        return self._store.get(row)
+
+    def __contains__(self, tx_id):
+        return tx_id in self._store
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._store.tx_ids)
+
+    def __len__(self):
+        return len(self._store)
+
+
+class ColumnarStorage(LedgerStorage):
+    """
+    In-memory backend that keeps transactions in a TransactionStore.
+    Wallet histories hold row offsets instead of Transaction references.
+    """
+
+    def __init__(self):
+        self.store = TransactionStore()
+        self.wallets: Dict[str, Wallet] = {}
+        self.transactions = _TransactionMap(self.store)
+        self.anchors: Dict[str, Anchor] = {}
+
+    def add_wallet(self, wallet: Wallet):
+        wallet.transactions = WalletHistory(self.store)
+        self.wallets[wallet.address] = wallet
+
+    def add_anchor(self, anchor: Anchor):
+        self.anchors[anchor.anchor_id] = anchor
+
+    def record_transaction(self, tx, sender_wallet, receiver_wallet, anchor_id=None, tax=0.0):
+        row = self.store.append(tx, anchor_id, tax)
+        sender_wallet.transactions.rows.append(row)
+        receiver_wallet.transactions.rows.append(row)
+
+    def save_balances(self, wallets):
+        pass
+
+    def transaction_anchor(self, tx_id):
+        row = self.store.row_of(tx_id)
+        return self.store.anchor_of(row) if row is not None else None
+
+    def transaction_tax(self, tx_id):
+        row = self.store.row_of(tx_id)
+        return self.store.tax_of(row) if row is not None else 0.0
+
+    def anchor_minute_totals(self):
+        store = self.store
+        return _minute_totals(
+            (store.anchor_ids[index], store.get(row), store.tax_of(row))
+            for row, index in enumerate(store.anchors) if index >= 0
+        )
@@ -33,6 +33,7 @@ DEFAULT_NODE_PORT = 8000
 MAX_PEERS = 50
 PEER_DISCOVERY_INTERVAL = 30  # Seconds between peer discovery attempts
 LEDGER_SYNC_INTERVAL = 60     # Seconds between ledger sync
+MERKLE_DEPTH = 3              # Levels below the root of the sync Merkle tree (16**depth leaf buckets)
 
 # ---------------------------
 # Paths
@@ -40,19 +41,79 @@ LEDGER_SYNC_INTERVAL = 60     # Seconds between ledger sync
 BASE_DIR = Path(__file__).resolve().parent.parent
 LEDGER_DB_PATH = BASE_DIR / "data" / "ledger.db"
 WALLET_KEYS_PATH = BASE_DIR / "data" / "keys"
+LEDGER_WAL_PATH = BASE_DIR / "data" / "ledger.wal"
+LEDGER_SNAPSHOT_PATH = BASE_DIR / "data" / "snapshots"
+# Directories are created by whatever first writes to them, not on import
 
-# Ensure directories exist
-os.makedirs(LEDGER_DB_PATH.parent, exist_ok=True)
-os.makedirs(WALLET_KEYS_PATH, exist_ok=True)
+# ---------------------------
+# Concurrency Settings
+# ---------------------------
+LEDGER_LOCK_STRIPES = 64  # Wallet lock stripes used by a thread-safe Ledger
+INGEST_QUEUE_DEPTH = 10_000      # Pending submissions before submitters wait
+INGEST_BATCH_SIZE = 256          # Max transactions applied per micro-batch
+INGEST_BATCH_DEADLINE_MS = 2     # Max wait to fill a micro-batch
+LEDGER_SHARDS = os.cpu_count() or 1  # Worker processes used by a ShardedLedger
+
+# ---------------------------
+# Mempool Settings
+# ---------------------------
+MEMPOOL_TTL = 60.0                 # Seconds a parked transaction may wait for funds
+MEMPOOL_MAX_BYTES = 64 * 1024**2   # Approximate memory cap for parked transactions
+
+# ---------------------------
+# Replay Filter Settings
+# ---------------------------
+SEEN_FILTER_CAPACITY = 100_000        # tx_ids in the first slice of each filter generation
+SEEN_FILTER_ERROR_RATE = 0.01         # Target false-positive rate; each costs one exact lookup
+SEEN_FILTER_MAX_BYTES = 16 * 1024**2  # Memory budget across all generations
+SEEN_FILTER_GENERATIONS = 2           # Generations kept; the oldest is dropped on rotation
+
+# ---------------------------
+# Anchor Reporting Settings
+# ---------------------------
+ROLLUP_MINUTE_RETENTION = 2 * 24 * 60  # Minute buckets kept per anchor (2 days)
+ROLLUP_HOUR_RETENTION = 90 * 24        # Hour buckets kept per anchor (90 days); day buckets are kept for good
+
+# ---------------------------
+# Metrics Settings
+# ---------------------------
+METRICS_ENABLED = False  # Instrument new Ledgers with per-phase latency metrics
+METRICS_LATENCY_BUCKETS = (                 # Histogram upper bounds, in seconds
+    1e-6, 2.5e-6, 5e-6, 1e-5, 2.5e-5, 5e-5, 1e-4, 2.5e-4, 5e-4, 1e-3, 5e-3, 1e-2, 0.1, 1.0,
+)
+
+# ---------------------------
+# Durability Settings
+# ---------------------------
+WAL_GROUP_COMMIT_SIZE = 128        # fsync after this many log records...
+WAL_GROUP_COMMIT_INTERVAL_MS = 5   # ...or after this many ms, whichever comes first
+SNAPSHOT_INTERVAL = 300            # Seconds between periodic checkpoints
+SNAPSHOT_KEEP = 2                  # Number of snapshot files kept on disk
+
+# ---------------------------
+# Storage Settings
+# ---------------------------
+SQLITE_BATCH_SIZE = 1000           # Buffered transaction inserts per write batch
+SQLITE_STATEMENT_CACHE = 64        # Prepared statements cached per connection
+SQLITE_WALLET_CACHE = 100_000      # Wallet objects kept in memory (LRU)
 
 # ---------------------------
 # Cryptography Settings
 # ---------------------------
 SIGNATURE_ALGORITHM = "Ed25519"
 KEY_SIZE = 256  # Bits for Ed25519 (fixed standard)
+KEY_CACHE_SIZE = 10_000  # Decoded keys kept in the KeyRegistry LRU cache
+VERIFY_BATCH_WORKERS = os.cpu_count() or 1  # Processes used by verify_batch
+VERIFY_BATCH_CHUNK_SIZE = 512               # Signatures per worker task
+SIGN_BATCH_WORKERS = os.cpu_count() or 1    # Processes used by sign_transactions
+SIGN_BATCH_CHUNK_SIZE = 512                 # Signatures per worker task
+KEYGEN_WORKERS = os.cpu_count() or 1        # Processes used by bulk keypair generation
+KEYGEN_CHUNK_SIZE = 1024                    # Keypairs derived per worker task
+KEYSTORE_INDEX_TAIL = 4096  # Keystore records appended before the on-disk index is rewritten
 
 # ---------------------------
 # Misc Settings
 # ---------------------------
 MAX_TRANSACTION_AMOUNT = 1_000_000.0  # Example limit
+AMOUNT_DECIMALS = 6  # Amounts are held as integer units of 10**-6 N1C
 TRANSACTION_ID_LENGTH = 32
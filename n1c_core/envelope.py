@@ -0,0 +1,260 @@
+# n1c_core/envelope.py
+
+"""
+Anchor-signed transaction batches.
+
+An anchor seals N transactions under one Merkle root and signs the root
+once. A node that trusts the anchor accepts the batch by recomputing the
+root and checking that single signature instead of N sender signatures
+(see Ledger.add_anchor_batch). Any one transaction can still be audited
+later against the batch header with an inclusion proof of log2(N)
+hashes.
+
+Leaves are the transaction_digest() of each transaction (its full codec
+record, sender signature included) hashed under a 0x00 prefix; inner
+nodes hash 0x01 + left + right, so a leaf can never pass for a node. On a
+level with an odd number of nodes the last one is carried up unchanged.
+
+The anchor signs MAGIC | version | count | root | anchor_id, so a root
+cannot be replayed under another anchor or batch size.
+"""
+
+import hashlib
+import struct
+from typing import List, NamedTuple, Optional, Sequence, Tuple
+from n1c_core.models import Transaction
+from n1c_core.codec import RECORD_SIZE, decode_transactions, encode_transactions
+from n1c_core.keyring import PrivateKeyLike, PublicKeyLike, load_private_key, load_public_key
+
+MAGIC = b"N1CE"
+VERSION = 1
+DIGEST_SIZE = 32
+SIGNATURE_SIZE = 64
+
+_LEAF = b"\x00"
+_NODE = b"\x01"
+
+# Signed message, followed by the UTF-8 anchor id
+_SIGNED = struct.Struct("<4sHI32s")            # magic, version, count, root
+# Wire header, followed by the anchor id and `count` codec records
+_ENVELOPE = struct.Struct("<4sHI32s64sH")      # magic, version, count, root, signature, anchor id length
+
+
+class BatchHeader(NamedTuple):
+    """
+    What an anchor signs for a batch, and all an auditor needs besides
+    a transaction and its proof.
+    """
+    anchor_id: str
+    count: int
+    root: bytes
+    signature: bytes
+
+
+class InclusionProof(NamedTuple):
+    """
+    Position of a transaction in its batch and the sibling hashes on its
+    path to the root, leaf level first. Levels where the node had no
+    sibling are skipped.
+    """
+    index: int
+    siblings: Tuple[bytes, ...]
+
+
+# ---------------------------
+# Merkle Tree
+# ---------------------------
+
+def _leaves(transactions: Sequence[Transaction]) -> List[bytes]:
+    # One codec buffer for the whole batch; each record hashes to its transaction_digest()
+    buffer = memoryview(encode_transactions(transactions))
+    sha256 = hashlib.sha256
+    return [
+        sha256(_LEAF + sha256(buffer[offset:offset + RECORD_SIZE]).digest()).digest()
+        for offset in range(0, len(buffer), RECORD_SIZE)
+    ]
+
+
+def _levels(leaves: List[bytes]) -> List[List[bytes]]:
+    """
+    Every level of the tree, leaves first and the root level last.
+    """
+    sha256 = hashlib.sha256
+    levels = [leaves]
+    level = leaves
+    while len(level) > 1:
+        parents = [sha256(_NODE + level[i] + level[i + 1]).digest() for i in range(0, len(level) - 1, 2)]
+        if len(level) % 2:
+            parents.append(level[-1])
+        levels.append(parents)
+        level = parents
+    return levels
+
+
+def batch_root(transactions: Sequence[Transaction]) -> bytes:
+    """
+    Merkle root over a non-empty batch. Raises ValueError for an empty
+    batch or transactions the codec cannot encode.
+    """
+    if not transactions:
+        raise ValueError("An anchor batch needs at least one transaction")
+    return _levels(_leaves(transactions))[-1][0]
+
+
+def _signed_message(anchor_id: str, count: int, root: bytes) -> bytes:
+    return _SIGNED.pack(MAGIC, VERSION, count, root) + anchor_id.encode()
+
+
+# ---------------------------
+# Envelopes
+# ---------------------------
+
+class BatchEnvelope:
+    """
+    A batch of transactions with the anchor's signed header. Build one
+    with seal_batch() or decode_envelope().
+    """
+
+    def __init__(self, header: BatchHeader, transactions: Sequence[Transaction]):
+        self.header = header
+        self.transactions = list(transactions)
+        self._levels: Optional[List[List[bytes]]] = None
+
+    @property
+    def anchor_id(self) -> str:
+        return self.header.anchor_id
+
+    def __len__(self):
+        return len(self.transactions)
+
+    def _tree(self) -> List[List[bytes]]:
+        if self._levels is None:
+            self._levels = _levels(_leaves(self.transactions))
+        return self._levels
+
+    def verify(self, public_key: PublicKeyLike) -> bool:
+        """
+        True if the transactions hash to the header root and the anchor's
+        signature over the header is valid. One signature check per batch.
+        """
+        header = self.header
+        if header.count != len(self.transactions) or not self.transactions:
+            return False
+        try:
+            root = self._tree()[-1][0]
+        except ValueError:
+            return False
+        return root == header.root and verify_header(header, public_key)
+
+    def proof(self, index: int) -> InclusionProof:
+        """
+        Inclusion proof for the transaction at `index`.
+        """
+        if not 0 <= index < len(self.transactions):
+            raise ValueError(f"No transaction at index {index} in a batch of {len(self.transactions)}")
+        siblings = []
+        position = index
+        for level in self._tree()[:-1]:
+            sibling = position ^ 1
+            if sibling < len(level):
+                siblings.append(level[sibling])
+            position //= 2
+        return InclusionProof(index, tuple(siblings))
+
+
+def seal_batch(anchor_id: str, transactions: Sequence[Transaction], private_key: PrivateKeyLike) -> BatchEnvelope:
+    """
+    Seal transactions into an envelope signed with the anchor's key.
+    Transactions should carry the anchor's fee, as the ledger charges it;
+    their sender signatures are sealed in but not checked here.
+    """
+    transactions = list(transactions)
+    if not transactions:
+        raise ValueError("An anchor batch needs at least one transaction")
+    levels = _levels(_leaves(transactions))
+    root = levels[-1][0]
+    signature = load_private_key(private_key).sign(_signed_message(anchor_id, len(transactions), root))
+    envelope = BatchEnvelope(BatchHeader(anchor_id, len(transactions), root, signature), transactions)
+    envelope._levels = levels
+    return envelope
+
+
+# ---------------------------
+# Auditing
+# ---------------------------
+
+def verify_header(header: BatchHeader, public_key: PublicKeyLike) -> bool:
+    """
+    True if the header carries the anchor's valid signature over its root.
+    """
+    from cryptography.exceptions import InvalidSignature
+    try:
+        load_public_key(public_key).verify(
+            header.signature, _signed_message(header.anchor_id, header.count, header.root)
+        )
+        return True
+    except (InvalidSignature, ValueError):
+        return False
+
+
+def verify_inclusion(tx: Transaction, proof: InclusionProof, header: BatchHeader) -> bool:
+    """
+    True if `tx` is the transaction at proof.index of the batch with this
+    header. Check the header itself once with verify_header().
+    """
+    if not 0 <= proof.index < header.count:
+        return False
+    try:
+        node = _leaves([tx])[0]
+    except ValueError:
+        return False
+
+    # Walk up the same shape the tree was built in, consuming a sibling
+    # only on levels where the node had one
+    siblings = iter(proof.siblings)
+    position, width = proof.index, header.count
+    sha256 = hashlib.sha256
+    while width > 1:
+        if position ^ 1 < width:
+            sibling = next(siblings, None)
+            if sibling is None:
+                return False
+            node = sha256(_NODE + (sibling + node if position % 2 else node + sibling)).digest()
+        position //= 2
+        width = (width + 1) // 2
+    return next(siblings, None) is None and node == header.root
+
+
+# ---------------------------
+# Wire Format
+# ---------------------------
+
+def encode_envelope(envelope: BatchEnvelope) -> bytes:
+    """
+    Header, anchor id, then the transactions as back-to-back codec records.
+    """
+    header = envelope.header
+    anchor_id = header.anchor_id.encode()
+    return (
+        _ENVELOPE.pack(MAGIC, VERSION, header.count, header.root, header.signature, len(anchor_id))
+        + anchor_id
+        + encode_transactions(envelope.transactions)
+    )
+
+
+def decode_envelope(data: bytes) -> BatchEnvelope:
+    """
+    Parse an encoded envelope. Raises ValueError if it is malformed; the
+    signature is not checked.
+    """
+    if len(data) < _ENVELOPE.size:
+        raise ValueError("Envelope is truncated")
+    magic, version, count, root, signature, id_length = _ENVELOPE.unpack_from(data)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError("Unsupported envelope format")
+    start = _ENVELOPE.size + id_length
+    if len(data) != start + count * RECORD_SIZE:
+        raise ValueError("Envelope length does not match its transaction count")
+    anchor_id = data[_ENVELOPE.size:start].decode()
+    transactions = list(decode_transactions(memoryview(data)[start:]))
+    return BatchEnvelope(BatchHeader(anchor_id, count, root, signature), transactions)
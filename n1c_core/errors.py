@@ -0,0 +1,41 @@
+# n1c_core/errors.py
+
+"""
+Exceptions raised when the ledger refuses transactions. Both are
+ValueErrors and are importable from n1c_core.ledger as well.
+"""
+
+from typing import List, Optional, Tuple
+from n1c_core.models import Transaction
+
+
+class TransactionRejectedError(ValueError):
+    """
+    Raised by Ledger.add_transaction for an invalid transaction. `reason`
+    is a short code: duplicate, unknown_wallet, unknown_anchor, validation,
+    signature or encoding.
+    """
+
+    def __init__(self, reason: str, message: str):
+        self.reason = reason
+        super().__init__(message)
+
+    def __reduce__(self):
+        return type(self), (self.reason, str(self))
+
+
+class BatchRejectedError(ValueError):
+    """
+    Raised by Ledger.add_transactions when any item of a batch is invalid.
+    For an atomic batch nothing has been applied; otherwise the valid items
+    were applied and are listed in `applied`.
+
+    Attributes:
+        rejections: (index, tx_id, reason) for every rejected item.
+        applied: transactions applied from the batch, in batch order.
+    """
+
+    def __init__(self, rejections: List[Tuple[int, str, str]], applied: Optional[List[Transaction]] = None):
+        self.rejections = rejections
+        self.applied = applied if applied is not None else []
+        super().__init__(f"Batch rejected: {len(rejections)} invalid transaction(s)")
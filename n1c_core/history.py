@@ -0,0 +1,215 @@
+# n1c_core/history.py
+
+import threading
+from array import array
+from bisect import bisect_left, bisect_right
+from datetime import datetime
+from typing import Dict, Iterator, List, NamedTuple, Optional, Sequence, Tuple
+from n1c_core.models import Transaction
+from n1c_core.timeutil import to_micros
+
+# Rows fetched per query when streaming a TimeOrderedHistory
+STREAM_PAGE = 500
+
+
+class HistoryPage(NamedTuple):
+    """
+    One page of wallet history. Pass `next_cursor` back to get the next
+    page; it is None on the last page.
+    """
+    transactions: List[Transaction]
+    next_cursor: Optional[str]
+
+
+class TimeOrderedHistory(Sequence):
+    """
+    A wallet history its backend can read in (timestamp, position) order
+    by range, such as a database with a timestamp index. HistoryIndexes
+    keeps no index of its own for these and asks window() for each page.
+    `position` is any stable integer that orders equal timestamps.
+    """
+
+    def window(
+        self,
+        since: Optional[int],
+        until: Optional[int],
+        after: Optional[Tuple[int, int]],
+        limit: int,
+    ) -> List[Tuple[int, int, Transaction]]:
+        """
+        Up to `limit` (timestamp, position, transaction) entries in order,
+        with since <= timestamp < until (microseconds, None for unbounded)
+        and (timestamp, position) > `after` if given.
+        """
+        raise NotImplementedError
+
+
+class HistoryIndex:
+    """
+    Timestamp-ordered index over one wallet's transaction history.
+
+    Holds (timestamp, position) pairs sorted by timestamp, where position
+    is the transaction's index in the wallet's history. New history
+    entries are picked up incrementally on each query; in-order appends
+    cost O(1), late timestamps are inserted in place. Readers hold `lock`
+    while syncing and reading the arrays, since a sync may insert.
+    """
+
+    def __init__(self):
+        self.timestamps = array("q")   # microseconds since the epoch, sorted
+        self.positions = array("Q")    # index into the wallet history
+        self.synced = 0                # history entries indexed so far
+        self.lock = threading.Lock()
+
+    def sync(self, history: Sequence[Transaction]):
+        # Entries appended while syncing are left for the next query
+        end = len(history)
+        if end == self.synced:
+            return
+        for position, tx in enumerate(history[self.synced:end], start=self.synced):
+            key = to_micros(tx.timestamp)
+            if not self.timestamps or key >= self.timestamps[-1]:
+                self.timestamps.append(key)
+                self.positions.append(position)
+            else:
+                at = bisect_right(self.timestamps, key)
+                self.timestamps.insert(at, key)
+                self.positions.insert(at, position)
+        self.synced = end
+
+    def bounds(
+        self,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        cursor: Optional[str] = None,
+    ) -> Tuple[int, int]:
+        """
+        Return the [start, end) slice of the index for a query.
+        `since` is inclusive, `until` exclusive.
+        """
+        start = bisect_left(self.timestamps, to_micros(since)) if since else 0
+        end = bisect_left(self.timestamps, to_micros(until)) if until else len(self.timestamps)
+        if cursor is not None:
+            timestamp, position = _decode_cursor(cursor)
+            # Entries with equal timestamps are ordered by position
+            lo = bisect_left(self.timestamps, timestamp)
+            hi = bisect_right(self.timestamps, timestamp, lo)
+            resume = bisect_right(self.positions, position, lo, hi)
+            start = max(start, resume)
+        return start, end
+
+
+def _encode_cursor(timestamp: int, position: int) -> str:
+    return f"{timestamp}:{position}"
+
+
+def _decode_cursor(cursor: str) -> Tuple[int, int]:
+    try:
+        timestamp, position = cursor.split(":")
+        return int(timestamp), int(position)
+    except ValueError:
+        raise ValueError(f"Invalid history cursor {cursor!r}")
+
+
+class HistoryIndexes:
+    """
+    Per-wallet history indexes, created lazily on first query.
+    """
+
+    def __init__(self):
+        self._indexes: Dict[str, HistoryIndex] = {}
+        self._lock = threading.Lock()
+
+    def _index(self, address: str) -> HistoryIndex:
+        index = self._indexes.get(address)
+        if index is None:
+            with self._lock:
+                index = self._indexes.setdefault(address, HistoryIndex())
+        return index
+
+    def page(
+        self,
+        address: str,
+        history: Sequence[Transaction],
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        cursor: Optional[str] = None,
+        limit: int = 100,
+    ) -> HistoryPage:
+        """
+        Return up to `limit` transactions in timestamp order.
+        """
+        if limit < 1:
+            raise ValueError("limit must be at least 1")
+        if isinstance(history, TimeOrderedHistory):
+            return _window_page(history, since, until, cursor, limit)
+        index = self._index(address)
+        with index.lock:
+            index.sync(history)
+            start, end = index.bounds(since, until, cursor)
+            stop = min(end, start + limit)
+            transactions = [history[index.positions[i]] for i in range(start, stop)]
+            next_cursor = None
+            if stop < end:
+                last = stop - 1
+                next_cursor = _encode_cursor(index.timestamps[last], index.positions[last])
+        return HistoryPage(transactions, next_cursor)
+
+    def iterate(
+        self,
+        address: str,
+        history: Sequence[Transaction],
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+    ) -> Iterator[Transaction]:
+        """
+        Stream transactions in timestamp order without building a list.
+        """
+        if isinstance(history, TimeOrderedHistory):
+            yield from _window_stream(history, since, until)
+            return
+        index = self._index(address)
+        with index.lock:
+            index.sync(history)
+            start, end = index.bounds(since, until)
+            # Later syncs may insert, so stream from a copy of the positions
+            positions = index.positions[start:end]
+        for position in positions:
+            yield history[position]
+
+
+def _micros(timestamp: Optional[datetime]) -> Optional[int]:
+    return to_micros(timestamp) if timestamp else None
+
+
+def _window_page(
+    history: TimeOrderedHistory,
+    since: Optional[datetime],
+    until: Optional[datetime],
+    cursor: Optional[str],
+    limit: int,
+) -> HistoryPage:
+    after = _decode_cursor(cursor) if cursor is not None else None
+    # One extra entry tells whether there is a next page
+    entries = history.window(_micros(since), _micros(until), after, limit + 1)
+    next_cursor = None
+    if len(entries) > limit:
+        entries = entries[:limit]
+        next_cursor = _encode_cursor(*entries[-1][:2])
+    return HistoryPage([tx for _, _, tx in entries], next_cursor)
+
+
+def _window_stream(
+    history: TimeOrderedHistory,
+    since: Optional[datetime],
+    until: Optional[datetime],
+) -> Iterator[Transaction]:
+    since_micros, until_micros = _micros(since), _micros(until)
+    after = None
+    while True:
+        entries = history.window(since_micros, until_micros, after, STREAM_PAGE)
+        for _, _, tx in entries:
+            yield tx
+        if len(entries) < STREAM_PAGE:
+            return
+        after = entries[-1][:2]
@@ -0,0 +1,201 @@
+# n1c_core/ingest.py
+
+import asyncio
+from concurrent.futures import Executor
+from datetime import datetime
+from typing import Any, List, Optional, Tuple
+from n1c_core.models import Transaction
+from n1c_core.ledger import BatchRejectedError, Ledger
+from n1c_core.config import INGEST_BATCH_DEADLINE_MS, INGEST_BATCH_SIZE, INGEST_QUEUE_DEPTH
+
+_CLOSE = object()      # queue sentinel
+_TIMEOUT = object()
+
+
+class IngestQueue:
+    """
+    asyncio front end for Ledger writes.
+
+    Submissions wait in a bounded queue; when it is full, submit() waits
+    for room. A single consumer coalesces pending submissions into
+    micro-batches of up to `batch_size` items, waiting at most
+    `batch_deadline_ms` after the first one, and applies each batch with
+    one non-atomic Ledger.add_transactions call in `executor` (the loop's
+    default executor if None). Every submitter gets its own result.
+
+        async with IngestQueue(ledger) as queue:
+            tx = await queue.submit(tx_id, "alice", "bob", 10.0, signature)
+    """
+
+    def __init__(
+        self,
+        ledger: Ledger,
+        max_depth: int = INGEST_QUEUE_DEPTH,
+        batch_size: int = INGEST_BATCH_SIZE,
+        batch_deadline_ms: float = INGEST_BATCH_DEADLINE_MS,
+        executor: Optional[Executor] = None,
+    ):
+        if max_depth < 1 or batch_size < 1:
+            raise ValueError("max_depth and batch_size must be at least 1")
+        self.ledger = ledger
+        self.max_depth = max_depth
+        self.batch_size = batch_size
+        self.batch_deadline = batch_deadline_ms / 1000
+        self.executor = executor
+
+        self._queue: Optional[asyncio.Queue] = None
+        self._consumer: Optional[asyncio.Task] = None
+        self._getter: Optional[asyncio.Future] = None
+        self._closed = False
+
+        # Counters
+        self.batches = 0
+        self.applied = 0
+        self.rejected = 0
+
+    # ---------------------------
+    # Lifecycle
+    # ---------------------------
+    async def start(self):
+        if self._consumer is not None:
+            raise ValueError("Ingest queue already started")
+        self._queue = asyncio.Queue(self.max_depth)
+        self._consumer = asyncio.get_running_loop().create_task(self._run())
+
+    async def close(self):
+        """
+        Stop accepting submissions and wait until everything queued so far
+        has been applied.
+        """
+        if self._consumer is None or self._closed:
+            return
+        self._closed = True
+        await self._queue.put(_CLOSE)
+        await self._consumer
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    # ---------------------------
+    # Submission
+    # ---------------------------
+    async def submit(
+        self,
+        tx_id: str,
+        sender_address: str,
+        receiver_address: str,
+        amount: float,
+        signature: str,
+        anchor_id: Optional[str] = None,
+        timestamp: Optional[datetime] = None,
+    ) -> Transaction:
+        """
+        Queue a transaction and wait until it is applied. Raises ValueError
+        with the ledger's reason if it is rejected.
+        """
+        if self._consumer is None or self._closed:
+            raise ValueError("Ingest queue is not running")
+        future = asyncio.get_running_loop().create_future()
+        item = (tx_id, sender_address, receiver_address, amount, signature, anchor_id, timestamp)
+        await self._queue.put((item, future))
+        return await future
+
+    @property
+    def depth(self) -> int:
+        return self._queue.qsize() if self._queue is not None else 0
+
+    # ---------------------------
+    # Consumer
+    # ---------------------------
+    async def _next(self, timeout: Optional[float]) -> Any:
+        # The pending get() survives a timeout, so no item is ever dropped
+        if self._getter is None:
+            self._getter = asyncio.ensure_future(self._queue.get())
+        done, _ = await asyncio.wait((self._getter,), timeout=timeout)
+        if not done:
+            return _TIMEOUT
+        getter, self._getter = self._getter, None
+        return getter.result()
+
+    async def _collect(self) -> Tuple[List[Tuple[tuple, asyncio.Future]], bool]:
+        first = await self._next(None)
+        if first is _CLOSE:
+            return [], True
+        batch = [first]
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.batch_deadline
+        while len(batch) < self.batch_size:
+            entry = self._queue.get_nowait() if self._getter is None and not self._queue.empty() else None
+            if entry is None:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                entry = await self._next(remaining)
+                if entry is _TIMEOUT:
+                    break
+            if entry is _CLOSE:
+                return batch, True
+            batch.append(entry)
+        return batch, False
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        closing = False
+        while not closing:
+            batch, closing = await self._collect()
+            if not batch:
+                continue
+            items = [item for item, _ in batch]
+            try:
+                results = await loop.run_in_executor(self.executor, self._apply, items)
+            except Exception as exc:
+                results = [exc] * len(batch)
+            for (_, future), result in zip(batch, results):
+                if future.done():     # submitter gave up
+                    continue
+                if isinstance(result, Exception):
+                    future.set_exception(result)
+                else:
+                    future.set_result(result)
+
+    def _apply(self, items: List[tuple]) -> List[Any]:
+        """
+        Apply one micro-batch; returns a Transaction or an exception per item.
+        """
+        try:
+            results = self._apply_items(items)
+        except Exception:
+            # Something failed the whole call: apply the items one at a time so
+            # each submitter gets only its own error
+            results = [self._apply_item(item) for item in items]
+
+        self.batches += 1
+        rejected = sum(isinstance(result, Exception) for result in results)
+        self.applied += len(results) - rejected
+        self.rejected += rejected
+        return results
+
+    def _apply_items(self, items: List[tuple]) -> List[Any]:
+        try:
+            applied = self.ledger.add_transactions(items, atomic=False)
+            rejections = {}
+        except BatchRejectedError as exc:
+            applied = exc.applied
+            rejections = {index: reason for index, _, reason in exc.rejections}
+
+        remaining = iter(applied)
+        return [
+            ValueError(f"Transaction {item[0]} rejected: {rejections[index]}")
+            if index in rejections else next(remaining)
+            for index, item in enumerate(items)
+        ]
+
+    def _apply_item(self, item: tuple) -> Any:
+        try:
+            return self._apply_items([item])[0]
+        except Exception as exc:
+            return exc
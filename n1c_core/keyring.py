@@ -0,0 +1,257 @@
+# n1c_core/keyring.py
+
+import threading
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Dict, Optional, Union
+from n1c_core.config import KEY_CACHE_SIZE
+
+# cryptography is imported on first use, not when the package is imported
+if TYPE_CHECKING:
+    from cryptography.hazmat.primitives.asymmetric import ed25519
+    from n1c_core.keystore import Keystore
+
+PublicKeyLike = Union[str, bytes, "ed25519.Ed25519PublicKey"]
+PrivateKeyLike = Union[str, bytes, "ed25519.Ed25519PrivateKey"]
+
+RAW_KEY_SIZE = 32
+
+
+# ---------------------------
+# Key Decoding
+# ---------------------------
+
+def load_public_key(key: PublicKeyLike) -> "ed25519.Ed25519PublicKey":
+    """
+    Decode a public key given as PEM text, raw 32 bytes or a key object.
+    """
+    from cryptography.hazmat.primitives.asymmetric import ed25519
+    from cryptography.hazmat.primitives import serialization
+    if isinstance(key, ed25519.Ed25519PublicKey):
+        return key
+    if isinstance(key, bytes) and len(key) == RAW_KEY_SIZE:
+        return ed25519.Ed25519PublicKey.from_public_bytes(key)
+    if isinstance(key, str):
+        key = key.encode()
+    return serialization.load_pem_public_key(key)
+
+
+def load_private_key(key: PrivateKeyLike) -> "ed25519.Ed25519PrivateKey":
+    """
+    Decode a private key given as PEM text, raw 32 bytes or a key object.
+    """
+    from cryptography.hazmat.primitives.asymmetric import ed25519
+    from cryptography.hazmat.primitives import serialization
+    if isinstance(key, ed25519.Ed25519PrivateKey):
+        return key
+    if isinstance(key, bytes) and len(key) == RAW_KEY_SIZE:
+        return ed25519.Ed25519PrivateKey.from_private_bytes(key)
+    if isinstance(key, str):
+        key = key.encode()
+    return serialization.load_pem_private_key(key, password=None)
+
+
+def public_key_bytes(key: PublicKeyLike) -> bytes:
+    """
+    Return the raw 32-byte encoding of a public key.
+    """
+    if isinstance(key, bytes) and len(key) == RAW_KEY_SIZE:
+        return key
+    from cryptography.hazmat.primitives import serialization
+    return load_public_key(key).public_bytes(
+        encoding=serialization.Encoding.Raw,
+        format=serialization.PublicFormat.Raw
+    )
+
+
+def private_key_bytes(key: PrivateKeyLike) -> bytes:
+    """
+    Return the raw 32-byte encoding of a private key.
+    """
+    if isinstance(key, bytes) and len(key) == RAW_KEY_SIZE:
+        return key
+    from cryptography.hazmat.primitives import serialization
+    return load_private_key(key).private_bytes(
+        encoding=serialization.Encoding.Raw,
+        format=serialization.PrivateFormat.Raw,
+        encryption_algorithm=serialization.NoEncryption()
+    )
+
+
+def _decode_public(raw: bytes) -> "ed25519.Ed25519PublicKey":
+    from cryptography.hazmat.primitives.asymmetric import ed25519
+    return ed25519.Ed25519PublicKey.from_public_bytes(raw)
+
+
+def _decode_private(raw: bytes) -> "ed25519.Ed25519PrivateKey":
+    from cryptography.hazmat.primitives.asymmetric import ed25519
+    return ed25519.Ed25519PrivateKey.from_private_bytes(raw)
+
+
+# ---------------------------
+# Key Registry
+# ---------------------------
+
+class KeyRegistry:
+    """
+    Address -> key registry shared by wallets, transactions and the ledger.
+
+    Keys are stored as raw 32-byte strings. Decoded key objects are kept in a
+    bounded LRU cache so hot addresses skip decoding on every sign/verify call.
+
+    With a keystore, addresses not registered in memory are looked up on
+    disk, so wallets created through it never hold every private key in
+    memory at once.
+    """
+
+    def __init__(self, capacity: int = KEY_CACHE_SIZE, keystore: Optional["Keystore"] = None):
+        if capacity <= 0:
+            raise ValueError("Key cache capacity must be positive")
+        self.capacity = capacity
+        self.keystore = keystore
+
+        # Raw key storage: address -> 32-byte key
+        self._public_raw: Dict[str, bytes] = {}
+        self._private_raw: Dict[str, bytes] = {}
+
+        # Decoded key objects, most recently used last
+        self._public_cache: "OrderedDict[str, ed25519.Ed25519PublicKey]" = OrderedDict()
+        self._private_cache: "OrderedDict[str, ed25519.Ed25519PrivateKey]" = OrderedDict()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        # Guards the raw maps and LRU caches; lookups reorder the caches
+        self._lock = threading.Lock()
+
+    # ---------------------------
+    # Registration
+    # ---------------------------
+    def register(
+        self,
+        address: str,
+        public_key: PublicKeyLike,
+        private_key: Optional[PrivateKeyLike] = None
+    ):
+        """
+        Register the keys of a wallet address, replacing any previous entry.
+        """
+        public_raw = public_key_bytes(public_key)
+        private_raw = private_key_bytes(private_key) if private_key is not None else None
+        with self._lock:
+            self._public_raw[address] = public_raw
+            self._public_cache.pop(address, None)
+            if private_raw is not None:
+                self._private_raw[address] = private_raw
+                self._private_cache.pop(address, None)
+
+    def remove(self, address: str):
+        """
+        Forget in-memory keys for an address. Keystore records are permanent.
+        """
+        with self._lock:
+            self._public_raw.pop(address, None)
+            self._private_raw.pop(address, None)
+            self._public_cache.pop(address, None)
+            self._private_cache.pop(address, None)
+
+    # ---------------------------
+    # Key Retrieval
+    # ---------------------------
+    def get_public_key(self, address: str) -> Optional["ed25519.Ed25519PublicKey"]:
+        """
+        Return the decoded public key for an address, or None if unknown.
+        """
+        return self._lookup(address, self.get_public_key_bytes, self._public_cache, _decode_public)
+
+    def get_private_key(self, address: str) -> Optional["ed25519.Ed25519PrivateKey"]:
+        """
+        Return the decoded private key for an address, or None if unknown.
+        """
+        return self._lookup(address, self.get_private_key_bytes, self._private_cache, _decode_private)
+
+    def get_public_key_bytes(self, address: str) -> Optional[bytes]:
+        raw = self._public_raw.get(address)
+        if raw is None and self.keystore is not None:
+            return self.keystore.get_public_key_bytes(address)
+        return raw
+
+    def get_private_key_bytes(self, address: str) -> Optional[bytes]:
+        raw = self._private_raw.get(address)
+        if raw is None and self.keystore is not None:
+            return self.keystore.get_private_key_bytes(address)
+        return raw
+
+    def get_public_key_pem(self, address: str) -> Optional[str]:
+        public_key = self.get_public_key(address)
+        if public_key is None:
+            return None
+        from cryptography.hazmat.primitives import serialization
+        return public_key.public_bytes(
+            encoding=serialization.Encoding.PEM,
+            format=serialization.PublicFormat.SubjectPublicKeyInfo
+        ).decode()
+
+    def get_private_key_pem(self, address: str) -> Optional[str]:
+        private_key = self.get_private_key(address)
+        if private_key is None:
+            return None
+        from cryptography.hazmat.primitives import serialization
+        return private_key.private_bytes(
+            encoding=serialization.Encoding.PEM,
+            format=serialization.PrivateFormat.PKCS8,
+            encryption_algorithm=serialization.NoEncryption()
+        ).decode()
+
+    def _lookup(self, address, read_raw, cache, decode):
+        # Held across the read so a concurrent register() cannot be undone
+        # by caching the key it replaced
+        with self._lock:
+            key = cache.get(address)
+            if key is not None:
+                cache.move_to_end(address)
+                self.hits += 1
+                return key
+
+            raw = read_raw(address)
+            if raw is None:
+                return None
+
+            self.misses += 1
+            key = decode(raw)
+            cache[address] = key
+            if len(cache) > self.capacity:
+                cache.popitem(last=False)
+                self.evictions += 1
+            return key
+
+    # ---------------------------
+    # Utility Methods
+    # ---------------------------
+    def stats(self) -> Dict[str, int]:
+        return {
+            "keys": len(self),
+            "cached": len(self._public_cache) + len(self._private_cache),
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+    def __contains__(self, address: str) -> bool:
+        return self.get_public_key_bytes(address) is not None
+
+    def __len__(self) -> int:
+        # Distinct addresses: keystore records plus in-memory keys it lacks
+        with self._lock:
+            addresses = list(self._public_raw)
+        if self.keystore is None:
+            return len(addresses)
+        return len(self.keystore) + sum(address not in self.keystore for address in addresses)
+
+
+# Process-wide registry used when no explicit registry is given
+_default_registry = KeyRegistry()
+
+
+def get_key_registry() -> KeyRegistry:
+    return _default_registry
@@ -0,0 +1,307 @@
+# n1c_core/keystore.py
+
+import hashlib
+import mmap
+import os
+import struct
+import threading
+import zlib
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple, Union
+from n1c_core.config import KEYSTORE_INDEX_TAIL, WALLET_KEYS_PATH
+
+DATA_FILE = "keys.dat"
+INDEX_FILE = "keys.idx"
+
+DATA_MAGIC = b"N1CK"
+INDEX_MAGIC = b"N1CI"
+VERSION = 1
+ADDRESS_SIZE = 64
+
+# Private keys are stored unencrypted, so only the owner may read them
+DIRECTORY_MODE = 0o700
+FILE_MODE = 0o600
+
+# Data file: header, then fixed-size records in append order.
+# Record: address (NUL padded) | public key | private key | crc32 of the rest
+_DATA_HEADER = struct.Struct("<4sHH")     # magic, version, address size
+_RECORD = struct.Struct(f"<{ADDRESS_SIZE}s32s32sI")
+
+# Index file: header, then (address hash, record number) entries sorted by hash
+_INDEX_HEADER = struct.Struct("<4sHxxQ")  # magic, version, records covered
+_ENTRY = struct.Struct("<QQ")
+
+
+def _address_hash(address: bytes) -> int:
+    return int.from_bytes(hashlib.blake2b(address, digest_size=8).digest(), "little")
+
+
+def _encode_address(address: str) -> bytes:
+    raw = address.encode()
+    if not raw or len(raw) > ADDRESS_SIZE or b"\0" in raw:
+        raise ValueError(f"Keystore addresses must be 1-{ADDRESS_SIZE} bytes without NUL")
+    return raw
+
+
+def _open_private(path: Path, flags: int) -> int:
+    """
+    Open a keystore file as owner-only, tightening an existing one.
+    """
+    fd = os.open(path, flags | os.O_CREAT, FILE_MODE)
+    os.fchmod(fd, FILE_MODE)
+    return fd
+
+
+class Keystore:
+    """
+    Append-only on-disk store of raw 32-byte wallet keypairs.
+
+    Keys live in one file of fixed-size, checksummed records. Lookups go
+    through a separate index of address hashes sorted for binary search,
+    which is memory-mapped, so opening a keystore of any size reads only
+    its header and keys are read from disk one record at a time.
+
+    Records appended since the index was last written (the tail) are
+    indexed in memory by address only. The index is rewritten once the
+    tail reaches `index_tail_limit` records, and on close(). A stale or
+    missing index is rebuilt on open; a torn record at the end of the
+    data file, left by a crash mid-append, is truncated.
+
+    Records are never rewritten or deleted. Keys are not encrypted; the
+    directory and its files are created owner-only, and existing ones are
+    narrowed to that on open.
+    """
+
+    def __init__(
+        self,
+        directory: Union[str, Path] = WALLET_KEYS_PATH,
+        index_tail_limit: int = KEYSTORE_INDEX_TAIL,
+    ):
+        if index_tail_limit < 1:
+            raise ValueError("index_tail_limit must be at least 1")
+        self.directory = Path(directory)
+        self.index_tail_limit = index_tail_limit
+        self.data_path = self.directory / DATA_FILE
+        self.index_path = self.directory / INDEX_FILE
+
+        os.makedirs(self.directory, mode=DIRECTORY_MODE, exist_ok=True)
+        os.chmod(self.directory, DIRECTORY_MODE)
+        if self.index_path.exists():
+            os.chmod(self.index_path, FILE_MODE)
+        self._lock = threading.Lock()
+        self._fd = _open_private(self.data_path, os.O_APPEND | os.O_RDWR)
+        self._file = os.fdopen(self._fd, "a+b")
+        self._records = self._open_data()
+
+        # (mapped index, entry count), replaced as one value so lock-free
+        # readers never pair a new map with an old count
+        self._index: Optional[Tuple[mmap.mmap, int]] = None
+        self._open_index()
+        indexed = self._index[1]
+
+        # Records past the index: address -> record number
+        self._tail: Dict[bytes, int] = {}
+        for number in range(indexed, self._records):
+            self._tail[self._read(number)[0]] = number
+
+    # ---------------------------
+    # Writing
+    # ---------------------------
+    def add(self, address: str, public_key: bytes, private_key: bytes):
+        self.add_many([(address, public_key, private_key)])
+
+    def add_many(self, keypairs: Iterable[Tuple[str, bytes, bytes]]):
+        """
+        Append (address, public key, private key) records with one write
+        and one fsync. Raises ValueError, writing nothing, if any address
+        is already stored or repeated, or any key is not 32 raw bytes.
+        """
+        with self._lock:
+            chunks: List[bytes] = []
+            added: Dict[bytes, int] = {}
+            for address, public_key, private_key in keypairs:
+                raw = _encode_address(address)
+                if len(public_key) != 32 or len(private_key) != 32:
+                    raise ValueError("Keystore keys must be raw 32-byte strings")
+                if raw in added or self._find(raw) is not None:
+                    raise ValueError(f"Keys for {address} are already stored")
+                added[raw] = self._records + len(chunks)
+                body = _RECORD.pack(raw, public_key, private_key, 0)[:-4]
+                chunks.append(body + zlib.crc32(body).to_bytes(4, "little"))
+            if not chunks:
+                return
+
+            self._file.write(b"".join(chunks))
+            self._file.flush()
+            os.fsync(self._fd)
+            self._records += len(chunks)
+            self._tail.update(added)
+            if len(self._tail) >= self.index_tail_limit:
+                self._write_index()
+
+    # ---------------------------
+    # Lookup
+    # ---------------------------
+    def get(self, address: str) -> Optional[Tuple[bytes, bytes]]:
+        """
+        Return (public key, private key) for an address, or None.
+        """
+        try:
+            raw = _encode_address(address)
+        except ValueError:
+            return None
+        number = self._find(raw)
+        if number is None:
+            return None
+        _, public_key, private_key = self._read(number)
+        return public_key, private_key
+
+    def get_public_key_bytes(self, address: str) -> Optional[bytes]:
+        keypair = self.get(address)
+        return keypair[0] if keypair is not None else None
+
+    def get_private_key_bytes(self, address: str) -> Optional[bytes]:
+        keypair = self.get(address)
+        return keypair[1] if keypair is not None else None
+
+    def addresses(self) -> Iterator[str]:
+        """
+        Every stored address, in the order it was added.
+        """
+        for number in range(self._records):
+            yield self._read(number)[0].decode()
+
+    def _find(self, raw: bytes) -> Optional[int]:
+        number = self._tail.get(raw)
+        if number is not None:
+            return number
+        index, indexed = self._index
+
+        # Leftmost entry with this hash, then check each candidate record
+        target = _address_hash(raw)
+        lo, hi = 0, indexed
+        offset = _INDEX_HEADER.size
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if _ENTRY.unpack_from(index, offset + mid * _ENTRY.size)[0] < target:
+                lo = mid + 1
+            else:
+                hi = mid
+        while lo < indexed:
+            entry_hash, number = _ENTRY.unpack_from(index, offset + lo * _ENTRY.size)
+            if entry_hash != target:
+                break
+            if self._read(number)[0] == raw:
+                return number
+            lo += 1
+        return None
+
+    def _read(self, number: int) -> Tuple[bytes, bytes, bytes]:
+        record = os.pread(self._fd, _RECORD.size, _DATA_HEADER.size + number * _RECORD.size)
+        address, public_key, private_key, _ = _RECORD.unpack(record)
+        return address.rstrip(b"\0"), public_key, private_key
+
+    # ---------------------------
+    # Files
+    # ---------------------------
+    def _open_data(self) -> int:
+        """
+        Validate or write the data file header, truncate a torn tail and
+        return the number of complete records.
+        """
+        size = os.fstat(self._fd).st_size
+        if size == 0:
+            self._file.write(_DATA_HEADER.pack(DATA_MAGIC, VERSION, ADDRESS_SIZE))
+            self._file.flush()
+            os.fsync(self._fd)
+            return 0
+
+        header = os.pread(self._fd, _DATA_HEADER.size, 0)
+        if len(header) < _DATA_HEADER.size or _DATA_HEADER.unpack(header) != (DATA_MAGIC, VERSION, ADDRESS_SIZE):
+            raise ValueError(f"{self.data_path} is not a version {VERSION} keystore")
+
+        records = (size - _DATA_HEADER.size) // _RECORD.size
+        # A crash can only tear the last append, so checksums are checked
+        # from the end back to the first intact record
+        while records:
+            record = os.pread(self._fd, _RECORD.size, _DATA_HEADER.size + (records - 1) * _RECORD.size)
+            if zlib.crc32(record[:-4]) == int.from_bytes(record[-4:], "little"):
+                break
+            records -= 1
+        end = _DATA_HEADER.size + records * _RECORD.size
+        if end != size:
+            self._file.truncate(end)
+            os.fsync(self._fd)
+        return records
+
+    def _open_index(self):
+        try:
+            with open(self.index_path, "rb") as f:
+                index = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (FileNotFoundError, ValueError):
+            # Missing, or empty and so impossible to map
+            self._write_index()
+            return
+
+        magic, version, covered = _INDEX_HEADER.unpack_from(index, 0)
+        expected = _INDEX_HEADER.size + covered * _ENTRY.size
+        if magic != INDEX_MAGIC or version != VERSION or covered > self._records or len(index) != expected:
+            index.close()
+            self._write_index()
+        else:
+            self._index = (index, covered)
+
+    def _write_index(self):
+        """
+        Merge the tail into the index and atomically replace the index file.
+        Rebuilds from the data file when there is no usable index.
+        """
+        if self._index is None:
+            numbers = range(self._records)
+            entries = [(_address_hash(self._read(number)[0]), number) for number in numbers]
+        else:
+            entries = list(_ENTRY.iter_unpack(self._index[0][_INDEX_HEADER.size:]))
+            entries += [(_address_hash(raw), number) for raw, number in self._tail.items()]
+        entries.sort()
+
+        tmp_path = self.index_path.with_suffix(".tmp")
+        with os.fdopen(_open_private(tmp_path, os.O_WRONLY | os.O_TRUNC), "wb") as f:
+            f.write(_INDEX_HEADER.pack(INDEX_MAGIC, VERSION, len(entries)))
+            f.write(b"".join(_ENTRY.pack(*entry) for entry in entries))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.index_path)
+
+        # The previous map is closed once no reader holds it
+        with open(self.index_path, "rb") as f:
+            self._index = (mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ), len(entries))
+        self._tail = {}
+
+    # ---------------------------
+    # Utility Methods
+    # ---------------------------
+    def reindex(self):
+        with self._lock:
+            if self._tail:
+                self._write_index()
+
+    def close(self):
+        with self._lock:
+            if self._file.closed:
+                return
+            if self._tail:
+                self._write_index()
+            self._index[0].close()
+            self._file.close()
+
+    def __contains__(self, address: str) -> bool:
+        return self.get(address) is not None
+
+    def __len__(self) -> int:
+        return self._records
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
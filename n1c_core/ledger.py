@@ -1,52 +1,328 @@
 # n1c_core/ledger.py
 
+import logging
+import threading
+import time
+from contextlib import nullcontext
 from datetime import datetime
-from typing import Dict, Optional
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Set, Tuple
 from n1c_core.models import Wallet, Transaction, Anchor
 from n1c_core.ledger_rules import (
     verify_balance,
     validate_transaction,
-    calculate_fee,
 )
+from n1c_core.amount import MAX_VECTOR_AMOUNT, add_minor, batch_fee_and_tax, fee_and_tax, from_minor, to_minor
+from n1c_core.errors import BatchRejectedError, TransactionRejectedError
+from n1c_core.keyring import KeyRegistry, PublicKeyLike, get_key_registry, load_public_key, public_key_bytes
+from n1c_core.utils import verify_signature
+from n1c_core.wal import WriteAheadLog
+from n1c_core.snapshot import Snapshot, SnapshotBuilder, SnapshotDelta, SnapshotStore
+from n1c_core.storage import LedgerStorage, MemoryStorage
+from n1c_core.audit import IntegrityAuditor
+from n1c_core.history import HistoryIndexes, HistoryPage
+from n1c_core.locking import IdReservations, StripedLock
+from n1c_core.merkle import MerkleIndex, transaction_digest
+from n1c_core.codec import signature_fits
+from n1c_core.bloom import SeenFilter
+from n1c_core.metrics import LedgerMetrics
+from n1c_core.rollups import AnchorRollups, RollupBucket, RollupTotals
+from n1c_core.envelope import BatchEnvelope
+from n1c_core import config
+from n1c_core.config import LEDGER_LOCK_STRIPES, SNAPSHOT_INTERVAL
+
+logger = logging.getLogger(__name__)
+
+# Metric labels for batch rejection reasons; anything else is an encoding failure
+_REJECTION_CODES = {
+    "duplicate transaction id": "duplicate",
+    "sender or receiver wallet does not exist": "unknown_wallet",
+    "unknown anchor": "unknown_anchor",
+    "validation failed": "validation",
+    "invalid signature": "signature",
+}
 
 
 class Ledger:
     """
     Ledger class manages all wallets, transactions, and anchors.
     It enforces ledger rules and applies transactions.
+
+    When a write-ahead log is given, its records are replayed on startup and
+    every state change is logged before it is applied. With a snapshot store
+    as well, startup loads the newest snapshot and replays only the log
+    written after it, and new checkpoints are taken every
+    `snapshot_interval` seconds. Durable storage (such as SQLiteStorage)
+    records the log offset it has committed, and startup replays only the
+    records after it; this pairing is single-threaded only.
+
+    Wallets, transactions and anchors live in a pluggable storage backend;
+    the in-memory MemoryStorage is the default.
+
+    Amounts are quantized to integer minor units (see n1c_core.amount) and
+    all balance arithmetic is exact; the API still takes and returns floats.
+
+    With `thread_safe`, writes may come from many threads. Wallets are
+    guarded by a pool of striped locks, always taken in stripe order, so
+    transfers between unrelated wallets run in parallel; transaction ids
+    are reserved before the duplicate check so concurrent inserts of the
+    same id cannot both succeed.
+
+    A MerkleIndex, if given, is kept up to date with every transaction in
+    storage so peers can diff ledgers cheaply (see n1c_core.sync).
+
+    A SeenFilter, if given, answers duplicate checks from memory: a miss
+    skips the storage lookup while the filter still holds every known id,
+    and a hit is confirmed against storage so a false positive never
+    rejects a new transaction.
+
+    Callables in `credit_listeners` are called with the address of every
+    wallet credited by a deposit or transfer, after the change is applied
+    and outside any ledger lock. A listener that raises is logged and
+    skipped: the write it was told about has already been committed.
+
+    With a LedgerMetrics (or config.METRICS_ENABLED), each write records
+    per-phase latencies and accept/reject counts; see n1c_core.metrics.
+
+    Every anchored transaction is added to `rollups`, per-anchor minute,
+    hour and day totals that answer get_anchor_totals() and
+    get_anchor_report() without scanning history.
+
+    Batches sealed by an anchor registered with trust_anchor() are accepted
+    on the anchor's one signature over their Merkle root; see
+    add_anchor_batch() and n1c_core.envelope.
     """
 
-    def __init__(self):
-        self.wallets: Dict[str, Wallet] = {}       # wallet address -> Wallet
-        self.transactions: Dict[str, Transaction] = {}  # tx_id -> Transaction
-        self.anchors: Dict[str, Anchor] = {}       # anchor_id -> Anchor
+    def __init__(
+        self,
+        key_registry: Optional[KeyRegistry] = None,
+        verify_signatures: bool = False,
+        wal: Optional[WriteAheadLog] = None,
+        snapshots: Optional[SnapshotStore] = None,
+        snapshot_interval: float = SNAPSHOT_INTERVAL,
+        storage: Optional[LedgerStorage] = None,
+        thread_safe: bool = False,
+        lock_stripes: int = LEDGER_LOCK_STRIPES,
+        merkle_index: Optional[MerkleIndex] = None,
+        seen_filter: Optional[SeenFilter] = None,
+        metrics: Optional[LedgerMetrics] = None,
+        rollups: Optional[AnchorRollups] = None,
+    ):
+        self.storage = storage if storage is not None else MemoryStorage()
+        if thread_safe and wal is not None and self.storage.durable:
+            # Concurrent writers could commit a later log offset ahead of an earlier record
+            raise ValueError("A thread-safe Ledger cannot pair a write-ahead log with durable storage")
+        # Durable storage is told which log record each write belongs to
+        self._log_offsets = wal is not None and self.storage.durable
+        if self._log_offsets:
+            # ...and commits an offset only once the log is synced up to it
+            self.storage.before_wal_commit = wal.sync_to
+        self.wallets = self.storage.wallets             # wallet address -> Wallet
+        self.transactions = self.storage.transactions   # tx_id -> Transaction
+        self.anchors = self.storage.anchors             # anchor_id -> Anchor
+
+        # tx_ids restored from a snapshot, whose history is not kept in memory
+        self.archived_tx_ids: Set[str] = set()
+
+        # Running per-wallet totals for incremental integrity audits, from
+        # the balances already in storage
+        self.auditor = IntegrityAuditor()
+        for address, balance in self.storage.wallet_balances():
+            self.auditor.track(address, balance)
+
+        # Timestamp-ordered history indexes for paginated queries
+        self.history_indexes = HistoryIndexes()
+
+        # Notified with each credited address (e.g. by the mempool)
+        self.credit_listeners: List[Callable[[str], None]] = []
+
+        # Per-phase instrumentation; None keeps the write paths uninstrumented
+        if metrics is None and config.METRICS_ENABLED:
+            metrics = LedgerMetrics()
+        self.metrics = metrics
+        if metrics is not None:
+            # Ledgers sharing the metrics export their sizes as separate series
+            labels = metrics.ledger_labels()
+            metrics.add_gauge("n1c_ledger_wallets", "Wallets in the ledger.", lambda: len(self.wallets), labels)
+            metrics.add_gauge(
+                "n1c_ledger_transactions", "Transactions in the ledger.", lambda: len(self.transactions), labels
+            )
+
+        # Sender public keys are resolved by address through the registry
+        self.key_registry = key_registry if key_registry is not None else get_key_registry()
+        self.verify_signatures = verify_signatures
+
+        # anchor_id -> public key of anchors whose signed batches skip sender checks
+        self.trusted_anchors: Dict[str, Any] = {}
+
+        # Synchronization, only in thread-safe mode
+        self.thread_safe = thread_safe
+        self._wallet_locks = StripedLock(lock_stripes) if thread_safe else None
+        self._tx_ids = IdReservations() if thread_safe else None
+        self._meta_lock = threading.Lock() if thread_safe else nullcontext()
+        self._storage_lock = (
+            threading.Lock() if thread_safe and not self.storage.concurrent_writes else nullcontext()
+        )
+        self._checkpoint_lock = threading.Lock()
+
+        # Snapshot state kept between captures, and tx_ids applied since the
+        # last one; both start with the first capture
+        self._snapshot_builder: Optional[SnapshotBuilder] = None
+        self._unsaved_tx_ids: Optional[List[str]] = None
+
+        self.seen_filter: Optional[SeenFilter] = None
+        self.merkle_index = merkle_index
+        if merkle_index is not None:
+            merkle_index.add_many(self.storage.transactions.values())
+
+        # Per-anchor reporting totals, rebuilt from persistent storage: the
+        # snapshot it was seeded from, if any, plus the transactions it holds
+        self.rollups = rollups if rollups is not None else AnchorRollups()
+        seed_rollups = list(self.storage.seed_rollups())
+        if seed_rollups:
+            self.rollups.load(seed_rollups)
+        self.rollups.add_minute_totals(self.storage.anchor_minute_totals())
+
+        self.wal: Optional[WriteAheadLog] = None
+        self.snapshots: Optional[SnapshotStore] = None
+        start = 0
+        if self._log_offsets and self.storage.wal_offset:
+            # Storage already holds every record up to its offset
+            start = self.storage.wal_offset
+            if start > wal.end_offset:
+                raise ValueError("Storage is ahead of the write-ahead log")
+            # History from before a snapshot the storage was seeded from is not stored
+            snapshot = snapshots.latest() if snapshots is not None else None
+            if snapshot is not None:
+                self.archived_tx_ids = set(snapshot.tx_ids)
+        elif self._log_offsets and wal.end_offset and self.wallets:
+            raise ValueError("Storage holds state that the write-ahead log does not cover")
+        elif snapshots is not None:
+            snapshot = snapshots.latest()
+            if snapshot is not None:
+                self.load_snapshot(snapshot)
+                start = snapshot.wal_offset
+                if wal is not None and start > wal.end_offset:
+                    raise ValueError("Snapshot is ahead of the write-ahead log")
+                if self._log_offsets:
+                    # Storage never holds the snapshot's history, so keep its totals
+                    self.storage.save_seed_rollups(snapshot.rollups)
+                    self.storage.set_wal_offset(start)
+                    self.storage.flush()
+        if wal is not None:
+            self.replay_log(wal, start)
+            self.wal = wal
+
+        # Seeded once state is restored; until then checks go to storage
+        if seen_filter is not None:
+            seen_filter.add_many(self.archived_tx_ids)
+            seen_filter.add_many(self.storage.transactions)
+            self.seen_filter = seen_filter
+
+        self.snapshots = snapshots
+        self.snapshot_interval = snapshot_interval
+        self._last_checkpoint = time.monotonic()
+        self._checkpoint_writer = None
+        if snapshots is not None:
+            # Copy the restored state now, so periodic checkpoints only copy changes
+            self.prepare_snapshot()
 
     # ---------------------------
     # Wallet Management
     # ---------------------------
-    def create_wallet(self, address: str) -> Wallet:
-        if address in self.wallets:
-            raise ValueError(f"Wallet {address} already exists")
-        wallet = Wallet(address=address, balance=0.0, transactions=[])
-        self.wallets[address] = wallet
+    def create_wallet(self, address: str, public_key: Optional[PublicKeyLike] = None) -> Wallet:
+        with self._meta_lock:
+            if address in self.wallets:
+                raise ValueError(f"Wallet {address} already exists")
+            if self.wal is not None:
+                self._log({
+                    "op": "wallet",
+                    "address": address,
+                    "public_key": public_key_bytes(public_key).hex() if public_key is not None else None,
+                })
+            if public_key is not None:
+                self.key_registry.register(address, public_key)
+            wallet = Wallet(address=address, balance=0.0, transactions=[])
+            with self._storage_lock:
+                self.storage.add_wallet(wallet)
+            self.auditor.track(address)
+            return wallet
+
+    def deposit(self, address: str, amount: float) -> Wallet:
+        """
+        Credit a wallet with funds entering the network (anchor on-ramp).
+        """
+        wallet = self.get_wallet(address)
+        if not wallet:
+            raise ValueError("Wallet not found")
+        amount_minor = to_minor(amount)
+        if amount_minor <= 0:
+            raise ValueError("Deposit amount must be positive")
+        with self._locked(address):
+            # Computed first: an out-of-range balance must fail before logging
+            balance = add_minor(wallet.balance, amount_minor)
+            if self.wal is not None:
+                self._log({"op": "deposit", "address": address, "amount": amount})
+            wallet.balance = balance
+            with self._storage_lock:
+                self.storage.save_balances((wallet,))
+            self.auditor.record_credit(address, amount_minor)
+        self._notify_credit((address,))
         return wallet
 
     def get_wallet(self, address: str) -> Optional[Wallet]:
         return self.wallets.get(address)
 
+    def get_public_key(self, address: str):
+        return self.key_registry.get_public_key(address)
+
     # ---------------------------
     # Anchor Management
     # ---------------------------
     def register_anchor(self, anchor_id: str, spread: float = 2.0, tax_rate: float = 0.0) -> Anchor:
-        if anchor_id in self.anchors:
-            raise ValueError(f"Anchor {anchor_id} already exists")
-        anchor = Anchor(anchor_id=anchor_id, spread=spread, tax_rate=tax_rate)
-        self.anchors[anchor_id] = anchor
-        return anchor
+        with self._meta_lock:
+            if anchor_id in self.anchors:
+                raise ValueError(f"Anchor {anchor_id} already exists")
+            if self.wal is not None:
+                self._log({"op": "anchor", "anchor_id": anchor_id, "spread": spread, "tax_rate": tax_rate})
+            anchor = Anchor(anchor_id=anchor_id, spread=spread, tax_rate=tax_rate)
+            with self._storage_lock:
+                self.storage.add_anchor(anchor)
+            return anchor
 
     def get_anchor(self, anchor_id: str) -> Optional[Anchor]:
         return self.anchors.get(anchor_id)
 
+    def trust_anchor(self, anchor_id: str, public_key: PublicKeyLike):
+        """
+        Accept batches sealed by this anchor on its signature alone. Trust
+        is node policy: it is neither logged nor snapshotted.
+        """
+        self.trusted_anchors[anchor_id] = load_public_key(public_key)
+
+    def get_anchor_totals(
+        self,
+        anchor_id: str,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+    ) -> RollupTotals:
+        """
+        Transaction count, volume, fees and taxes routed through an anchor
+        in [since, until), all time by default. See AnchorRollups.totals().
+        """
+        return self.rollups.totals(anchor_id, since, until)
+
+    def get_anchor_report(
+        self,
+        anchor_id: str,
+        resolution: str = "hour",
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+    ) -> List[RollupBucket]:
+        """
+        Per-minute, hour or day totals for an anchor, oldest first.
+        """
+        return self.rollups.buckets(anchor_id, resolution, since, until)
+
     # ---------------------------
     # Transaction Management
     # ---------------------------
@@ -58,58 +334,693 @@ class Ledger:
         amount: float,
         signature: str,
         anchor_id: Optional[str] = None,
+        timestamp: Optional[datetime] = None,
     ) -> Transaction:
         """
         Add a new transaction to the ledger after validation.
+        Pass the signer's timestamp when signatures are verified, since it
+        is part of the signed message.
+        Raises TransactionRejectedError (a ValueError) if it is invalid.
         """
-        if tx_id in self.transactions:
-            raise ValueError(f"Transaction {tx_id} already exists")
+        timer = self.metrics.timer("single") if self.metrics is not None else None
+        outcome = ("error",)
+        try:
+            if self._tx_ids is None:
+                tx = self._apply_transaction(
+                    tx_id, sender_address, receiver_address, amount, signature, anchor_id, timestamp, timer
+                )
+            else:
+                if self._tx_ids.reserve((tx_id,), self.has_transaction):
+                    raise TransactionRejectedError("duplicate", f"Transaction {tx_id} already exists")
+                try:
+                    with self._wallet_locks.locked(sender_address, receiver_address):
+                        tx = self._apply_transaction(
+                            tx_id, sender_address, receiver_address, amount, signature, anchor_id, timestamp,
+                            timer,
+                        )
+                finally:
+                    self._tx_ids.release((tx_id,))
+            outcome = ()
+        except TransactionRejectedError as exc:
+            outcome = (exc.reason,)
+            raise
+        finally:
+            if timer is not None:
+                timer.done(accepted=0 if outcome else 1, rejected=outcome)
+
+        self._maybe_checkpoint()
+        self._notify_credit((receiver_address,))
+        return tx
+
+    def _apply_transaction(
+        self,
+        tx_id: str,
+        sender_address: str,
+        receiver_address: str,
+        amount: float,
+        signature: str,
+        anchor_id: Optional[str],
+        timestamp: Optional[datetime],
+        timer=None,
+    ) -> Transaction:
+        if self.has_transaction(tx_id):
+            raise TransactionRejectedError("duplicate", f"Transaction {tx_id} already exists")
 
         sender_wallet = self.get_wallet(sender_address)
         receiver_wallet = self.get_wallet(receiver_address)
 
         if not sender_wallet or not receiver_wallet:
-            raise ValueError("Sender or receiver wallet does not exist")
+            raise TransactionRejectedError("unknown_wallet", "Sender or receiver wallet does not exist")
 
         # Determine anchor fee if anchor provided
         anchor = self.get_anchor(anchor_id) if anchor_id else None
-        fee = calculate_fee(amount, anchor.spread if anchor else 0.0)
-        tax = amount * (anchor.tax_rate / 100) if anchor else 0.0
+        if anchor_id and anchor is None:
+            raise TransactionRejectedError("unknown_anchor", f"Anchor {anchor_id} does not exist")
+        if timer is not None:
+            timer.mark("lookup")
+        amount_minor = to_minor(amount)
+        fee_minor, tax_minor = fee_and_tax(amount_minor, anchor.spread, anchor.tax_rate) if anchor else (0, 0)
+        if timer is not None:
+            timer.mark("fee")
 
         tx = Transaction(
             tx_id=tx_id,
             sender=sender_address,
             receiver=receiver_address,
-            amount=amount,
-            fee=fee,
-            timestamp=datetime.utcnow(),
+            amount=from_minor(amount_minor),
+            fee=from_minor(fee_minor),
+            timestamp=timestamp or datetime.utcnow(),
             signature=signature,
         )
 
         # Validate transaction against rules
         if not validate_transaction(tx, sender_wallet, receiver_wallet):
-            raise ValueError("Transaction validation failed")
+            raise TransactionRejectedError("validation", "Transaction validation failed")
+        if timer is not None:
+            timer.mark("validation")
+
+        if not self._signature_ok(tx):
+            raise TransactionRejectedError("signature", "Transaction signature is invalid")
+        if timer is not None:
+            timer.mark("signature")
+
+        # Hashing can fail for fields the codec cannot encode: do it first
+        digest = None
+        if self.merkle_index is not None:
+            try:
+                digest = transaction_digest(tx)
+            except ValueError as exc:
+                # The same rejection a verifying ledger gives a malformed signature
+                if not signature_fits(tx.signature):
+                    raise TransactionRejectedError("signature", "Transaction signature is invalid") from exc
+                raise TransactionRejectedError("encoding", str(exc)) from exc
+
+        # New balances can still be out of range, so compute them before logging
+        sender_balance = add_minor(sender_wallet.balance, -(amount_minor + fee_minor + tax_minor))
+        receiver_balance = add_minor(
+            sender_balance if receiver_address == sender_address else receiver_wallet.balance, amount_minor
+        )
+
+        # Log before touching balances
+        if self.wal is not None:
+            self._log(self._log_record(tx, anchor_id))
 
         # Apply transaction
-        sender_wallet.balance -= (amount + fee + tax)
-        receiver_wallet.balance += amount
+        sender_wallet.balance = sender_balance
+        receiver_wallet.balance = receiver_balance
 
         # Record transaction in wallets and ledger
-        sender_wallet.transactions.append(tx)
-        receiver_wallet.transactions.append(tx)
-        self.transactions[tx_id] = tx
-
+        with self._storage_lock:
+            self.storage.record_transaction(tx, sender_wallet, receiver_wallet, anchor_id, from_minor(tax_minor))
+        self.auditor.record_transfer(sender_address, receiver_address, amount_minor, fee_minor, tax_minor)
+        if anchor_id:
+            self.rollups.record(anchor_id, tx.timestamp, amount_minor, fee_minor, tax_minor)
+        if digest is not None:
+            self.merkle_index.add_digest(tx_id, digest)
+        if self.seen_filter is not None:
+            self.seen_filter.add(tx_id)
+        if self._unsaved_tx_ids is not None:
+            self._unsaved_tx_ids.append(tx_id)
+        if timer is not None:
+            timer.mark("apply")
         return tx
 
+    def add_transactions(self, batch: Iterable[Any], atomic: bool = True) -> List[Transaction]:
+        """
+        Add a batch of transactions. An atomic batch is all or nothing;
+        with `atomic=False` the valid items are applied and the invalid ones
+        skipped.
+
+        Each item is a tuple in add_transaction argument order
+        (tx_id, sender_address, receiver_address, amount, signature[, anchor_id[, timestamp]])
+        or a dict of add_transaction keyword arguments.
+
+        Items are validated in order against running balances, so a later
+        item may spend funds received earlier in the same batch.
+        Raises BatchRejectedError listing every invalid item, after applying
+        the rest when the batch is not atomic.
+
+        Fees and taxes for the whole batch are computed in one vectorized call.
+        """
+        return self._add_items([self._batch_item(item) for item in batch], atomic)
+
+    def add_anchor_batch(self, envelope: BatchEnvelope, atomic: bool = True) -> List[Transaction]:
+        """
+        Add a batch sealed by an anchor, every transaction routed through
+        that anchor. If the anchor is trusted, the envelope's root and
+        signature are checked once and sender signatures are skipped; a
+        batch that fails the check is rejected whole. Otherwise each
+        transaction is verified as in add_transactions().
+
+        Fees are charged at the ledger's rates for the anchor, as for any
+        other transfer.
+        """
+        items = [
+            {
+                "tx_id": tx.tx_id,
+                "sender_address": tx.sender,
+                "receiver_address": tx.receiver,
+                "amount": tx.amount,
+                "signature": tx.signature,
+                "anchor_id": envelope.anchor_id,
+                "timestamp": tx.timestamp,
+            }
+            for tx in envelope.transactions
+        ]
+        public_key = self.trusted_anchors.get(envelope.anchor_id)
+        if public_key is None:
+            return self._add_items(items, atomic)
+        if not envelope.verify(public_key):
+            raise BatchRejectedError(
+                [(index, tx.tx_id, "invalid signature") for index, tx in enumerate(envelope.transactions)]
+            )
+        return self._add_items(items, atomic, check_signatures=False)
+
+    def _add_items(self, items: List[Dict[str, Any]], atomic: bool, check_signatures: bool = True) -> List[Transaction]:
+        timer = self.metrics.timer("batch") if self.metrics is not None else None
+        try:
+            if self._tx_ids is None:
+                applied, rejections = self._apply_batch(items, (), atomic, timer, check_signatures)
+            else:
+                refused = set(self._tx_ids.reserve({item["tx_id"] for item in items}, self.has_transaction))
+                addresses = [a for item in items for a in (item["sender_address"], item["receiver_address"])]
+                try:
+                    with self._wallet_locks.locked(*addresses):
+                        applied, rejections = self._apply_batch(items, refused, atomic, timer, check_signatures)
+                finally:
+                    self._tx_ids.release({item["tx_id"] for item in items} - refused)
+        except BaseException:
+            # The batch is rolled back, so every item counts as an error
+            if timer is not None:
+                timer.done(rejected=("error",) * len(items))
+            raise
+        if timer is not None:
+            timer.done(
+                accepted=len(applied),
+                rejected=(_REJECTION_CODES.get(reason, "encoding") for _, _, reason in rejections),
+            )
+
+        if applied:
+            self._maybe_checkpoint()
+            self._notify_credit(dict.fromkeys(tx.receiver for tx in applied))
+        if rejections:
+            raise BatchRejectedError(rejections, applied)
+        return applied
+
+    def _apply_batch(
+        self,
+        items: List[Dict[str, Any]],
+        refused,
+        atomic: bool,
+        timer=None,
+        check_signatures: bool = True,
+    ) -> Tuple[List[Transaction], List[Tuple[int, str, str]]]:
+        now = datetime.utcnow()
+
+        # Resolve wallets and anchors once per batch
+        wallets = {}
+        anchors = {}
+        for item in items:
+            for address in (item["sender_address"], item["receiver_address"]):
+                if address not in wallets:
+                    wallets[address] = self.wallets.get(address)
+            anchor_id = item["anchor_id"]
+            if anchor_id and anchor_id not in anchors:
+                anchors[anchor_id] = self.anchors.get(anchor_id)
+        if timer is not None:
+            timer.mark("lookup")
+
+        # Amounts that are not finite are rejected per item below
+        amounts: List[Optional[int]] = []
+        for item in items:
+            try:
+                amounts.append(to_minor(item["amount"]))
+            except TransactionRejectedError:
+                amounts.append(None)
+        fees, taxes = self._batch_charges(
+            amounts, [anchors.get(item["anchor_id"]) if item["anchor_id"] else None for item in items]
+        )
+        if timer is not None:
+            timer.mark("fee")
+
+        rejections: List[Tuple[int, str, str]] = []
+        accepted: List[Tuple[Transaction, Wallet, Wallet, int, int, int, Optional[str]]] = []
+        seen_ids = set()
+        opening_balances: Dict[str, float] = {}
+        digests: Dict[str, bytes] = {}
+
+        # Balances change as items are accepted: undo them if anything escapes
+        try:
+            for index, item in enumerate(items):
+                tx_id = item["tx_id"]
+                if tx_id in seen_ids or tx_id in refused or self.has_transaction(tx_id):
+                    rejections.append((index, tx_id, "duplicate transaction id"))
+                    continue
+                seen_ids.add(tx_id)
+
+                sender_wallet = wallets[item["sender_address"]]
+                receiver_wallet = wallets[item["receiver_address"]]
+                if not sender_wallet or not receiver_wallet:
+                    rejections.append((index, tx_id, "sender or receiver wallet does not exist"))
+                    continue
+                if item["anchor_id"] and anchors[item["anchor_id"]] is None:
+                    rejections.append((index, tx_id, "unknown anchor"))
+                    continue
+
+                amount_minor, fee_minor, tax_minor = amounts[index], fees[index], taxes[index]
+                if amount_minor is None:
+                    rejections.append((index, tx_id, "validation failed"))
+                    continue
+
+                tx = Transaction(
+                    tx_id=tx_id,
+                    sender=sender_wallet.address,
+                    receiver=receiver_wallet.address,
+                    amount=from_minor(amount_minor),
+                    fee=from_minor(fee_minor),
+                    timestamp=item["timestamp"] or now,
+                    signature=item["signature"],
+                )
+
+                if not validate_transaction(tx, sender_wallet, receiver_wallet):
+                    rejections.append((index, tx_id, "validation failed"))
+                    continue
+                if check_signatures and not self._signature_ok(tx):
+                    rejections.append((index, tx_id, "invalid signature"))
+                    continue
+                if self.merkle_index is not None:
+                    try:
+                        digests[tx_id] = transaction_digest(tx)
+                    except ValueError as exc:
+                        reason = "invalid signature" if not signature_fits(tx.signature) else str(exc)
+                        rejections.append((index, tx_id, reason))
+                        continue
+
+                # Apply to running balances, remembering where each wallet started
+                try:
+                    sender_balance = add_minor(sender_wallet.balance, -(amount_minor + fee_minor + tax_minor))
+                    receiver_balance = add_minor(
+                        sender_balance if receiver_wallet is sender_wallet else receiver_wallet.balance,
+                        amount_minor,
+                    )
+                except TransactionRejectedError:
+                    rejections.append((index, tx_id, "validation failed"))
+                    continue
+                opening_balances.setdefault(sender_wallet.address, sender_wallet.balance)
+                opening_balances.setdefault(receiver_wallet.address, receiver_wallet.balance)
+                sender_wallet.balance = sender_balance
+                receiver_wallet.balance = receiver_balance
+                accepted.append(
+                    (tx, sender_wallet, receiver_wallet, amount_minor, fee_minor, tax_minor, item["anchor_id"])
+                )
+        except BaseException:
+            self._restore_balances(wallets, opening_balances)
+            raise
+
+        # Signature checks are interleaved with validation in a batch
+        if timer is not None:
+            timer.mark("validation")
+
+        if rejections and atomic:
+            self._restore_balances(wallets, opening_balances)
+            return [], rejections
+
+        # Log the whole batch before it becomes visible
+        offsets: List[Optional[int]] = [None] * len(accepted)
+        if self.wal is not None and accepted:
+            try:
+                offsets = self.wal.append_batch(
+                    self._log_record(tx, anchor_id, vouched=not check_signatures) for tx, *_, anchor_id in accepted
+                )
+            except Exception:
+                self._restore_balances(wallets, opening_balances)
+                raise
+
+        for offset, (tx, sender_wallet, receiver_wallet, amount_minor, fee_minor, tax_minor, anchor_id) in zip(
+            offsets, accepted
+        ):
+            with self._storage_lock:
+                if offset is not None and self._log_offsets:
+                    self.storage.set_wal_offset(offset)
+                self.storage.record_transaction(tx, sender_wallet, receiver_wallet, anchor_id, from_minor(tax_minor))
+            self.auditor.record_transfer(tx.sender, tx.receiver, amount_minor, fee_minor, tax_minor)
+            if anchor_id:
+                self.rollups.record(anchor_id, tx.timestamp, amount_minor, fee_minor, tax_minor)
+            if self.merkle_index is not None:
+                self.merkle_index.add_digest(tx.tx_id, digests[tx.tx_id])
+        if self.seen_filter is not None:
+            self.seen_filter.add_many(tx.tx_id for tx, *_ in accepted)
+        if self._unsaved_tx_ids is not None:
+            self._unsaved_tx_ids.extend(tx.tx_id for tx, *_ in accepted)
+        if timer is not None:
+            timer.mark("apply")
+
+        return [tx for tx, *_ in accepted], rejections
+
+    @staticmethod
+    def _batch_charges(
+        amounts: List[Optional[int]], anchors: List[Optional[Anchor]]
+    ) -> Tuple[List[int], List[int]]:
+        """
+        Fee and tax per item, in one vectorized call for the anchored
+        amounts the int64 path can hold; larger ones are charged exactly by
+        fee_and_tax(), and missing amounts nothing.
+        """
+        fees = [0] * len(amounts)
+        taxes = [0] * len(amounts)
+        vectorized = []
+        for index, (amount, anchor) in enumerate(zip(amounts, anchors)):
+            if anchor is None or amount is None:
+                continue
+            if -MAX_VECTOR_AMOUNT <= amount <= MAX_VECTOR_AMOUNT:
+                vectorized.append(index)
+            else:
+                fees[index], taxes[index] = fee_and_tax(amount, anchor.spread, anchor.tax_rate)
+        if vectorized:
+            batch_fees, batch_taxes = batch_fee_and_tax(
+                [amounts[index] for index in vectorized],
+                [anchors[index].spread for index in vectorized],
+                [anchors[index].tax_rate for index in vectorized],
+            )
+            for index, fee, tax in zip(vectorized, batch_fees.tolist(), batch_taxes.tolist()):
+                fees[index], taxes[index] = fee, tax
+        return fees, taxes
+
+    _BATCH_FIELDS = (
+        "tx_id", "sender_address", "receiver_address",
+        "amount", "signature", "anchor_id", "timestamp",
+    )
+
+    def _batch_item(self, item: Any) -> Dict[str, Any]:
+        if isinstance(item, dict):
+            unknown = set(item) - set(self._BATCH_FIELDS)
+            if unknown:
+                raise ValueError(f"Unknown batch item fields: {sorted(unknown)}")
+            fields = dict.fromkeys(self._BATCH_FIELDS)
+            fields.update(item)
+        else:
+            if not 5 <= len(item) <= len(self._BATCH_FIELDS):
+                raise ValueError("Batch items need 5 to 7 fields")
+            fields = dict.fromkeys(self._BATCH_FIELDS)
+            fields.update(zip(self._BATCH_FIELDS, item))
+        return fields
+
+    @staticmethod
+    def _restore_balances(wallets: Dict[str, Wallet], balances: Dict[str, float]):
+        for address, balance in balances.items():
+            wallets[address].balance = balance
+
+    def required_balance(self, amount: float, anchor_id: Optional[str] = None) -> float:
+        """
+        Total debited from a sender for a transfer: amount plus anchor fee and tax.
+        Raises TransactionRejectedError for an unknown anchor.
+        """
+        anchor = self.get_anchor(anchor_id) if anchor_id else None
+        if anchor_id and anchor is None:
+            raise TransactionRejectedError("unknown_anchor", f"Anchor {anchor_id} does not exist")
+        amount_minor = to_minor(amount)
+        fee_minor, tax_minor = fee_and_tax(amount_minor, anchor.spread, anchor.tax_rate) if anchor else (0, 0)
+        return from_minor(amount_minor + fee_minor + tax_minor)
+
+    def _notify_credit(self, addresses: Iterable[str]):
+        addresses = tuple(addresses)
+        for listener in list(self.credit_listeners):
+            for address in addresses:
+                try:
+                    listener(address)
+                except Exception:
+                    logger.exception("Credit listener %r failed for %s", listener, address)
+
+    def _locked(self, *addresses: str):
+        if self._wallet_locks is None:
+            return nullcontext()
+        return self._wallet_locks.locked(*addresses)
+
+    def _locked_all(self):
+        """
+        Exclusive access to every wallet, for consistent whole-ledger reads.
+        """
+        if self._wallet_locks is None:
+            return nullcontext()
+        return self._wallet_locks.locked_all()
+
+    def _signature_ok(self, tx: Transaction) -> bool:
+        if not self.verify_signatures:
+            return True
+        public_key = self.key_registry.get_public_key(tx.sender)
+        return public_key is not None and verify_signature(tx, public_key)
+
+    # ---------------------------
+    # Write-Ahead Log
+    # ---------------------------
+    @staticmethod
+    def _log_record(tx: Transaction, anchor_id: Optional[str], vouched: bool = False) -> Dict[str, Any]:
+        record = {
+            "op": "tx",
+            "tx_id": tx.tx_id,
+            "sender": tx.sender,
+            "receiver": tx.receiver,
+            "amount": tx.amount,
+            "signature": tx.signature,
+            "anchor_id": anchor_id,
+            "timestamp": tx.timestamp.isoformat(),
+        }
+        # Accepted on a trusted anchor's signature, so replay skips the sender check
+        if vouched:
+            record["vouched"] = True
+        return record
+
+    def _log(self, record: Dict[str, Any]):
+        offset = self.wal.append(record)
+        if self._log_offsets:
+            self.storage.set_wal_offset(offset)
+
+    def replay_log(self, wal: WriteAheadLog, start: int = 0) -> int:
+        """
+        Re-apply the operations recorded in a log, from offset `start`.
+        Returns the number of records applied.
+        """
+        current, self.wal = self.wal, None  # replayed records are already logged
+        count = 0
+        try:
+            for offset, record in wal.scan(start):
+                if self._log_offsets:
+                    self.storage.set_wal_offset(offset)
+                op = record["op"]
+                if op == "tx" and record.get("vouched"):
+                    item = {
+                        "tx_id": record["tx_id"],
+                        "sender_address": record["sender"],
+                        "receiver_address": record["receiver"],
+                        "amount": record["amount"],
+                        "signature": record["signature"],
+                        "anchor_id": record["anchor_id"],
+                        "timestamp": datetime.fromisoformat(record["timestamp"]),
+                    }
+                    self._add_items([item], atomic=True, check_signatures=False)
+                elif op == "tx":
+                    self.add_transaction(
+                        tx_id=record["tx_id"],
+                        sender_address=record["sender"],
+                        receiver_address=record["receiver"],
+                        amount=record["amount"],
+                        signature=record["signature"],
+                        anchor_id=record["anchor_id"],
+                        timestamp=datetime.fromisoformat(record["timestamp"]),
+                    )
+                elif op == "deposit":
+                    self.deposit(record["address"], record["amount"])
+                elif op == "wallet":
+                    public_key = record["public_key"]
+                    self.create_wallet(record["address"], bytes.fromhex(public_key) if public_key else None)
+                elif op == "anchor":
+                    self.register_anchor(record["anchor_id"], record["spread"], record["tax_rate"])
+                else:
+                    raise ValueError(f"Unknown log record type {op!r}")
+                count += 1
+        finally:
+            self.wal = current
+        return count
+
+    # ---------------------------
+    # Snapshots
+    # ---------------------------
+    def capture_snapshot(self) -> Snapshot:
+        """
+        Copy the state needed to restart: balances, keys, anchors, known
+        tx_ids and anchor rollups. See prepare_snapshot().
+        """
+        return self.prepare_snapshot()()
+
+    def prepare_snapshot(self) -> Callable[[], Snapshot]:
+        """
+        Capture what changed since the previous capture and return a
+        callable that builds the full Snapshot from it. Only the capture
+        pauses writers (in thread-safe mode), for time proportional to the
+        wallets and transactions changed since; the first capture copies
+        everything. Build on another thread to keep the copy off the write
+        path. The log is synced first so the snapshot never covers records
+        that could still be lost.
+        """
+        with self._meta_lock, self._locked_all():
+            wal_offset = 0
+            if self.wal is not None:
+                self.wal.sync()
+                wal_offset = self.wal.end_offset
+
+            if self._snapshot_builder is None:
+                self._snapshot_builder = SnapshotBuilder()
+                self.auditor.take_changed()
+                addresses = list(self.wallets)
+                tx_ids = self.archived_tx_ids.union(self.transactions)
+            else:
+                addresses = self.auditor.take_changed()
+                tx_ids = self._unsaved_tx_ids
+            self._unsaved_tx_ids = []
+
+            balances = {}
+            public_keys = {}
+            for address in addresses:
+                wallet = self.wallets.get(address)
+                if wallet is None:
+                    continue
+                balances[address] = wallet.balance
+                public_key = self.key_registry.get_public_key_bytes(address)
+                if public_key is not None:
+                    public_keys[address] = public_key
+
+            self._snapshot_builder.add(SnapshotDelta(
+                wal_offset=wal_offset,
+                balances=balances,
+                public_keys=public_keys,
+                anchors={a.anchor_id: (a.spread, a.tax_rate) for a in self.anchors.values()},
+                tx_ids=tx_ids,
+                rollups=self.rollups.export(),
+            ))
+        return self._snapshot_builder.build
+
+    def load_snapshot(self, snapshot: Snapshot):
+        """
+        Restore state from a snapshot into an empty ledger. Transaction
+        history before the snapshot is not rebuilt; its tx_ids are kept for
+        replay protection.
+        """
+        if self.wallets or self.transactions:
+            raise ValueError("Snapshots can only be loaded into an empty ledger")
+        for address, balance in snapshot.balances.items():
+            public_key = snapshot.public_keys.get(address)
+            if public_key is not None:
+                self.key_registry.register(address, public_key)
+            self.storage.add_wallet(Wallet(address=address, balance=balance, transactions=[]))
+            self.auditor.track(address, balance)
+        for anchor_id, (spread, tax_rate) in snapshot.anchors.items():
+            self.storage.add_anchor(Anchor(anchor_id=anchor_id, spread=spread, tax_rate=tax_rate))
+        self.archived_tx_ids = set(snapshot.tx_ids)
+        if self._unsaved_tx_ids is not None:
+            self._unsaved_tx_ids.extend(self.archived_tx_ids)
+        self.rollups.load(snapshot.rollups)
+        if self.seen_filter is not None:
+            self.seen_filter.add_many(self.archived_tx_ids)
+
+    def _maybe_checkpoint(self):
+        if self.snapshots is None:
+            return
+        now = time.monotonic()
+        if now - self._last_checkpoint < self.snapshot_interval:
+            return
+        # Only one thread checkpoints; the others carry on
+        if not self._checkpoint_lock.acquire(blocking=False):
+            return
+        try:
+            # Never queue a checkpoint behind one that is still being written
+            if self._checkpoint_writer is not None and self._checkpoint_writer.is_alive():
+                return
+            self._last_checkpoint = now
+            self._checkpoint_writer = self.snapshots.checkpoint(self)
+        finally:
+            self._checkpoint_lock.release()
+
     # ---------------------------
     # Ledger Utilities
     # ---------------------------
+    def has_transaction(self, tx_id: str) -> bool:
+        if self.seen_filter is not None:
+            return self.seen_filter.contains(tx_id, self._known_tx_id)
+        return self._known_tx_id(tx_id)
+
+    def _known_tx_id(self, tx_id: str) -> bool:
+        return tx_id in self.transactions or tx_id in self.archived_tx_ids
+
     def get_transaction(self, tx_id: str) -> Optional[Transaction]:
         return self.transactions.get(tx_id)
 
+    def get_transaction_anchor(self, tx_id: str) -> Optional[str]:
+        return self.storage.transaction_anchor(tx_id)
+
+    def get_transaction_tax(self, tx_id: str) -> float:
+        return self.storage.transaction_tax(tx_id)
+
     def get_all_transactions(self):
         return list(self.transactions.values())
 
+    def iter_transactions(self) -> Iterator[Transaction]:
+        """
+        Stream every transaction without copying the whole set.
+        """
+        return iter(self.transactions.values())
+
+    def get_wallet_history(
+        self,
+        address: str,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        cursor: Optional[str] = None,
+        limit: int = 100,
+    ) -> HistoryPage:
+        """
+        Return one page of a wallet's history in timestamp order.
+        `since` is inclusive, `until` exclusive; pass the returned
+        next_cursor to continue.
+        """
+        wallet = self.get_wallet(address)
+        if not wallet:
+            raise ValueError("Wallet not found")
+        return self.history_indexes.page(address, wallet.transactions, since, until, cursor, limit)
+
+    def iter_wallet_history(
+        self,
+        address: str,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+    ) -> Iterator[Transaction]:
+        """
+        Stream a wallet's history in timestamp order without building a list.
+        """
+        wallet = self.get_wallet(address)
+        if not wallet:
+            raise ValueError("Wallet not found")
+        return self.history_indexes.iterate(address, wallet.transactions, since, until)
+
     def recalculate_wallet_balance(self, address: str) -> float:
         """
         Recalculate wallet balance from transaction history.
@@ -119,25 +1030,31 @@ class Ledger:
         if not wallet:
             raise ValueError("Wallet not found")
 
-        balance = 0.0
+        balance = 0
         for tx in wallet.transactions:
             if tx.receiver == address:
-                balance += tx.amount
+                balance += to_minor(tx.amount)
             if tx.sender == address:
-                balance -= (tx.amount + tx.fee)
-        wallet.balance = balance
-        return balance
+                balance -= to_minor(tx.amount) + to_minor(tx.fee)
+        wallet.balance = from_minor(balance)
+        return wallet.balance
 
     # ---------------------------
     # Validation Helpers
     # ---------------------------
+    def audit(self, full: bool = False) -> List[str]:
+        """
+        Check the balances of wallets changed since the last audit against
+        their running debit/credit totals (every wallet when `full`).
+        Returns the addresses whose balance is inconsistent. Balances are
+        never modified.
+        """
+        with self._locked_all():
+            return self.auditor.audit(self.wallets, full=full)
+
     def verify_integrity(self) -> bool:
         """
-        Verify that all wallets balances match transaction history.
-        Returns True if all balances are consistent.
+        Verify that all wallets balances match their recorded debits and
+        credits. Returns True if all balances are consistent.
         """
-        for wallet in self.wallets.values():
-            calculated = self.recalculate_wallet_balance(wallet.address)
-            if abs(calculated - wallet.balance) > 1e-8:  # Allow minor float rounding
-                return False
-        return True
+        return not self.audit(full=True)
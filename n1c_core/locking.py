@@ -0,0 +1,78 @@
+# n1c_core/locking.py
+
+import threading
+from contextlib import contextmanager
+from typing import Iterator, List, Set
+
+
+class StripedLock:
+    """
+    A fixed pool of locks shared by hashing keys onto stripes.
+
+    Locking several keys acquires their stripes in ascending stripe order,
+    so two threads locking overlapping key sets can never deadlock.
+    """
+
+    def __init__(self, stripes: int):
+        if stripes < 1:
+            raise ValueError("stripes must be at least 1")
+        self._locks: List[threading.Lock] = [threading.Lock() for _ in range(stripes)]
+
+    def __len__(self):
+        return len(self._locks)
+
+    def stripe_of(self, key: str) -> int:
+        return hash(key) % len(self._locks)
+
+    def locked(self, *keys: str):
+        """
+        Hold the stripes of every key for the duration of a with block.
+        """
+        return self._locked_stripes({self.stripe_of(key) for key in keys})
+
+    def locked_all(self):
+        """
+        Hold every stripe, e.g. to read a consistent view of all keys.
+        """
+        return self._locked_stripes(range(len(self._locks)))
+
+    @contextmanager
+    def _locked_stripes(self, stripes) -> Iterator[None]:
+        acquired = []
+        try:
+            for stripe in sorted(set(stripes)):
+                self._locks[stripe].acquire()
+                acquired.append(stripe)
+            yield
+        finally:
+            for stripe in reversed(acquired):
+                self._locks[stripe].release()
+
+
+class IdReservations:
+    """
+    Claims on ids that are being inserted, closing the gap between an
+    existence check and the insert itself.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._reserved: Set[str] = set()
+
+    def reserve(self, ids, exists) -> List[str]:
+        """
+        Reserve every id that is neither reserved already nor `exists(id)`.
+        Returns the ids that could not be reserved.
+        """
+        refused = []
+        with self._lock:
+            for id_ in ids:
+                if id_ in self._reserved or exists(id_):
+                    refused.append(id_)
+                else:
+                    self._reserved.add(id_)
+        return refused
+
+    def release(self, ids):
+        with self._lock:
+            self._reserved.difference_update(ids)
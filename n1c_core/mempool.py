@@ -0,0 +1,245 @@
+# n1c_core/mempool.py
+
+import sys
+import threading
+import time
+from collections import OrderedDict, deque
+from datetime import datetime
+from typing import Callable, Deque, Dict, NamedTuple, Optional, Tuple
+from n1c_core.models import Transaction
+from n1c_core.ledger import Ledger
+from n1c_core.amount import to_minor
+from n1c_core.config import MEMPOOL_MAX_BYTES, MEMPOOL_TTL
+
+# Rough per-entry cost of the containers holding a parked transaction
+_ENTRY_OVERHEAD = 400
+
+
+class PendingTransaction(NamedTuple):
+    tx_id: str
+    sender_address: str
+    receiver_address: str
+    amount: float
+    signature: str
+    anchor_id: Optional[str]
+    timestamp: Optional[datetime]
+    expires_at: float
+    nbytes: int
+
+
+class Mempool:
+    """
+    Holds transactions whose sender cannot fund them yet (ledger rules
+    §7.1, transaction dependencies) and applies them once it can.
+
+    Parked transactions are queued per sender in arrival order. The mempool
+    listens to the ledger's credits: when a wallet is credited, its queue is
+    released front to back while the balance covers the next transaction,
+    and every release credits another wallet whose queue is checked in
+    turn. Nothing is polled.
+
+    Transactions expire `ttl` seconds after being parked, and parking is
+    refused once the parked transactions would use more than `max_bytes`.
+    `on_applied(tx)` and `on_dropped(tx_id, reason)` report the outcome of
+    parked transactions.
+    """
+
+    def __init__(
+        self,
+        ledger: Ledger,
+        ttl: float = MEMPOOL_TTL,
+        max_bytes: int = MEMPOOL_MAX_BYTES,
+        on_applied: Optional[Callable[[Transaction], None]] = None,
+        on_dropped: Optional[Callable[[str, str], None]] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.ledger = ledger
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.on_applied = on_applied
+        self.on_dropped = on_dropped
+        self.clock = clock
+
+        self._pending: Dict[str, PendingTransaction] = {}                          # tx_id -> entry
+        self._by_sender: Dict[str, "OrderedDict[str, PendingTransaction]"] = {}    # sender -> FIFO
+        self._expiry: Deque[Tuple[float, str]] = deque()                           # (expires_at, tx_id)
+        self.nbytes = 0
+
+        self._lock = threading.RLock()
+        self._credited: Deque[str] = deque()
+        self._draining = False
+
+        # Counters
+        self.released = 0
+        self.expired = 0
+        self.dropped = 0
+
+        ledger.credit_listeners.append(self._on_credit)
+
+    def __len__(self):
+        return len(self._pending)
+
+    def __contains__(self, tx_id: str):
+        return tx_id in self._pending
+
+    def close(self):
+        """
+        Stop listening to the ledger. Parked transactions are discarded.
+        """
+        with self._lock:
+            if self._on_credit in self.ledger.credit_listeners:
+                self.ledger.credit_listeners.remove(self._on_credit)
+            self._pending.clear()
+            self._by_sender.clear()
+            self._expiry.clear()
+            self.nbytes = 0
+
+    # ---------------------------
+    # Submission
+    # ---------------------------
+    def submit(
+        self,
+        tx_id: str,
+        sender_address: str,
+        receiver_address: str,
+        amount: float,
+        signature: str,
+        anchor_id: Optional[str] = None,
+        timestamp: Optional[datetime] = None,
+    ) -> Optional[Transaction]:
+        """
+        Apply a transaction now if its sender can fund it, otherwise park it.
+        Returns the applied Transaction, or None if it was parked.
+        Raises ValueError if it is invalid for any other reason or the
+        mempool is full.
+        """
+        with self._lock:
+            self.expire()
+            if tx_id in self._pending:
+                raise ValueError(f"Transaction {tx_id} is already pending")
+
+            # Earlier parked transactions of the same sender go first
+            if sender_address not in self._by_sender and self._funded(sender_address, amount, anchor_id):
+                return self.ledger.add_transaction(
+                    tx_id, sender_address, receiver_address, amount, signature, anchor_id, timestamp
+                )
+
+            self._check_parkable(tx_id, sender_address, receiver_address, amount, anchor_id)
+            nbytes = _ENTRY_OVERHEAD + sum(
+                sys.getsizeof(value) for value in (tx_id, sender_address, receiver_address, signature)
+            )
+            if self.nbytes + nbytes > self.max_bytes:
+                raise ValueError("Mempool is full")
+
+            entry = PendingTransaction(
+                tx_id, sender_address, receiver_address, amount, signature, anchor_id, timestamp,
+                self.clock() + self.ttl, nbytes,
+            )
+            self._pending[tx_id] = entry
+            self._by_sender.setdefault(sender_address, OrderedDict())[tx_id] = entry
+            self._expiry.append((entry.expires_at, tx_id))
+            self.nbytes += nbytes
+            return None
+
+    def _check_parkable(
+        self, tx_id: str, sender_address: str, receiver_address: str, amount: float, anchor_id: Optional[str]
+    ):
+        if self.ledger.has_transaction(tx_id):
+            raise ValueError(f"Transaction {tx_id} already exists")
+        if not self.ledger.get_wallet(sender_address) or not self.ledger.get_wallet(receiver_address):
+            raise ValueError("Sender or receiver wallet does not exist")
+        # to_minor rejects NaN and infinity, which compare false with 0
+        if to_minor(amount) <= 0:
+            raise ValueError("Transaction validation failed")
+        # Anything required_balance() cannot price would fail every later credit
+        self.ledger.required_balance(amount, anchor_id)
+
+    def _funded(self, sender_address: str, amount: float, anchor_id: Optional[str]) -> bool:
+        wallet = self.ledger.get_wallet(sender_address)
+        # Unknown wallets are left for the ledger to reject
+        return wallet is None or wallet.balance >= self.ledger.required_balance(amount, anchor_id)
+
+    # ---------------------------
+    # Release
+    # ---------------------------
+    def _on_credit(self, address: str):
+        with self._lock:
+            if address not in self._by_sender:
+                return
+            self._credited.append(address)
+            # Releases credit further wallets; they join the work list
+            if self._draining:
+                return
+            self._draining = True
+            try:
+                while self._credited:
+                    self._release(self._credited.popleft())
+            finally:
+                self._draining = False
+
+    def _release(self, sender_address: str):
+        queue = self._by_sender.get(sender_address)
+        now = self.clock()
+        while queue:
+            entry = next(iter(queue.values()))
+            if entry.expires_at <= now:
+                self._remove(entry)
+                self._drop(entry.tx_id, "expired")
+                continue
+            try:
+                funded = self._funded(sender_address, entry.amount, entry.anchor_id)
+            except ValueError as exc:
+                # Unpriceable entries would block the queue behind them
+                self._remove(entry)
+                self._drop(entry.tx_id, str(exc))
+                continue
+            if not funded:
+                break
+            self._remove(entry)
+            try:
+                tx = self.ledger.add_transaction(
+                    entry.tx_id, entry.sender_address, entry.receiver_address,
+                    entry.amount, entry.signature, entry.anchor_id, entry.timestamp,
+                )
+            except ValueError as exc:
+                self._drop(entry.tx_id, str(exc))
+                continue
+            self.released += 1
+            if self.on_applied is not None:
+                self.on_applied(tx)
+
+    def _remove(self, entry: PendingTransaction):
+        del self._pending[entry.tx_id]
+        queue = self._by_sender[entry.sender_address]
+        del queue[entry.tx_id]
+        if not queue:
+            del self._by_sender[entry.sender_address]
+        self.nbytes -= entry.nbytes
+
+    def _drop(self, tx_id: str, reason: str):
+        if reason == "expired":
+            self.expired += 1
+        else:
+            self.dropped += 1
+        if self.on_dropped is not None:
+            self.on_dropped(tx_id, reason)
+
+    # ---------------------------
+    # Expiry
+    # ---------------------------
+    def expire(self) -> int:
+        """
+        Drop parked transactions whose time is up. Returns how many were dropped.
+        """
+        with self._lock:
+            now = self.clock()
+            count = 0
+            while self._expiry and self._expiry[0][0] <= now:
+                expires_at, tx_id = self._expiry.popleft()
+                entry = self._pending.get(tx_id)
+                if entry is None or entry.expires_at != expires_at:   # already released
+                    continue
+                self._remove(entry)
+                self._drop(tx_id, "expired")
+                count += 1
+            return count
@@ -0,0 +1,121 @@
+# n1c_core/merkle.py
+
+import hashlib
+import threading
+from typing import Dict, Iterable, List, Set
+from n1c_core.models import Transaction
+from n1c_core.codec import encode_transaction
+from n1c_core.config import MERKLE_DEPTH
+
+FANOUT = 16
+DIGEST_SIZE = 32
+EMPTY = bytes(DIGEST_SIZE)   # hash of an empty subtree
+
+
+def transaction_digest(tx: Transaction) -> bytes:
+    """
+    Content hash of a transaction: SHA-256 of its codec record. Raises
+    ValueError for transactions the codec cannot encode.
+    """
+    return hashlib.sha256(encode_transaction(tx)).digest()
+
+
+def bucket_of(tx_id: str, depth: int) -> int:
+    """
+    Leaf bucket of a tx_id: the first `depth` hex digits of its SHA-256.
+    Hashing spreads sequential or prefixed ids evenly over the buckets.
+    """
+    return int.from_bytes(hashlib.sha256(tx_id.encode()).digest()[:4], "big") >> (32 - 4 * depth)
+
+
+class MerkleIndex:
+    """
+    Merkle tree over a transaction set, bucketed by tx_id hash prefix.
+
+    Level 0 is the root and level `depth` holds FANOUT**depth leaf buckets.
+    A leaf hashes the (tx_id, digest) pairs of its bucket in tx_id order;
+    an inner node hashes its FANOUT children. Empty subtrees hash to EMPTY.
+
+    Adding a transaction only marks its path dirty; hashes are recomputed
+    on the next read, so each read rehashes just the nodes that changed.
+    """
+
+    def __init__(self, depth: int = MERKLE_DEPTH):
+        if not 1 <= depth <= 7:
+            raise ValueError("depth must be between 1 and 7")
+        self.depth = depth
+        self._leaves: List[Dict[str, bytes]] = [{} for _ in range(FANOUT ** depth)]
+        self._hashes: List[List[bytes]] = [[EMPTY] * (FANOUT ** level) for level in range(depth + 1)]
+        self._dirty: List[Set[int]] = [set() for _ in range(depth + 1)]
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return sum(len(leaf) for leaf in self._leaves)
+
+    # ---------------------------
+    # Updates
+    # ---------------------------
+    def add(self, tx: Transaction):
+        self.add_digest(tx.tx_id, transaction_digest(tx))
+
+    def add_many(self, transactions: Iterable[Transaction]):
+        for tx in transactions:
+            self.add(tx)
+
+    def add_digest(self, tx_id: str, digest: bytes):
+        bucket = bucket_of(tx_id, self.depth)
+        with self._lock:
+            self._leaves[bucket][tx_id] = digest
+            index = bucket
+            for level in range(self.depth, -1, -1):
+                self._dirty[level].add(index)
+                index //= FANOUT
+
+    def _rehash_locked(self):
+        if not self._dirty[0]:
+            return
+        leaf_hashes = self._hashes[self.depth]
+        for bucket in self._dirty[self.depth]:
+            entries = self._leaves[bucket]
+            leaf_hashes[bucket] = hashlib.sha256(
+                b"".join(tx_id.encode() + b"\0" + entries[tx_id] for tx_id in sorted(entries))
+            ).digest() if entries else EMPTY
+        self._dirty[self.depth].clear()
+
+        for level in range(self.depth - 1, -1, -1):
+            below = self._hashes[level + 1]
+            for index in self._dirty[level]:
+                children = below[index * FANOUT:(index + 1) * FANOUT]
+                self._hashes[level][index] = (
+                    EMPTY if all(child == EMPTY for child in children)
+                    else hashlib.sha256(b"".join(children)).digest()
+                )
+            self._dirty[level].clear()
+
+    # ---------------------------
+    # Reads
+    # ---------------------------
+    def root(self) -> bytes:
+        return self.node(0, 0)
+
+    def node(self, level: int, index: int) -> bytes:
+        with self._lock:
+            self._rehash_locked()
+            return self._hashes[level][index]
+
+    def children(self, level: int, index: int) -> List[bytes]:
+        """
+        Hashes of the FANOUT children of an inner node.
+        """
+        if not 0 <= level < self.depth:
+            raise ValueError(f"Level {level} has no children")
+        with self._lock:
+            self._rehash_locked()
+            return self._hashes[level + 1][index * FANOUT:(index + 1) * FANOUT]
+
+    def leaf(self, bucket: int) -> Dict[str, bytes]:
+        """
+        The tx_id -> digest entries of one leaf bucket.
+        """
+        with self._lock:
+            return dict(self._leaves[bucket])
@@ -0,0 +1,247 @@
+# n1c_core/metrics.py
+
+"""
+In-process metrics for ledger operations.
+
+LedgerMetrics keeps per-phase latency histograms, accepted/rejected
+counters and callback gauges. render_prometheus() returns the Prometheus
+text exposition format; publish() hands the same data to any sinks added
+with add_sink(), e.g. to push it to StatsD or a log.
+
+A ledger without metrics pays one `is None` check per instrumented call,
+so instrumentation is off unless config.METRICS_ENABLED is set or a
+LedgerMetrics is passed in.
+"""
+
+import threading
+import time
+from bisect import bisect_left
+from typing import Callable, Dict, Iterable, List, NamedTuple, Sequence, Tuple
+from n1c_core.config import METRICS_LATENCY_BUCKETS
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+class Sample(NamedTuple):
+    name: str
+    labels: Labels
+    value: float
+
+
+class MetricFamily(NamedTuple):
+    name: str
+    type: str          # "counter", "gauge" or "histogram"
+    help: str
+    samples: List[Sample]
+
+
+class Histogram:
+    """
+    Cumulative-bucket histogram, as Prometheus expects.
+    """
+
+    def __init__(self, buckets: Sequence[float] = METRICS_LATENCY_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        self.counts = [0] * (len(self.buckets) + 1)   # last slot is +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def samples(self, name: str, labels: Labels) -> List[Sample]:
+        samples = []
+        cumulative = 0
+        for bound, count in zip(self.buckets + (float("inf"),), self.counts):
+            cumulative += count
+            samples.append(Sample(f"{name}_bucket", labels + (("le", _format_value(bound)),), cumulative))
+        samples.append(Sample(f"{name}_sum", labels, self.sum))
+        samples.append(Sample(f"{name}_count", labels, self.count))
+        return samples
+
+
+class PhaseTimer:
+    """
+    Times consecutive phases of one operation. mark(phase) closes the
+    phase that started at the previous mark; done() records everything at
+    once.
+    """
+
+    __slots__ = ("_metrics", "_path", "_start", "_last", "_phases")
+
+    def __init__(self, metrics: "LedgerMetrics", path: str):
+        self._metrics = metrics
+        self._path = path
+        self._start = self._last = time.perf_counter()
+        self._phases: List[Tuple[str, float]] = []
+
+    def mark(self, phase: str):
+        now = time.perf_counter()
+        self._phases.append((phase, now - self._last))
+        self._last = now
+
+    def done(self, accepted: int = 0, rejected: Iterable[str] = ()):
+        self._metrics.record(
+            self._path, self._phases, time.perf_counter() - self._start, accepted, rejected
+        )
+
+
+class LedgerMetrics:
+    """
+    Metrics for one or more ledgers.
+
+    Histograms (seconds), labelled by path ("single" or "batch"):
+        n1c_ledger_phase_seconds{path, phase}   lookup, fee, validation,
+                                                signature, apply (batches
+                                                check signatures during
+                                                validation)
+        n1c_ledger_operation_seconds{path}      whole add_transaction(s) call
+    Counters:
+        n1c_ledger_transactions_accepted_total{path}
+        n1c_ledger_transactions_rejected_total{reason}
+            "error" counts transactions lost to an unexpected exception
+    Gauges, one series per ledger ("0", "1", ... in the order the ledgers
+    were created):
+        n1c_ledger_wallets{ledger}
+        n1c_ledger_transactions{ledger}
+    Gauges are read from callbacks at export time (see add_gauge).
+    """
+
+    def __init__(self, buckets: Sequence[float] = METRICS_LATENCY_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.phases: Dict[Tuple[str, str], Histogram] = {}
+        self.operations: Dict[str, Histogram] = {}
+        self.accepted: Dict[str, int] = {}
+        self.rejected: Dict[str, int] = {}
+        self._gauges: Dict[str, Tuple[str, Dict[Labels, Callable[[], float]]]] = {}
+        self._ledgers = 0
+        self._sinks: List[Callable[[List[MetricFamily]], None]] = []
+        self._lock = threading.Lock()
+
+    # ---------------------------
+    # Recording
+    # ---------------------------
+    def timer(self, path: str) -> PhaseTimer:
+        return PhaseTimer(self, path)
+
+    def record(
+        self,
+        path: str,
+        phases: Iterable[Tuple[str, float]],
+        elapsed: float,
+        accepted: int = 0,
+        rejected: Iterable[str] = (),
+    ):
+        with self._lock:
+            for phase, seconds in phases:
+                histogram = self.phases.get((path, phase))
+                if histogram is None:
+                    histogram = self.phases[(path, phase)] = Histogram(self.buckets)
+                histogram.observe(seconds)
+            histogram = self.operations.get(path)
+            if histogram is None:
+                histogram = self.operations[path] = Histogram(self.buckets)
+            histogram.observe(elapsed)
+            if accepted:
+                self.accepted[path] = self.accepted.get(path, 0) + accepted
+            for reason in rejected:
+                self.rejected[reason] = self.rejected.get(reason, 0) + 1
+
+    def add_gauge(self, name: str, help: str, read: Callable[[], float], labels: Labels = ()):
+        """
+        Export `read()` as gauge `name` with `labels`; it is called at export
+        time only. Raises ValueError if that series is already registered.
+        """
+        with self._lock:
+            _, series = self._gauges.setdefault(name, (help, {}))
+            if labels in series:
+                raise ValueError(f"Gauge {name}{dict(labels)} is already registered")
+            series[labels] = read
+
+    def ledger_labels(self) -> Labels:
+        """
+        Labels for the gauges of a newly created ledger.
+        """
+        with self._lock:
+            index, self._ledgers = self._ledgers, self._ledgers + 1
+        return (("ledger", str(index)),)
+
+    # ---------------------------
+    # Export
+    # ---------------------------
+    def collect(self) -> List[MetricFamily]:
+        with self._lock:
+            phases = [
+                sample
+                for (path, phase), histogram in sorted(self.phases.items())
+                for sample in histogram.samples("n1c_ledger_phase_seconds", (("path", path), ("phase", phase)))
+            ]
+            operations = [
+                sample
+                for path, histogram in sorted(self.operations.items())
+                for sample in histogram.samples("n1c_ledger_operation_seconds", (("path", path),))
+            ]
+            accepted = [
+                Sample("n1c_ledger_transactions_accepted_total", (("path", path),), count)
+                for path, count in sorted(self.accepted.items())
+            ]
+            rejected = [
+                Sample("n1c_ledger_transactions_rejected_total", (("reason", reason),), count)
+                for reason, count in sorted(self.rejected.items())
+            ]
+            gauges = [(name, help, sorted(series.items())) for name, (help, series) in sorted(self._gauges.items())]
+        families = [
+            MetricFamily("n1c_ledger_phase_seconds", "histogram",
+                         "Time spent in each phase of applying transactions.", phases),
+            MetricFamily("n1c_ledger_operation_seconds", "histogram",
+                         "Time spent in add_transaction and add_transactions calls.", operations),
+            MetricFamily("n1c_ledger_transactions_accepted_total", "counter",
+                         "Transactions applied.", accepted),
+            MetricFamily("n1c_ledger_transactions_rejected_total", "counter",
+                         "Transactions rejected, by reason.", rejected),
+        ]
+        for name, help, series in gauges:
+            samples = [Sample(name, labels, read()) for labels, read in series]
+            families.append(MetricFamily(name, "gauge", help, samples))
+        return families
+
+    def render_prometheus(self) -> str:
+        """
+        All metrics in the Prometheus text exposition format (version 0.0.4).
+        """
+        lines = []
+        for family in self.collect():
+            lines.append(f"# HELP {family.name} {family.help}")
+            lines.append(f"# TYPE {family.name} {family.type}")
+            for sample in family.samples:
+                labels = ",".join(f'{key}="{_escape(value)}"' for key, value in sample.labels)
+                name = f"{sample.name}{{{labels}}}" if labels else sample.name
+                lines.append(f"{name} {_format_value(sample.value)}")
+        return "\n".join(lines) + "\n"
+
+    def add_sink(self, sink: Callable[[List[MetricFamily]], None]):
+        """
+        Register a callable that receives collect() output on publish().
+        """
+        self._sinks.append(sink)
+
+    def publish(self):
+        if not self._sinks:
+            return
+        families = self.collect()
+        for sink in self._sinks:
+            sink(families)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
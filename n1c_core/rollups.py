@@ -0,0 +1,297 @@
+# n1c_core/rollups.py
+
+"""
+Per-anchor volume, fee and tax rollups in minute, hour and day buckets.
+
+The ledger calls record() as it applies each anchored transaction, so a
+report reads a handful of buckets instead of scanning history. Amounts
+are kept in integer minor units and converted only when reported.
+
+Minute and hour buckets are pruned once they fall out of their retention
+window; day buckets are kept for good.
+"""
+
+import threading
+from bisect import bisect_left, insort
+from datetime import datetime
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+from n1c_core.amount import MinorUnits, from_minor
+from n1c_core.config import ROLLUP_HOUR_RETENTION, ROLLUP_MINUTE_RETENTION
+from n1c_core.timeutil import EPOCH, MINUTE, to_minutes
+
+# Resolution name -> bucket width in minutes, finest first
+RESOLUTIONS = {"minute": 1, "hour": 60, "day": 1440}
+_WIDTHS = tuple(RESOLUTIONS.values())
+
+# (anchor_id, resolution, bucket index, count, volume, fees, taxes), minor units
+RollupRecord = Tuple[str, str, int, int, MinorUnits, MinorUnits, MinorUnits]
+
+
+class RollupTotals(NamedTuple):
+    count: int
+    volume: float
+    fees: float
+    taxes: float
+
+
+class RollupBucket(NamedTuple):
+    start: datetime
+    count: int
+    volume: float
+    fees: float
+    taxes: float
+
+
+class _Series:
+    """
+    Buckets of one anchor at one resolution: index -> [count, volume, fees, taxes].
+    """
+
+    __slots__ = ("buckets", "keys", "horizon")
+
+    def __init__(self):
+        self.buckets: Dict[int, List[int]] = {}
+        self.keys: List[int] = []       # sorted bucket indexes
+        self.horizon: Optional[int] = None  # first index still retained, once pruned
+
+    def bucket(self, index: int, retention: Optional[int]) -> Optional[List[int]]:
+        """
+        The bucket at `index`, created if needed; None if already pruned.
+        """
+        bucket = self.buckets.get(index)
+        if bucket is not None:
+            return bucket
+        if self.horizon is not None and index < self.horizon:
+            return None
+        bucket = self.buckets[index] = [0, 0, 0, 0]
+        if not self.keys or index > self.keys[-1]:
+            self.keys.append(index)
+            if retention is not None and index - retention >= self.keys[0]:
+                self._prune(index - retention + 1)
+        else:
+            insort(self.keys, index)
+        return bucket
+
+    def _prune(self, horizon: int):
+        cut = bisect_left(self.keys, horizon)
+        for index in self.keys[:cut]:
+            del self.buckets[index]
+        del self.keys[:cut]
+        self.horizon = horizon
+
+    def span(self, lo: int, hi: int) -> Iterable[int]:
+        """
+        Indexes of stored buckets in [lo, hi).
+        """
+        keys = self.keys
+        return keys[bisect_left(keys, lo):bisect_left(keys, hi)]
+
+
+class AnchorRollups:
+    """
+    Time-bucketed totals per anchor, updated incrementally.
+
+    record() is O(1): the three buckets a transaction lands in are cached
+    per anchor, so consecutive transactions in the same minute touch no
+    dictionaries. buckets() costs O(buckets returned) and totals() over
+    any minute-aligned range O(buckets spanned), using the coarsest
+    buckets that fit.
+    """
+
+    def __init__(
+        self,
+        minute_retention: Optional[int] = ROLLUP_MINUTE_RETENTION,
+        hour_retention: Optional[int] = ROLLUP_HOUR_RETENTION,
+    ):
+        self.retention = (minute_retention, hour_retention, None)
+        self._series: Dict[str, Tuple[_Series, _Series, _Series]] = {}
+        self._totals: Dict[str, List[int]] = {}
+        # anchor_id -> (minute index, its minute, hour and day buckets)
+        self._current: Dict[str, Tuple[int, Tuple[Optional[List[int]], ...]]] = {}
+        self._lock = threading.Lock()
+
+    # ---------------------------
+    # Recording
+    # ---------------------------
+    def record(self, anchor_id: str, timestamp: datetime, amount: MinorUnits, fee: MinorUnits, tax: MinorUnits):
+        """
+        Add one applied transaction routed through `anchor_id`.
+        """
+        minute = to_minutes(timestamp)
+        with self._lock:
+            current = self._current.get(anchor_id)
+            if current is None or current[0] != minute:
+                current = self._current[anchor_id] = (minute, self._buckets(anchor_id, minute))
+            for bucket in current[1]:
+                if bucket is not None:
+                    bucket[0] += 1
+                    bucket[1] += amount
+                    bucket[2] += fee
+                    bucket[3] += tax
+            totals = self._totals[anchor_id]
+            totals[0] += 1
+            totals[1] += amount
+            totals[2] += fee
+            totals[3] += tax
+
+    def add_minute_totals(self, rows: Iterable[Tuple[str, int, int, MinorUnits, MinorUnits, MinorUnits]]):
+        """
+        Add pre-aggregated (anchor_id, minute index, count, volume, fees,
+        taxes) rows, e.g. when rebuilding from storage.
+        """
+        with self._lock:
+            for anchor_id, minute, count, volume, fees, taxes in rows:
+                self._current.pop(anchor_id, None)
+                for bucket in self._buckets(anchor_id, minute):
+                    if bucket is not None:
+                        _add(bucket, count, volume, fees, taxes)
+                _add(self._totals[anchor_id], count, volume, fees, taxes)
+
+    def _buckets(self, anchor_id: str, minute: int) -> Tuple[Optional[List[int]], ...]:
+        series = self._series.get(anchor_id)
+        if series is None:
+            series = self._series[anchor_id] = (_Series(), _Series(), _Series())
+            self._totals[anchor_id] = [0, 0, 0, 0]
+        return tuple(
+            level.bucket(minute // width, retention)
+            for level, width, retention in zip(series, _WIDTHS, self.retention)
+        )
+
+    # ---------------------------
+    # Reports
+    # ---------------------------
+    def anchors(self) -> List[str]:
+        return sorted(self._series)
+
+    def totals(
+        self,
+        anchor_id: str,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+    ) -> RollupTotals:
+        """
+        Count, volume, fees and taxes in [since, until), bounds truncated to
+        the minute. Raises ValueError if the range needs minute or hour
+        buckets that were already pruned; day-aligned bounds always work.
+        """
+        with self._lock:
+            series = self._series.get(anchor_id)
+            if series is None:
+                return RollupTotals(0, 0.0, 0.0, 0.0)
+            if since is None and until is None:
+                return _totals(self._totals[anchor_id])
+
+            days = series[-1].keys
+            lo = to_minutes(since) if since is not None else days[0] * _WIDTHS[-1]
+            hi = to_minutes(until) if until is not None else (days[-1] + 1) * _WIDTHS[-1]
+            total = [0, 0, 0, 0]
+            if lo < hi:
+                self._sum_range(series, lo, hi, len(_WIDTHS) - 1, total)
+            return _totals(total)
+
+    def _sum_range(self, series, lo: int, hi: int, level: int, total: List[int]):
+        """
+        Add buckets covering minutes [lo, hi), as coarse as alignment allows.
+        """
+        width = _WIDTHS[level]
+        first, last = -(-lo // width), hi // width
+        if level and first >= last:
+            self._sum_range(series, lo, hi, level - 1, total)
+            return
+        if not level:
+            first, last = lo, hi
+
+        horizon = series[level].horizon
+        if horizon is not None and first < horizon:
+            name = list(RESOLUTIONS)[level]
+            raise ValueError(f"{name.capitalize()} buckets needed for this range were pruned; align the bounds to coarser buckets")
+        buckets = series[level].buckets
+        for index in series[level].span(first, last):
+            _add(total, *buckets[index])
+
+        if level:
+            if lo < first * width:
+                self._sum_range(series, lo, first * width, level - 1, total)
+            if last * width < hi:
+                self._sum_range(series, last * width, hi, level - 1, total)
+
+    def buckets(
+        self,
+        anchor_id: str,
+        resolution: str = "hour",
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+    ) -> List[RollupBucket]:
+        """
+        Non-empty buckets of one resolution whose start is in [since, until).
+        """
+        if resolution not in RESOLUTIONS:
+            raise ValueError(f"Unknown resolution {resolution!r}; use one of {', '.join(RESOLUTIONS)}")
+        level = list(RESOLUTIONS).index(resolution)
+        width = _WIDTHS[level]
+        with self._lock:
+            series = self._series.get(anchor_id)
+            if series is None:
+                return []
+            keys = series[level].keys
+            lo = -(-to_minutes(since) // width) if since is not None else keys[0]
+            hi = -(-to_minutes(until) // width) if until is not None else keys[-1] + 1
+            buckets = series[level].buckets
+            return [
+                RollupBucket(EPOCH + index * width * MINUTE, *_totals(buckets[index]))
+                for index in series[level].span(lo, hi)
+            ]
+
+    # ---------------------------
+    # Persistence
+    # ---------------------------
+    def export(self) -> List[RollupRecord]:
+        """
+        Every retained bucket, for snapshots.
+        """
+        with self._lock:
+            return [
+                (anchor_id, name, index, *level.buckets[index])
+                for anchor_id, series in self._series.items()
+                for name, level in zip(RESOLUTIONS, series)
+                for index in level.keys
+            ]
+
+    def load(self, records: Iterable[RollupRecord]):
+        """
+        Replace all state with exported buckets.
+        """
+        with self._lock:
+            self._series.clear()
+            self._totals.clear()
+            self._current.clear()
+            levels = list(RESOLUTIONS)
+            for anchor_id, name, index, count, volume, fees, taxes in records:
+                series = self._series.get(anchor_id)
+                if series is None:
+                    series = self._series[anchor_id] = (_Series(), _Series(), _Series())
+                    self._totals[anchor_id] = [0, 0, 0, 0]
+                level = levels.index(name)
+                series[level].buckets[index] = [count, volume, fees, taxes]
+                insort(series[level].keys, index)
+                # Day buckets are never pruned, so they add up to all-time totals
+                if level == len(levels) - 1:
+                    _add(self._totals[anchor_id], count, volume, fees, taxes)
+            # Whether anything was pruned before the export is unknown, so
+            # assume the full retention window was
+            for series in self._series.values():
+                for level, retention in zip(series, self.retention):
+                    if retention is not None and level.keys:
+                        level._prune(level.keys[-1] - retention + 1)
+
+
+def _add(target: List[int], count: int, volume: MinorUnits, fees: MinorUnits, taxes: MinorUnits):
+    target[0] += count
+    target[1] += volume
+    target[2] += fees
+    target[3] += taxes
+
+
+def _totals(values: List[int]) -> RollupTotals:
+    count, volume, fees, taxes = values
+    return RollupTotals(count, from_minor(volume), from_minor(fees), from_minor(taxes))
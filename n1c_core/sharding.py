@@ -0,0 +1,528 @@
+# n1c_core/sharding.py
+
+"""
+Address-sharded ledger across worker processes.
+
+Wallets are partitioned by a stable hash of their address over N worker
+processes, each running its own in-memory ShardLedger. ShardedLedger, the
+coordinator, routes every call to the shard that owns the wallet and
+offers the same surface as Ledger.
+
+A transfer between two wallets on one shard is an ordinary Ledger
+transfer. A cross-shard transfer runs two-phase commit:
+
+    prepare  the sender's shard validates the transfer and moves amount,
+             fee and tax out of the sender into a hold; the receiver's
+             shard checks the receiver exists and reserves the tx_id
+    commit   if both shards prepared, the receiver is credited and the
+             hold is closed into the sender's history
+    abort    otherwise the hold is refunded and the reservation dropped
+
+Held funds leave the sender before they reach the receiver, so supply is
+never created, and a failure before commit leaves both shards exactly as
+they were. Shards keep no log: a shard lost during commit is not
+recovered.
+"""
+
+import multiprocessing
+import threading
+import zlib
+from collections import defaultdict
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple, Union
+from n1c_core.models import Anchor, Transaction, Wallet
+from n1c_core.ledger_rules import validate_transaction
+from n1c_core.amount import add_minor, fee_and_tax, from_minor, to_minor
+from n1c_core.keyring import PublicKeyLike, public_key_bytes
+from n1c_core.errors import TransactionRejectedError
+from n1c_core.ledger import BatchRejectedError, Ledger
+from n1c_core.rollups import RollupTotals
+from n1c_core.config import LEDGER_SHARDS
+
+
+class ShardUnavailableError(RuntimeError):
+    """
+    Raised when a shard worker process cannot be reached.
+    """
+
+
+def _placeholder(address: str) -> Wallet:
+    # Stands in for a wallet owned by another shard when recording a transaction
+    return Wallet(address=address, balance=0.0, transactions=[])
+
+
+# ---------------------------
+# Shard (participant)
+# ---------------------------
+
+class ShardLedger(Ledger):
+    """
+    Ledger holding one shard's wallets, plus the participant side of the
+    cross-shard protocol. Each step takes a list so a coordinator can move
+    a whole batch per message.
+    """
+
+    def __init__(self, **kwargs):
+        self._holds: Dict[str, Tuple[Transaction, Optional[str], int, int]] = {}  # tx_id -> (tx, anchor_id, debited, tax)
+        self._incoming: Set[str] = set()                                     # tx_ids reserved for a credit
+        super().__init__(**kwargs)
+
+    def has_transaction(self, tx_id: str) -> bool:
+        return tx_id in self._holds or tx_id in self._incoming or super().has_transaction(tx_id)
+
+    def apply_local(self, items: List[Dict[str, Any]]) -> Tuple[List[Transaction], List[Tuple[int, str, str]]]:
+        """
+        add_transactions(atomic=False), returning (applied, rejections).
+        """
+        try:
+            return self.add_transactions(items, atomic=False), []
+        except BatchRejectedError as exc:
+            return exc.applied, exc.rejections
+
+    def prepare_debits(self, items: List[Dict[str, Any]]) -> List[Union[Transaction, str]]:
+        """
+        Validate each outgoing transfer against the running balance and
+        move its amount, fee and tax into a hold. Returns the prepared
+        Transaction or a rejection reason per item.
+        """
+        results: List[Union[Transaction, str]] = []
+        for item in items:
+            tx_id = item["tx_id"]
+            sender_wallet = self.get_wallet(item["sender_address"])
+            if self.has_transaction(tx_id):
+                results.append("duplicate transaction id")
+                continue
+            if not sender_wallet:
+                results.append("sender or receiver wallet does not exist")
+                continue
+
+            anchor = self.get_anchor(item["anchor_id"]) if item["anchor_id"] else None
+            try:
+                amount_minor = to_minor(item["amount"])
+            except TransactionRejectedError:
+                results.append("validation failed")
+                continue
+            fee_minor, tax_minor = fee_and_tax(amount_minor, anchor.spread, anchor.tax_rate) if anchor else (0, 0)
+            tx = Transaction(
+                tx_id=tx_id,
+                sender=sender_wallet.address,
+                receiver=item["receiver_address"],
+                amount=from_minor(amount_minor),
+                fee=from_minor(fee_minor),
+                timestamp=item["timestamp"],
+                signature=item["signature"],
+            )
+            if not validate_transaction(tx, sender_wallet, _placeholder(tx.receiver)):
+                results.append("validation failed")
+                continue
+            if not self._signature_ok(tx):
+                results.append("invalid signature")
+                continue
+
+            debited = amount_minor + fee_minor + tax_minor
+            sender_wallet.balance = add_minor(sender_wallet.balance, -debited)
+            self.storage.save_balances((sender_wallet,))
+            self.auditor.record_debit(sender_wallet.address, debited)
+            self._holds[tx_id] = (tx, item["anchor_id"], debited, tax_minor)
+            results.append(tx)
+        return results
+
+    def prepare_credits(self, items: List[Tuple[str, str]]) -> List[Optional[str]]:
+        """
+        Reserve (tx_id, receiver) pairs. Returns None or a rejection reason
+        per pair.
+        """
+        results: List[Optional[str]] = []
+        for tx_id, receiver in items:
+            if self.has_transaction(tx_id):
+                results.append("duplicate transaction id")
+            elif receiver not in self.wallets:
+                results.append("sender or receiver wallet does not exist")
+            else:
+                self._incoming.add(tx_id)
+                results.append(None)
+        return results
+
+    def commit_debits(self, tx_ids: List[str]):
+        for tx_id in tx_ids:
+            tx, anchor_id, _, tax_minor = self._holds.pop(tx_id)
+            self.storage.record_transaction(
+                tx, self.wallets[tx.sender], _placeholder(tx.receiver), anchor_id, from_minor(tax_minor)
+            )
+            # Rollups count each cross-shard transfer once, on the sender's shard
+            if anchor_id:
+                self.rollups.record(anchor_id, tx.timestamp, to_minor(tx.amount), to_minor(tx.fee), tax_minor)
+        if self._unsaved_tx_ids is not None:
+            self._unsaved_tx_ids.extend(tx_ids)
+
+    def abort_debits(self, tx_ids: List[str]):
+        for tx_id in tx_ids:
+            tx, _, debited, _ = self._holds.pop(tx_id)
+            wallet = self.wallets[tx.sender]
+            wallet.balance = add_minor(wallet.balance, debited)
+            self.storage.save_balances((wallet,))
+            self.auditor.record_credit(wallet.address, debited)
+
+    def commit_credits(self, items: List[Tuple[Transaction, Optional[str]]]):
+        for tx, anchor_id in items:
+            self._incoming.discard(tx.tx_id)
+            wallet = self.wallets[tx.receiver]
+            amount_minor = to_minor(tx.amount)
+            wallet.balance = add_minor(wallet.balance, amount_minor)
+            self.storage.record_transaction(tx, _placeholder(tx.sender), wallet, anchor_id)
+            self.auditor.record_credit(wallet.address, amount_minor)
+        if self._unsaved_tx_ids is not None:
+            self._unsaved_tx_ids.extend(tx.tx_id for tx, _ in items)
+        self._notify_credit(dict.fromkeys(tx.receiver for tx, _ in items))
+
+    def abort_credits(self, tx_ids: List[str]):
+        self._incoming.difference_update(tx_ids)
+
+    def balances(self) -> Dict[str, float]:
+        return {address: wallet.balance for address, wallet in self.wallets.items()}
+
+
+def _serve(conn, verify_signatures: bool):
+    """
+    Worker process loop: each message is a list of (method, args) calls on
+    the shard, answered with a list of (ok, result or exception).
+    """
+    ledger = ShardLedger(verify_signatures=verify_signatures)
+    while True:
+        try:
+            calls = conn.recv()
+        except EOFError:
+            break
+        if calls is None:
+            break
+        results = []
+        for method, args in calls:
+            try:
+                results.append((True, getattr(ledger, method)(*args)))
+            except Exception as exc:
+                results.append((False, exc))
+        conn.send(results)
+    conn.close()
+
+
+# ---------------------------
+# Coordinator
+# ---------------------------
+
+class ShardedLedger:
+    """
+    Ledger facade over `shards` worker processes.
+
+    Calls are serialized by the coordinator; add_transactions() sends each
+    shard its share of a batch at once, so shards work in parallel. Within
+    a batch every shard applies its local transfers first and cross-shard
+    credits land at commit, so an item spending funds that a cross-shard
+    item of the same batch delivers may be rejected.
+
+    Wallets and transactions returned are copies from the worker, not live
+    objects.
+    """
+
+    _BATCH_FIELDS = Ledger._BATCH_FIELDS
+    _batch_item = Ledger._batch_item
+
+    def __init__(
+        self,
+        shards: int = LEDGER_SHARDS,
+        verify_signatures: bool = False,
+        start_method: Optional[str] = None,
+    ):
+        if shards < 1:
+            raise ValueError("shards must be at least 1")
+        context = multiprocessing.get_context(start_method)
+        self._conns = []
+        self._workers = []
+        for _ in range(shards):
+            parent, child = context.Pipe()
+            worker = context.Process(target=_serve, args=(child, verify_signatures), daemon=True)
+            worker.start()
+            child.close()
+            self._conns.append(parent)
+            self._workers.append(worker)
+        self._tx_ids: Set[str] = set()   # every applied tx_id, for global uniqueness
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._conns)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        for conn in self._conns:
+            try:
+                conn.send(None)
+            except OSError:
+                pass
+            conn.close()
+        for worker in self._workers:
+            worker.join(timeout=5)
+            if worker.is_alive():
+                worker.terminate()
+        self._conns, self._workers = [], []
+
+    def shard_of(self, address: str) -> int:
+        # Stable across processes, unlike the salted built-in hash
+        return zlib.crc32(address.encode()) % len(self._conns)
+
+    # ---------------------------
+    # Messaging
+    # ---------------------------
+    def _run(self, jobs: List[Tuple[int, str, tuple]]) -> List[Tuple[bool, Any]]:
+        """
+        Run (shard, method, args) jobs, one message per shard, every shard
+        at once. Returns (ok, result or exception) per job, in job order.
+        """
+        by_shard: Dict[int, List[int]] = defaultdict(list)
+        for position, (shard, _, _) in enumerate(jobs):
+            by_shard[shard].append(position)
+
+        sent = []
+        for shard, positions in by_shard.items():
+            try:
+                self._conns[shard].send([jobs[p][1:] for p in positions])
+                sent.append(shard)
+            except OSError:
+                pass
+
+        results: List[Tuple[bool, Any]] = [None] * len(jobs)
+        for shard, positions in by_shard.items():
+            replies = None
+            if shard in sent:
+                try:
+                    replies = self._conns[shard].recv()
+                except (EOFError, OSError):
+                    pass
+            if replies is None:
+                replies = [(False, ShardUnavailableError(f"Shard {shard} is unavailable"))] * len(positions)
+            for position, reply in zip(positions, replies):
+                results[position] = reply
+        return results
+
+    def _call(self, shard: int, method: str, *args) -> Any:
+        ((ok, result),) = self._run([(shard, method, args)])
+        if not ok:
+            raise result
+        return result
+
+    def _broadcast(self, method: str, *args) -> List[Any]:
+        results = []
+        for ok, result in self._run([(shard, method, args) for shard in range(len(self._conns))]):
+            if not ok:
+                raise result
+            results.append(result)
+        return results
+
+    # ---------------------------
+    # Wallets and Anchors
+    # ---------------------------
+    def create_wallet(self, address: str, public_key: Optional[PublicKeyLike] = None) -> Wallet:
+        raw_key = public_key_bytes(public_key) if public_key is not None else None
+        with self._lock:
+            return self._call(self.shard_of(address), "create_wallet", address, raw_key)
+
+    def deposit(self, address: str, amount: float) -> Wallet:
+        with self._lock:
+            return self._call(self.shard_of(address), "deposit", address, amount)
+
+    def get_wallet(self, address: str) -> Optional[Wallet]:
+        with self._lock:
+            return self._call(self.shard_of(address), "get_wallet", address)
+
+    def register_anchor(self, anchor_id: str, spread: float = 2.0, tax_rate: float = 0.0) -> Anchor:
+        """
+        Register an anchor on every shard, since fees are charged where the
+        sender lives.
+        """
+        with self._lock:
+            return self._broadcast("register_anchor", anchor_id, spread, tax_rate)[0]
+
+    def get_anchor(self, anchor_id: str) -> Optional[Anchor]:
+        with self._lock:
+            return self._call(0, "get_anchor", anchor_id)
+
+    def get_anchor_totals(
+        self,
+        anchor_id: str,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+    ) -> RollupTotals:
+        """
+        Anchor totals summed over shards; each transfer is counted on the
+        sender's shard.
+        """
+        with self._lock:
+            found = self._broadcast("get_anchor_totals", anchor_id, since, until)
+        return RollupTotals(
+            sum(totals.count for totals in found),
+            *(from_minor(sum(to_minor(totals[field]) for totals in found)) for field in (1, 2, 3)),
+        )
+
+    def balances(self) -> Dict[str, float]:
+        """
+        Every wallet's balance, gathered from all shards.
+        """
+        with self._lock:
+            merged = {}
+            for balances in self._broadcast("balances"):
+                merged.update(balances)
+            return merged
+
+    def audit(self, full: bool = False) -> List[str]:
+        with self._lock:
+            return [address for found in self._broadcast("audit", full) for address in found]
+
+    # ---------------------------
+    # Transactions
+    # ---------------------------
+    def has_transaction(self, tx_id: str) -> bool:
+        return tx_id in self._tx_ids
+
+    def get_transaction(self, tx_id: str) -> Optional[Transaction]:
+        if tx_id not in self._tx_ids:
+            return None
+        with self._lock:
+            return next((tx for tx in self._broadcast("get_transaction", tx_id) if tx is not None), None)
+
+    def add_transaction(
+        self,
+        tx_id: str,
+        sender_address: str,
+        receiver_address: str,
+        amount: float,
+        signature: str,
+        anchor_id: Optional[str] = None,
+        timestamp: Optional[datetime] = None,
+    ) -> Transaction:
+        try:
+            (tx,) = self.add_transactions(
+                [(tx_id, sender_address, receiver_address, amount, signature, anchor_id, timestamp)]
+            )
+        except BatchRejectedError as exc:
+            raise ValueError(f"Transaction {tx_id} rejected: {exc.rejections[0][2]}") from None
+        return tx
+
+    def add_transactions(self, batch: Iterable[Any]) -> List[Transaction]:
+        """
+        Apply a batch across shards, as Ledger.add_transactions with
+        `atomic=False`: valid items are applied and BatchRejectedError
+        lists the rest. Costs one round of messages for a batch of local
+        transfers and two when any transfer crosses shards.
+        """
+        items = [self._batch_item(item) for item in batch]
+        now = datetime.utcnow()
+        with self._lock:
+            return self._apply_batch(items, now)
+
+    def _apply_batch(self, items: List[Dict[str, Any]], now: datetime) -> List[Transaction]:
+        rejections: List[Tuple[int, str, str]] = []
+        local: Dict[int, List[int]] = defaultdict(list)     # shard -> batch indices
+        debits: Dict[int, List[int]] = defaultdict(list)
+        credits: Dict[int, List[int]] = defaultdict(list)
+        seen_ids = set()
+
+        for index, item in enumerate(items):
+            tx_id = item["tx_id"]
+            if tx_id in seen_ids or tx_id in self._tx_ids:
+                rejections.append((index, tx_id, "duplicate transaction id"))
+                continue
+            seen_ids.add(tx_id)
+            # Both halves of a cross-shard transfer must agree on the time
+            item["timestamp"] = item["timestamp"] or now
+            sender_shard = self.shard_of(item["sender_address"])
+            receiver_shard = self.shard_of(item["receiver_address"])
+            if sender_shard == receiver_shard:
+                local[sender_shard].append(index)
+            else:
+                debits[sender_shard].append(index)
+                credits[receiver_shard].append(index)
+
+        # Round 1: local transfers, then prepare both halves of cross-shard ones
+        jobs, groups = [], []
+        for shard, indices in local.items():
+            jobs.append((shard, "apply_local", ([items[i] for i in indices],)))
+            groups.append(("local", indices))
+        for shard, indices in debits.items():
+            jobs.append((shard, "prepare_debits", ([items[i] for i in indices],)))
+            groups.append(("debit", indices))
+        for shard, indices in credits.items():
+            jobs.append((shard, "prepare_credits", ([(items[i]["tx_id"], items[i]["receiver_address"]) for i in indices],)))
+            groups.append(("credit", indices))
+
+        applied: Dict[int, Transaction] = {}
+        prepared_debits: Dict[int, Transaction] = {}
+        prepared_credits: Set[int] = set()
+        failures: Dict[int, str] = {}
+
+        for (kind, indices), (ok, result) in zip(groups, self._run(jobs)):
+            if not ok:
+                for i in indices:
+                    failures.setdefault(i, str(result))
+            elif kind == "local":
+                txs, local_rejections = result
+                rejected = {position for position, _, _ in local_rejections}
+                for position, _, reason in local_rejections:
+                    failures[indices[position]] = reason
+                accepted = [i for position, i in enumerate(indices) if position not in rejected]
+                applied.update(zip(accepted, txs))
+            elif kind == "debit":
+                for i, outcome in zip(indices, result):
+                    if isinstance(outcome, str):
+                        failures.setdefault(i, outcome)
+                    else:
+                        prepared_debits[i] = outcome
+            else:
+                for i, reason in zip(indices, result):
+                    if reason is None:
+                        prepared_credits.add(i)
+                    else:
+                        failures.setdefault(i, reason)
+
+        # Round 2: commit transfers prepared on both sides, abort the rest
+        committed = [i for i in prepared_debits if i in prepared_credits]
+        commit_set = set(committed)
+        jobs = []
+        by_receiver: Dict[int, List[Tuple[Transaction, Optional[str]]]] = defaultdict(list)
+        by_sender: Dict[int, List[str]] = defaultdict(list)
+        abort_debits: Dict[int, List[str]] = defaultdict(list)
+        abort_credits: Dict[int, List[str]] = defaultdict(list)
+        for i in committed:
+            by_receiver[self.shard_of(items[i]["receiver_address"])].append((prepared_debits[i], items[i]["anchor_id"]))
+            by_sender[self.shard_of(items[i]["sender_address"])].append(items[i]["tx_id"])
+        for i in prepared_debits:
+            if i not in commit_set:
+                abort_debits[self.shard_of(items[i]["sender_address"])].append(items[i]["tx_id"])
+        for i in prepared_credits:
+            if i not in commit_set:
+                abort_credits[self.shard_of(items[i]["receiver_address"])].append(items[i]["tx_id"])
+        for method, groups_by_shard in (
+            ("commit_credits", by_receiver), ("commit_debits", by_sender),
+            ("abort_debits", abort_debits), ("abort_credits", abort_credits),
+        ):
+            jobs.extend((shard, method, (entries,)) for shard, entries in groups_by_shard.items())
+
+        if jobs:
+            errors = [result for ok, result in self._run(jobs) if not ok]
+            if errors:
+                # Local transfers are in, and any commit may have landed on
+                # one side; keep their ids so a retry is refused, not reapplied
+                self._tx_ids.update(tx.tx_id for tx in applied.values())
+                self._tx_ids.update(items[i]["tx_id"] for i in committed)
+                raise ShardUnavailableError(f"Cross-shard commit failed, shards may disagree: {errors[0]}")
+        for i in committed:
+            applied[i] = prepared_debits[i]
+
+        self._tx_ids.update(tx.tx_id for tx in applied.values())
+        rejections.extend((i, items[i]["tx_id"], reason) for i, reason in failures.items() if i not in applied)
+        ordered = [applied[i] for i in sorted(applied)]
+        if rejections:
+            raise BatchRejectedError(sorted(rejections), ordered)
+        return ordered
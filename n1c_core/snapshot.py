@@ -0,0 +1,279 @@
+# n1c_core/snapshot.py
+
+import os
+import struct
+import threading
+import zlib
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, NamedTuple, Optional, Sequence, Set, Tuple, Union
+from n1c_core.config import LEDGER_SNAPSHOT_PATH, SNAPSHOT_KEEP
+from n1c_core.rollups import RESOLUTIONS, RollupRecord
+
+MAGIC = b"N1CS"
+VERSION = 2
+
+# magic | version | wal offset | wallet count | anchor count | tx_id count [| rollup count]
+_HEADER_V1 = struct.Struct("<4sHQIII")
+_HEADER = struct.Struct("<4sHQIIII")
+_LENGTH = struct.Struct("<H")
+_BALANCE = struct.Struct("<dB")        # balance, has public key
+_ANCHOR = struct.Struct("<dd")         # spread, tax rate
+_ROLLUP = struct.Struct("<BqQqqq")     # resolution, bucket index, count, volume, fees, taxes
+_CHECKSUM = struct.Struct("<I")
+
+
+class Snapshot(NamedTuple):
+    """
+    Point-in-time ledger state. `wal_offset` is the log position the state
+    corresponds to; replay resumes from there.
+    """
+    wal_offset: int
+    balances: Dict[str, float]
+    public_keys: Dict[str, bytes]
+    anchors: Dict[str, Tuple[float, float]]
+    tx_ids: Set[str]
+    rollups: Sequence[RollupRecord] = ()
+
+
+class SnapshotDelta(NamedTuple):
+    """
+    What changed since the previous capture: balances and keys of the
+    wallets touched, new tx_ids, and the (small) anchor and rollup state
+    in full.
+    """
+    wal_offset: int
+    balances: Dict[str, float]
+    public_keys: Dict[str, bytes]
+    anchors: Dict[str, Tuple[float, float]]
+    tx_ids: Iterable[str]
+    rollups: Sequence[RollupRecord] = ()
+
+
+class SnapshotBuilder:
+    """
+    Running copy of a ledger's snapshot state. The ledger hands over a
+    SnapshotDelta per capture while writers are paused; build() folds the
+    deltas in and copies the full state afterwards, on whichever thread
+    calls it, so the pause is proportional to the changes rather than to
+    the history.
+    """
+
+    def __init__(self):
+        self.balances: Dict[str, float] = {}
+        self.public_keys: Dict[str, bytes] = {}
+        self.tx_ids: Set[str] = set()
+        self._latest: Optional[SnapshotDelta] = None
+        self._deltas: List[SnapshotDelta] = []
+        self._deltas_lock = threading.Lock()   # held briefly by the ledger
+        self._build_lock = threading.Lock()    # held for the copy
+
+    def add(self, delta: SnapshotDelta):
+        with self._deltas_lock:
+            self._deltas.append(delta)
+
+    def build(self) -> Snapshot:
+        """
+        State as of the newest delta added. Deltas are folded in the order
+        they were added, whichever thread builds first.
+        """
+        with self._build_lock:
+            with self._deltas_lock:
+                deltas, self._deltas = self._deltas, []
+            for delta in deltas:
+                self.balances.update(delta.balances)
+                self.public_keys.update(delta.public_keys)
+                self.tx_ids.update(delta.tx_ids)
+                self._latest = delta
+            latest = self._latest
+            if latest is None:
+                raise ValueError("No state has been captured yet")
+            return Snapshot(
+                wal_offset=latest.wal_offset,
+                balances=dict(self.balances),
+                public_keys=dict(self.public_keys),
+                anchors=latest.anchors,
+                tx_ids=set(self.tx_ids),
+                rollups=latest.rollups,
+            )
+
+
+# ---------------------------
+# Encoding
+# ---------------------------
+
+def encode_snapshot(snapshot: Snapshot) -> bytes:
+    """
+    Serialize a snapshot into the compact binary checkpoint format.
+    """
+    parts: List[bytes] = [_HEADER.pack(
+        MAGIC, VERSION, snapshot.wal_offset,
+        len(snapshot.balances), len(snapshot.anchors), len(snapshot.tx_ids), len(snapshot.rollups)
+    )]
+
+    for address, balance in snapshot.balances.items():
+        _append_str(parts, address)
+        public_key = snapshot.public_keys.get(address)
+        parts.append(_BALANCE.pack(balance, public_key is not None))
+        if public_key is not None:
+            parts.append(public_key)
+
+    for anchor_id, (spread, tax_rate) in snapshot.anchors.items():
+        _append_str(parts, anchor_id)
+        parts.append(_ANCHOR.pack(spread, tax_rate))
+
+    for tx_id in snapshot.tx_ids:
+        _append_str(parts, tx_id)
+
+    resolutions = list(RESOLUTIONS)
+    for anchor_id, resolution, index, count, volume, fees, taxes in snapshot.rollups:
+        _append_str(parts, anchor_id)
+        parts.append(_ROLLUP.pack(resolutions.index(resolution), index, count, volume, fees, taxes))
+
+    body = b"".join(parts)
+    return body + _CHECKSUM.pack(zlib.crc32(body))
+
+
+def decode_snapshot(data: bytes) -> Snapshot:
+    """
+    Parse a checkpoint file, current or version 1. Raises ValueError if
+    it is corrupt.
+    """
+    if len(data) < _HEADER_V1.size + _CHECKSUM.size:
+        raise ValueError("Snapshot is truncated")
+    body, (checksum,) = data[:-_CHECKSUM.size], _CHECKSUM.unpack(data[-_CHECKSUM.size:])
+    if zlib.crc32(body) != checksum:
+        raise ValueError("Snapshot checksum mismatch")
+
+    view = memoryview(body)
+    magic, version = view[:4].tobytes(), _LENGTH.unpack_from(view, 4)[0]
+    if magic != MAGIC or version not in (1, VERSION):
+        raise ValueError("Unsupported snapshot format")
+    if version == 1:
+        _, _, wal_offset, wallets, anchors, tx_ids = _HEADER_V1.unpack_from(view)
+        rollup_count, offset = 0, _HEADER_V1.size
+    else:
+        _, _, wal_offset, wallets, anchors, tx_ids, rollup_count = _HEADER.unpack_from(view)
+        offset = _HEADER.size
+
+    balances: Dict[str, float] = {}
+    public_keys: Dict[str, bytes] = {}
+    for _ in range(wallets):
+        address, offset = _read_str(view, offset)
+        balance, has_key = _BALANCE.unpack_from(view, offset)
+        offset += _BALANCE.size
+        balances[address] = balance
+        if has_key:
+            public_keys[address] = bytes(view[offset:offset + 32])
+            offset += 32
+
+    anchor_rates: Dict[str, Tuple[float, float]] = {}
+    for _ in range(anchors):
+        anchor_id, offset = _read_str(view, offset)
+        anchor_rates[anchor_id] = _ANCHOR.unpack_from(view, offset)
+        offset += _ANCHOR.size
+
+    known: Set[str] = set()
+    for _ in range(tx_ids):
+        tx_id, offset = _read_str(view, offset)
+        known.add(tx_id)
+
+    resolutions = list(RESOLUTIONS)
+    rollups: List[RollupRecord] = []
+    for _ in range(rollup_count):
+        anchor_id, offset = _read_str(view, offset)
+        level, *values = _ROLLUP.unpack_from(view, offset)
+        offset += _ROLLUP.size
+        rollups.append((anchor_id, resolutions[level], *values))
+
+    return Snapshot(wal_offset, balances, public_keys, anchor_rates, known, rollups)
+
+
+def _append_str(parts: List[bytes], value: str):
+    encoded = value.encode()
+    parts.append(_LENGTH.pack(len(encoded)))
+    parts.append(encoded)
+
+
+def _read_str(view: memoryview, offset: int) -> Tuple[str, int]:
+    (length,) = _LENGTH.unpack_from(view, offset)
+    offset += _LENGTH.size
+    return str(view[offset:offset + length], "utf-8"), offset + length
+
+
+# ---------------------------
+# Snapshot Store
+# ---------------------------
+
+class SnapshotStore:
+    """
+    Directory of checkpoint files named by the log offset they cover.
+
+    checkpoint() captures what changed since the ledger's previous
+    capture synchronously, then builds the full snapshot, serializes and
+    fsyncs it on a background thread, so ingestion only pauses for the
+    changes. Ledger takes periodic checkpoints itself when constructed
+    with a store.
+    """
+
+    def __init__(self, directory: Union[str, Path] = LEDGER_SNAPSHOT_PATH, keep: int = SNAPSHOT_KEEP):
+        if keep < 1:
+            raise ValueError("keep must be at least 1")
+        self.directory = Path(directory)
+        self.keep = keep
+        self._write_lock = threading.Lock()
+
+    # ---------------------------
+    # Writing
+    # ---------------------------
+    def write(self, snapshot: Snapshot) -> Path:
+        """
+        Write a snapshot atomically and prune old checkpoints.
+        """
+        os.makedirs(self.directory, exist_ok=True)
+        path = self.directory / f"snapshot-{snapshot.wal_offset:020d}.snap"
+        tmp_path = path.with_suffix(".tmp")
+        data = encode_snapshot(snapshot)
+        with self._write_lock:
+            with open(tmp_path, "wb") as f:
+                f.write(data)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, path)
+            for old in self._paths()[:-self.keep]:
+                old.unlink()
+        return path
+
+    def checkpoint(self, ledger, background: bool = True) -> Optional[threading.Thread]:
+        """
+        Take a checkpoint of a ledger. Returns the writer thread when
+        running in the background.
+        """
+        build = ledger.prepare_snapshot()
+        if not background:
+            self.write(build())
+            return None
+        writer = threading.Thread(target=self._build_and_write, args=(build,), daemon=True)
+        writer.start()
+        return writer
+
+    def _build_and_write(self, build: Callable[[], Snapshot]):
+        self.write(build())
+
+    # ---------------------------
+    # Reading
+    # ---------------------------
+    def latest(self) -> Optional[Snapshot]:
+        """
+        Return the newest readable snapshot, skipping corrupt files.
+        """
+        for path in reversed(self._paths()):
+            try:
+                return decode_snapshot(path.read_bytes())
+            except ValueError:
+                continue
+        return None
+
+    def _paths(self) -> List[Path]:
+        if not self.directory.exists():
+            return []
+        return sorted(self.directory.glob("snapshot-*.snap"))
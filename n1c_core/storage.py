@@ -0,0 +1,623 @@
+# n1c_core/storage.py
+
+import os
+import sqlite3
+import threading
+from collections import OrderedDict
+from collections.abc import Mapping
+from itertools import islice
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+from n1c_core.models import Wallet, Transaction, Anchor
+from n1c_core.amount import AMOUNT_SCALE, MinorUnits, to_minor
+from n1c_core.history import TimeOrderedHistory
+from n1c_core.rollups import RollupRecord
+from n1c_core.timeutil import from_micros, to_micros, to_minutes
+from n1c_core.config import (
+    LEDGER_DB_PATH,
+    SQLITE_BATCH_SIZE,
+    SQLITE_STATEMENT_CACHE,
+    SQLITE_WALLET_CACHE,
+)
+
+
+class LedgerStorage:
+    """
+    Storage backend interface used by Ledger.
+
+    Backends expose `wallets`, `transactions` and `anchors` as mappings and
+    persist whatever the ledger changes. Wallet objects returned by a
+    backend are live: the ledger mutates their balances and then reports
+    the change through record_transaction() or save_balances().
+
+    `concurrent_writes` tells a thread-safe Ledger whether writes touching
+    different wallets may reach the backend at the same time; when False
+    the ledger serializes them.
+
+    A `durable` backend keeps its state across restarts. Paired with a
+    write-ahead log it also keeps `wal_offset`, the log offset its state
+    covers, so the ledger replays only the records after it. Before
+    committing an offset it calls `before_wal_commit(offset)`, which the
+    ledger points at the log so the records it covers are on disk first.
+    """
+
+    wallets: Mapping
+    transactions: Mapping
+    anchors: Mapping
+    concurrent_writes = False
+    durable = False
+    wal_offset = 0
+    before_wal_commit: Optional[Callable[[int], None]] = None
+
+    def set_wal_offset(self, offset: int):
+        """
+        Mark the changes written from now on as those of the log record
+        ending at `offset`. A durable backend must persist the offset in the
+        same commit as those changes.
+        """
+
+    def add_wallet(self, wallet: Wallet):
+        raise NotImplementedError
+
+    def add_anchor(self, anchor: Anchor):
+        raise NotImplementedError
+
+    def record_transaction(
+        self,
+        tx: Transaction,
+        sender_wallet: Wallet,
+        receiver_wallet: Wallet,
+        anchor_id: Optional[str] = None,
+        tax: float = 0.0,
+    ):
+        """
+        Store an applied transaction, append it to both wallet histories and
+        persist both wallets' balances. `tax` is the foundation tax the
+        sender paid on top of tx.fee.
+        """
+        raise NotImplementedError
+
+    def save_balances(self, wallets: Iterable[Wallet]):
+        raise NotImplementedError
+
+    def wallet_balances(self) -> Iterator[Tuple[str, float]]:
+        """
+        (address, balance) of every stored wallet.
+        """
+        return ((address, wallet.balance) for address, wallet in self.wallets.items())
+
+    def transaction_anchor(self, tx_id: str) -> Optional[str]:
+        """
+        Anchor a stored transaction was routed through, if any.
+        """
+        raise NotImplementedError
+
+    def transaction_tax(self, tx_id: str) -> float:
+        """
+        Tax charged on a stored transaction; 0.0 if none or unknown.
+        """
+        raise NotImplementedError
+
+    def anchor_minute_totals(self) -> Iterator[Tuple[str, int, int, MinorUnits, MinorUnits, MinorUnits]]:
+        """
+        Anchored transactions aggregated as (anchor_id, minute since the
+        epoch, count, volume, fees, taxes) in minor units, for rebuilding
+        rollups (see n1c_core.rollups).
+        """
+        raise NotImplementedError
+
+    def save_seed_rollups(self, records: Iterable[RollupRecord]):
+        """
+        Keep the anchor rollups of the snapshot this storage is seeded from,
+        whose transactions it does not hold. Replaces any kept before.
+        """
+
+    def seed_rollups(self) -> Iterable[RollupRecord]:
+        """
+        Rollups kept by save_seed_rollups(); empty if none.
+        """
+        return ()
+
+    def flush(self):
+        pass
+
+    def close(self):
+        pass
+
+
+# ---------------------------
+# In-Memory Backend
+# ---------------------------
+
+class MemoryStorage(LedgerStorage):
+    """
+    Default backend: plain dicts, wallet histories as lists.
+    """
+
+    # Each write touches only its own dict keys and the histories of wallets
+    # the ledger holds locks for
+    concurrent_writes = True
+
+    def __init__(self):
+        self.wallets: Dict[str, Wallet] = {}             # wallet address -> Wallet
+        self.transactions: Dict[str, Transaction] = {}   # tx_id -> Transaction
+        self.anchors: Dict[str, Anchor] = {}             # anchor_id -> Anchor
+        self.tx_anchors: Dict[str, str] = {}             # tx_id -> anchor_id, anchored only
+        self.tx_taxes: Dict[str, float] = {}             # tx_id -> tax, taxed only
+
+    def add_wallet(self, wallet: Wallet):
+        self.wallets[wallet.address] = wallet
+
+    def add_anchor(self, anchor: Anchor):
+        self.anchors[anchor.anchor_id] = anchor
+
+    def record_transaction(self, tx, sender_wallet, receiver_wallet, anchor_id=None, tax=0.0):
+        sender_wallet.transactions.append(tx)
+        receiver_wallet.transactions.append(tx)
+        self.transactions[tx.tx_id] = tx
+        if anchor_id is not None:
+            self.tx_anchors[tx.tx_id] = anchor_id
+        if tax:
+            self.tx_taxes[tx.tx_id] = tax
+
+    def save_balances(self, wallets):
+        pass
+
+    def transaction_anchor(self, tx_id):
+        return self.tx_anchors.get(tx_id)
+
+    def transaction_tax(self, tx_id):
+        return self.tx_taxes.get(tx_id, 0.0)
+
+    def anchor_minute_totals(self):
+        return _minute_totals(
+            (anchor_id, self.transactions[tx_id], self.tx_taxes.get(tx_id, 0.0))
+            for tx_id, anchor_id in self.tx_anchors.items()
+        )
+
+
+def _minute_totals(
+    rows: Iterable[Tuple[str, Transaction, float]]
+) -> Iterator[Tuple[str, int, int, MinorUnits, MinorUnits, MinorUnits]]:
+    """
+    Aggregate (anchor_id, transaction, tax) rows per anchor and minute.
+    Shared by backends that cannot aggregate natively.
+    """
+    totals: Dict[Tuple[str, int], List[int]] = {}
+    for anchor_id, tx, tax in rows:
+        key = (anchor_id, to_minutes(tx.timestamp))
+        bucket = totals.get(key)
+        if bucket is None:
+            bucket = totals[key] = [0, 0, 0, 0]
+        bucket[0] += 1
+        bucket[1] += to_minor(tx.amount)
+        bucket[2] += to_minor(tx.fee)
+        bucket[3] += to_minor(tax)
+    return ((anchor_id, minute, *bucket) for (anchor_id, minute), bucket in totals.items())
+
+
+# ---------------------------
+# SQLite Backend
+# ---------------------------
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS wallets (
+    address TEXT PRIMARY KEY,
+    balance REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS anchors (
+    anchor_id TEXT PRIMARY KEY,
+    spread REAL NOT NULL,
+    tax_rate REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS transactions (
+    seq INTEGER PRIMARY KEY,
+    tx_id TEXT NOT NULL UNIQUE,
+    sender TEXT NOT NULL,
+    receiver TEXT NOT NULL,
+    amount REAL NOT NULL,
+    fee REAL NOT NULL,
+    timestamp INTEGER NOT NULL,
+    signature TEXT NOT NULL,
+    anchor_id TEXT,
+    tax REAL NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS idx_transactions_sender ON transactions (sender);
+CREATE INDEX IF NOT EXISTS idx_transactions_receiver ON transactions (receiver);
+CREATE INDEX IF NOT EXISTS idx_transactions_timestamp ON transactions (timestamp);
+CREATE INDEX IF NOT EXISTS idx_transactions_anchor ON transactions (anchor_id);
+CREATE INDEX IF NOT EXISTS idx_transactions_sender_time ON transactions (sender, timestamp);
+CREATE INDEX IF NOT EXISTS idx_transactions_receiver_time ON transactions (receiver, timestamp);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS seed_rollups (
+    anchor_id TEXT NOT NULL,
+    resolution TEXT NOT NULL,
+    bucket INTEGER NOT NULL,
+    count INTEGER NOT NULL,
+    volume INTEGER NOT NULL,
+    fees INTEGER NOT NULL,
+    taxes INTEGER NOT NULL
+);
+"""
+
+# Statements are module constants so sqlite3's per-connection statement
+# cache (keyed by SQL text) always hits after the first use.
+_INSERT_WALLET = "INSERT INTO wallets (address, balance) VALUES (?, ?)"
+_UPDATE_BALANCE = "UPDATE wallets SET balance = ? WHERE address = ?"
+_SELECT_WALLET = "SELECT balance FROM wallets WHERE address = ?"
+_SELECT_ADDRESSES = "SELECT address FROM wallets"
+_SELECT_BALANCES = "SELECT address, balance FROM wallets"
+_COUNT_WALLETS = "SELECT COUNT(*) FROM wallets"
+_INSERT_ANCHOR = "INSERT INTO anchors (anchor_id, spread, tax_rate) VALUES (?, ?, ?)"
+_SELECT_ANCHORS = "SELECT anchor_id, spread, tax_rate FROM anchors"
+_INSERT_TX = (
+    "INSERT INTO transactions (tx_id, sender, receiver, amount, fee, timestamp, signature, anchor_id, tax) "
+    "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)"
+)
+_TX_COLUMNS = "tx_id, sender, receiver, amount, fee, timestamp, signature"
+_SELECT_TX = f"SELECT {_TX_COLUMNS} FROM transactions WHERE tx_id = ?"
+_SELECT_TX_EXISTS = "SELECT 1 FROM transactions WHERE tx_id = ?"
+_SELECT_TX_ANCHOR = "SELECT anchor_id FROM transactions WHERE tx_id = ?"
+_SELECT_TX_TAX = "SELECT tax FROM transactions WHERE tx_id = ?"
+_SELECT_ANCHOR_MINUTES = (
+    f"SELECT anchor_id, timestamp / 60000000, COUNT(*), "
+    f"SUM(CAST(ROUND(amount * {AMOUNT_SCALE}) AS INTEGER)), "
+    f"SUM(CAST(ROUND(fee * {AMOUNT_SCALE}) AS INTEGER)), "
+    f"SUM(CAST(ROUND(tax * {AMOUNT_SCALE}) AS INTEGER)) "
+    "FROM transactions WHERE anchor_id IS NOT NULL GROUP BY anchor_id, timestamp / 60000000"
+)
+_DELETE_SEED_ROLLUPS = "DELETE FROM seed_rollups"
+_INSERT_SEED_ROLLUP = "INSERT INTO seed_rollups VALUES (?, ?, ?, ?, ?, ?, ?)"
+_SELECT_SEED_ROLLUPS = "SELECT anchor_id, resolution, bucket, count, volume, fees, taxes FROM seed_rollups"
+_SELECT_WAL_OFFSET = "SELECT value FROM meta WHERE key = 'wal_offset'"
+_SAVE_WAL_OFFSET = "INSERT OR REPLACE INTO meta (key, value) VALUES ('wal_offset', ?)"
+_SELECT_COLUMNS = "PRAGMA table_info(transactions)"
+_ADD_TAX_COLUMN = "ALTER TABLE transactions ADD COLUMN tax REAL NOT NULL DEFAULT 0"
+_SELECT_TX_IDS = "SELECT tx_id FROM transactions ORDER BY seq"
+_COUNT_TXS = "SELECT COUNT(*) FROM transactions"
+_SELECT_HISTORY = (
+    f"SELECT {_TX_COLUMNS}, seq FROM transactions WHERE sender = ? "
+    f"UNION ALL SELECT {_TX_COLUMNS}, seq FROM transactions WHERE receiver = ? AND sender != ? "
+    "ORDER BY timestamp, seq"
+)
+# One page of a wallet's history: each side walks its (address, timestamp)
+# index from the cursor and stops at the limit. Bounds are since, until,
+# then the cursor's timestamp and seq.
+_HISTORY_RANGE = "timestamp >= ? AND timestamp < ? AND (timestamp, seq) > (?, ?)"
+_SELECT_HISTORY_WINDOW = (
+    f"SELECT * FROM (SELECT {_TX_COLUMNS}, seq FROM transactions WHERE sender = ? AND {_HISTORY_RANGE} "
+    "ORDER BY timestamp, seq LIMIT ?) "
+    f"UNION ALL SELECT * FROM (SELECT {_TX_COLUMNS}, seq FROM transactions "
+    f"WHERE receiver = ? AND sender != ? AND {_HISTORY_RANGE} ORDER BY timestamp, seq LIMIT ?) "
+    "ORDER BY timestamp, seq LIMIT ?"
+)
+_MIN_INT64 = -2 ** 63
+_MAX_INT64 = 2 ** 63 - 1
+_COUNT_HISTORY = (
+    "SELECT (SELECT COUNT(*) FROM transactions WHERE sender = ?) + "
+    "(SELECT COUNT(*) FROM transactions WHERE receiver = ? AND sender != ?)"
+)
+
+
+def _row_to_transaction(row) -> Transaction:
+    tx_id, sender, receiver, amount, fee, timestamp, signature = row[:7]
+    return Transaction(
+        tx_id=tx_id,
+        sender=sender,
+        receiver=receiver,
+        amount=amount,
+        fee=fee,
+        timestamp=from_micros(timestamp),
+        signature=signature,
+    )
+
+
+class SQLiteStorage(LedgerStorage):
+    """
+    SQLite backend at config.LEDGER_DB_PATH.
+
+    Uses WAL journal mode and indexes on sender, receiver, timestamp and
+    anchor. Transaction inserts and balance updates are buffered and written
+    with executemany once `batch_size` transactions are pending, on flush()
+    or before any query that reads history. At most `wallet_cache_size`
+    recently used wallets are kept in memory, evicting the least recently
+    used whose balance has no pending write; histories are loaded from the
+    database on access. A Wallet object held past its eviction is no longer
+    updated, so read wallets through `wallets` rather than keeping them.
+
+    The write-ahead log offset set with set_wal_offset() is committed in
+    the same transaction as the writes it covers, after before_wal_commit()
+    has made the log durable up to it.
+    """
+
+    # Every read and write goes through the connection lock
+    concurrent_writes = True
+    durable = True
+
+    def __init__(
+        self,
+        path: Union[str, Path] = LEDGER_DB_PATH,
+        batch_size: int = SQLITE_BATCH_SIZE,
+        statement_cache: int = SQLITE_STATEMENT_CACHE,
+        wallet_cache_size: int = SQLITE_WALLET_CACHE,
+    ):
+        if wallet_cache_size < 1:
+            raise ValueError("wallet_cache_size must be at least 1")
+
+        self.path = Path(path)
+        self.batch_size = batch_size
+        self.wallet_cache_size = wallet_cache_size
+
+        if str(path) != ":memory:":
+            os.makedirs(self.path.parent, exist_ok=True)
+        self._conn = sqlite3.connect(
+            str(path), check_same_thread=False, cached_statements=statement_cache
+        )
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+        # Databases created before taxes were stored lack the column
+        if "tax" not in {row[1] for row in self._conn.execute(_SELECT_COLUMNS)}:
+            self._conn.execute(_ADD_TAX_COLUMN)
+            self._conn.commit()
+        self._lock = threading.RLock()
+
+        # Live wallet objects, so balance changes made by the ledger stick;
+        # least recently used first
+        self._wallet_cache: "OrderedDict[str, Wallet]" = OrderedDict()
+
+        # Buffered writes
+        self._pending_txs: Dict[str, Tuple] = {}
+        self._pending_balances: Dict[str, float] = {}
+        self._pending_wal_offset: Optional[int] = None
+
+        rows = self._query(_SELECT_WAL_OFFSET)
+        self.wal_offset = rows[0][0] if rows else 0
+
+        self.wallets = _WalletMap(self)
+        self.transactions = _TransactionMap(self)
+
+        # Anchors are few and read on every transaction: keep them all loaded
+        self.anchors: Dict[str, Anchor] = {
+            anchor_id: Anchor(anchor_id=anchor_id, spread=spread, tax_rate=tax_rate)
+            for anchor_id, spread, tax_rate in self._query(_SELECT_ANCHORS)
+        }
+
+    # ---------------------------
+    # Writes
+    # ---------------------------
+    def add_wallet(self, wallet: Wallet):
+        with self._lock:
+            self._flush_locked((_INSERT_WALLET, (wallet.address, wallet.balance)))
+            wallet.transactions = _WalletHistory(self, wallet.address)
+            self._cache_wallet_locked(wallet)
+
+    def add_anchor(self, anchor: Anchor):
+        with self._lock:
+            self._flush_locked((_INSERT_ANCHOR, (anchor.anchor_id, anchor.spread, anchor.tax_rate)))
+            self.anchors[anchor.anchor_id] = anchor
+
+    def record_transaction(self, tx, sender_wallet, receiver_wallet, anchor_id=None, tax=0.0):
+        with self._lock:
+            self._pending_txs[tx.tx_id] = (
+                tx.tx_id, tx.sender, tx.receiver, tx.amount, tx.fee,
+                to_micros(tx.timestamp), tx.signature, anchor_id, tax,
+            )
+            self._pending_balances[sender_wallet.address] = sender_wallet.balance
+            self._pending_balances[receiver_wallet.address] = receiver_wallet.balance
+            if len(self._pending_txs) >= self.batch_size:
+                self._flush_locked()
+
+    def save_balances(self, wallets):
+        with self._lock:
+            for wallet in wallets:
+                self._pending_balances[wallet.address] = wallet.balance
+            self._flush_locked()
+
+    def save_seed_rollups(self, records):
+        with self._lock, self._conn:
+            self._conn.execute(_DELETE_SEED_ROLLUPS)
+            self._conn.executemany(_INSERT_SEED_ROLLUP, records)
+
+    def seed_rollups(self):
+        return iter(self._query(_SELECT_SEED_ROLLUPS))
+
+    def set_wal_offset(self, offset):
+        with self._lock:
+            self._pending_wal_offset = offset
+
+    def flush(self):
+        with self._lock:
+            self._flush_locked()
+
+    def _flush_locked(self, statement: Optional[Tuple[str, Tuple]] = None):
+        """
+        Commit the buffered writes, `statement` if given and the pending
+        log offset as one transaction.
+        """
+        if (statement is None and not self._pending_txs and not self._pending_balances
+                and self._pending_wal_offset is None):
+            return
+        # Never commit an offset past the part of the log that is durable
+        if self._pending_wal_offset is not None and self.before_wal_commit is not None:
+            self.before_wal_commit(self._pending_wal_offset)
+        with self._conn:
+            if statement is not None:
+                self._conn.execute(*statement)
+            self._conn.executemany(_INSERT_TX, self._pending_txs.values())
+            self._conn.executemany(
+                _UPDATE_BALANCE,
+                ((balance, address) for address, balance in self._pending_balances.items())
+            )
+            if self._pending_wal_offset is not None:
+                self._conn.execute(_SAVE_WAL_OFFSET, (self._pending_wal_offset,))
+        self._pending_txs.clear()
+        self._pending_balances.clear()
+        if self._pending_wal_offset is not None:
+            self.wal_offset, self._pending_wal_offset = self._pending_wal_offset, None
+
+    def close(self):
+        with self._lock:
+            self._flush_locked()
+            self._conn.close()
+
+    # ---------------------------
+    # Reads
+    # ---------------------------
+    def _query(self, sql: str, params: Tuple = (), flush: bool = False) -> List[Tuple]:
+        with self._lock:
+            if flush:
+                self._flush_locked()
+            return self._conn.execute(sql, params).fetchall()
+
+    def _get_wallet(self, address: str) -> Optional[Wallet]:
+        with self._lock:
+            wallet = self._wallet_cache.get(address)
+            if wallet is not None:
+                self._wallet_cache.move_to_end(address)
+                return wallet
+            rows = self._query(_SELECT_WALLET, (address,))
+            if not rows:
+                return None
+            wallet = Wallet(
+                address=address,
+                # An evicted wallet may still have a balance write buffered
+                balance=self._pending_balances.get(address, rows[0][0]),
+                transactions=_WalletHistory(self, address),
+            )
+            self._cache_wallet_locked(wallet)
+            return wallet
+
+    def _cache_wallet_locked(self, wallet: Wallet):
+        cache = self._wallet_cache
+        cache[wallet.address] = wallet
+        cache.move_to_end(wallet.address)
+        excess = len(cache) - self.wallet_cache_size
+        if excess <= 0:
+            return
+        # Wallets with a buffered balance stay until it is written, and the
+        # one just cached stays for its caller
+        pending = self._pending_balances
+        candidates = islice(cache, min(excess + len(pending), len(cache) - 1))
+        for address in [a for a in candidates if a not in pending][:excess]:
+            del cache[address]
+
+    def _get_transaction(self, tx_id: str) -> Optional[Transaction]:
+        with self._lock:
+            pending = self._pending_txs.get(tx_id)
+            if pending is not None:
+                return _row_to_transaction(pending)
+            rows = self._query(_SELECT_TX, (tx_id,))
+        return _row_to_transaction(rows[0]) if rows else None
+
+    def transaction_anchor(self, tx_id):
+        with self._lock:
+            pending = self._pending_txs.get(tx_id)
+            if pending is not None:
+                return pending[7]
+            rows = self._query(_SELECT_TX_ANCHOR, (tx_id,))
+        return rows[0][0] if rows else None
+
+    def transaction_tax(self, tx_id):
+        with self._lock:
+            pending = self._pending_txs.get(tx_id)
+            if pending is not None:
+                return pending[8]
+            rows = self._query(_SELECT_TX_TAX, (tx_id,))
+        return rows[0][0] if rows else 0.0
+
+    def anchor_minute_totals(self):
+        return iter(self._query(_SELECT_ANCHOR_MINUTES, flush=True))
+
+    def wallet_balances(self):
+        # Straight from the table, without loading every wallet into the cache
+        return iter(self._query(_SELECT_BALANCES, flush=True))
+
+    def _has_transaction(self, tx_id: str) -> bool:
+        with self._lock:
+            return tx_id in self._pending_txs or bool(self._query(_SELECT_TX_EXISTS, (tx_id,)))
+
+
+class _WalletMap(Mapping):
+    def __init__(self, storage: SQLiteStorage):
+        self._storage = storage
+
+    def __getitem__(self, address):
+        wallet = self._storage._get_wallet(address)
+        if wallet is None:
+            raise KeyError(address)
+        return wallet
+
+    def __contains__(self, address):
+        return self._storage._get_wallet(address) is not None
+
+    def __iter__(self) -> Iterator[str]:
+        return (row[0] for row in self._storage._query(_SELECT_ADDRESSES))
+
+    def __len__(self):
+        return self._storage._query(_COUNT_WALLETS)[0][0]
+
+
+class _TransactionMap(Mapping):
+    def __init__(self, storage: SQLiteStorage):
+        self._storage = storage
+
+    def __getitem__(self, tx_id):
+        tx = self._storage._get_transaction(tx_id)
+        if tx is None:
+            raise KeyError(tx_id)
+        return tx
+
+    def __contains__(self, tx_id):
+        return self._storage._has_transaction(tx_id)
+
+    def __iter__(self) -> Iterator[str]:
+        return (row[0] for row in self._storage._query(_SELECT_TX_IDS, flush=True))
+
+    def __len__(self):
+        return self._storage._query(_COUNT_TXS, flush=True)[0][0]
+
+
+class _WalletHistory(TimeOrderedHistory):
+    """
+    A wallet's transaction history, read from the sender/receiver indexes.
+    Positions in window() are row seqs.
+    """
+
+    def __init__(self, storage: SQLiteStorage, address: str):
+        self._storage = storage
+        self._address = address
+
+    def _rows(self) -> List[Tuple]:
+        address = self._address
+        return self._storage._query(_SELECT_HISTORY, (address, address, address), flush=True)
+
+    def __getitem__(self, index):
+        rows = self._rows()
+        if isinstance(index, slice):
+            return [_row_to_transaction(row) for row in rows[index]]
+        return _row_to_transaction(rows[index])
+
+    def __iter__(self) -> Iterator[Transaction]:
+        return (_row_to_transaction(row) for row in self._rows())
+
+    def __len__(self):
+        address = self._address
+        return self._storage._query(_COUNT_HISTORY, (address, address, address), flush=True)[0][0]
+
+    def window(self, since, until, after, limit):
+        address = self._address
+        bounds = (
+            _MIN_INT64 if since is None else since,
+            _MAX_INT64 if until is None else until,
+            *((_MIN_INT64, _MIN_INT64) if after is None else after),
+        )
+        rows = self._storage._query(
+            _SELECT_HISTORY_WINDOW,
+            (address, *bounds, limit, address, address, *bounds, limit, limit),
+            flush=True,
+        )
+        return [(row[5], row[7], _row_to_transaction(row)) for row in rows]
@@ -0,0 +1,238 @@
+# n1c_core/sync.py
+
+"""
+Merkle-diff ledger synchronization.
+
+A client walks its own MerkleIndex against a peer's, one tree level per
+round trip, descending only into subtrees whose hashes differ. At the
+leaves it compares (tx_id, digest) lists and then fetches just the
+transactions it is missing, as packed codec records. A diff therefore
+costs depth + 3 round trips however large the ledgers are.
+
+Messages are bytes; any transport with request(bytes) -> bytes works.
+LoopbackTransport connects a client to a SyncServer in the same process.
+"""
+
+import struct
+from typing import Iterable, List, NamedTuple, Sequence, Tuple
+from n1c_core.codec import TransactionBuffer, encode_transactions
+from n1c_core.ledger import BatchRejectedError, Ledger
+from n1c_core.merkle import DIGEST_SIZE, EMPTY, FANOUT, MerkleIndex
+
+_ROOT = b"R"
+_CHILDREN = b"C"
+_LEAVES = b"L"
+_FETCH = b"T"
+
+_U8 = struct.Struct("<B")
+_U32 = struct.Struct("<I")
+_ROOT_REPLY = struct.Struct(f"<B{DIGEST_SIZE}s")
+
+# Transactions requested per fetch message
+FETCH_BATCH = 4096
+
+
+# ---------------------------
+# Message Helpers
+# ---------------------------
+
+def _pack_indices(indices: Sequence[int]) -> bytes:
+    return _U32.pack(len(indices)) + struct.pack(f"<{len(indices)}I", *indices)
+
+
+def _unpack_indices(data: bytes, offset: int) -> List[int]:
+    (count,) = _U32.unpack_from(data, offset)
+    return list(struct.unpack_from(f"<{count}I", data, offset + 4))
+
+
+def _pack_ids(tx_ids: Iterable[str]) -> bytes:
+    parts = []
+    for tx_id in tx_ids:
+        raw = tx_id.encode()
+        if len(raw) > 255:
+            raise ValueError(f"Identifier {tx_id!r} is too long to sync")
+        parts.append(_U8.pack(len(raw)) + raw)
+    return _U32.pack(len(parts)) + b"".join(parts)
+
+
+def _unpack_ids(data: bytes, offset: int) -> Tuple[List[str], int]:
+    (count,) = _U32.unpack_from(data, offset)
+    offset += 4
+    tx_ids = []
+    for _ in range(count):
+        length = data[offset]
+        tx_ids.append(data[offset + 1:offset + 1 + length].decode())
+        offset += 1 + length
+    return tx_ids, offset
+
+
+# ---------------------------
+# Server
+# ---------------------------
+
+class SyncServer:
+    """
+    Answers sync requests from a ledger that maintains a MerkleIndex.
+    """
+
+    def __init__(self, ledger: Ledger):
+        if ledger.merkle_index is None:
+            raise ValueError("Ledger has no Merkle index")
+        self.ledger = ledger
+        self.index: MerkleIndex = ledger.merkle_index
+
+    def handle(self, request: bytes) -> bytes:
+        kind = request[:1]
+        if kind == _ROOT:
+            return _ROOT_REPLY.pack(self.index.depth, self.index.root())
+        if kind == _CHILDREN:
+            level = request[1]
+            return b"".join(
+                b"".join(self.index.children(level, index)) for index in _unpack_indices(request, 2)
+            )
+        if kind == _LEAVES:
+            parts = []
+            for bucket in _unpack_indices(request, 1):
+                entries = self.index.leaf(bucket)
+                parts.append(_pack_ids(entries))
+                parts.extend(entries.values())
+            return b"".join(parts)
+        if kind == _FETCH:
+            tx_ids, _ = _unpack_ids(request, 1)
+            found = [tx for tx in map(self.ledger.get_transaction, tx_ids) if tx is not None]
+            # Anchor ids ("" for none) first, then the packed records
+            anchors = _pack_ids(self.ledger.get_transaction_anchor(tx.tx_id) or "" for tx in found)
+            return anchors + encode_transactions(found)
+        raise ValueError(f"Unknown sync request {kind!r}")
+
+
+class LoopbackTransport:
+    """
+    In-process transport to a SyncServer, for tests and benchmarks.
+    """
+
+    def __init__(self, server: SyncServer):
+        self.server = server
+
+    def request(self, data: bytes) -> bytes:
+        return self.server.handle(bytes(data))
+
+
+# ---------------------------
+# Client
+# ---------------------------
+
+class SyncResult(NamedTuple):
+    missing: List[str]                        # tx_ids the peer has and we lacked
+    conflicts: List[str]                      # tx_ids both have with different content
+    applied: int
+    rejections: List[Tuple[int, str, str]]    # as in BatchRejectedError
+    round_trips: int
+    bytes_sent: int
+    bytes_received: int
+
+
+class SyncClient:
+    """
+    Pulls the transactions a peer has and the local ledger lacks.
+    """
+
+    def __init__(self, ledger: Ledger, transport):
+        if ledger.merkle_index is None:
+            raise ValueError("Ledger has no Merkle index")
+        self.ledger = ledger
+        self.index: MerkleIndex = ledger.merkle_index
+        self.transport = transport
+        self._reset_counters()
+
+    def _reset_counters(self):
+        self.round_trips = 0
+        self.bytes_sent = 0
+        self.bytes_received = 0
+
+    def _request(self, data: bytes) -> bytes:
+        reply = self.transport.request(data)
+        self.round_trips += 1
+        self.bytes_sent += len(data)
+        self.bytes_received += len(reply)
+        return reply
+
+    def diff(self) -> Tuple[List[str], List[str]]:
+        """
+        Compare with the peer. Returns (missing, conflicts) tx_ids.
+        """
+        depth, root = _ROOT_REPLY.unpack(self._request(_ROOT))
+        if depth != self.index.depth:
+            raise ValueError(f"Peer Merkle depth {depth} does not match local depth {self.index.depth}")
+        if root == self.index.root() or root == EMPTY:
+            return [], []
+
+        # Descend level by level into subtrees that differ and are non-empty remotely
+        frontier = [0]
+        span = FANOUT * DIGEST_SIZE
+        for level in range(depth):
+            reply = self._request(_CHILDREN + _U8.pack(level) + _pack_indices(frontier))
+            next_frontier = []
+            for i, index in enumerate(frontier):
+                local = self.index.children(level, index)
+                for child in range(FANOUT):
+                    start = i * span + child * DIGEST_SIZE
+                    remote = reply[start:start + DIGEST_SIZE]
+                    if remote != EMPTY and remote != local[child]:
+                        next_frontier.append(index * FANOUT + child)
+            frontier = next_frontier
+            if not frontier:
+                return [], []
+
+        reply = self._request(_LEAVES + _pack_indices(frontier))
+        missing, conflicts = [], []
+        offset = 0
+        for bucket in frontier:
+            tx_ids, offset = _unpack_ids(reply, offset)
+            local = self.index.leaf(bucket)
+            for tx_id in tx_ids:
+                digest = reply[offset:offset + DIGEST_SIZE]
+                offset += DIGEST_SIZE
+                if tx_id not in local:
+                    missing.append(tx_id)
+                elif local[tx_id] != digest:
+                    conflicts.append(tx_id)
+        return missing, conflicts
+
+    def sync(self) -> SyncResult:
+        """
+        Diff against the peer, fetch the missing transactions and apply them
+        in timestamp order. Transactions the local ledger rejects (e.g. an
+        unknown wallet) are reported, not retried.
+        """
+        self._reset_counters()
+        missing, conflicts = self.diff()
+
+        fetched = []
+        for start in range(0, len(missing), FETCH_BATCH):
+            reply = self._request(_FETCH + _pack_ids(missing[start:start + FETCH_BATCH]))
+            anchor_ids, records = _unpack_ids(reply, 0)
+            buffer = TransactionBuffer(memoryview(reply)[records:])
+            # Skip any that arrived by another path since the diff, undecoded
+            fetched.extend(
+                (buffer[i], anchor_id) for i, anchor_id in enumerate(anchor_ids)
+                if not self.ledger.has_transaction(buffer.tx_id(i))
+            )
+
+        # Fees are recomputed by the ledger from the anchor
+        fetched.sort(key=lambda entry: entry[0].timestamp)
+        batch = [
+            (tx.tx_id, tx.sender, tx.receiver, tx.amount, tx.signature, anchor_id or None, tx.timestamp)
+            for tx, anchor_id in fetched
+        ]
+        applied, rejections = 0, []
+        if batch:
+            try:
+                applied = len(self.ledger.add_transactions(batch, atomic=False))
+            except BatchRejectedError as exc:
+                applied, rejections = len(exc.applied), exc.rejections
+
+        return SyncResult(
+            missing, conflicts, applied, rejections,
+            self.round_trips, self.bytes_sent, self.bytes_received,
+        )
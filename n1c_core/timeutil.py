@@ -0,0 +1,33 @@
+# n1c_core/timeutil.py
+
+"""
+Integer timestamps.
+
+Transactions carry naive UTC datetimes. Storage backends, indexes and the
+wire codec hold them as integer microseconds since the Unix epoch, and
+rollups bucket them by whole minutes since the epoch.
+"""
+
+from datetime import datetime, timedelta
+
+EPOCH = datetime(1970, 1, 1)
+MICROSECOND = timedelta(microseconds=1)
+MINUTE = timedelta(minutes=1)
+
+
+def to_micros(timestamp: datetime) -> int:
+    """
+    Microseconds since the epoch for a naive UTC datetime.
+    """
+    return (timestamp - EPOCH) // MICROSECOND
+
+
+def from_micros(micros: int) -> datetime:
+    return EPOCH + timedelta(microseconds=micros)
+
+
+def to_minutes(timestamp: datetime) -> int:
+    """
+    Whole minutes since the epoch, rounded down.
+    """
+    return (timestamp - EPOCH) // MINUTE
@@ -1,15 +1,39 @@
 # n1c_core/transaction.py
 
+import os
 import uuid
 from datetime import datetime
-from typing import Optional
+from typing import List, NamedTuple, Optional, Sequence, Tuple, Union
 from n1c_core.models import Transaction, Wallet, Anchor
 from n1c_core.ledger_rules import (
     verify_balance,
-    validate_transaction,
-    calculate_fee
+    validate_transaction
 )
-from n1c_core.utils import sign_transaction, verify_signature
+from n1c_core.amount import (
+    add_minor,
+    batch_fee_and_tax,
+    batch_to_minor,
+    charge,
+    from_minor,
+    to_minor,
+    to_rate_units
+)
+from n1c_core.utils import sign_transaction, sign_transactions, verify_signature
+from n1c_core.keyring import KeyRegistry, PrivateKeyLike, get_key_registry, load_private_key
+from n1c_core.config import SIGN_BATCH_WORKERS
+
+
+class BatchItem(NamedTuple):
+    """
+    One signed transfer in Ledger.add_transactions argument order.
+    """
+    tx_id: str
+    sender_address: str
+    receiver_address: str
+    amount: float
+    signature: str
+    anchor_id: Optional[str]
+    timestamp: datetime
 
 
 class TransactionManager:
@@ -23,8 +47,9 @@ class TransactionManager:
         sender_wallet: Wallet,
         receiver_wallet: Wallet,
         amount: float,
-        private_key: str,
-        anchor: Optional[Anchor] = None
+        private_key: Optional[PrivateKeyLike] = None,
+        anchor: Optional[Anchor] = None,
+        key_registry: Optional[KeyRegistry] = None
     ) -> Transaction:
         """
         Create a new signed transaction.
@@ -33,8 +58,11 @@ class TransactionManager:
             sender_wallet (Wallet): The sender's wallet object.
             receiver_wallet (Wallet): The receiver's wallet object.
             amount (float): Amount to transfer.
-            private_key (str): Private key to sign the transaction.
+            private_key (str, optional): Private key to sign the transaction.
+                Resolved from the key registry by sender address if omitted.
             anchor (Anchor, optional): Optional anchor for fee/tax.
+            key_registry (KeyRegistry, optional): Registry used to resolve
+                the private key. Defaults to the shared registry.
 
         Returns:
             Transaction: Signed transaction object ready to be added to ledger.
@@ -43,55 +71,157 @@ class TransactionManager:
         # Generate a unique transaction ID
         tx_id = str(uuid.uuid4())
 
-        # Calculate fees
-        fee = calculate_fee(amount, anchor.spread if anchor else 0.0)
-        tax = amount * (anchor.tax_rate / 100) if anchor else 0.0
+        # Calculate fees in minor units
+        amount_minor = to_minor(amount)
+        fee_minor = charge(amount_minor, to_rate_units(anchor.spread)) if anchor else 0
 
         # Create transaction object
         tx = Transaction(
             tx_id=tx_id,
             sender=sender_wallet.address,
             receiver=receiver_wallet.address,
-            amount=amount,
-            fee=fee,
+            amount=from_minor(amount_minor),
+            fee=from_minor(fee_minor),
             timestamp=datetime.utcnow(),
             signature=""  # To be signed
         )
 
         # Sign transaction
+        if private_key is None:
+            registry = key_registry if key_registry is not None else get_key_registry()
+            private_key = registry.get_private_key(sender_wallet.address)
+            if private_key is None:
+                raise ValueError(f"No private key registered for {sender_wallet.address}")
         tx.signature = sign_transaction(tx, private_key)
 
         return tx
 
     @staticmethod
-    def is_valid_transaction(tx: Transaction, sender_wallet: Wallet, receiver_wallet: Wallet) -> bool:
+    def create_transactions(
+        sender_wallet: Wallet,
+        payouts: Sequence[Tuple[Union[Wallet, str], float]],
+        anchor: Optional[Anchor] = None,
+        private_key: Optional[PrivateKeyLike] = None,
+        key_registry: Optional[KeyRegistry] = None,
+        workers: int = SIGN_BATCH_WORKERS
+    ) -> List[BatchItem]:
+        """
+        Create signed transactions paying many receivers from one sender,
+        e.g. an anchor's payroll run.
+
+        Args:
+            sender_wallet (Wallet): The paying wallet.
+            payouts: (receiver wallet or address, amount) pairs.
+            anchor (Anchor, optional): Anchor charging fee/tax on every payout.
+            private_key (optional): Sender's signing key, loaded once.
+                Resolved from the key registry if omitted.
+            key_registry (KeyRegistry, optional): Registry used to resolve
+                the private key. Defaults to the shared registry.
+            workers (int): Processes used to sign (see sign_transactions).
+
+        Returns:
+            List[BatchItem]: Items for Ledger.add_transactions, which applies
+            them atomically by default. All share one timestamp.
+
+        Raises ValueError, before signing anything, if an amount is not
+        positive, not finite or out of range, or the sender's balance does
+        not cover every amount, fee and tax together.
+        """
+        if not payouts:
+            return []
+
+        if private_key is None:
+            registry = key_registry if key_registry is not None else get_key_registry()
+            private_key = registry.get_private_key(sender_wallet.address)
+            if private_key is None:
+                raise ValueError(f"No private key registered for {sender_wallet.address}")
+        private_key = load_private_key(private_key)
+
+        # Fees and taxes for the whole batch in minor units
+        receivers = [receiver.address if isinstance(receiver, Wallet) else receiver for receiver, _ in payouts]
+        amounts = batch_to_minor([amount for _, amount in payouts])
+        for i, amount_minor in enumerate(amounts.tolist()):
+            if amount_minor <= 0:
+                raise ValueError(f"Payout {i} amount must be positive")
+        if anchor is not None:
+            fees, taxes = batch_fee_and_tax(amounts, anchor.spread, anchor.tax_rate)
+        else:
+            fees = taxes = amounts * 0
+
+        # The ledger debits amount + fee + tax for each payout
+        total_minor = int((amounts + fees + taxes).sum())
+        if total_minor > to_minor(sender_wallet.balance):
+            raise ValueError(
+                f"Insufficient balance: payouts need {from_minor(total_minor)}, "
+                f"wallet holds {sender_wallet.balance}"
+            )
+
+        # One entropy read and one clock read for the whole batch
+        entropy = os.urandom(16 * len(payouts))
+        timestamp = datetime.utcnow()
+        transactions = [
+            Transaction(
+                tx_id=str(uuid.UUID(bytes=entropy[16 * i:16 * i + 16], version=4)),
+                sender=sender_wallet.address,
+                receiver=receiver,
+                amount=from_minor(amount_minor),
+                fee=from_minor(fee_minor),
+                timestamp=timestamp,
+                signature=""
+            )
+            for i, (receiver, amount_minor, fee_minor) in enumerate(zip(receivers, amounts.tolist(), fees.tolist()))
+        ]
+
+        signatures = sign_transactions(transactions, private_key, workers)
+        anchor_id = anchor.anchor_id if anchor is not None else None
+        return [
+            BatchItem(tx.tx_id, tx.sender, tx.receiver, tx.amount, signature, anchor_id, timestamp)
+            for tx, signature in zip(transactions, signatures)
+        ]
+
+    @staticmethod
+    def is_valid_transaction(
+        tx: Transaction,
+        sender_wallet: Wallet,
+        receiver_wallet: Wallet,
+        key_registry: Optional[KeyRegistry] = None
+    ) -> bool:
         """
         Validate a transaction according to ledger rules.
+        The sender's public key is resolved through the key registry.
         """
         # Verify balance
         if not verify_balance(sender_wallet, tx.amount, tx.fee):
             return False
 
         # Verify signature
-        if not verify_signature(tx, sender_wallet.address):
+        registry = key_registry if key_registry is not None else get_key_registry()
+        public_key = registry.get_public_key(sender_wallet.address)
+        if public_key is None or not verify_signature(tx, public_key):
             return False
 
         # Additional ledger validation
         return validate_transaction(tx, sender_wallet, receiver_wallet)
 
     @staticmethod
-    def apply_transaction(tx: Transaction, sender_wallet: Wallet, receiver_wallet: Wallet):
+    def apply_transaction(
+        tx: Transaction,
+        sender_wallet: Wallet,
+        receiver_wallet: Wallet,
+        key_registry: Optional[KeyRegistry] = None
+    ):
         """
         Apply a validated transaction to the wallets.
         """
-        if not TransactionManager.is_valid_transaction(tx, sender_wallet, receiver_wallet):
+        if not TransactionManager.is_valid_transaction(tx, sender_wallet, receiver_wallet, key_registry):
             raise ValueError("Transaction is invalid and cannot be applied")
 
         # Deduct amount + fee from sender
-        sender_wallet.balance -= (tx.amount + tx.fee)
+        amount_minor = to_minor(tx.amount)
+        sender_wallet.balance = add_minor(sender_wallet.balance, -(amount_minor + to_minor(tx.fee)))
 
         # Add amount to receiver
-        receiver_wallet.balance += tx.amount
+        receiver_wallet.balance = add_minor(receiver_wallet.balance, amount_minor)
 
         # Record transaction in both wallets
         sender_wallet.transactions.append(tx)
@@ -1,11 +1,26 @@
 # n1c_core/utils.py
 
 import hashlib
+import os
 import uuid
-from typing import Tuple
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Sequence, Tuple
 from n1c_core.models import Transaction
-from cryptography.hazmat.primitives.asymmetric import ed25519
-from cryptography.hazmat.primitives import serialization
+from n1c_core.codec import signing_payload
+from n1c_core.keyring import (
+    RAW_KEY_SIZE,
+    PublicKeyLike,
+    PrivateKeyLike,
+    load_public_key,
+    load_private_key,
+    private_key_bytes
+)
+from n1c_core.config import (
+    KEYGEN_WORKERS,
+    KEYGEN_CHUNK_SIZE,
+    SIGN_BATCH_WORKERS,
+    SIGN_BATCH_CHUNK_SIZE
+)
 
 # ---------------------------
 # Wallet Utilities
@@ -26,6 +41,8 @@ def generate_keypair() -> Tuple[str, str]:
     Generate an Ed25519 keypair for signing and verification.
     Returns (private_key_pem, public_key_pem) as strings.
     """
+    from cryptography.hazmat.primitives.asymmetric import ed25519
+    from cryptography.hazmat.primitives import serialization
     private_key = ed25519.Ed25519PrivateKey.generate()
     public_key = private_key.public_key()
 
@@ -44,42 +61,147 @@ def generate_keypair() -> Tuple[str, str]:
     return private_bytes.decode(), public_bytes.decode()
 
 
+def generate_raw_keypair() -> Tuple[bytes, bytes]:
+    """
+    Generate an Ed25519 keypair as raw 32-byte strings.
+    Returns (private_key_bytes, public_key_bytes); cheaper than PEM.
+    """
+    from cryptography.hazmat.primitives.asymmetric import ed25519
+    from cryptography.hazmat.primitives import serialization
+    private_key = ed25519.Ed25519PrivateKey.generate()
+    private_bytes = private_key.private_bytes(
+        encoding=serialization.Encoding.Raw,
+        format=serialization.PrivateFormat.Raw,
+        encryption_algorithm=serialization.NoEncryption()
+    )
+    public_bytes = private_key.public_key().public_bytes(
+        encoding=serialization.Encoding.Raw,
+        format=serialization.PublicFormat.Raw
+    )
+    return private_bytes, public_bytes
+
+
+def generate_raw_keypairs(
+    n: int,
+    workers: int = KEYGEN_WORKERS,
+    chunk_size: int = KEYGEN_CHUNK_SIZE
+) -> List[Tuple[bytes, bytes]]:
+    """
+    Generate n Ed25519 keypairs as raw 32-byte (private, public) pairs.
+    An Ed25519 private key is 32 random bytes, so all seeds come from one
+    os.urandom call; deriving the public keys is spread over `workers`
+    processes.
+    """
+    if n < 0:
+        raise ValueError("n must not be negative")
+    if workers < 1:
+        raise ValueError("workers must be at least 1")
+    if chunk_size < 1:
+        raise ValueError("chunk_size must be at least 1")
+    seeds = os.urandom(RAW_KEY_SIZE * n)
+    step = RAW_KEY_SIZE * chunk_size
+    chunks = [seeds[start:start + step] for start in range(0, len(seeds), step)]
+    if workers == 1 or len(chunks) <= 1:
+        publics = b"".join(map(_derive_public_keys, chunks))
+    else:
+        with ProcessPoolExecutor(max_workers=min(workers, len(chunks))) as executor:
+            publics = b"".join(executor.map(_derive_public_keys, chunks))
+    return [
+        (seeds[start:start + RAW_KEY_SIZE], publics[start:start + RAW_KEY_SIZE])
+        for start in range(0, len(seeds), RAW_KEY_SIZE)
+    ]
+
+
+def _derive_public_keys(seeds: bytes) -> bytes:
+    """
+    Raw public keys for concatenated raw private keys. Runs inside workers.
+    """
+    from cryptography.hazmat.primitives.asymmetric import ed25519
+    from cryptography.hazmat.primitives import serialization
+
+    from_seed = ed25519.Ed25519PrivateKey.from_private_bytes
+    return b"".join(
+        from_seed(seeds[start:start + RAW_KEY_SIZE]).public_key().public_bytes(
+            encoding=serialization.Encoding.Raw,
+            format=serialization.PublicFormat.Raw
+        )
+        for start in range(0, len(seeds), RAW_KEY_SIZE)
+    )
+
+
 # ---------------------------
 # Transaction Utilities
 # ---------------------------
 
-def sign_transaction(tx: Transaction, private_key_pem: str) -> str:
+def sign_transaction(tx: Transaction, private_key: PrivateKeyLike) -> str:
     """
     Sign a transaction using sender's private key.
-    Returns base64-encoded signature string.
+    The key may be PEM text, raw bytes or an already decoded key object
+    (see KeyRegistry.get_private_key), which skips parsing.
+    Returns hex-encoded signature string.
     """
-    private_key = serialization.load_pem_private_key(
-        private_key_pem.encode(),
-        password=None
-    )
+    private_key = load_private_key(private_key)
     message = _transaction_message(tx)
-    signature = private_key.sign(message.encode())
+    signature = private_key.sign(message)
     return signature.hex()
 
 
-def verify_signature(tx: Transaction, public_key_pem: str) -> bool:
+def sign_transactions(
+    transactions: Sequence[Transaction],
+    private_key: PrivateKeyLike,
+    workers: int = SIGN_BATCH_WORKERS,
+    chunk_size: int = SIGN_BATCH_CHUNK_SIZE
+) -> List[str]:
+    """
+    Sign many transactions with one key, e.g. a payout batch.
+    The key is decoded once; with more than one worker and chunk, chunks of
+    canonical messages are signed in worker processes, which are sent the
+    raw private key. Returns hex-encoded signatures in input order.
+    """
+    if workers < 1:
+        raise ValueError("workers must be at least 1")
+    if chunk_size < 1:
+        raise ValueError("chunk_size must be at least 1")
+    messages = [_transaction_message(tx) for tx in transactions]
+    if workers == 1 or len(messages) <= chunk_size:
+        sign = load_private_key(private_key).sign
+        return [sign(message).hex() for message in messages]
+
+    raw_key = private_key_bytes(private_key)
+    chunks = [(raw_key, messages[start:start + chunk_size]) for start in range(0, len(messages), chunk_size)]
+    with ProcessPoolExecutor(max_workers=min(workers, len(chunks))) as executor:
+        signatures = b"".join(executor.map(_sign_chunk, chunks))
+    return [signatures[start:start + 64].hex() for start in range(0, len(signatures), 64)]
+
+
+def _sign_chunk(chunk: Tuple[bytes, List[bytes]]) -> bytes:
+    """
+    Concatenated 64-byte signatures of a chunk of messages. Runs inside workers.
+    """
+    raw_key, messages = chunk
+    sign = load_private_key(raw_key).sign
+    return b"".join(sign(message) for message in messages)
+
+
+def verify_signature(tx: Transaction, public_key: PublicKeyLike) -> bool:
     """
     Verify transaction signature using sender's public key.
+    The key may be PEM text, raw bytes or an already decoded key object
+    (see KeyRegistry.get_public_key), which skips parsing.
     Returns True if signature is valid.
     """
     from cryptography.exceptions import InvalidSignature
-    public_key = serialization.load_pem_public_key(public_key_pem.encode())
-    message = _transaction_message(tx)
+    public_key = load_public_key(public_key)
     try:
-        public_key.verify(bytes.fromhex(tx.signature), message.encode())
+        public_key.verify(bytes.fromhex(tx.signature), _transaction_message(tx))
         return True
-    except InvalidSignature:
+    except (InvalidSignature, ValueError):
         return False
 
 
-def _transaction_message(tx: Transaction) -> str:
+def _transaction_message(tx: Transaction) -> bytes:
     """
-    Serialize transaction fields into a canonical string for signing/verifying.
-    Excludes the signature field itself.
+    Canonical bytes for signing/verifying: the fixed-layout binary record
+    without its signature (see n1c_core.codec).
     """
-    return f"{tx.tx_id}|{tx.sender}|{tx.receiver}|{tx.amount}|{tx.fee}|{tx.timestamp.isoformat()}"
+    return signing_payload(tx)
@@ -0,0 +1,163 @@
+# n1c_core/verify.py
+
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Optional, Sequence, Tuple
+from n1c_core.models import Transaction
+from n1c_core.keyring import KeyRegistry, get_key_registry
+from n1c_core.utils import _transaction_message
+from n1c_core.config import VERIFY_BATCH_WORKERS, VERIFY_BATCH_CHUNK_SIZE
+
+# Per-signature fixed part of a chunk: 32-byte public key + 64-byte signature
+_FIXED_SIZE = 96
+
+# A chunk as shipped to a worker: (fixed parts, joined messages, message end offsets)
+Chunk = Tuple[bytes, bytes, array]
+
+
+def _verify_chunk(chunk: Chunk) -> bytes:
+    """
+    Verify one packed chunk of signatures. Runs inside worker processes.
+    Returns one byte per signature: 1 if valid, 0 otherwise.
+    """
+    from cryptography.exceptions import InvalidSignature
+    from cryptography.hazmat.primitives.asymmetric import ed25519
+
+    fixed, messages, ends = chunk
+    result = bytearray(len(ends))
+    keys = {}  # public key bytes -> decoded key, senders repeat within a chunk
+    start = 0
+    for i, end in enumerate(ends):
+        offset = i * _FIXED_SIZE
+        raw_key = fixed[offset:offset + 32]
+        public_key = keys.get(raw_key)
+        if public_key is None:
+            public_key = ed25519.Ed25519PublicKey.from_public_bytes(raw_key)
+            keys[raw_key] = public_key
+        try:
+            public_key.verify(fixed[offset + 32:offset + _FIXED_SIZE], messages[start:end])
+            result[i] = 1
+        except InvalidSignature:
+            pass
+        start = end
+    return bytes(result)
+
+
+class BatchVerifier:
+    """
+    Verifies transaction signatures in bulk over a process pool.
+
+    Transactions are reduced to (public key, canonical message, signature)
+    and packed into compact chunks, so workers never receive Transaction
+    objects. The pool is created lazily and reused across calls.
+    """
+
+    def __init__(
+        self,
+        workers: int = VERIFY_BATCH_WORKERS,
+        chunk_size: int = VERIFY_BATCH_CHUNK_SIZE,
+        key_registry: Optional[KeyRegistry] = None
+    ):
+        if workers < 1:
+            raise ValueError("workers must be at least 1")
+        if chunk_size < 1:
+            raise ValueError("chunk_size must be at least 1")
+        self.workers = workers
+        self.chunk_size = chunk_size
+        self.key_registry = key_registry if key_registry is not None else get_key_registry()
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    # ---------------------------
+    # Verification
+    # ---------------------------
+    def verify(self, transactions: Sequence[Transaction]) -> bytearray:
+        """
+        Verify the signatures of a batch of transactions.
+        Returns a bitmap in input order: 1 for valid, 0 for invalid.
+        Transactions whose sender key is unknown are invalid.
+        """
+        bitmap = bytearray(len(transactions))
+        chunks, positions = self._pack(transactions)
+        if not chunks:
+            return bitmap
+
+        if self.workers == 1 or len(chunks) == 1:
+            results = map(_verify_chunk, chunks)
+        else:
+            results = self._get_executor().map(_verify_chunk, chunks)
+
+        for chunk_positions, chunk_result in zip(positions, results):
+            for position, valid in zip(chunk_positions, chunk_result):
+                bitmap[position] = valid
+        return bitmap
+
+    def _pack(self, transactions: Sequence[Transaction]) -> Tuple[List[Chunk], List[List[int]]]:
+        chunks: List[Chunk] = []
+        positions: List[List[int]] = []
+
+        fixed = bytearray()
+        messages = bytearray()
+        ends = array("I")
+        chunk_positions: List[int] = []
+
+        for position, tx in enumerate(transactions):
+            raw_key = self.key_registry.get_public_key_bytes(tx.sender)
+            if raw_key is None:
+                continue
+            try:
+                signature = bytes.fromhex(tx.signature)
+                message = _transaction_message(tx)
+            except ValueError:
+                continue
+            if len(signature) != 64:
+                continue
+
+            fixed += raw_key
+            fixed += signature
+            messages += message
+            ends.append(len(messages))
+            chunk_positions.append(position)
+
+            if len(chunk_positions) == self.chunk_size:
+                chunks.append((bytes(fixed), bytes(messages), ends))
+                positions.append(chunk_positions)
+                fixed, messages, ends, chunk_positions = bytearray(), bytearray(), array("I"), []
+
+        if chunk_positions:
+            chunks.append((bytes(fixed), bytes(messages), ends))
+            positions.append(chunk_positions)
+        return chunks, positions
+
+    # ---------------------------
+    # Pool Lifecycle
+    # ---------------------------
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.workers)
+        return self._executor
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+def verify_batch(
+    transactions: Sequence[Transaction],
+    workers: int = VERIFY_BATCH_WORKERS,
+    chunk_size: int = VERIFY_BATCH_CHUNK_SIZE,
+    key_registry: Optional[KeyRegistry] = None
+) -> bytearray:
+    """
+    Verify a batch of transaction signatures in parallel.
+    Returns a bitmap in input order: 1 for valid, 0 for invalid.
+    Use a long-lived BatchVerifier to avoid starting a pool per call.
+    """
+    with BatchVerifier(workers, chunk_size, key_registry) as verifier:
+        return verifier.verify(transactions)
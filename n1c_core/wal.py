@@ -0,0 +1,219 @@
+# n1c_core/wal.py
+
+import json
+import os
+import struct
+import threading
+import time
+import zlib
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Tuple, Union
+from n1c_core.config import (
+    LEDGER_WAL_PATH,
+    WAL_GROUP_COMMIT_SIZE,
+    WAL_GROUP_COMMIT_INTERVAL_MS,
+)
+
+# Every record is: payload length (u32) | crc32 of payload (u32) | payload
+RECORD_HEADER = struct.Struct("<II")
+
+
+class WriteAheadLog:
+    """
+    Append-only, length-prefixed, checksummed log of ledger operations.
+
+    Records are written before the ledger changes state and made durable by
+    group commit: one fsync covers every record appended since the previous
+    one, and happens once `group_commit_size` records are pending or
+    `group_commit_interval_ms` has elapsed. A crash can therefore lose at most
+    one commit group, never corrupt earlier records. Call sync() to force a
+    commit point.
+
+    Opening an existing log scans it and truncates any torn tail left by a
+    crash mid-write.
+    """
+
+    def __init__(
+        self,
+        path: Union[str, Path] = LEDGER_WAL_PATH,
+        group_commit_size: int = WAL_GROUP_COMMIT_SIZE,
+        group_commit_interval_ms: float = WAL_GROUP_COMMIT_INTERVAL_MS,
+    ):
+        if group_commit_size < 1:
+            raise ValueError("group_commit_size must be at least 1")
+
+        self.path = Path(path)
+        self.group_commit_size = group_commit_size
+        self.group_commit_interval = group_commit_interval_ms / 1000.0
+
+        os.makedirs(self.path.parent, exist_ok=True)
+        if not self.path.exists():
+            self.path.touch()
+
+        self._file = open(self.path, "r+b")
+        self._end = self._truncate_torn_tail()
+        self._file.seek(self._end)
+
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._first_pending_at = 0.0
+        self._synced = self._end     # offset up to which the log is on disk
+        self.fsyncs = 0
+
+        # Background flusher enforces the time bound on group commit
+        self._stop = threading.Event()
+        self._flusher = None
+        if self.group_commit_interval > 0:
+            self._flusher = threading.Thread(target=self._flush_loop, daemon=True)
+            self._flusher.start()
+
+    # ---------------------------
+    # Writing
+    # ---------------------------
+    def append(self, record: Dict[str, Any]) -> int:
+        """
+        Append one record. Returns the log offset just past the record.
+        """
+        payload = json.dumps(record, separators=(",", ":")).encode()
+        data = RECORD_HEADER.pack(len(payload), zlib.crc32(payload)) + payload
+        with self._lock:
+            self._write_locked(data)
+            return self._end
+
+    def append_many(self, records) -> int:
+        """
+        Append several records as one write. Returns the offset past the last.
+        """
+        ends = self.append_batch(records)
+        return ends[-1] if ends else self._end
+
+    def append_batch(self, records) -> List[int]:
+        """
+        Append several records as one write. Returns the offset just past
+        each record, in order.
+        """
+        chunks = []
+        sizes = []
+        for record in records:
+            payload = json.dumps(record, separators=(",", ":")).encode()
+            chunks.append(RECORD_HEADER.pack(len(payload), zlib.crc32(payload)))
+            chunks.append(payload)
+            sizes.append(RECORD_HEADER.size + len(payload))
+        with self._lock:
+            offset = self._end
+            self._write_locked(b"".join(chunks), len(sizes))
+        ends = []
+        for size in sizes:
+            offset += size
+            ends.append(offset)
+        return ends
+
+    def _write_locked(self, data: bytes, count: int = 1):
+        self._file.write(data)
+        self._end += len(data)
+        if self._pending == 0:
+            self._first_pending_at = time.monotonic()
+        self._pending += count
+        if self._pending >= self.group_commit_size:
+            self._sync_locked()
+
+    def sync(self):
+        """
+        Make every appended record durable now.
+        """
+        with self._lock:
+            self._sync_locked()
+
+    def sync_to(self, offset: int):
+        """
+        Make the log durable up to `offset`, fsyncing only if it is not yet.
+        """
+        with self._lock:
+            if offset > self._synced:
+                self._sync_locked()
+
+    def _sync_locked(self):
+        if self._pending == 0:
+            return
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._pending = 0
+        self._synced = self._end
+        self.fsyncs += 1
+
+    def _flush_loop(self):
+        while not self._stop.wait(self.group_commit_interval):
+            with self._lock:
+                if self._pending and time.monotonic() - self._first_pending_at >= self.group_commit_interval:
+                    self._sync_locked()
+
+    # ---------------------------
+    # Reading
+    # ---------------------------
+    def replay(self, start: int = 0) -> Iterator[Dict[str, Any]]:
+        """
+        Yield every complete record from offset `start` to the end of the log.
+        """
+        return (record for _, record in self.scan(start))
+
+    def scan(self, start: int = 0) -> Iterator[Tuple[int, Dict[str, Any]]]:
+        """
+        Like replay(), yielding (offset just past the record, record).
+        """
+        with self._lock:
+            self._file.flush()
+            end = self._end
+        with open(self.path, "rb") as reader:
+            reader.seek(start)
+            offset = start
+            while offset < end:
+                length, _ = RECORD_HEADER.unpack(reader.read(RECORD_HEADER.size))
+                payload = reader.read(length)
+                offset += RECORD_HEADER.size + length
+                yield offset, json.loads(payload)
+
+    @property
+    def end_offset(self) -> int:
+        return self._end
+
+    def _truncate_torn_tail(self) -> int:
+        """
+        Scan the log and cut it after the last complete, checksummed record.
+        """
+        self._file.seek(0)
+        good = 0
+        while True:
+            header = self._file.read(RECORD_HEADER.size)
+            if len(header) < RECORD_HEADER.size:
+                break
+            length, checksum = RECORD_HEADER.unpack(header)
+            payload = self._file.read(length)
+            if len(payload) < length or zlib.crc32(payload) != checksum:
+                break
+            good += RECORD_HEADER.size + length
+
+        self._file.seek(0, os.SEEK_END)
+        if self._file.tell() != good:
+            self._file.truncate(good)
+            self._file.flush()
+            os.fsync(self._file.fileno())
+        return good
+
+    # ---------------------------
+    # Lifecycle
+    # ---------------------------
+    def close(self):
+        self._stop.set()
+        if self._flusher is not None:
+            self._flusher.join()
+        with self._lock:
+            if self._file.closed:
+                return
+            self._sync_locked()
+            self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
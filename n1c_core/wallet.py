@@ -1,8 +1,13 @@
 # n1c_core/wallet.py
 
-from typing import Dict, List, Optional
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional
 from n1c_core.models import Wallet, Transaction
-from n1c_core.utils import generate_wallet_address, generate_keypair
+from n1c_core.utils import generate_wallet_address, generate_raw_keypair, generate_raw_keypairs
+from n1c_core.keyring import KeyRegistry, get_key_registry
+from n1c_core.keystore import Keystore
+from n1c_core.config import KEYGEN_WORKERS
+from n1c_core.history import HistoryIndexes, HistoryPage
 
 
 class WalletManager:
@@ -10,13 +15,25 @@ class WalletManager:
     Manages wallets: creation, retrieval, balances, and transaction histories.
     """
 
-    def __init__(self):
+    def __init__(self, key_registry: Optional[KeyRegistry] = None, keystore: Optional[Keystore] = None):
         # Wallet storage: address -> Wallet object
         self.wallets: Dict[str, Wallet] = {}
 
-        # Private keys storage (in-memory, for demonstration purposes)
-        self.private_keys: Dict[str, str] = {}
-        self.public_keys: Dict[str, str] = {}
+        # Keys are held by the registry as raw bytes, indexed by address.
+        # With a keystore, new keys are written to disk instead and the
+        # registry reads them back from there.
+        if key_registry is None:
+            key_registry = KeyRegistry(keystore=keystore) if keystore is not None else get_key_registry()
+        elif keystore is not None:
+            if key_registry.keystore is None:
+                key_registry.keystore = keystore
+            elif key_registry.keystore is not keystore:
+                raise ValueError("Key registry is already backed by another keystore")
+        self.key_registry = key_registry
+        self.keystore = keystore
+
+        # Timestamp-ordered history indexes for paginated queries
+        self.history_indexes = HistoryIndexes()
 
     # ---------------------------
     # Wallet Creation
@@ -30,9 +47,11 @@ class WalletManager:
             raise ValueError(f"Wallet with address {address} already exists")
 
         # Generate keypair
-        private_key, public_key = generate_keypair()
-        self.private_keys[address] = private_key
-        self.public_keys[address] = public_key
+        private_key, public_key = generate_raw_keypair()
+        if self.keystore is not None:
+            self.keystore.add(address, public_key, private_key)
+        else:
+            self.key_registry.register(address, public_key, private_key)
 
         wallet = Wallet(
             address=address,
@@ -42,6 +61,30 @@ class WalletManager:
         self.wallets[address] = wallet
         return wallet
 
+    def create_wallets(self, n: int, owner_name: str = "wallet", workers: int = KEYGEN_WORKERS) -> List[Wallet]:
+        """
+        Create n wallets at once, e.g. to onboard a community.
+        Keypairs are generated in parallel (see generate_raw_keypairs) and,
+        with a keystore, written with a single append and fsync.
+        """
+        addresses = [generate_wallet_address(owner_name) for _ in range(n)]
+        if len(set(addresses)) != n or any(address in self.wallets for address in addresses):
+            raise ValueError("Generated wallet address already exists")
+
+        keypairs = generate_raw_keypairs(n, workers)
+        if self.keystore is not None:
+            self.keystore.add_many(
+                (address, public_key, private_key)
+                for address, (private_key, public_key) in zip(addresses, keypairs)
+            )
+        else:
+            for address, (private_key, public_key) in zip(addresses, keypairs):
+                self.key_registry.register(address, public_key, private_key)
+
+        wallets = [Wallet(address=address, balance=0.0, transactions=[]) for address in addresses]
+        self.wallets.update(zip(addresses, wallets))
+        return wallets
+
     # ---------------------------
     # Wallet Retrieval
     # ---------------------------
@@ -49,10 +92,18 @@ class WalletManager:
         return self.wallets.get(address)
 
     def get_private_key(self, address: str) -> Optional[str]:
-        return self.private_keys.get(address)
+        """
+        Return the private key as PEM text. Hot paths should use
+        key_registry.get_private_key() to get the decoded key directly.
+        """
+        return self.key_registry.get_private_key_pem(address)
 
     def get_public_key(self, address: str) -> Optional[str]:
-        return self.public_keys.get(address)
+        """
+        Return the public key as PEM text. Hot paths should use
+        key_registry.get_public_key() to get the decoded key directly.
+        """
+        return self.key_registry.get_public_key_pem(address)
 
     # ---------------------------
     # Balance Management
@@ -89,6 +140,38 @@ class WalletManager:
             raise ValueError("Wallet not found")
         return wallet.transactions
 
+    def get_transaction_page(
+        self,
+        address: str,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        cursor: Optional[str] = None,
+        limit: int = 100,
+    ) -> HistoryPage:
+        """
+        Return one page of a wallet's history in timestamp order.
+        `since` is inclusive, `until` exclusive; pass the returned
+        next_cursor to continue.
+        """
+        wallet = self.get_wallet(address)
+        if not wallet:
+            raise ValueError("Wallet not found")
+        return self.history_indexes.page(address, wallet.transactions, since, until, cursor, limit)
+
+    def iter_transactions(
+        self,
+        address: str,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+    ) -> Iterator[Transaction]:
+        """
+        Stream a wallet's history in timestamp order without building a list.
+        """
+        wallet = self.get_wallet(address)
+        if not wallet:
+            raise ValueError("Wallet not found")
+        return self.history_indexes.iterate(address, wallet.transactions, since, until)
+
     # ---------------------------
     # Utility Methods
     # ---------------------------
@@ -0,0 +1,163 @@
+# n1c_core/tests/test_amount.py
+
+import random
+import unittest
+from n1c_core.amount import (
+    batch_charge,
+    batch_fee_and_tax,
+    batch_to_minor,
+    charge,
+    fee_and_tax,
+    from_minor,
+    to_minor,
+    to_rate_units,
+)
+from n1c_core.anchor import AnchorManager
+from n1c_core.errors import BatchRejectedError, TransactionRejectedError
+from n1c_core.ledger import Ledger
+
+
+class TestAmount(unittest.TestCase):
+
+    def test_conversion(self):
+        self.assertEqual(to_minor(1.5), 1_500_000)
+        self.assertEqual(to_minor(0.1) + to_minor(0.2), to_minor(0.3))
+        self.assertEqual(from_minor(2_500_001), 2.500001)
+        self.assertEqual(to_rate_units(2.5), 25_000)
+
+    def test_half_even_rounding(self):
+        # 1% of 50 minor units is exactly 0.5 -> rounds to even (0)
+        self.assertEqual(charge(50, to_rate_units(1.0)), 0)
+        # 1% of 150 minor units is exactly 1.5 -> rounds to even (2)
+        self.assertEqual(charge(150, to_rate_units(1.0)), 2)
+        self.assertEqual(charge(151, to_rate_units(1.0)), 2)
+        self.assertEqual(charge(149, to_rate_units(1.0)), 1)
+
+    def test_vectorized_matches_scalar(self):
+        rng = random.Random(7)
+        amounts = [rng.randrange(0, 10 ** 12) for _ in range(2000)] + [50, 150, 250, 0]
+        spreads = [rng.choice([0.0, 0.5, 1.0, 2.0, 2.5, 5.0, 7.0]) for _ in amounts]
+        fees, taxes = batch_fee_and_tax(amounts, spreads, 0.02)
+        for amount, spread, fee, tax in zip(amounts, spreads, fees.tolist(), taxes.tolist()):
+            self.assertEqual((fee, tax), fee_and_tax(amount, spread, 0.02))
+
+    def test_non_finite_amounts_are_rejected(self):
+        for amount in (float("nan"), float("inf"), -float("inf")):
+            with self.assertRaises(TransactionRejectedError) as ctx:
+                to_minor(amount)
+            self.assertEqual(ctx.exception.reason, "validation")
+
+    def test_out_of_range_amounts_are_rejected(self):
+        self.assertEqual(to_minor(9e12), 9 * 10 ** 18)
+        for amount in (1e13, -1e13):
+            with self.assertRaises(TransactionRejectedError) as ctx:
+                to_minor(amount)
+            self.assertEqual(ctx.exception.reason, "validation")
+
+    def test_vectorized_range_check(self):
+        with self.assertRaises(ValueError):
+            batch_charge([2 ** 62], 1)
+        self.assertEqual(batch_to_minor([0.1, 2.5]).tolist(), [100_000, 2_500_000])
+
+    def test_vectorized_conversion_rejects_unrepresentable_amounts(self):
+        for amount in (float("nan"), float("inf"), -float("inf"), 1e13, -1e13):
+            with self.assertRaises(ValueError):
+                batch_to_minor([1.0, amount])
+        with self.assertRaises(ValueError):
+            batch_charge([-(2 ** 63)], 1)
+
+
+class TestExactLedgerArithmetic(unittest.TestCase):
+
+    def test_anchor_manager_batch(self):
+        anchors = AnchorManager()
+        anchors.register_anchor("anchor1", spread=2.5, tax_rate=0.02)
+        amounts = [0.1, 33.333333, 100.0, 7.77]
+        fees, taxes = anchors.calculate_charges("anchor1", amounts)
+        self.assertEqual(fees.tolist(), [anchors.calculate_fee("anchor1", a) for a in amounts])
+        self.assertEqual(taxes.tolist(), [anchors.calculate_tax("anchor1", a) for a in amounts])
+
+    def test_balances_are_exact(self):
+        ledger = Ledger()
+        ledger.create_wallet("alice")
+        ledger.create_wallet("bob")
+        ledger.register_anchor("anchor1", spread=2.5, tax_rate=0.02)
+        ledger.deposit("alice", 1000.0)
+        for i in range(1000):
+            ledger.add_transaction(f"tx{i}", "alice", "bob", 0.1, "sig", anchor_id="anchor1" if i % 2 else None)
+
+        # 1000 * 0.1 received, no float drift
+        self.assertEqual(ledger.get_wallet("bob").balance, 100.0)
+        # 500 anchored transfers: fee 0.0025, tax 0.00002 each
+        self.assertEqual(ledger.get_wallet("alice").balance, 1000.0 - 100.0 - 500 * 0.00252)
+        self.assertEqual(ledger.auditor.expected_balance("alice"), to_minor(ledger.get_wallet("alice").balance))
+        self.assertTrue(ledger.verify_integrity())
+
+    def test_out_of_range_writes_change_nothing(self):
+        ledger = Ledger()
+        ledger.create_wallet("alice")
+        ledger.create_wallet("bob")
+        ledger.deposit("alice", 9e12)
+        with self.assertRaises(TransactionRejectedError):
+            ledger.deposit("alice", 9e12)
+        with self.assertRaises(TransactionRejectedError):
+            ledger.add_transaction("tx1", "alice", "bob", 1e13, "sig")
+        self.assertEqual(ledger.get_wallet("alice").balance, 9e12)
+        self.assertEqual(len(ledger.transactions), 0)
+        self.assertTrue(ledger.verify_integrity())
+
+    def test_batch_matches_single_path(self):
+        single, batched = Ledger(), Ledger()
+        for ledger in (single, batched):
+            ledger.create_wallet("alice")
+            ledger.create_wallet("bob")
+            ledger.register_anchor("anchor1", spread=3.0, tax_rate=1.5)
+            ledger.deposit("alice", 500.0)
+
+        items = [(f"tx{i}", "alice", "bob", 1.234567 * (i + 1), "sig", "anchor1") for i in range(20)]
+        expected = [single.add_transaction(*item) for item in items]
+        applied = batched.add_transactions(items)
+        self.assertEqual([(tx.amount, tx.fee) for tx in applied], [(tx.amount, tx.fee) for tx in expected])
+        self.assertEqual(batched.get_wallet("alice").balance, single.get_wallet("alice").balance)
+        self.assertTrue(batched.verify_integrity())
+
+    def test_bad_batch_amounts_are_rejected_per_item(self):
+        ledger = Ledger()
+        ledger.create_wallet("alice")
+        ledger.create_wallet("bob")
+        ledger.register_anchor("anchor1", spread=3.0, tax_rate=1.5)
+        ledger.deposit("alice", 100.0)
+        with self.assertRaises(TransactionRejectedError) as ctx:
+            ledger.add_transaction("nan", "alice", "bob", float("nan"), "sig")
+        self.assertEqual(ctx.exception.reason, "validation")
+
+        items = [
+            ("tx0", "alice", "bob", 1.0, "sig", "anchor1"),
+            ("tx1", "alice", "bob", 1e7, "sig", "anchor1"),
+            ("tx2", "alice", "bob", float("nan"), "sig", "anchor1"),
+            ("tx3", "alice", "bob", 2.0, "sig", "anchor1"),
+        ]
+        with self.assertRaises(BatchRejectedError) as ctx:
+            ledger.add_transactions(items, atomic=False)
+        self.assertEqual(
+            ctx.exception.rejections, [(1, "tx1", "validation failed"), (2, "tx2", "validation failed")]
+        )
+        self.assertEqual([tx.tx_id for tx in ctx.exception.applied], ["tx0", "tx3"])
+        self.assertTrue(ledger.verify_integrity())
+
+    def test_batch_charges_amounts_beyond_the_vector_range(self):
+        single, batched = Ledger(), Ledger()
+        for ledger in (single, batched):
+            ledger.create_wallet("alice")
+            ledger.create_wallet("bob")
+            ledger.register_anchor("anchor1", spread=3.0, tax_rate=1.5)
+            ledger.deposit("alice", 2e7)
+        items = [("tx0", "alice", "bob", 1e7, "sig", "anchor1"), ("tx1", "alice", "bob", 5.0, "sig", "anchor1")]
+        expected = [single.add_transaction(*item) for item in items]
+        applied = batched.add_transactions(items)
+        self.assertEqual([tx.fee for tx in applied], [tx.fee for tx in expected])
+        self.assertEqual(batched.get_wallet("alice").balance, single.get_wallet("alice").balance)
+
+
+if __name__ == "__main__":
+    unittest.main()
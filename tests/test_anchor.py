@@ -0,0 +1,62 @@
+# n1c_core/tests/test_anchor.py
+
+import unittest
+from n1c_core.anchor import AnchorManager
+
+
+class TestAnchorQuotes(unittest.TestCase):
+
+    def setUp(self):
+        self.anchors = AnchorManager()
+        self.anchors.register_anchor("cheap_fee", spread=1.0, tax_rate=3.0)
+        self.anchors.register_anchor("cheap_tax", spread=3.0, tax_rate=1.0)
+        self.anchors.register_anchor("flat", spread=2.0, tax_rate=1.5)
+
+    def test_quote_matrix_matches_scalar(self):
+        amounts = [0.01, 12.345678, 100.0, 99999.99]
+        quote = self.anchors.quote(amounts)
+        self.assertEqual(quote.anchor_ids, ("cheap_fee", "cheap_tax", "flat"))
+        self.assertEqual(quote.fees.shape, (4, 3))
+        for i, amount in enumerate(amounts):
+            for j, anchor_id in enumerate(quote.anchor_ids):
+                fee = self.anchors.calculate_fee(anchor_id, amount)
+                tax = self.anchors.calculate_tax(anchor_id, amount)
+                self.assertEqual(quote.fees[i, j], fee)
+                self.assertEqual(quote.taxes[i, j], tax)
+
+    def test_quote_subset(self):
+        quote = self.anchors.quote([100.0], anchor_ids=["flat", "cheap_fee"])
+        self.assertEqual(quote.anchor_ids, ("flat", "cheap_fee"))
+        self.assertEqual(quote.totals.tolist(), [[3.5, 4.0]])
+        with self.assertRaises(ValueError):
+            self.anchors.quote([1.0], anchor_ids=["missing"])
+
+    def test_best_anchor(self):
+        self.assertEqual(self.anchors.best_anchor(100.0), ("flat", 3.5))
+        # Ties go to the earliest registered anchor
+        self.anchors.register_anchor("flat_copy", spread=2.0, tax_rate=1.5)
+        self.assertEqual(self.anchors.best_anchors([100.0, 200.0]), [("flat", 3.5), ("flat", 7.0)])
+        self.assertIsNone(AnchorManager().best_anchor(10.0))
+
+    def test_invalid_amounts_are_rejected(self):
+        for amount in (float("nan"), float("inf"), 1e13, -1.0):
+            with self.assertRaises(ValueError):
+                self.anchors.quote([amount, 100.0])
+            with self.assertRaises(ValueError):
+                self.anchors.best_anchors([amount])
+            with self.assertRaises(ValueError):
+                self.anchors.calculate_charges("flat", [amount])
+        # Empty manager still validates instead of answering None
+        with self.assertRaises(ValueError):
+            AnchorManager().best_anchors([float("inf")])
+
+    def test_rate_table_rebuilt_on_register(self):
+        table = self.anchors._rates()
+        self.assertIs(self.anchors._rates(), table)
+        self.anchors.register_anchor("free", spread=0.0, tax_rate=0.0)
+        self.assertIsNot(self.anchors._rates(), table)
+        self.assertEqual(self.anchors.best_anchor(50.0), ("free", 0.0))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,110 @@
+# n1c_core/tests/test_bloom.py
+
+import unittest
+from n1c_core.bloom import BloomFilter, RotatingBloomFilter, ScalableBloomFilter, SeenFilter
+from n1c_core.ledger import Ledger
+
+SIGNATURE = "ab" * 64
+
+
+def saturate(seen: RotatingBloomFilter):
+    """Set every bit so each lookup is a (false) hit."""
+    for generation in seen.generations:
+        for s in generation.slices:
+            s._bits[:] = b"\xff" * len(s._bits)
+
+
+class TestBloomFilter(unittest.TestCase):
+
+    def test_no_false_negatives_and_rate_on_target(self):
+        bloom = BloomFilter(5_000, 0.01)
+        for i in range(5_000):
+            bloom.add(f"tx{i}")
+        self.assertTrue(all(f"tx{i}" in bloom for i in range(5_000)))
+        false_hits = sum(f"other{i}" in bloom for i in range(20_000))
+        self.assertLess(false_hits / 20_000, 0.02)
+        self.assertAlmostEqual(bloom.estimated_fp_rate, 0.01, delta=0.005)
+
+    def test_scalable_grows_and_keeps_rate(self):
+        bloom = ScalableBloomFilter(1_000, 0.01)
+        for i in range(10_000):
+            bloom.add(f"tx{i}")
+        self.assertGreater(len(bloom.slices), 3)
+        self.assertEqual(len(bloom), 10_000)
+        self.assertTrue(all(f"tx{i}" in bloom for i in range(10_000)))
+        self.assertLess(bloom.estimated_fp_rate, 0.01)
+        false_hits = sum(f"other{i}" in bloom for i in range(20_000))
+        self.assertLess(false_hits / 20_000, 0.015)
+
+    def test_rotation_bounds_memory(self):
+        bloom = RotatingBloomFilter(capacity=500, error_rate=0.01, max_bytes=8_000, generations=2)
+        for i in range(20_000):
+            bloom.add(f"tx{i}")
+        self.assertGreater(bloom.rotations, 1)
+        self.assertFalse(bloom.complete)
+        self.assertLessEqual(bloom.nbytes, 8_000)
+        self.assertTrue(all(f"tx{i}" in bloom for i in range(19_900, 20_000)))
+        self.assertLess(sum(f"tx{i}" in bloom for i in range(1_000)), 100)
+        with self.assertRaises(ValueError):
+            RotatingBloomFilter(capacity=1_000_000, max_bytes=1_000)
+
+
+class TestSeenFilter(unittest.TestCase):
+
+    def test_false_positive_falls_back_to_exact_check(self):
+        seen = SeenFilter(capacity=100, error_rate=0.01)
+        seen.add("tx1")
+        known = {"tx1"}
+        self.assertTrue(seen.contains("tx1", known.__contains__))
+        self.assertFalse(seen.contains("tx2", known.__contains__))
+        self.assertEqual(seen.exact_checks, 1)     # the miss was answered by the filter
+
+        saturate(seen)
+        self.assertFalse(seen.contains("tx3", known.__contains__))
+        self.assertEqual((seen.checks, seen.hits, seen.false_positives), (3, 2, 1))
+        self.assertEqual(seen.observed_fp_rate, 0.5)
+
+    def test_ledger_rejects_duplicates_and_accepts_false_positives(self):
+        ledger = Ledger(seen_filter=SeenFilter(capacity=100))
+        ledger.create_wallet("alice")
+        ledger.create_wallet("bob")
+        ledger.deposit("alice", 100.0)
+        ledger.add_transaction("tx1", "alice", "bob", 1.0, SIGNATURE)
+        with self.assertRaises(ValueError):
+            ledger.add_transaction("tx1", "alice", "bob", 1.0, SIGNATURE)
+
+        saturate(ledger.seen_filter)
+        ledger.add_transaction("tx2", "alice", "bob", 1.0, SIGNATURE)
+        ledger.add_transactions([("tx3", "alice", "bob", 1.0, SIGNATURE)])
+        self.assertEqual(ledger.get_wallet("bob").balance, 3.0)
+        self.assertEqual(ledger.seen_filter.false_positives, 2)
+
+    def test_exact_after_rotation(self):
+        seen = SeenFilter(capacity=100, error_rate=0.01, max_bytes=2_000, generations=2)
+        ledger = Ledger(seen_filter=seen)
+        ledger.create_wallet("alice")
+        ledger.create_wallet("bob")
+        ledger.deposit("alice", 1_000.0)
+        ledger.add_transactions((f"tx{i}", "alice", "bob", 0.01, SIGNATURE) for i in range(2_000))
+        self.assertFalse(seen.complete)
+
+        for tx_id in ("tx0", "tx1999"):
+            with self.assertRaises(ValueError):
+                ledger.add_transaction(tx_id, "alice", "bob", 0.01, SIGNATURE)
+        ledger.add_transaction("tx2000", "alice", "bob", 0.01, SIGNATURE)
+
+    def test_seeded_from_storage(self):
+        ledger = Ledger()
+        ledger.create_wallet("alice")
+        ledger.create_wallet("bob")
+        ledger.deposit("alice", 100.0)
+        ledger.add_transactions((f"tx{i}", "alice", "bob", 1.0, SIGNATURE) for i in range(10))
+
+        reopened = Ledger(storage=ledger.storage, seen_filter=SeenFilter(capacity=100))
+        self.assertTrue(reopened.seen_filter.complete)
+        self.assertTrue(all(reopened.has_transaction(f"tx{i}") for i in range(10)))
+        self.assertFalse(reopened.has_transaction("tx10"))
+
+
+if __name__ == "__main__":
+    unittest.main()
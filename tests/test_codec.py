@@ -0,0 +1,127 @@
+# n1c_core/tests/test_codec.py
+
+import unittest
+from datetime import datetime, timezone
+from n1c_core.codec import (
+    PAYLOAD_SIZE,
+    RECORD_SIZE,
+    TransactionBuffer,
+    decode_transaction,
+    decode_transactions,
+    encode_transaction,
+    encode_transactions,
+    signature_fits,
+    signing_payload,
+)
+from n1c_core.models import Transaction
+from n1c_core.keyring import public_key_bytes, load_private_key
+from n1c_core.utils import sign_transaction, verify_signature
+
+# Conformance vector: changing either value breaks every existing signature
+PRIVATE_KEY = bytes(range(32))
+EXPECTED_PAYLOAD = bytes.fromhex(
+    "01"
+    "36663166326437652d386134332d346637622d396135312d326630633065376439623131"
+    "6e31635f3031323334353637383961626364656630313233343536373839616263646566"
+    "6e31635f6665646362613938373635343332313066656463626139383736353433323130"
+    "20bcbe0000000000"
+    "90d0030000000000"
+    "354f57f65e470600"
+)
+EXPECTED_SIGNATURE = (
+    "0762343d1305f6d076430715b056860bf780a7458bcf683cf7a5dbe847de2b4e"
+    "09a75bc4d04112cff3c70d5240d2071697a9d75e93b7527117b56f28dfe24f0d"
+)
+
+
+def make_transaction(**overrides) -> Transaction:
+    fields = dict(
+        tx_id="6f1f2d7e-8a43-4f7b-9a51-2f0c0e7d9b11",
+        sender="n1c_0123456789abcdef0123456789abcdef",
+        receiver="n1c_fedcba9876543210fedcba9876543210",
+        amount=12.5,
+        fee=0.25,
+        timestamp=datetime(2026, 1, 2, 3, 4, 5, 678901),
+        signature="",
+    )
+    fields.update(overrides)
+    return Transaction(**fields)
+
+
+class TestConformance(unittest.TestCase):
+
+    def test_signing_payload_is_stable(self):
+        self.assertEqual(signing_payload(make_transaction()), EXPECTED_PAYLOAD)
+        self.assertEqual(len(EXPECTED_PAYLOAD), PAYLOAD_SIZE)
+
+    def test_signature_is_stable(self):
+        tx = make_transaction()
+        tx.signature = sign_transaction(tx, PRIVATE_KEY)
+        self.assertEqual(tx.signature, EXPECTED_SIGNATURE)
+        public_key = public_key_bytes(load_private_key(PRIVATE_KEY).public_key())
+        self.assertTrue(verify_signature(tx, public_key))
+
+        tx.amount = 12.500001
+        self.assertFalse(verify_signature(tx, public_key))
+
+
+class TestCodec(unittest.TestCase):
+
+    def setUp(self):
+        self.transactions = [
+            make_transaction(tx_id=f"tx{i}", amount=i + 0.5, signature=EXPECTED_SIGNATURE if i % 2 else "")
+            for i in range(5)
+        ]
+
+    def test_round_trip(self):
+        tx = make_transaction(signature=EXPECTED_SIGNATURE)
+        record = encode_transaction(tx)
+        self.assertEqual(len(record), RECORD_SIZE)
+        self.assertEqual(record[:PAYLOAD_SIZE], EXPECTED_PAYLOAD)
+        self.assertEqual(decode_transaction(record), tx)
+
+    def test_bulk(self):
+        buffer = encode_transactions(self.transactions)
+        self.assertEqual(len(buffer), RECORD_SIZE * 5)
+        self.assertEqual(list(decode_transactions(buffer)), self.transactions)
+        self.assertEqual(decode_transaction(buffer, 3 * RECORD_SIZE), self.transactions[3])
+
+    def test_buffer_view(self):
+        data = bytearray(encode_transactions(self.transactions))
+        view = TransactionBuffer(data)
+        self.assertEqual(len(view), 5)
+        self.assertEqual(view[-1], self.transactions[4])
+        self.assertEqual(list(view[1:3]), self.transactions[1:3])
+        self.assertEqual(bytes(view.payload(0)), signing_payload(self.transactions[0]))
+        self.assertEqual(view.signature(1).hex(), EXPECTED_SIGNATURE)
+
+        # Views share the buffer rather than copying it
+        columns = view.columns()
+        self.assertEqual(columns["amount"].tolist(), [500_000, 1_500_000, 2_500_000, 3_500_000, 4_500_000])
+        data[RECORD_SIZE + 109] = 0     # low byte of record 1's amount
+        self.assertEqual(columns["amount"][1], 1_500_000 - 0x60)
+        with self.assertRaises(IndexError):
+            view[5]
+
+    def test_invalid_fields(self):
+        with self.assertRaises(ValueError):
+            encode_transaction(make_transaction(tx_id="x" * 37))
+        with self.assertRaises(ValueError):
+            encode_transaction(make_transaction(signature="not hex"))
+        self.assertEqual([signature_fits(s) for s in ("", "ab" * 64, "ab" * 63, "not hex")], [True, True, False, False])
+        with self.assertRaises(ValueError):
+            TransactionBuffer(b"\x01" * (RECORD_SIZE - 1))
+        with self.assertRaises(ValueError):
+            decode_transaction(b"\x02" + bytes(RECORD_SIZE - 1))
+
+    def test_unencodable_numbers_and_times_raise_value_error(self):
+        aware = datetime(2026, 1, 2, tzinfo=timezone.utc)
+        for tx in (make_transaction(amount=1e13), make_transaction(fee=-1e13), make_transaction(timestamp=aware)):
+            with self.assertRaises(ValueError):
+                signing_payload(tx)
+            with self.assertRaises(ValueError):
+                encode_transactions([make_transaction(), tx])
+
+
+if __name__ == "__main__":
+    unittest.main()
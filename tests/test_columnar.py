@@ -0,0 +1,94 @@
+# n1c_core/tests/test_columnar.py
+
+import unittest
+from dataclasses import replace
+from n1c_core.columnar import ColumnarStorage, IdTable, WalletHistory
+from n1c_core.ledger import Ledger
+
+
+class TestColumnarStorage(unittest.TestCase):
+
+    def setUp(self):
+        self.storage = ColumnarStorage()
+        self.ledger = Ledger(storage=self.storage)
+        self.alice = self.ledger.create_wallet("alice")
+        self.bob = self.ledger.create_wallet("bob")
+        self.ledger.register_anchor("anchor1", spread=5.0, tax_rate=2.0)
+        self.ledger.deposit("alice", 100.0)
+
+        self.tx1 = self.ledger.add_transaction("tx1", "alice", "bob", 10.0, "ab" * 64, anchor_id="anchor1")
+        self.tx2 = self.ledger.add_transaction("tx2", "bob", "alice", 4.0, "dummy_signature")
+
+    def test_wallets_hold_row_offsets(self):
+        self.assertIsInstance(self.alice.transactions, WalletHistory)
+        self.assertEqual(list(self.alice.transactions.rows), [0, 1])
+        self.assertEqual(list(self.bob.transactions.rows), [0, 1])
+
+    def test_transactions_materialize_lazily(self):
+        self.assertEqual(self.alice.transactions[0], self.tx1)
+        self.assertIn(self.tx2, self.bob.transactions)
+        self.assertEqual(self.ledger.get_transaction("tx2").signature, "dummy_signature")
+        self.assertEqual(self.ledger.get_transaction("tx1").signature, "ab" * 64)
+        self.assertEqual(self.ledger.get_all_transactions(), [self.tx1, self.tx2])
+
+    def test_signatures_round_trip_exactly(self):
+        for i, signature in enumerate(["AB" * 32, "ab cd", "abc", ""]):
+            tx = self.ledger.add_transaction(f"sig{i}", "alice", "bob", 1.0, signature)
+            self.assertEqual(self.ledger.get_transaction(tx.tx_id).signature, signature)
+        self.assertEqual(self.storage.store.sig_kinds[0], 0)    # lowercase hex packed as bytes
+
+    def test_amounts_are_stored_in_minor_units(self):
+        store = self.storage.store
+        self.assertEqual(store.amounts.typecode, "q")
+        self.assertEqual(list(store.amounts), [10_000_000, 4_000_000])
+        self.assertEqual(store.fees[0], 500_000)
+        self.assertEqual(self.ledger.get_transaction_tax("tx1"), 0.2)
+        self.assertEqual(self.ledger.get_transaction("tx1").fee, 0.5)
+
+    def test_rejected_append_keeps_columns_aligned(self):
+        store = self.storage.store
+        with self.assertRaises(ValueError):
+            store.append(replace(self.tx1, tx_id="t1", amount=1e13))
+        self.assertEqual(len(store), 2)
+        self.assertNotIn("t1", store)
+        # The ledger rejects the same amount before moving any balance
+        with self.assertRaises(ValueError):
+            self.ledger.add_transaction("t1", "alice", "bob", 1e13, "sig")
+        tx = self.ledger.add_transaction("t2", "alice", "bob", 1.0, "sig")
+        self.assertEqual(self.ledger.get_transaction("t2"), tx)
+        self.assertTrue(self.ledger.verify_integrity())
+
+    def test_columns_are_interned(self):
+        store = self.storage.store
+        self.assertEqual(len(store.addresses), 2)
+        self.assertEqual(store.anchor_of(0), "anchor1")
+        self.assertIsNone(store.anchor_of(1))
+        self.assertIn("tx1", self.ledger.transactions)
+        with self.assertRaises(ValueError):
+            self.ledger.add_transaction("tx1", "alice", "bob", 1.0, "sig")
+
+    def test_tx_ids_are_packed_and_indexed(self):
+        ids = IdTable()
+        values = [f"{i:08x}-0000-4000-8000-{i:012x}" for i in range(1000)] + ["tx-é"]
+        for row, value in enumerate(values):
+            self.assertEqual(ids.append(value), row)
+        self.assertEqual(len(ids.data), sum(len(value.encode()) for value in values))
+        self.assertEqual([ids.row_of(value) for value in values], list(range(len(values))))
+        self.assertEqual(list(ids), values)
+        self.assertEqual(ids[-1], "tx-é")
+        self.assertIsNone(ids.row_of("missing"))
+        self.assertNotIn("missing", ids)
+        with self.assertRaises(ValueError):
+            ids.append(values[10])
+
+        store = self.storage.store
+        self.assertEqual(list(store.tx_ids), ["tx1", "tx2"])
+        self.assertEqual(store.row_of("tx2"), 1)
+        self.assertEqual(list(self.ledger.transactions), ["tx1", "tx2"])
+
+    def test_integrity_with_columnar_history(self):
+        self.assertTrue(self.ledger.verify_integrity())
+
+
+if __name__ == "__main__":
+    unittest.main()
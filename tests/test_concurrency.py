@@ -0,0 +1,198 @@
+# n1c_core/tests/test_concurrency.py
+
+import random
+import sys
+import threading
+import unittest
+from datetime import datetime, timedelta
+from n1c_core.amount import fee_and_tax, to_minor
+from n1c_core.columnar import ColumnarStorage
+from n1c_core.keyring import KeyRegistry
+from n1c_core.ledger import Ledger
+from n1c_core.locking import StripedLock
+from n1c_core.models import Transaction
+from n1c_core.utils import generate_raw_keypair, sign_transaction
+
+WALLETS = 16
+THREADS = 8
+TRANSFERS_PER_THREAD = 500
+
+
+class TestThreadSafeLedger(unittest.TestCase):
+
+    def setUp(self):
+        # Switch threads as often as possible to provoke races
+        self._switch_interval = sys.getswitchinterval()
+        sys.setswitchinterval(1e-6)
+
+    def tearDown(self):
+        sys.setswitchinterval(self._switch_interval)
+
+    def _ledger(self, **kwargs) -> Ledger:
+        ledger = Ledger(thread_safe=True, lock_stripes=4, **kwargs)
+        ledger.register_anchor("anchor1", spread=2.5, tax_rate=1.0)
+        for i in range(WALLETS):
+            ledger.create_wallet(f"w{i}")
+            ledger.deposit(f"w{i}", 1000.0)
+        return ledger
+
+    def _run(self, target, threads: int = THREADS):
+        errors = []
+
+        def wrapper(n):
+            try:
+                target(n)
+            except Exception as exc:  # pragma: no cover - reported below
+                errors.append(exc)
+
+        workers = [threading.Thread(target=wrapper, args=(n,)) for n in range(threads)]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        self.assertEqual(errors, [])
+
+    def _stress(self, ledger: Ledger, use_batches: bool = False):
+        def transfer(n):
+            rng = random.Random(n)
+            batch = []
+            for i in range(TRANSFERS_PER_THREAD):
+                sender, receiver = rng.sample(range(WALLETS), 2)
+                item = (f"t{n}-{i}", f"w{sender}", f"w{receiver}", rng.choice([0.5, 1.0, 3.3]), "sig",
+                        "anchor1" if i % 3 == 0 else None)
+                if use_batches:
+                    batch.append(item)
+                    if len(batch) == 10:
+                        ledger.add_transactions(batch)
+                        batch = []
+                else:
+                    ledger.add_transaction(*item)
+            if batch:
+                ledger.add_transactions(batch)
+
+        self._run(transfer)
+
+        # Supply is conserved: balances plus fees and taxes equal deposits
+        transactions = ledger.get_all_transactions()
+        self.assertEqual(len(transactions), THREADS * TRANSFERS_PER_THREAD)
+        anchored = [tx for tx in transactions if tx.fee]
+        self.assertEqual(len(anchored), THREADS * len(range(0, TRANSFERS_PER_THREAD, 3)))
+        charged = sum(sum(fee_and_tax(to_minor(tx.amount), 2.5, 1.0)) for tx in anchored)
+        balances = sum(to_minor(ledger.get_wallet(f"w{i}").balance) for i in range(WALLETS))
+        self.assertEqual(balances + charged, WALLETS * to_minor(1000.0))
+        self.assertTrue(ledger.verify_integrity())
+
+    def test_conservation_under_contention(self):
+        self._stress(self._ledger())
+
+    def test_conservation_with_batches(self):
+        self._stress(self._ledger(), use_batches=True)
+
+    def test_serialized_backend(self):
+        self._stress(self._ledger(storage=ColumnarStorage()))
+
+    def test_signature_checks_share_a_small_key_cache(self):
+        registry = KeyRegistry(capacity=4)
+        ledger = self._ledger(key_registry=registry, verify_signatures=True)
+        private_keys = {}
+        for i in range(WALLETS):
+            private_key, public_key = generate_raw_keypair()
+            registry.register(f"w{i}", public_key)
+            private_keys[f"w{i}"] = private_key
+        timestamp = datetime(2026, 1, 1)
+
+        def transfer(n):
+            rng = random.Random(n)
+            for i in range(50):
+                sender, receiver = (f"w{j}" for j in rng.sample(range(WALLETS), 2))
+                tx = Transaction(f"s{n}-{i}", sender, receiver, 1.0, 0.0, timestamp, "")
+                signature = sign_transaction(tx, private_keys[sender])
+                ledger.add_transaction(tx.tx_id, sender, receiver, 1.0, signature, timestamp=timestamp)
+
+        self._run(transfer)
+        self.assertEqual(len(ledger.get_all_transactions()), THREADS * 50)
+        self.assertLessEqual(len(registry._public_cache), 4)
+        self.assertTrue(ledger.verify_integrity())
+
+        # Lookups alone, which reorder and evict the cache on every call
+        def lookup(n):
+            rng = random.Random(n)
+            for _ in range(5000):
+                self.assertIsNotNone(registry.get_public_key(f"w{rng.randrange(WALLETS)}"))
+
+        self._run(lookup)
+        self.assertEqual(len(registry._public_cache), 4)
+
+    def test_concurrent_history_readers(self):
+        ledger = self._ledger()
+        start = datetime(2026, 1, 1)
+        # Out-of-order timestamps make index syncs insert, not just append
+        for i in range(3000):
+            ledger.add_transaction(
+                f"h{i}", "w0", "w1", 0.1, "sig", timestamp=start + timedelta(seconds=(i * 7919) % 3000)
+            )
+        expected = [tx.tx_id for tx in sorted(ledger.get_wallet("w0").transactions, key=lambda tx: tx.timestamp)]
+        results = []
+
+        def read(n):
+            if n % 2:
+                results.append([tx.tx_id for tx in ledger.iter_wallet_history("w0")])
+            else:
+                page, ids = ledger.get_wallet_history("w0", limit=250), []
+                while True:
+                    ids += [tx.tx_id for tx in page.transactions]
+                    if page.next_cursor is None:
+                        break
+                    page = ledger.get_wallet_history("w0", cursor=page.next_cursor, limit=250)
+                results.append(ids)
+
+        self._run(read, threads=6)
+        self.assertEqual(len(results), 6)
+        for ids in results:
+            self.assertEqual(sorted(ids), sorted(expected))
+            self.assertEqual(len(ids), 3000)
+
+    def test_duplicate_ids_race(self):
+        ledger = self._ledger()
+        results = []
+
+        def insert(n):
+            try:
+                ledger.add_transaction("same-id", f"w{n}", f"w{n + 1}", 1.0, "sig")
+                results.append(n)
+            except ValueError:
+                pass
+
+        self._run(insert)
+        self.assertEqual(len(results), 1)
+        self.assertEqual(len(ledger.get_all_transactions()), 1)
+        self.assertTrue(ledger.verify_integrity())
+
+
+class TestStripedLock(unittest.TestCase):
+
+    def test_overlapping_sets_do_not_deadlock(self):
+        locks = StripedLock(8)
+        keys = [f"k{i}" for i in range(32)]
+
+        def worker(n):
+            rng = random.Random(n)
+            for _ in range(2000):
+                with locks.locked(*rng.sample(keys, 3)):
+                    pass
+
+        workers = [threading.Thread(target=worker, args=(n,)) for n in range(4)]
+        for w in workers:
+            w.start()
+        for w in workers:
+            w.join(timeout=30)
+            self.assertFalse(w.is_alive())
+
+    def test_same_stripe_keys(self):
+        locks = StripedLock(1)
+        with locks.locked("a", "b", "a"):
+            pass
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,193 @@
+# n1c_core/tests/test_envelope.py
+
+import os
+import tempfile
+import unittest
+from datetime import datetime, timedelta
+from n1c_core.anchor import AnchorManager
+from n1c_core.envelope import (
+    BatchHeader,
+    InclusionProof,
+    batch_root,
+    decode_envelope,
+    encode_envelope,
+    seal_batch,
+    verify_header,
+    verify_inclusion,
+)
+from n1c_core.keyring import KeyRegistry
+from n1c_core.ledger import BatchRejectedError, Ledger
+from n1c_core.merkle import MerkleIndex
+from n1c_core.models import Transaction
+from n1c_core.transaction import TransactionManager
+from n1c_core.utils import generate_raw_keypair
+from n1c_core.wal import WriteAheadLog
+from n1c_core.wallet import WalletManager
+
+START = datetime(2026, 1, 2, 3, 4, 5)
+
+
+def make_transactions(n: int, sender: str = "alice", receiver: str = "bob"):
+    return [
+        Transaction(
+            tx_id=f"tx-{i}",
+            sender=sender,
+            receiver=receiver,
+            amount=1.0 + i,
+            fee=0.0,
+            timestamp=START + timedelta(seconds=i),
+            signature="ab" * 64,
+        )
+        for i in range(n)
+    ]
+
+
+def altered(tx: Transaction, **overrides) -> Transaction:
+    fields = dict(
+        tx_id=tx.tx_id, sender=tx.sender, receiver=tx.receiver, amount=tx.amount,
+        fee=tx.fee, timestamp=tx.timestamp, signature=tx.signature,
+    )
+    fields.update(overrides)
+    return Transaction(**fields)
+
+
+class TestEnvelope(unittest.TestCase):
+
+    def setUp(self):
+        self.private_key, self.public_key = generate_raw_keypair()
+
+    # ---------------------------
+    # Sealing and Proofs
+    # ---------------------------
+    def test_every_transaction_has_a_valid_proof(self):
+        for n in (1, 2, 3, 5, 8, 9):
+            envelope = seal_batch("anchor1", make_transactions(n), self.private_key)
+            self.assertTrue(envelope.verify(self.public_key))
+            self.assertEqual(envelope.header.root, batch_root(envelope.transactions))
+            for index, tx in enumerate(envelope.transactions):
+                proof = envelope.proof(index)
+                self.assertTrue(verify_inclusion(tx, proof, envelope.header))
+                self.assertLessEqual(len(proof.siblings), n.bit_length())
+                # A proof only opens its own position
+                if n > 1:
+                    other = envelope.transactions[(index + 1) % n]
+                    self.assertFalse(verify_inclusion(other, proof, envelope.header))
+        with self.assertRaises(ValueError):
+            seal_batch("anchor1", [], self.private_key)
+        with self.assertRaises(ValueError):
+            envelope.proof(9)
+
+    def test_tampering_is_detected(self):
+        envelope = seal_batch("anchor1", make_transactions(4), self.private_key)
+        header, proof = envelope.header, envelope.proof(2)
+        tx = envelope.transactions[2]
+
+        self.assertFalse(verify_inclusion(altered(tx, amount=100.0), proof, header))
+        self.assertFalse(verify_inclusion(tx, InclusionProof(2, proof.siblings[:-1]), header))
+        self.assertFalse(verify_inclusion(tx, InclusionProof(2, proof.siblings + proof.siblings[:1]), header))
+        self.assertTrue(verify_header(header, self.public_key))
+        self.assertFalse(verify_header(header._replace(anchor_id="anchor2"), self.public_key))
+        self.assertFalse(verify_header(header._replace(count=5), self.public_key))
+        self.assertFalse(verify_header(header, generate_raw_keypair()[1]))
+
+        envelope.transactions[0] = altered(envelope.transactions[0], receiver="mallory")
+        envelope._levels = None
+        self.assertFalse(envelope.verify(self.public_key))
+
+    def test_wire_round_trip(self):
+        envelope = seal_batch("anchor1", make_transactions(5), self.private_key)
+        data = encode_envelope(envelope)
+        decoded = decode_envelope(data)
+        self.assertEqual(decoded.header, envelope.header)
+        self.assertEqual(decoded.transactions, envelope.transactions)
+        self.assertTrue(decoded.verify(self.public_key))
+        with self.assertRaises(ValueError):
+            decode_envelope(data[:-1])
+        with self.assertRaises(ValueError):
+            decode_envelope(b"XXXX" + data[4:])
+
+
+class TestLedgerAnchorBatches(unittest.TestCase):
+
+    def setUp(self):
+        self.registry = KeyRegistry()
+        wallet_manager = WalletManager(key_registry=self.registry)
+        self.alice = wallet_manager.create_wallet("alice")
+        self.bob = wallet_manager.create_wallet("bob")
+        self.anchor_private, self.anchor_public = generate_raw_keypair()
+        self.anchor = AnchorManager().register_anchor("anchor1", spread=2.0, tax_rate=1.0)
+
+    def _ledger(self, **kwargs) -> Ledger:
+        ledger = Ledger(key_registry=self.registry, verify_signatures=True, **kwargs)
+        ledger.register_anchor("anchor1", spread=2.0, tax_rate=1.0)
+        ledger.create_wallet(self.alice.address)
+        ledger.create_wallet(self.bob.address)
+        ledger.deposit(self.alice.address, 100.0)
+        return ledger
+
+    def _envelope(self, n: int, signed: bool = True):
+        if signed:
+            transactions = [
+                TransactionManager.create_transaction(
+                    self.alice, self.bob, 1.0 + i, anchor=self.anchor, key_registry=self.registry
+                )
+                for i in range(n)
+            ]
+        else:
+            transactions = make_transactions(n, self.alice.address, self.bob.address)
+        return seal_batch("anchor1", transactions, self.anchor_private)
+
+    def test_trusted_anchor_skips_sender_signatures(self):
+        # Sender signatures here are not valid: only the anchor vouches
+        envelope = self._envelope(4, signed=False)
+        ledger = self._ledger()
+        with self.assertRaises(BatchRejectedError) as ctx:
+            ledger.add_anchor_batch(envelope)
+        self.assertEqual({reason for _, _, reason in ctx.exception.rejections}, {"invalid signature"})
+
+        ledger.trust_anchor("anchor1", self.anchor_public)
+        applied = ledger.add_anchor_batch(envelope)
+        self.assertEqual([tx.tx_id for tx in applied], [tx.tx_id for tx in envelope.transactions])
+        self.assertEqual(ledger.get_wallet(self.bob.address).balance, 10.0)
+        self.assertEqual(ledger.get_transaction_anchor("tx-0"), "anchor1")
+
+    def test_forged_batch_is_rejected_whole(self):
+        ledger = self._ledger()
+        ledger.trust_anchor("anchor1", self.anchor_public)
+        envelope = self._envelope(3)
+        envelope.transactions[1] = altered(envelope.transactions[1], amount=50.0)
+        envelope._levels = None
+        with self.assertRaises(BatchRejectedError) as ctx:
+            ledger.add_anchor_batch(envelope)
+        self.assertEqual(len(ctx.exception.rejections), 3)
+        self.assertEqual(ctx.exception.applied, [])
+        self.assertEqual(ledger.get_wallet(self.alice.address).balance, 100.0)
+
+    def test_applied_transactions_audit_against_the_header(self):
+        ledger = self._ledger(merkle_index=MerkleIndex(depth=2))
+        ledger.trust_anchor("anchor1", self.anchor_public)
+        envelope = self._envelope(5)
+        ledger.add_anchor_batch(envelope)
+        # An auditor keeps only the header; the ledger's copy must match what was sealed
+        header = BatchHeader(*envelope.header)
+        for index, sealed in enumerate(envelope.transactions):
+            stored = ledger.get_transaction(sealed.tx_id)
+            self.assertTrue(verify_inclusion(stored, envelope.proof(index), header))
+
+    def test_vouched_transactions_replay(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, "ledger.wal")
+            with WriteAheadLog(path) as wal:
+                ledger = self._ledger(wal=wal)
+                ledger.trust_anchor("anchor1", self.anchor_public)
+                ledger.add_anchor_batch(self._envelope(3, signed=False))
+                balance = ledger.get_wallet(self.alice.address).balance
+
+            with WriteAheadLog(path) as wal:
+                restored = Ledger(key_registry=self.registry, verify_signatures=True, wal=wal)
+                self.assertEqual(set(restored.transactions), {"tx-0", "tx-1", "tx-2"})
+                self.assertEqual(restored.get_wallet(self.alice.address).balance, balance)
+
+
+if __name__ == "__main__":
+    unittest.main()
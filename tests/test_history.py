@@ -0,0 +1,141 @@
+# n1c_core/tests/test_history.py
+
+import os
+import tempfile
+import types
+import unittest
+from datetime import datetime, timedelta
+from n1c_core.columnar import ColumnarStorage
+from n1c_core.ledger import Ledger
+from n1c_core.storage import SQLiteStorage
+from n1c_core.wallet import WalletManager
+from n1c_core.transaction import TransactionManager
+
+
+class TestWalletHistory(unittest.TestCase):
+
+    def setUp(self):
+        self.ledger = Ledger()
+        self.ledger.create_wallet("alice")
+        self.ledger.create_wallet("bob")
+        self.ledger.deposit("alice", 1000.0)
+
+        # Ten transfers a minute apart, the last one arriving out of order
+        self.start = datetime(2026, 1, 1, 12, 0)
+        offsets = list(range(9)) + [4]
+        for i, minutes in enumerate(offsets):
+            self.ledger.add_transaction(
+                f"tx{i}", "alice", "bob", 1.0, "sig",
+                timestamp=self.start + timedelta(minutes=minutes, seconds=30 if i == 9 else 0)
+            )
+        self.expected = ["tx0", "tx1", "tx2", "tx3", "tx4", "tx9", "tx5", "tx6", "tx7", "tx8"]
+
+    def _ids(self, transactions):
+        return [tx.tx_id for tx in transactions]
+
+    def test_cursor_pagination(self):
+        seen = []
+        cursor = None
+        while True:
+            page = self.ledger.get_wallet_history("alice", cursor=cursor, limit=3)
+            seen.extend(self._ids(page.transactions))
+            cursor = page.next_cursor
+            if cursor is None:
+                break
+        self.assertEqual(seen, self.expected)
+
+    def test_time_range(self):
+        page = self.ledger.get_wallet_history(
+            "bob",
+            since=self.start + timedelta(minutes=3),
+            until=self.start + timedelta(minutes=6),
+        )
+        self.assertEqual(self._ids(page.transactions), ["tx3", "tx4", "tx9", "tx5"])
+        self.assertIsNone(page.next_cursor)
+
+    def test_new_transactions_after_cursor(self):
+        page = self.ledger.get_wallet_history("alice", limit=5)
+        self.ledger.add_transaction("tx10", "alice", "bob", 1.0, "sig", timestamp=self.start + timedelta(hours=1))
+        rest = self.ledger.get_wallet_history("alice", cursor=page.next_cursor)
+        self.assertEqual(self._ids(rest.transactions), self.expected[5:] + ["tx10"])
+
+    def test_generator_streams(self):
+        stream = self.ledger.iter_wallet_history("alice", since=self.start + timedelta(minutes=7))
+        self.assertIsInstance(stream, types.GeneratorType)
+        self.assertEqual(self._ids(stream), ["tx7", "tx8"])
+
+    def test_columnar_backend(self):
+        ledger = Ledger(storage=ColumnarStorage())
+        ledger.create_wallet("alice")
+        ledger.create_wallet("bob")
+        ledger.deposit("alice", 10.0)
+        for i in (2, 0, 1):
+            ledger.add_transaction(f"tx{i}", "alice", "bob", 1.0, "sig", timestamp=self.start + timedelta(seconds=i))
+        self.assertEqual(self._ids(ledger.iter_wallet_history("bob")), ["tx0", "tx1", "tx2"])
+
+    def test_equal_timestamps_resume_after_cursor(self):
+        ledger = Ledger()
+        ledger.create_wallet("alice")
+        ledger.create_wallet("bob")
+        ledger.deposit("alice", 10.0)
+        for i in range(7):
+            ledger.add_transaction(f"tx{i}", "alice", "bob", 1.0, "sig", timestamp=self.start)
+        seen, cursor = [], None
+        while True:
+            page = ledger.get_wallet_history("bob", cursor=cursor, limit=2)
+            seen.extend(self._ids(page.transactions))
+            cursor = page.next_cursor
+            if cursor is None:
+                break
+        self.assertEqual(seen, [f"tx{i}" for i in range(7)])
+
+    def test_sqlite_backend_pages_in_one_query(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            storage = SQLiteStorage(os.path.join(tmpdir, "ledger.db"), batch_size=4)
+            ledger = Ledger(storage=storage)
+            ledger.create_wallet("alice")
+            ledger.create_wallet("bob")
+            ledger.deposit("alice", 1000.0)
+            for tx in self.ledger.get_wallet("alice").transactions:
+                ledger.add_transaction(tx.tx_id, "alice", "bob", 1.0, "sig", timestamp=tx.timestamp)
+            ledger.add_transaction("self", "bob", "bob", 1.0, "sig", timestamp=self.start)
+            storage.flush()
+
+            statements = []
+            storage._conn.set_trace_callback(statements.append)
+            seen, cursor = [], None
+            while True:
+                page = ledger.get_wallet_history("alice", cursor=cursor, limit=3)
+                seen.extend(self._ids(page.transactions))
+                cursor = page.next_cursor
+                if cursor is None:
+                    break
+            self.assertEqual(seen, self.expected)
+            self.assertEqual(len(statements), 4)
+            storage._conn.set_trace_callback(None)
+
+            page = ledger.get_wallet_history(
+                "bob", since=self.start + timedelta(minutes=3), until=self.start + timedelta(minutes=6)
+            )
+            self.assertEqual(self._ids(page.transactions), ["tx3", "tx4", "tx9", "tx5"])
+            self.assertEqual(self._ids(ledger.iter_wallet_history("bob")), ["tx0", "self"] + self.expected[1:])
+            storage.close()
+
+    def test_wallet_manager_pages(self):
+        wallet_manager = WalletManager()
+        alice = wallet_manager.create_wallet("Alice")
+        bob = wallet_manager.create_wallet("Bob")
+        alice.balance = 100.0
+        for _ in range(3):
+            tx = TransactionManager.create_transaction(alice, bob, 1.0)
+            TransactionManager.apply_transaction(tx, alice, bob)
+
+        page = wallet_manager.get_transaction_page(bob.address, limit=2)
+        self.assertEqual(len(page.transactions), 2)
+        rest = wallet_manager.get_transaction_page(bob.address, cursor=page.next_cursor)
+        self.assertEqual(len(rest.transactions), 1)
+        self.assertEqual(len(list(wallet_manager.iter_transactions(alice.address))), 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,111 @@
+# n1c_core/tests/test_ingest.py
+
+import asyncio
+import threading
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from n1c_core.ingest import IngestQueue
+from n1c_core.ledger import BatchRejectedError, Ledger
+
+
+class TestIngestQueue(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        self.ledger = Ledger()
+        self.ledger.create_wallet("alice")
+        self.ledger.create_wallet("bob")
+        self.ledger.deposit("alice", 100.0)
+
+    async def test_micro_batches(self):
+        async with IngestQueue(self.ledger, batch_size=16, batch_deadline_ms=50) as queue:
+            results = await asyncio.gather(*(
+                queue.submit(f"tx{i}", "alice", "bob", 1.0, "sig") for i in range(40)
+            ))
+        self.assertEqual([tx.tx_id for tx in results], [f"tx{i}" for i in range(40)])
+        self.assertEqual(self.ledger.get_wallet("bob").balance, 40.0)
+        self.assertLessEqual(queue.batches, 4)
+        self.assertEqual(queue.applied, 40)
+
+    async def test_rejections_are_per_submitter(self):
+        async with IngestQueue(self.ledger, batch_deadline_ms=50) as queue:
+            results = await asyncio.gather(
+                queue.submit("tx1", "alice", "bob", 60.0, "sig"),
+                queue.submit("tx2", "alice", "bob", 60.0, "sig"),     # overdraws
+                queue.submit("tx3", "alice", "nobody", 1.0, "sig"),
+                queue.submit("tx4", "bob", "alice", 10.0, "sig"),
+                return_exceptions=True,
+            )
+        self.assertEqual(results[0].tx_id, "tx1")
+        self.assertIsInstance(results[1], ValueError)
+        self.assertIn("validation failed", str(results[1]))
+        self.assertIsInstance(results[2], ValueError)
+        self.assertEqual(results[3].tx_id, "tx4")
+        self.assertEqual(queue.rejected, 2)
+        self.assertTrue(self.ledger.verify_integrity())
+
+    async def test_unexpected_errors_stay_with_their_submitter(self):
+        async with IngestQueue(self.ledger, batch_deadline_ms=50) as queue:
+            results = await asyncio.gather(
+                queue.submit("tx1", "alice", "bob", 1.0, "sig"),
+                queue.submit("tx2", "alice", "bob", "ten", "sig"),    # fails the whole ledger call
+                queue.submit("tx3", "alice", "bob", 2.0, "sig"),
+                return_exceptions=True,
+            )
+        self.assertEqual(results[0].tx_id, "tx1")
+        self.assertIsInstance(results[1], TypeError)
+        self.assertEqual(results[2].tx_id, "tx3")
+        self.assertEqual((queue.batches, queue.applied, queue.rejected), (1, 2, 1))
+        self.assertEqual(self.ledger.get_wallet("bob").balance, 3.0)
+
+    async def test_backpressure(self):
+        release = threading.Event()
+        executor = ThreadPoolExecutor(max_workers=1)
+        executor.submit(release.wait)   # occupy the only worker
+
+        try:
+            queue = IngestQueue(self.ledger, max_depth=2, batch_size=1, batch_deadline_ms=0, executor=executor)
+            await queue.start()
+            tasks = [asyncio.create_task(queue.submit(f"tx{i}", "alice", "bob", 1.0, "sig")) for i in range(5)]
+            await asyncio.sleep(0.05)
+
+            # One batch is waiting for the executor, two items fill the queue,
+            # and the remaining submitters are held back
+            self.assertEqual(queue.depth, 2)
+            self.assertFalse(any(task.done() for task in tasks))
+
+            release.set()
+            results = await asyncio.gather(*tasks)
+            await queue.close()
+        finally:
+            release.set()
+            executor.shutdown()
+        self.assertEqual(len(results), 5)
+        self.assertEqual(self.ledger.get_wallet("bob").balance, 5.0)
+
+    async def test_closed_queue(self):
+        queue = IngestQueue(self.ledger)
+        with self.assertRaises(ValueError):
+            await queue.submit("tx1", "alice", "bob", 1.0, "sig")
+
+
+class TestNonAtomicBatch(unittest.TestCase):
+
+    def test_valid_items_are_applied(self):
+        ledger = Ledger()
+        ledger.create_wallet("alice")
+        ledger.create_wallet("bob")
+        ledger.deposit("alice", 10.0)
+        with self.assertRaises(BatchRejectedError) as ctx:
+            ledger.add_transactions([
+                ("tx1", "alice", "bob", 4.0, "sig"),
+                ("tx2", "alice", "bob", 40.0, "sig"),
+                ("tx3", "alice", "bob", 4.0, "sig"),
+            ], atomic=False)
+        self.assertEqual([tx.tx_id for tx in ctx.exception.applied], ["tx1", "tx3"])
+        self.assertEqual(ctx.exception.rejections, [(1, "tx2", "validation failed")])
+        self.assertEqual(ledger.get_wallet("bob").balance, 8.0)
+        self.assertTrue(ledger.verify_integrity())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,104 @@
+# n1c_core/tests/test_keyring.py
+
+import unittest
+from n1c_core.keyring import KeyRegistry
+from n1c_core.wallet import WalletManager
+from n1c_core.transaction import TransactionManager
+from n1c_core.ledger import Ledger
+from n1c_core.utils import generate_keypair, generate_raw_keypair
+
+
+class TestKeyRegistry(unittest.TestCase):
+
+    def setUp(self):
+        self.registry = KeyRegistry(capacity=2)
+        self.wallet_manager = WalletManager(key_registry=self.registry)
+
+        self.alice = self.wallet_manager.create_wallet("Alice")
+        self.bob = self.wallet_manager.create_wallet("Bob")
+        self.alice.balance = 1000.0
+
+    # ---------------------------
+    # Registry Tests
+    # ---------------------------
+    def test_register_pem_and_raw(self):
+        private_pem, public_pem = generate_keypair()
+        self.registry.register("pem_wallet", public_pem, private_pem)
+        self.assertEqual(len(self.registry.get_public_key_bytes("pem_wallet")), 32)
+        self.assertIsNotNone(self.registry.get_private_key("pem_wallet"))
+        self.assertIsNone(self.registry.get_public_key("unknown_wallet"))
+
+    def test_cache_hits_and_misses(self):
+        self.registry.get_public_key(self.alice.address)
+        self.registry.get_public_key(self.alice.address)
+        stats = self.registry.stats()
+        self.assertEqual(stats["misses"], 1)
+        self.assertEqual(stats["hits"], 1)
+
+    def test_lru_eviction(self):
+        _, public_key = generate_raw_keypair()
+        self.registry.register("carol", public_key)
+
+        self.registry.get_public_key(self.alice.address)
+        self.registry.get_public_key(self.bob.address)
+        self.registry.get_public_key(self.alice.address)  # bob is now least recent
+        self.registry.get_public_key("carol")
+        self.assertEqual(self.registry.evictions, 1)
+
+        # Evicted keys are decoded again from the raw store
+        self.assertIsNotNone(self.registry.get_public_key(self.bob.address))
+        self.assertEqual(self.registry.stats()["misses"], 4)
+
+    # ---------------------------
+    # Resolution Through the Registry
+    # ---------------------------
+    def test_valid_transaction_resolves_key(self):
+        tx = TransactionManager.create_transaction(
+            sender_wallet=self.alice,
+            receiver_wallet=self.bob,
+            amount=100.0,
+            key_registry=self.registry
+        )
+        self.assertTrue(TransactionManager.is_valid_transaction(
+            tx, self.alice, self.bob, key_registry=self.registry
+        ))
+
+        tx.amount = 999.0
+        self.assertFalse(TransactionManager.is_valid_transaction(
+            tx, self.alice, self.bob, key_registry=self.registry
+        ))
+
+    def test_ledger_verifies_signatures(self):
+        ledger = Ledger(key_registry=self.registry, verify_signatures=True)
+        sender = ledger.create_wallet(self.alice.address)
+        ledger.create_wallet(self.bob.address)
+        sender.balance = 1000.0
+
+        tx = TransactionManager.create_transaction(
+            sender_wallet=self.alice,
+            receiver_wallet=self.bob,
+            amount=100.0,
+            key_registry=self.registry
+        )
+        ledger.add_transaction(
+            tx_id=tx.tx_id,
+            sender_address=tx.sender,
+            receiver_address=tx.receiver,
+            amount=tx.amount,
+            signature=tx.signature,
+            timestamp=tx.timestamp
+        )
+        self.assertIn(tx.tx_id, ledger.transactions)
+
+        with self.assertRaises(ValueError):
+            ledger.add_transaction(
+                tx_id="forged",
+                sender_address=self.alice.address,
+                receiver_address=self.bob.address,
+                amount=100.0,
+                signature="00" * 64
+            )
+
+
+if __name__ == "__main__":
+    unittest.main()
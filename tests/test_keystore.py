@@ -0,0 +1,142 @@
+# n1c_core/tests/test_keystore.py
+
+import os
+import stat
+import tempfile
+import unittest
+from pathlib import Path
+from n1c_core.keystore import DATA_FILE, INDEX_FILE, Keystore
+from n1c_core.keyring import KeyRegistry, load_private_key, public_key_bytes
+from n1c_core.wallet import WalletManager
+from n1c_core.ledger import Ledger
+from n1c_core.transaction import TransactionManager
+from n1c_core.utils import generate_raw_keypairs
+
+
+class TestKeystore(unittest.TestCase):
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.directory = Path(self._tmp.name) / "keys"
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def _keypairs(self, n: int, prefix: str = "n1c_"):
+        return [
+            (f"{prefix}{i}", public_key, private_key)
+            for i, (private_key, public_key) in enumerate(generate_raw_keypairs(n, workers=1))
+        ]
+
+    # ---------------------------
+    # Keystore Tests
+    # ---------------------------
+    def test_keys_survive_reopen_with_and_without_index(self):
+        keypairs = self._keypairs(20)
+        with Keystore(self.directory, index_tail_limit=8) as keystore:
+            keystore.add_many(keypairs[:10])      # indexed: tail limit reached
+            for keypair in keypairs[10:]:
+                keystore.add(*keypair)            # 2 of these stay in the tail
+            self.assertEqual(keystore.get("n1c_3"), keypairs[3][1:])
+            self.assertEqual(keystore.get("n1c_19"), keypairs[19][1:])
+
+        with Keystore(self.directory) as keystore:
+            self.assertEqual(len(keystore), 20)
+            self.assertEqual(list(keystore.addresses()), [address for address, _, _ in keypairs])
+            for address, public_key, private_key in keypairs:
+                self.assertEqual(keystore.get(address), (public_key, private_key))
+            self.assertIsNone(keystore.get("n1c_missing"))
+
+        # A lost index is rebuilt from the data file
+        os.remove(self.directory / INDEX_FILE)
+        with Keystore(self.directory) as keystore:
+            self.assertEqual(keystore.get_private_key_bytes("n1c_7"), keypairs[7][2])
+
+    def test_duplicates_and_bad_keys_write_nothing(self):
+        keypairs = self._keypairs(3)
+        with Keystore(self.directory) as keystore:
+            keystore.add(*keypairs[0])
+            with self.assertRaises(ValueError):
+                keystore.add_many(keypairs)                      # n1c_0 already stored
+            with self.assertRaises(ValueError):
+                keystore.add_many([keypairs[1], keypairs[1]])    # repeated in the batch
+            with self.assertRaises(ValueError):
+                keystore.add("n1c_short", b"\0" * 31, b"\0" * 32)
+            self.assertEqual(len(keystore), 1)
+
+    def test_torn_tail_is_truncated(self):
+        keypairs = self._keypairs(3)
+        with Keystore(self.directory) as keystore:
+            keystore.add_many(keypairs[:2])
+            keystore.add(*keypairs[2])
+        data_path = self.directory / DATA_FILE
+        with open(data_path, "r+b") as f:
+            f.truncate(os.path.getsize(data_path) - 5)
+        os.remove(self.directory / INDEX_FILE)
+
+        with Keystore(self.directory) as keystore:
+            self.assertEqual(len(keystore), 2)
+            self.assertIsNone(keystore.get("n1c_2"))
+            keystore.add(*keypairs[2])
+            self.assertEqual(keystore.get("n1c_2"), keypairs[2][1:])
+
+    def test_files_are_owner_only(self):
+        def modes():
+            paths = (self.directory, self.directory / DATA_FILE, self.directory / INDEX_FILE)
+            return [stat.S_IMODE(os.stat(path).st_mode) for path in paths]
+
+        umask = os.umask(0o022)
+        try:
+            with Keystore(self.directory) as keystore:
+                keystore.add(*self._keypairs(1)[0])
+            self.assertEqual(modes(), [0o700, 0o600, 0o600])
+
+            # A keystore left readable by an older version is narrowed on open
+            os.chmod(self.directory, 0o755)
+            os.chmod(self.directory / DATA_FILE, 0o644)
+            os.chmod(self.directory / INDEX_FILE, 0o644)
+            Keystore(self.directory).close()
+            self.assertEqual(modes(), [0o700, 0o600, 0o600])
+        finally:
+            os.umask(umask)
+
+    # ---------------------------
+    # Bulk Wallet Tests
+    # ---------------------------
+    def test_parallel_keypairs_match_their_seeds(self):
+        keypairs = generate_raw_keypairs(10, workers=2, chunk_size=4)
+        self.assertEqual(len(keypairs), 10)
+        for private_key, public_key in keypairs:
+            self.assertEqual(public_key_bytes(load_private_key(private_key).public_key()), public_key)
+
+    def test_create_wallets_signs_through_keystore(self):
+        with Keystore(self.directory) as keystore:
+            registry = KeyRegistry(capacity=4)
+            manager = WalletManager(key_registry=registry, keystore=keystore)
+            wallets = manager.create_wallets(50, owner_name="community", workers=2)
+            self.assertEqual(len({wallet.address for wallet in wallets}), 50)
+            self.assertEqual(len(keystore), 50)
+            self.assertEqual(registry.stats()["keys"], 50)
+            # Keys held in memory as well as on disk count once
+            private_key, public_key = generate_raw_keypairs(1)[0]
+            registry.register(wallets[0].address, keystore.get_public_key_bytes(wallets[0].address))
+            registry.register("memory_only", public_key, private_key)
+            self.assertEqual(len(registry), 51)
+
+            sender, receiver = wallets[0], wallets[1]
+            ledger = Ledger(key_registry=registry, verify_signatures=True)
+            ledger.create_wallet(sender.address)
+            ledger.create_wallet(receiver.address)
+            ledger.deposit(sender.address, 100.0)
+            tx = TransactionManager.create_transaction(
+                sender_wallet=sender,
+                receiver_wallet=receiver,
+                amount=10.0,
+                key_registry=registry,
+            )
+            ledger.add_transaction(tx.tx_id, sender.address, receiver.address, tx.amount, tx.signature, timestamp=tx.timestamp)
+            self.assertEqual(ledger.get_wallet(receiver.address).balance, 10.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -4,7 +4,7 @@ import unittest
 from datetime import datetime
 from n1c_core.wallet import WalletManager
 from n1c_core.transaction import TransactionManager
-from n1c_core.ledger import Ledger
+from n1c_core.ledger import Ledger, BatchRejectedError
 from n1c_core.anchor import AnchorManager
 from n1c_core.utils import generate_keypair
 
@@ -148,5 +148,78 @@ class TestLedger(unittest.TestCase):
         self.assertAlmostEqual(tax, 2.0)
 
 
+class TestLedgerBatch(unittest.TestCase):
+
+    def setUp(self):
+        self.ledger = Ledger()
+        self.alice = self.ledger.create_wallet("alice")
+        self.bob = self.ledger.create_wallet("bob")
+        self.carol = self.ledger.create_wallet("carol")
+        self.alice.balance = 100.0
+        self.ledger.register_anchor("anchor1", spread=5.0, tax_rate=2.0)
+
+    def test_batch_applies_with_running_balances(self):
+        txs = self.ledger.add_transactions([
+            ("b1", "alice", "bob", 80.0, "sig"),
+            {"tx_id": "b2", "sender_address": "bob", "receiver_address": "carol",
+             "amount": 50.0, "signature": "sig", "anchor_id": "anchor1"},
+        ])
+        self.assertEqual([tx.tx_id for tx in txs], ["b1", "b2"])
+        self.assertAlmostEqual(self.alice.balance, 20.0)
+        self.assertAlmostEqual(self.bob.balance, 80.0 - 50.0 - 2.5 - 1.0)
+        self.assertAlmostEqual(self.carol.balance, 50.0)
+        self.assertIn("b2", self.ledger.transactions)
+
+    def test_batch_is_all_or_nothing(self):
+        self.ledger.add_transaction("t0", "alice", "bob", 10.0, "sig")
+        with self.assertRaises(BatchRejectedError) as ctx:
+            self.ledger.add_transactions([
+                ("b1", "alice", "carol", 20.0, "sig"),
+                ("b1", "alice", "carol", 1.0, "sig"),
+                ("t0", "alice", "carol", 1.0, "sig"),
+                ("b2", "alice", "nobody", 1.0, "sig"),
+                ("b3", "carol", "bob", 500.0, "sig"),
+            ])
+        self.assertEqual([index for index, _, _ in ctx.exception.rejections], [1, 2, 3, 4])
+
+        # Nothing from the failed batch was applied
+        self.assertAlmostEqual(self.alice.balance, 90.0)
+        self.assertAlmostEqual(self.carol.balance, 0.0)
+        self.assertNotIn("b1", self.ledger.transactions)
+        self.assertEqual(len(self.carol.transactions), 0)
+
+
+class TestLedgerAudit(unittest.TestCase):
+
+    def setUp(self):
+        self.ledger = Ledger()
+        for address in ("alice", "bob", "carol"):
+            self.ledger.create_wallet(address)
+        self.ledger.register_anchor("anchor1", spread=5.0, tax_rate=2.0)
+        self.ledger.deposit("alice", 100.0)
+        self.ledger.add_transaction("tx1", "alice", "bob", 50.0, "sig", anchor_id="anchor1")
+
+    def test_consistent_ledger_passes(self):
+        self.assertEqual(self.ledger.audit(), [])
+        self.assertTrue(self.ledger.verify_integrity())
+
+    def test_audit_only_checks_changed_wallets(self):
+        self.ledger.audit()
+        self.ledger.get_wallet("carol").balance = 999.0  # tampered, but untouched since
+
+        self.ledger.add_transaction("tx2", "bob", "alice", 10.0, "sig")
+        self.assertEqual(self.ledger.audit(), [])
+        self.assertEqual(self.ledger.audit(full=True), ["carol"])
+
+    def test_audit_does_not_mutate_balances(self):
+        bob = self.ledger.get_wallet("bob")
+        bob.balance += 1.0
+        self.assertEqual(self.ledger.audit(), ["bob"])
+        self.assertFalse(self.ledger.verify_integrity())
+        self.assertAlmostEqual(bob.balance, 51.0)
+        # Inconsistent wallets stay flagged until fixed
+        self.assertEqual(self.ledger.audit(), ["bob"])
+
+
 if __name__ == "__main__":
     unittest.main()
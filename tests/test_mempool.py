@@ -0,0 +1,133 @@
+# n1c_core/tests/test_mempool.py
+
+import unittest
+from n1c_core.ledger import Ledger
+from n1c_core.mempool import Mempool
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestMempool(unittest.TestCase):
+
+    def setUp(self):
+        self.ledger = Ledger()
+        for address in ("alice", "bob", "carol", "dave"):
+            self.ledger.create_wallet(address)
+        self.ledger.deposit("alice", 10.0)
+
+        self.clock = FakeClock()
+        self.applied = []
+        self.dropped = []
+        self.mempool = Mempool(
+            self.ledger, ttl=30.0, clock=self.clock,
+            on_applied=lambda tx: self.applied.append(tx.tx_id),
+            on_dropped=lambda tx_id, reason: self.dropped.append((tx_id, reason)),
+        )
+
+    def test_funded_transactions_apply_immediately(self):
+        tx = self.mempool.submit("tx1", "alice", "bob", 5.0, "sig")
+        self.assertEqual(tx.tx_id, "tx1")
+        self.assertEqual(len(self.mempool), 0)
+
+    def test_chain_released_when_funds_land(self):
+        # Submitted in reverse dependency order
+        self.assertIsNone(self.mempool.submit("tx3", "carol", "dave", 4.0, "sig"))
+        self.assertIsNone(self.mempool.submit("tx2", "bob", "carol", 6.0, "sig"))
+        self.assertEqual(len(self.mempool), 2)
+
+        self.mempool.submit("tx1", "alice", "bob", 8.0, "sig")
+        self.assertEqual(self.applied, ["tx2", "tx3"])
+        self.assertEqual(len(self.mempool), 0)
+        self.assertEqual(self.mempool.nbytes, 0)
+        self.assertEqual(self.ledger.get_wallet("dave").balance, 4.0)
+        self.assertTrue(self.ledger.verify_integrity())
+
+    def test_sender_order_is_kept(self):
+        self.mempool.submit("tx1", "bob", "carol", 5.0, "sig")
+        # bob has an earlier parked transaction, so this one waits too
+        self.mempool.submit("tx2", "bob", "carol", 1.0, "sig")
+        self.ledger.deposit("bob", 5.5)
+        self.assertEqual(self.applied, ["tx1"])
+        self.ledger.deposit("bob", 0.5)
+        self.assertEqual(self.applied, ["tx1", "tx2"])
+
+    def test_direct_ledger_credits_release(self):
+        self.mempool.submit("tx1", "bob", "carol", 3.0, "sig")
+        self.ledger.add_transaction("direct", "alice", "bob", 3.0, "sig")
+        self.assertEqual(self.applied, ["tx1"])
+
+    def test_expiry(self):
+        self.mempool.submit("tx1", "bob", "carol", 3.0, "sig")
+        self.clock.now = 31.0
+        self.ledger.deposit("bob", 3.0)
+        self.assertEqual(self.dropped, [("tx1", "expired")])
+        self.assertEqual(self.ledger.get_wallet("carol").balance, 0.0)
+
+        self.mempool.submit("tx2", "bob", "carol", 30.0, "sig")
+        self.clock.now = 62.0
+        self.assertEqual(self.mempool.expire(), 1)
+        self.assertEqual(len(self.mempool), 0)
+
+    def test_memory_cap(self):
+        mempool = Mempool(Ledger(), max_bytes=1000)
+        mempool.ledger.create_wallet("x")
+        mempool.ledger.create_wallet("y")
+        with self.assertRaises(ValueError):
+            for i in range(100):
+                mempool.submit(f"tx{i}", "x", "y", 1.0, "sig")
+        self.assertLessEqual(mempool.nbytes, 1000)
+        self.assertGreater(len(mempool), 0)
+
+    def test_invalid_transactions_are_not_parked(self):
+        with self.assertRaises(ValueError):
+            self.mempool.submit("tx1", "bob", "nobody", 3.0, "sig")
+        with self.assertRaises(ValueError):
+            self.mempool.submit("tx2", "bob", "carol", -1.0, "sig")
+        self.mempool.submit("tx3", "bob", "carol", 3.0, "sig")
+        with self.assertRaises(ValueError):
+            self.mempool.submit("tx3", "bob", "carol", 3.0, "sig")
+        self.assertEqual(len(self.mempool), 1)
+
+    def test_non_finite_amount_is_not_parked_behind_another(self):
+        self.mempool.submit("tx1", "bob", "carol", 3.0, "sig")
+        with self.assertRaises(ValueError):
+            self.mempool.submit("tx2", "bob", "carol", float("nan"), "sig")
+        self.ledger.deposit("bob", 10.0)
+        self.assertEqual(self.applied, ["tx1"])
+        self.assertEqual(self.ledger.get_wallet("bob").balance, 7.0)
+
+    def test_unpriceable_entry_is_dropped_on_release(self):
+        self.mempool.submit("tx1", "bob", "carol", 3.0, "sig")
+        self.mempool.submit("tx2", "bob", "carol", 1.0, "sig")
+        # An entry that can no longer be priced must not block its queue
+        entry = self.mempool._pending["tx1"]
+        bad = entry._replace(amount=float("nan"))
+        self.mempool._pending["tx1"] = self.mempool._by_sender["bob"]["tx1"] = bad
+        self.ledger.deposit("bob", 10.0)
+        self.assertEqual(self.dropped[0][0], "tx1")
+        self.assertEqual(self.applied, ["tx2"])
+
+    def test_listener_errors_do_not_reject_applied_writes(self):
+        def broken(address):
+            raise RuntimeError("listener failed")
+
+        self.ledger.credit_listeners.insert(0, broken)
+        with self.assertLogs("n1c_core.ledger", level="ERROR"):
+            self.ledger.deposit("bob", 4.0)
+        self.assertEqual(self.ledger.get_wallet("bob").balance, 4.0)
+        with self.assertLogs("n1c_core.ledger", level="ERROR"):
+            tx = self.ledger.add_transaction("tx1", "alice", "bob", 1.0, "sig")
+        self.assertEqual(tx.tx_id, "tx1")
+        with self.assertLogs("n1c_core.ledger", level="ERROR"):
+            self.ledger.add_transactions([("tx2", "alice", "bob", 1.0, "sig")])
+        self.assertTrue(self.ledger.has_transaction("tx2"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,100 @@
+# n1c_core/tests/test_metrics.py
+
+import unittest
+from unittest import mock
+from n1c_core import config
+from n1c_core.ledger import BatchRejectedError, Ledger, TransactionRejectedError
+from n1c_core.metrics import Histogram, LedgerMetrics
+
+SIGNATURE = "ab" * 64
+
+
+class TestHistogram(unittest.TestCase):
+
+    def test_cumulative_buckets(self):
+        histogram = Histogram([0.1, 1.0])
+        for value in (0.05, 0.1, 0.5, 3.0):
+            histogram.observe(value)
+        samples = histogram.samples("t", ())
+        self.assertEqual([s.value for s in samples], [2, 3, 4, 3.65, 4])
+        self.assertEqual(samples[2].labels, (("le", "+Inf"),))
+
+
+class TestLedgerMetrics(unittest.TestCase):
+
+    def setUp(self):
+        self.metrics = LedgerMetrics()
+        self.ledger = Ledger(metrics=self.metrics)
+        for address in ("alice", "bob"):
+            self.ledger.create_wallet(address)
+        self.ledger.deposit("alice", 100.0)
+
+    def test_counts_and_phases(self):
+        self.ledger.add_transaction("tx1", "alice", "bob", 10.0, SIGNATURE)
+        self.ledger.add_transaction("tx2", "alice", "bob", 10.0, SIGNATURE)
+        for args in (("tx1", "alice", "bob", 1.0), ("tx3", "alice", "carol", 1.0), ("tx4", "alice", "bob", 1e6)):
+            with self.assertRaises(TransactionRejectedError):
+                self.ledger.add_transaction(*args, SIGNATURE)
+        with self.assertRaises(BatchRejectedError):
+            self.ledger.add_transactions(
+                [("tx5", "alice", "bob", 1.0, SIGNATURE), ("tx1", "alice", "bob", 1.0, SIGNATURE)], atomic=False
+            )
+
+        self.assertEqual(self.metrics.accepted, {"single": 2, "batch": 1})
+        self.assertEqual(self.metrics.rejected, {"duplicate": 2, "unknown_wallet": 1, "validation": 1})
+        # tx4 got as far as validation; the other rejections never finished a phase
+        counts = {phase: self.metrics.phases[("single", phase)].count
+                  for phase in ("lookup", "fee", "validation", "signature", "apply")}
+        self.assertEqual(counts, {"lookup": 3, "fee": 3, "validation": 2, "signature": 2, "apply": 2})
+        self.assertEqual(self.metrics.operations["single"].count, 5)
+        self.assertEqual(self.metrics.phases[("batch", "apply")].count, 1)
+
+    def test_unexpected_errors_are_recorded(self):
+        with mock.patch.object(self.ledger, "_apply_transaction", side_effect=RuntimeError("disk")):
+            with self.assertRaises(RuntimeError):
+                self.ledger.add_transaction("tx1", "alice", "bob", 1.0, SIGNATURE)
+        with mock.patch.object(self.ledger, "_apply_batch", side_effect=RuntimeError("disk")):
+            with self.assertRaises(RuntimeError):
+                self.ledger.add_transactions(
+                    [("tx2", "alice", "bob", 1.0, SIGNATURE), ("tx3", "alice", "bob", 1.0, SIGNATURE)]
+                )
+
+        self.assertEqual(self.metrics.accepted, {})
+        self.assertEqual(self.metrics.rejected, {"error": 3})
+        self.assertEqual(self.metrics.operations["single"].count, 1)
+        self.assertEqual(self.metrics.operations["batch"].count, 1)
+
+    def test_prometheus_text_and_sinks(self):
+        self.ledger.add_transaction("tx1", "alice", "bob", 10.0, SIGNATURE)
+        text = self.metrics.render_prometheus()
+        self.assertIn("# TYPE n1c_ledger_phase_seconds histogram", text)
+        self.assertIn('n1c_ledger_phase_seconds_count{path="single",phase="signature"} 1', text)
+        self.assertIn('n1c_ledger_phase_seconds_bucket{path="single",phase="apply",le="+Inf"} 1', text)
+        self.assertIn('n1c_ledger_transactions_accepted_total{path="single"} 1', text)
+        self.assertIn('n1c_ledger_wallets{ledger="0"} 2', text)
+        self.assertIn('n1c_ledger_transactions{ledger="0"} 1', text)
+
+        received = []
+        self.metrics.add_sink(received.append)
+        self.metrics.publish()
+        self.assertEqual(len(received), 1)
+        self.assertIn("n1c_ledger_transactions", [family.name for family in received[0]])
+
+    def test_ledgers_sharing_metrics_keep_their_gauges(self):
+        other = Ledger(metrics=self.metrics)
+        other.create_wallet("carol")
+        text = self.metrics.render_prometheus()
+        self.assertIn('n1c_ledger_wallets{ledger="0"} 2', text)
+        self.assertIn('n1c_ledger_wallets{ledger="1"} 1', text)
+        self.assertEqual(text.count("# TYPE n1c_ledger_wallets gauge"), 1)
+        with self.assertRaises(ValueError):
+            self.metrics.add_gauge("n1c_ledger_wallets", "Wallets in the ledger.", lambda: 0, (("ledger", "1"),))
+
+    def test_enabled_through_config(self):
+        self.assertIsNone(Ledger().metrics)
+        with mock.patch.object(config, "METRICS_ENABLED", True):
+            self.assertIsInstance(Ledger().metrics, LedgerMetrics)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,80 @@
+# n1c_core/tests/test_payouts.py
+
+import unittest
+from n1c_core.keyring import KeyRegistry
+from n1c_core.wallet import WalletManager
+from n1c_core.transaction import TransactionManager
+from n1c_core.anchor import AnchorManager
+from n1c_core.ledger import Ledger
+from n1c_core.amount import fee_and_tax, from_minor, to_minor
+from n1c_core.utils import sign_transactions, verify_signature
+
+
+class TestPayouts(unittest.TestCase):
+
+    def setUp(self):
+        self.registry = KeyRegistry()
+        self.wallet_manager = WalletManager(key_registry=self.registry)
+        self.anchor = AnchorManager().register_anchor("anchor1", spread=2.0, tax_rate=1.0)
+
+        self.payer = self.wallet_manager.create_wallet("Payroll")
+        self.payer.balance = 1000.0
+        self.receivers = self.wallet_manager.create_wallets(20, owner_name="Staff", workers=1)
+
+        self.ledger = Ledger(key_registry=self.registry, verify_signatures=True)
+        self.ledger.register_anchor("anchor1", spread=2.0, tax_rate=1.0)
+        for wallet in [self.payer] + self.receivers:
+            self.ledger.create_wallet(wallet.address)
+        self.ledger.deposit(self.payer.address, 1000.0)
+
+    def test_batch_applies_atomically_with_valid_signatures(self):
+        payouts = [(wallet, 10.0 + i) for i, wallet in enumerate(self.receivers[:10])]
+        payouts += [(wallet.address, 5.0) for wallet in self.receivers[10:]]
+        batch = TransactionManager.create_transactions(
+            self.payer, payouts, self.anchor, key_registry=self.registry, workers=1
+        )
+        self.assertEqual(len({item.tx_id for item in batch}), 20)
+        self.assertEqual(len({item.timestamp for item in batch}), 1)
+
+        applied = self.ledger.add_transactions(batch)
+        self.assertEqual([tx.tx_id for tx in applied], [item.tx_id for item in batch])
+
+        debit = 0
+        for _, amount in payouts:
+            fee, tax = fee_and_tax(to_minor(amount), 2.0, 1.0)
+            debit += to_minor(amount) + fee + tax
+        self.assertEqual(self.ledger.get_wallet(self.payer.address).balance, from_minor(to_minor(1000.0) - debit))
+        self.assertEqual(self.ledger.get_wallet(self.receivers[3].address).balance, 13.0)
+
+    def test_rejects_before_signing(self):
+        with self.assertRaises(ValueError) as ctx:
+            TransactionManager.create_transactions(
+                self.payer, [(wallet, 100.0) for wallet in self.receivers[:10]], self.anchor,
+                key_registry=self.registry,
+            )
+        self.assertIn("Insufficient balance", str(ctx.exception))
+        with self.assertRaises(ValueError):
+            TransactionManager.create_transactions(
+                self.payer, [(self.receivers[0], 0.0)], key_registry=self.registry
+            )
+        with self.assertRaises(ValueError) as ctx:
+            TransactionManager.create_transactions(
+                self.payer, [(self.receivers[0], 1e13)], key_registry=self.registry
+            )
+        self.assertIn("out of range", str(ctx.exception))
+        self.assertEqual(TransactionManager.create_transactions(self.payer, []), [])
+
+    def test_parallel_signing_matches_inline(self):
+        batch = TransactionManager.create_transactions(
+            self.payer, [(wallet, 1.0) for wallet in self.receivers], key_registry=self.registry, workers=1
+        )
+        transactions = self.ledger.add_transactions(batch)
+        private_key = self.registry.get_private_key(self.payer.address)
+        signatures = sign_transactions(transactions, private_key, workers=2, chunk_size=6)
+        self.assertEqual(signatures, [item.signature for item in batch])
+        public_key = self.registry.get_public_key(self.payer.address)
+        self.assertTrue(all(verify_signature(tx, public_key) for tx in transactions))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,191 @@
+# n1c_core/tests/test_rollups.py
+
+import os
+import tempfile
+import unittest
+from datetime import datetime, timedelta
+from n1c_core.amount import fee_and_tax, from_minor, to_minor
+from n1c_core.columnar import ColumnarStorage
+from n1c_core.errors import BatchRejectedError, TransactionRejectedError
+from n1c_core.ledger import Ledger
+from n1c_core.rollups import AnchorRollups, RollupTotals
+from n1c_core.snapshot import SnapshotStore, decode_snapshot, encode_snapshot
+from n1c_core.storage import SQLiteStorage
+from n1c_core.wal import WriteAheadLog
+
+START = datetime(2024, 3, 1, 23, 30)
+
+
+class TestAnchorRollups(unittest.TestCase):
+
+    def setUp(self):
+        self.ledger = Ledger()
+        self.ledger.register_anchor("anchor1", spread=2.0, tax_rate=1.0)
+        self.ledger.register_anchor("anchor2", spread=5.0, tax_rate=0.0)
+        for address in ("alice", "bob"):
+            self.ledger.create_wallet(address)
+        self.ledger.deposit("alice", 10_000.0)
+
+    def _expected(self, amounts, spread=2.0, tax_rate=1.0) -> RollupTotals:
+        fees = taxes = 0
+        for amount in amounts:
+            fee, tax = fee_and_tax(to_minor(amount), spread, tax_rate)
+            fees, taxes = fees + fee, taxes + tax
+        return RollupTotals(len(amounts), from_minor(sum(map(to_minor, amounts))), from_minor(fees), from_minor(taxes))
+
+    # ---------------------------
+    # Ledger Reports
+    # ---------------------------
+    def test_single_and_batch_transactions_are_rolled_up(self):
+        # 23:30 .. 00:29 across midnight, one transfer every 20 minutes
+        for i in range(3):
+            self.ledger.add_transaction(
+                f"tx{i}", "alice", "bob", 10.0 + i, "sig", anchor_id="anchor1",
+                timestamp=START + timedelta(minutes=20 * i),
+            )
+        batch = [
+            {"tx_id": "tx3", "sender_address": "alice", "receiver_address": "bob", "amount": 7.0,
+             "signature": "sig", "anchor_id": "anchor1", "timestamp": START + timedelta(minutes=45)},
+            {"tx_id": "tx4", "sender_address": "alice", "receiver_address": "bob", "amount": 3.0,
+             "signature": "sig", "anchor_id": "anchor2", "timestamp": START},
+            {"tx_id": "tx5", "sender_address": "alice", "receiver_address": "bob", "amount": 1.0,
+             "signature": "sig", "timestamp": START},
+        ]
+        self.ledger.add_transactions(batch)
+
+        self.assertEqual(self.ledger.get_anchor_totals("anchor1"), self._expected([10.0, 11.0, 12.0, 7.0]))
+        self.assertEqual(self.ledger.get_anchor_totals("anchor2"), self._expected([3.0], 5.0, 0.0))
+        self.assertEqual(self.ledger.get_anchor_totals("missing"), RollupTotals(0, 0.0, 0.0, 0.0))
+        self.assertEqual(self.ledger.rollups.anchors(), ["anchor1", "anchor2"])
+
+        _, tax = fee_and_tax(to_minor(11.0), 2.0, 1.0)
+        self.assertEqual(self.ledger.get_transaction_tax("tx1"), from_minor(tax))
+        self.assertEqual(self.ledger.get_transaction_tax("tx5"), 0.0)
+
+        days = self.ledger.get_anchor_report("anchor1", "day")
+        self.assertEqual([(b.start, b.count) for b in days], [(datetime(2024, 3, 1), 2), (datetime(2024, 3, 2), 2)])
+        hours = self.ledger.get_anchor_report("anchor1", "hour", since=datetime(2024, 3, 2))
+        self.assertEqual([(b.start.hour, b.count, b.volume) for b in hours], [(0, 2, 19.0)])
+
+        midnight = datetime(2024, 3, 2)
+        self.assertEqual(self.ledger.get_anchor_totals("anchor1", until=midnight), self._expected([10.0, 11.0]))
+        self.assertEqual(
+            self.ledger.get_anchor_totals("anchor1", since=START + timedelta(minutes=15), until=START + timedelta(minutes=41)),
+            self._expected([11.0, 12.0]),
+        )
+        with self.assertRaises(ValueError):
+            self.ledger.get_anchor_report("anchor1", "week")
+
+    def test_unknown_anchors_are_rejected(self):
+        with self.assertRaises(TransactionRejectedError) as ctx:
+            self.ledger.add_transaction("tx1", "alice", "bob", 10.0, "sig", anchor_id="ghost")
+        self.assertEqual(ctx.exception.reason, "unknown_anchor")
+        with self.assertRaises(BatchRejectedError) as ctx:
+            self.ledger.add_transactions([("tx2", "alice", "bob", 10.0, "sig", "ghost")], atomic=False)
+        self.assertEqual(ctx.exception.rejections, [(0, "tx2", "unknown anchor")])
+        self.assertFalse(self.ledger.has_transaction("tx1") or self.ledger.has_transaction("tx2"))
+        self.assertEqual(self.ledger.rollups.anchors(), [])
+
+    def test_snapshot_round_trip(self):
+        for i in range(3):
+            self.ledger.add_transaction(
+                f"tx{i}", "alice", "bob", 5.0, "sig", anchor_id="anchor1",
+                timestamp=START + timedelta(hours=i),
+            )
+        snapshot = decode_snapshot(encode_snapshot(self.ledger.capture_snapshot()))
+        restored = Ledger()
+        restored.load_snapshot(snapshot)
+        self.assertEqual(restored.get_anchor_totals("anchor1"), self._expected([5.0] * 3))
+        self.assertEqual(restored.get_anchor_report("anchor1", "minute"), self.ledger.get_anchor_report("anchor1", "minute"))
+
+        # Rollups keep accumulating after a restore
+        restored.add_transaction("tx3", "alice", "bob", 5.0, "sig", anchor_id="anchor1", timestamp=START)
+        self.assertEqual(restored.get_anchor_totals("anchor1").count, 4)
+
+    # ---------------------------
+    # Range Queries and Retention
+    # ---------------------------
+    def test_ranges_use_coarse_buckets_and_refuse_pruned_ones(self):
+        rollups = AnchorRollups(minute_retention=60, hour_retention=48)
+        start = datetime(2024, 1, 1)
+        for minute in range(0, 5 * 24 * 60, 30):
+            rollups.record("a", start + timedelta(minutes=minute), 1_000_000, 10_000, 1_000)
+
+        self.assertEqual(rollups.totals("a").count, 240)
+        self.assertEqual(len(rollups.buckets("a", "minute")), 2)    # older minutes pruned
+        self.assertEqual(len(rollups.buckets("a", "hour")), 48)
+        self.assertEqual(rollups.totals("a", since=start + timedelta(days=1), until=start + timedelta(days=3)).count, 96)
+        self.assertEqual(rollups.totals("a", since=start + timedelta(days=4, hours=1)).count, 46)
+        self.assertEqual(rollups.totals("a", until=start).count, 0)
+
+        with self.assertRaises(ValueError):
+            rollups.totals("a", since=start + timedelta(hours=5))
+        with self.assertRaises(ValueError):
+            rollups.totals("a", since=start + timedelta(days=4, minutes=30))
+
+    # ---------------------------
+    # Persistent Storage
+    # ---------------------------
+    def test_rollups_are_rebuilt_from_storage(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, "ledger.db")
+            storage = SQLiteStorage(path)
+            ledger = Ledger(storage=storage)
+            ledger.register_anchor("anchor1", spread=2.0, tax_rate=1.0)
+            ledger.create_wallet("alice")
+            ledger.create_wallet("bob")
+            ledger.deposit("alice", 100.0)
+            for i in range(3):
+                ledger.add_transaction(
+                    f"tx{i}", "alice", "bob", 10.0, "sig", anchor_id="anchor1",
+                    timestamp=START + timedelta(minutes=i),
+                )
+            storage.close()
+
+            storage = SQLiteStorage(path)
+            reopened = Ledger(storage=storage)
+            self.assertEqual(reopened.get_anchor_totals("anchor1"), self._expected([10.0] * 3))
+            self.assertEqual(reopened.get_transaction_tax("tx2"), from_minor(fee_and_tax(to_minor(10.0), 2.0, 1.0)[1]))
+            storage.close()
+
+    def test_storage_seeded_from_snapshot_keeps_its_rollups(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            wal_path = os.path.join(tmpdir, "ledger.wal")
+            db_path = os.path.join(tmpdir, "ledger.db")
+            store = SnapshotStore(os.path.join(tmpdir, "snapshots"))
+            with WriteAheadLog(wal_path) as wal:
+                ledger = Ledger(wal=wal)
+                ledger.register_anchor("anchor1", spread=2.0, tax_rate=1.0)
+                ledger.create_wallet("alice")
+                ledger.create_wallet("bob")
+                ledger.deposit("alice", 100.0)
+                ledger.add_transaction("tx0", "alice", "bob", 10.0, "sig", anchor_id="anchor1", timestamp=START)
+                store.checkpoint(ledger).join()
+
+            # The first open seeds SQLite from the snapshot, later ones trust its offset
+            for i in range(1, 3):
+                with WriteAheadLog(wal_path) as wal:
+                    storage = SQLiteStorage(db_path)
+                    ledger = Ledger(wal=wal, storage=storage, snapshots=store)
+                    self.assertEqual(ledger.get_anchor_totals("anchor1"), self._expected([10.0] * i))
+                    ledger.add_transaction(
+                        f"tx{i}", "alice", "bob", 10.0, "sig", anchor_id="anchor1",
+                        timestamp=START + timedelta(minutes=i),
+                    )
+                    storage.close()
+
+    def test_columnar_storage_keeps_taxes(self):
+        ledger = Ledger(storage=ColumnarStorage())
+        ledger.register_anchor("anchor1", spread=2.0, tax_rate=1.0)
+        ledger.create_wallet("alice")
+        ledger.create_wallet("bob")
+        ledger.deposit("alice", 100.0)
+        ledger.add_transaction("tx1", "alice", "bob", 10.0, "sig", anchor_id="anchor1", timestamp=START)
+        fee, tax = fee_and_tax(to_minor(10.0), 2.0, 1.0)
+        minute = (START - datetime(1970, 1, 1)) // timedelta(minutes=1)
+        self.assertEqual(list(ledger.storage.anchor_minute_totals()), [("anchor1", minute, 1, to_minor(10.0), fee, tax)])
+        self.assertEqual(ledger.get_transaction_tax("tx1"), from_minor(tax))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,109 @@
+# n1c_core/tests/test_sharding.py
+
+import unittest
+from n1c_core.amount import fee_and_tax, to_minor
+from n1c_core.ledger import BatchRejectedError
+from n1c_core.sharding import ShardUnavailableError, ShardedLedger
+
+SIGNATURE = "ab" * 64
+
+
+class TestShardedLedger(unittest.TestCase):
+
+    def setUp(self):
+        self.ledger = ShardedLedger(shards=3)
+        self.ledger.register_anchor("anchor1", spread=2.0, tax_rate=1.0)
+        self.addresses = [f"wallet-{i}" for i in range(12)]
+        for address in self.addresses:
+            self.ledger.create_wallet(address)
+            self.ledger.deposit(address, 100.0)
+
+    def tearDown(self):
+        self.ledger.close()
+
+    def _pair(self, same_shard: bool):
+        sender = self.addresses[0]
+        for receiver in self.addresses[1:]:
+            if (self.ledger.shard_of(receiver) == self.ledger.shard_of(sender)) == same_shard:
+                return sender, receiver
+        self.fail("no suitable wallet pair")
+
+    def test_local_and_cross_shard_transfers(self):
+        for same_shard in (True, False):
+            sender, receiver = self._pair(same_shard)
+            tx = self.ledger.add_transaction(f"tx-{same_shard}", sender, receiver, 10.0, SIGNATURE, "anchor1")
+            self.assertEqual(self.ledger.get_transaction(tx.tx_id), tx)
+            self.assertEqual(self.ledger.get_wallet(receiver).balance, 110.0)
+            self.assertIn(tx, self.ledger.get_wallet(sender).transactions)
+            self.assertIn(tx, self.ledger.get_wallet(receiver).transactions)
+
+        fee, tax = fee_and_tax(to_minor(10.0), 2.0, 1.0)
+        supply = sum(map(to_minor, self.ledger.balances().values()))
+        self.assertEqual(supply, to_minor(1200.0) - 2 * (fee + tax))
+        self.assertEqual(self.ledger.audit(full=True), [])
+
+        totals = self.ledger.get_anchor_totals("anchor1")
+        self.assertEqual((totals.count, totals.volume), (2, 20.0))
+        self.assertEqual(to_minor(totals.taxes), 2 * tax)
+
+    def test_batch_conserves_supply_and_reports_rejections(self):
+        local_pair, cross_pair = self._pair(True), self._pair(False)
+        batch = [
+            ("tx1", *local_pair, 5.0, SIGNATURE),
+            ("tx2", *cross_pair, 5.0, SIGNATURE),
+            ("tx2", *local_pair, 1.0, SIGNATURE),               # duplicate id
+            ("tx3", cross_pair[0], "nobody", 5.0, SIGNATURE),    # unknown receiver
+            ("tx4", *cross_pair, 1_000.0, SIGNATURE),           # insufficient funds
+        ]
+        with self.assertRaises(BatchRejectedError) as ctx:
+            self.ledger.add_transactions(batch)
+        self.assertEqual([t.tx_id for t in ctx.exception.applied], ["tx1", "tx2"])
+        self.assertEqual([(i, tx_id) for i, tx_id, _ in ctx.exception.rejections], [(2, "tx2"), (3, "tx3"), (4, "tx4")])
+
+        self.assertEqual(self.ledger.get_wallet(cross_pair[0]).balance, 90.0)
+        self.assertEqual(sum(self.ledger.balances().values()), 1200.0)
+        with self.assertRaises(ValueError):
+            self.ledger.add_transaction("tx1", *cross_pair, 1.0, SIGNATURE)
+
+    def test_lost_shard_aborts_cleanly(self):
+        sender, receiver = self._pair(False)
+        self.ledger._workers[self.ledger.shard_of(receiver)].terminate()
+        self.ledger._workers[self.ledger.shard_of(receiver)].join()
+
+        with self.assertRaises(ValueError) as ctx:
+            self.ledger.add_transaction("tx1", sender, receiver, 10.0, SIGNATURE)
+        self.assertIn("unavailable", str(ctx.exception))
+        self.assertEqual(self.ledger.get_wallet(sender).balance, 100.0)
+        self.assertFalse(self.ledger.has_transaction("tx1"))
+
+    def test_failed_commit_keeps_applied_ids(self):
+        local_pair, cross_pair = self._pair(True), self._pair(False)
+        receiver_worker = self.ledger._workers[self.ledger.shard_of(cross_pair[1])]
+        run = self.ledger._run
+        rounds = []
+
+        def lose_receiver_before_commit(jobs):
+            rounds.append(jobs)
+            if len(rounds) == 2:
+                receiver_worker.terminate()
+                receiver_worker.join()
+            return run(jobs)
+
+        self.ledger._run = lose_receiver_before_commit
+        batch = [("tx1", *local_pair, 5.0, SIGNATURE), ("tx2", *cross_pair, 5.0, SIGNATURE)]
+        with self.assertRaises(ShardUnavailableError):
+            self.ledger.add_transactions(batch)
+        self.assertEqual(len(rounds), 2)
+        self.assertTrue(self.ledger.has_transaction("tx1"))
+        self.assertTrue(self.ledger.has_transaction("tx2"))
+
+        # The sender's shard committed both; a retry must not debit again
+        with self.assertRaises(BatchRejectedError) as ctx:
+            self.ledger.add_transactions(batch)
+        self.assertEqual(ctx.exception.applied, [])
+        self.assertEqual({reason for _, _, reason in ctx.exception.rejections}, {"duplicate transaction id"})
+        self.assertEqual(self.ledger.get_wallet(local_pair[0]).balance, 90.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
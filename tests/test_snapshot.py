@@ -0,0 +1,121 @@
+# n1c_core/tests/test_snapshot.py
+
+import os
+import tempfile
+import unittest
+from n1c_core.keyring import KeyRegistry
+from n1c_core.ledger import Ledger
+from n1c_core.snapshot import SnapshotStore, decode_snapshot, encode_snapshot
+from n1c_core.utils import generate_raw_keypair
+from n1c_core.wal import WriteAheadLog
+
+
+class TestSnapshots(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.wal_path = os.path.join(self.tmpdir.name, "ledger.wal")
+        self.store = SnapshotStore(os.path.join(self.tmpdir.name, "snapshots"), keep=2)
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_round_trip_encoding(self):
+        ledger = Ledger(key_registry=KeyRegistry())
+        _, public_key = generate_raw_keypair()
+        ledger.create_wallet("alice", public_key)
+        ledger.create_wallet("bob")
+        ledger.register_anchor("anchor1", spread=3.0, tax_rate=1.0)
+        ledger.deposit("alice", 50.0)
+        ledger.add_transaction("tx1", "alice", "bob", 5.0, "sig")
+
+        snapshot = decode_snapshot(encode_snapshot(ledger.capture_snapshot()))
+        self.assertEqual(snapshot.balances, {"alice": 45.0, "bob": 5.0})
+        self.assertEqual(snapshot.public_keys, {"alice": public_key})
+        self.assertEqual(snapshot.anchors, {"anchor1": (3.0, 1.0)})
+        self.assertEqual(snapshot.tx_ids, {"tx1"})
+
+    def test_restart_replays_only_log_tail(self):
+        with WriteAheadLog(self.wal_path) as wal:
+            ledger = Ledger(wal=wal)
+            ledger.create_wallet("alice")
+            ledger.create_wallet("bob")
+            ledger.deposit("alice", 100.0)
+            ledger.add_transaction("tx1", "alice", "bob", 10.0, "sig")
+            self.store.checkpoint(ledger).join()
+            ledger.add_transaction("tx2", "alice", "bob", 20.0, "sig")
+
+        with WriteAheadLog(self.wal_path) as wal:
+            restored = Ledger(wal=wal, snapshots=self.store)
+            self.assertAlmostEqual(restored.get_wallet("alice").balance, 70.0)
+            self.assertAlmostEqual(restored.get_wallet("bob").balance, 30.0)
+            # Only the post-snapshot transaction was replayed into history
+            self.assertEqual(list(restored.transactions), ["tx2"])
+            self.assertTrue(restored.has_transaction("tx1"))
+            with self.assertRaises(ValueError):
+                restored.add_transaction("tx1", "alice", "bob", 1.0, "sig")
+
+    def test_periodic_checkpoints_and_pruning(self):
+        with WriteAheadLog(self.wal_path) as wal:
+            ledger = Ledger(wal=wal, snapshots=self.store, snapshot_interval=0)
+            ledger.create_wallet("alice")
+            ledger.create_wallet("bob")
+            ledger.deposit("alice", 100.0)
+            for i in range(4):
+                ledger.add_transaction(f"tx{i}", "alice", "bob", 1.0, "sig")
+                ledger._checkpoint_writer.join()
+
+        self.assertEqual(len(os.listdir(self.store.directory)), 2)
+        self.assertEqual(len(self.store.latest().tx_ids), 4)
+
+    def test_captures_copy_only_changes(self):
+        ledger = Ledger()
+        for address in ("alice", "bob", "carol"):
+            ledger.create_wallet(address)
+        ledger.deposit("alice", 100.0)
+        ledger.add_transaction("tx1", "alice", "bob", 10.0, "sig")
+        ledger.capture_snapshot()
+
+        ledger.add_transaction("tx2", "alice", "carol", 5.0, "sig")
+        build = ledger.prepare_snapshot()
+        delta = ledger._snapshot_builder._deltas[-1]
+        self.assertEqual(set(delta.balances), {"alice", "carol"})
+        self.assertEqual(list(delta.tx_ids), ["tx2"])
+
+        # Writes after the capture stay out of the snapshot built from it
+        ledger.add_transaction("tx3", "bob", "carol", 1.0, "sig")
+        snapshot = build()
+        self.assertEqual(snapshot.tx_ids, {"tx1", "tx2"})
+        self.assertEqual(snapshot.balances, {"alice": 85.0, "bob": 10.0, "carol": 5.0})
+        self.assertEqual(ledger.capture_snapshot().tx_ids, {"tx1", "tx2", "tx3"})
+
+    def test_restored_ledger_snapshots_incrementally(self):
+        with WriteAheadLog(self.wal_path) as wal:
+            ledger = Ledger(wal=wal)
+            ledger.create_wallet("alice")
+            ledger.create_wallet("bob")
+            ledger.deposit("alice", 100.0)
+            ledger.add_transaction("tx1", "alice", "bob", 10.0, "sig")
+            self.store.checkpoint(ledger).join()
+
+        with WriteAheadLog(self.wal_path) as wal:
+            restored = Ledger(wal=wal, snapshots=self.store)
+            restored.add_transaction("tx2", "bob", "alice", 1.0, "sig")
+            self.store.checkpoint(restored).join()
+        snapshot = self.store.latest()
+        self.assertEqual(snapshot.tx_ids, {"tx1", "tx2"})
+        self.assertEqual(snapshot.balances, {"alice": 91.0, "bob": 9.0})
+
+    def test_corrupt_snapshot_is_skipped(self):
+        ledger = Ledger()
+        ledger.create_wallet("alice")
+        older = self.store.write(ledger.capture_snapshot()._replace(wal_offset=1))
+        newer = self.store.write(ledger.capture_snapshot()._replace(wal_offset=2))
+        with open(newer, "r+b") as f:
+            f.write(b"garbage")
+        self.assertEqual(self.store.latest().wal_offset, 1)
+        self.assertTrue(older.exists())
+
+
+if __name__ == "__main__":
+    unittest.main()
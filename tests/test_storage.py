@@ -0,0 +1,211 @@
+# n1c_core/tests/test_storage.py
+
+import os
+import tempfile
+import unittest
+from n1c_core.ledger import Ledger
+from n1c_core.models import Wallet
+from n1c_core.storage import MemoryStorage, SQLiteStorage
+from n1c_core.wal import WriteAheadLog
+
+
+class TestSQLiteStorage(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmpdir.name, "ledger.db")
+        self.storage = SQLiteStorage(self.path, batch_size=3)
+        self.ledger = Ledger(storage=self.storage)
+
+        self.ledger.create_wallet("alice")
+        self.ledger.create_wallet("bob")
+        self.ledger.register_anchor("anchor1", spread=5.0, tax_rate=2.0)
+        self.ledger.deposit("alice", 100.0)
+
+    def tearDown(self):
+        self.storage.close()
+        self.tmpdir.cleanup()
+
+    def test_default_backend_is_memory(self):
+        self.assertIsInstance(Ledger().storage, MemoryStorage)
+
+    def test_schema_and_journal_mode(self):
+        conn = self.storage._conn
+        self.assertEqual(conn.execute("PRAGMA journal_mode").fetchone()[0], "wal")
+        indexes = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+        for column in ("sender", "receiver", "timestamp", "anchor"):
+            self.assertIn(f"idx_transactions_{column}", indexes)
+
+    def test_transactions_are_batched(self):
+        self.ledger.add_transaction("tx1", "alice", "bob", 10.0, "sig", anchor_id="anchor1")
+        self.ledger.add_transaction("tx2", "bob", "alice", 5.0, "sig")
+        count = self.storage._conn.execute("SELECT COUNT(*) FROM transactions").fetchone()[0]
+        self.assertEqual(count, 0)
+
+        # Pending transactions are still visible to the ledger
+        self.assertIn("tx1", self.ledger.transactions)
+        self.assertEqual(self.ledger.get_transaction("tx2").amount, 5.0)
+        with self.assertRaises(ValueError):
+            self.ledger.add_transaction("tx1", "alice", "bob", 1.0, "sig")
+
+        self.ledger.add_transaction("tx3", "alice", "bob", 1.0, "sig")
+        count = self.storage._conn.execute("SELECT COUNT(*) FROM transactions").fetchone()[0]
+        self.assertEqual(count, 3)
+
+    def test_state_survives_reopen(self):
+        self.ledger.add_transaction("tx1", "alice", "bob", 10.0, "sig", anchor_id="anchor1")
+        self.ledger.add_transaction("tx2", "bob", "alice", 4.0, "sig")
+        alice_balance = self.ledger.get_wallet("alice").balance
+        self.storage.close()
+
+        self.storage = SQLiteStorage(self.path)
+        reopened = Ledger(storage=self.storage)
+        alice = reopened.get_wallet("alice")
+        self.assertAlmostEqual(alice.balance, alice_balance)
+        self.assertEqual([tx.tx_id for tx in alice.transactions], ["tx1", "tx2"])
+        self.assertEqual(reopened.get_anchor("anchor1").spread, 5.0)
+        self.assertEqual(len(reopened.transactions), 2)
+        self.assertEqual(len(reopened.get_all_transactions()), 2)
+
+    def test_wallet_cache_is_bounded(self):
+        self.storage.close()
+        self.storage = SQLiteStorage(self.path, batch_size=100, wallet_cache_size=2)
+        ledger = Ledger(storage=self.storage)
+        for address in ("carol", "dave", "erin"):
+            ledger.create_wallet(address)
+        ledger.add_transaction("tx1", "alice", "carol", 10.0, "sig")
+        ledger.add_transaction("tx2", "carol", "dave", 4.0, "sig")
+        ledger.add_transaction("tx3", "dave", "erin", 1.0, "sig")
+        # Wallets with buffered balances are kept until the batch is written
+        self.assertEqual(set(self.storage._wallet_cache), {"alice", "carol", "dave", "erin"})
+        self.storage.flush()
+        for address in ("bob", "erin", "alice", "dave"):
+            ledger.get_wallet(address)
+        self.assertEqual(list(self.storage._wallet_cache), ["alice", "dave"])
+        self.assertEqual(ledger.get_wallet("carol").balance, 6.0)
+        self.assertEqual(ledger.get_wallet("dave").balance, 3.0)
+        self.assertEqual(ledger.get_wallet("alice").balance, 90.0)
+        self.assertTrue(ledger.verify_integrity())
+
+    def test_reopened_ledger_is_audited(self):
+        self.ledger.add_transaction("tx1", "alice", "bob", 10.0, "sig", anchor_id="anchor1")
+        self.storage.close()
+
+        self.storage = SQLiteStorage(self.path)
+        reopened = Ledger(storage=self.storage)
+        self.assertEqual(set(reopened.auditor.opening), {"alice", "bob"})
+        self.assertEqual(reopened.audit(full=True), [])
+
+        # Transfers after the restart are tracked like any other
+        reopened.add_transaction("tx2", "alice", "bob", 5.0, "sig")
+        reopened.get_wallet("bob").balance += 1.0
+        self.assertEqual(reopened.audit(), ["bob"])
+
+    def test_untracked_wallets_do_not_break_writes(self):
+        # A wallet written to storage behind the ledger's back
+        self.storage.add_wallet(Wallet(address="carol", balance=0.0, transactions=[]))
+        self.ledger.add_transaction("tx1", "alice", "bob", 10.0, "sig")
+        self.ledger.add_transaction("tx2", "bob", "carol", 5.0, "sig")
+        self.assertEqual(self.ledger.get_wallet("carol").balance, 5.0)
+        self.assertEqual(self.ledger.audit(full=True), [])
+
+
+class TestSQLiteWithLog(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.tmpdir.name, "ledger.db")
+        self.wal_path = os.path.join(self.tmpdir.name, "ledger.wal")
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def _populate(self, ledger):
+        ledger.create_wallet("alice")
+        ledger.create_wallet("bob")
+        ledger.register_anchor("anchor1", spread=5.0, tax_rate=2.0)
+        ledger.deposit("alice", 100.0)
+        ledger.add_transaction("tx1", "alice", "bob", 10.0, "sig", anchor_id="anchor1")
+        ledger.add_transactions([("tx2", "bob", "alice", 4.0, "sig"), ("tx3", "alice", "bob", 1.0, "sig")])
+        ledger.add_transaction("tx4", "alice", "bob", 2.0, "sig")
+
+    def test_restart_replays_only_uncommitted_records(self):
+        with WriteAheadLog(self.wal_path) as wal:
+            storage = SQLiteStorage(self.db_path)
+            ledger = Ledger(wal=wal, storage=storage)
+            self._populate(ledger)
+            balance = ledger.get_wallet("alice").balance
+            storage.close()
+            self.assertEqual(storage.wal_offset, wal.end_offset)
+
+        # Clean restart: nothing left to replay
+        with WriteAheadLog(self.wal_path) as wal:
+            storage = SQLiteStorage(self.db_path)
+            reopened = Ledger(wal=wal, storage=storage)
+            self.assertEqual(reopened.get_wallet("alice").balance, balance)
+            self.assertEqual(len(reopened.transactions), 4)
+            reopened.add_transaction("tx5", "bob", "alice", 1.0, "sig")
+            storage.close()
+
+        with WriteAheadLog(self.wal_path) as wal:
+            storage = SQLiteStorage(self.db_path)
+            self.assertEqual(Ledger(wal=wal, storage=storage).get_wallet("alice").balance, balance + 1.0)
+            storage.close()
+
+    def test_crash_with_buffered_writes_is_recovered(self):
+        with WriteAheadLog(self.wal_path) as wal:
+            # Flushes land mid-batch, and tx5 is still buffered when the process dies
+            storage = SQLiteStorage(self.db_path, batch_size=2)
+            ledger = Ledger(wal=wal, storage=storage)
+            self._populate(ledger)
+            ledger.add_transaction("tx5", "bob", "alice", 1.0, "sig")
+            balance = ledger.get_wallet("alice").balance
+            self.assertLess(storage.wal_offset, wal.end_offset)
+
+        with WriteAheadLog(self.wal_path) as wal:
+            storage = SQLiteStorage(self.db_path)
+            recovered = Ledger(wal=wal, storage=storage)
+            self.assertEqual(set(recovered.transactions), {"tx1", "tx2", "tx3", "tx4", "tx5"})
+            self.assertEqual(recovered.get_wallet("alice").balance, balance)
+            storage.close()
+
+    def test_power_loss_drops_unsynced_log_tail(self):
+        # No time-based syncs: the log is durable only where it was fsynced
+        wal = WriteAheadLog(self.wal_path, group_commit_size=1000, group_commit_interval_ms=0)
+        storage = SQLiteStorage(self.db_path, batch_size=1)
+        self._populate(Ledger(wal=wal, storage=storage))
+        committed = storage.wal_offset
+        self.assertGreater(committed, 0)
+        self.assertGreater(wal.fsyncs, 0)
+
+        # Power loss: the disk keeps the log only up to its last fsync
+        durable = wal._synced
+        self.assertGreaterEqual(durable, committed)
+        with open(self.wal_path, "r+b") as log:
+            log.truncate(durable)
+
+        with WriteAheadLog(self.wal_path) as reopened_wal:
+            reopened_storage = SQLiteStorage(self.db_path)
+            recovered = Ledger(wal=reopened_wal, storage=reopened_storage)
+            self.assertEqual(set(recovered.transactions), {"tx1", "tx2", "tx3", "tx4"})
+            self.assertTrue(recovered.verify_integrity())
+            reopened_storage.close()
+        storage._conn.close()
+        wal._file.close()
+
+    def test_unsupported_pairings_are_rejected(self):
+        with WriteAheadLog(self.wal_path) as wal:
+            storage = SQLiteStorage(self.db_path)
+            with self.assertRaises(ValueError):
+                Ledger(wal=wal, storage=storage, thread_safe=True)
+
+            # State written without the log cannot be reconciled with it
+            self._populate(Ledger(storage=storage))
+            wal.append({"op": "wallet", "address": "carol", "public_key": None})
+            with self.assertRaises(ValueError):
+                Ledger(wal=wal, storage=storage)
+            storage.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,141 @@
+# n1c_core/tests/test_sync.py
+
+import unittest
+from unittest import mock
+from datetime import datetime, timedelta, timezone
+from n1c_core.ledger import BatchRejectedError, Ledger, TransactionRejectedError
+from n1c_core.merkle import EMPTY, MerkleIndex
+from n1c_core.sync import LoopbackTransport, SyncClient, SyncServer
+
+SIGNATURE = "ab" * 64
+START = datetime(2026, 1, 1)
+
+
+def make_ledger(depth: int = 2) -> Ledger:
+    ledger = Ledger(merkle_index=MerkleIndex(depth))
+    ledger.register_anchor("anchor1", spread=1.0, tax_rate=0.5)
+    for address in ("alice", "bob", "carol"):
+        ledger.create_wallet(address)
+        ledger.deposit(address, 10_000.0)
+    return ledger
+
+
+def transfer(ledger: Ledger, i: int):
+    pair = [("alice", "bob"), ("bob", "carol"), ("carol", "alice")][i % 3]
+    ledger.add_transaction(
+        f"tx{i}", *pair, 1.0 + i % 7, SIGNATURE,
+        anchor_id="anchor1" if i % 4 == 0 else None,
+        timestamp=START + timedelta(seconds=i),
+    )
+
+
+class TestMerkleIndex(unittest.TestCase):
+
+    def test_root_tracks_content_not_order(self):
+        a, b = make_ledger(), make_ledger()
+        self.assertEqual(a.merkle_index.root(), EMPTY)
+        for i in range(50):
+            transfer(a, i)
+        for i in reversed(range(50)):
+            transfer(b, i)
+        self.assertEqual(a.merkle_index.root(), b.merkle_index.root())
+        self.assertEqual(len(a.merkle_index), 50)
+
+        transfer(a, 50)
+        self.assertNotEqual(a.merkle_index.root(), b.merkle_index.root())
+
+    def test_rejects_unencodable_transactions(self):
+        ledger = make_ledger()
+        # Malformed signatures get the rejection a verifying ledger gives them
+        with self.assertRaises(TransactionRejectedError) as caught:
+            ledger.add_transaction("tx1", "alice", "bob", 1.0, "not-a-signature")
+        self.assertEqual(caught.exception.reason, "signature")
+        with self.assertRaises(BatchRejectedError) as caught:
+            ledger.add_transactions([("tx1", "alice", "bob", 1.0, "ab" * 10)])
+        self.assertEqual([reason for _, _, reason in caught.exception.rejections], ["invalid signature"])
+        aware = START.replace(tzinfo=timezone.utc)
+        with self.assertRaises(TransactionRejectedError) as caught:
+            ledger.add_transaction("tx2", "alice", "bob", 1.0, SIGNATURE, timestamp=aware)
+        self.assertEqual(caught.exception.reason, "encoding")
+        self.assertEqual(ledger.get_wallet("bob").balance, 10_000.0)
+        self.assertEqual(len(ledger.merkle_index), 0)
+
+    def test_batch_failure_restores_balances(self):
+        ledger = make_ledger()
+        batch = [("x1", "alice", "bob", 5.0, SIGNATURE), ("x2", "alice", "bob", 1e13, SIGNATURE)]
+        with self.assertRaises(BatchRejectedError):
+            ledger.add_transactions(batch)
+        # An unexpected error mid-batch undoes the balances already moved
+        with mock.patch("n1c_core.ledger.transaction_digest", side_effect=[bytes(32), RuntimeError("boom")]):
+            with self.assertRaises(RuntimeError):
+                ledger.add_transactions([batch[0], ("x3", "bob", "carol", 1.0, SIGNATURE)])
+        self.assertEqual(ledger.get_wallet("alice").balance, 10_000.0)
+        self.assertEqual(ledger.get_wallet("bob").balance, 10_000.0)
+        self.assertEqual(len(ledger.transactions), 0)
+        self.assertTrue(ledger.verify_integrity())
+
+    def test_built_from_existing_storage(self):
+        ledger = make_ledger()
+        for i in range(10):
+            transfer(ledger, i)
+        rebuilt = Ledger(storage=ledger.storage, merkle_index=MerkleIndex(2))
+        self.assertEqual(rebuilt.merkle_index.root(), ledger.merkle_index.root())
+
+
+class TestSync(unittest.TestCase):
+
+    def setUp(self):
+        self.local, self.remote = make_ledger(), make_ledger()
+        for i in range(200):
+            transfer(self.local, i)
+            transfer(self.remote, i)
+
+    def _client(self) -> SyncClient:
+        return SyncClient(self.local, LoopbackTransport(SyncServer(self.remote)))
+
+    def test_in_sync(self):
+        result = self._client().sync()
+        self.assertEqual(result.missing, [])
+        self.assertEqual(result.round_trips, 1)
+
+    def test_pulls_only_missing(self):
+        for i in range(200, 205):
+            transfer(self.remote, i)
+        result = self._client().sync()
+
+        self.assertEqual(sorted(result.missing), [f"tx{i}" for i in range(200, 205)])
+        self.assertEqual(result.applied, 5)
+        self.assertEqual(result.conflicts, [])
+        # root + one request per level + leaves + fetch
+        self.assertEqual(result.round_trips, 1 + 2 + 1 + 1)
+        self.assertEqual(self.local.merkle_index.root(), self.remote.merkle_index.root())
+        self.assertEqual(self.local.get_transaction("tx200").fee, self.remote.get_transaction("tx200").fee)
+        self.assertEqual(self.local.get_transaction_anchor("tx200"), "anchor1")
+        for address in ("alice", "bob", "carol"):
+            self.assertEqual(self.local.get_wallet(address).balance, self.remote.get_wallet(address).balance)
+
+    def test_local_extras_are_not_pulled(self):
+        transfer(self.local, 300)
+        result = self._client().sync()
+        self.assertEqual(result.missing, [])
+        self.assertEqual(result.applied, 0)
+
+    def test_conflicts_and_rejections(self):
+        self.local.add_transaction("dup", "alice", "bob", 1.0, SIGNATURE, timestamp=START)
+        self.remote.add_transaction("dup", "alice", "bob", 2.0, SIGNATURE, timestamp=START)
+        self.remote.create_wallet("dave")
+        self.remote.add_transaction("new", "alice", "dave", 1.0, SIGNATURE, timestamp=START)
+
+        result = self._client().sync()
+        self.assertEqual(result.conflicts, ["dup"])
+        self.assertEqual(result.missing, ["new"])
+        self.assertEqual(result.rejections, [(0, "new", "sender or receiver wallet does not exist")])
+
+    def test_depth_mismatch(self):
+        other = Ledger(merkle_index=MerkleIndex(3))
+        with self.assertRaises(ValueError):
+            SyncClient(self.local, LoopbackTransport(SyncServer(other))).diff()
+
+
+if __name__ == "__main__":
+    unittest.main()
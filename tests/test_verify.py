@@ -0,0 +1,53 @@
+# n1c_core/tests/test_verify.py
+
+import unittest
+from n1c_core.keyring import KeyRegistry
+from n1c_core.wallet import WalletManager
+from n1c_core.transaction import TransactionManager
+from n1c_core.verify import BatchVerifier, verify_batch
+
+
+class TestBatchVerification(unittest.TestCase):
+
+    def setUp(self):
+        self.registry = KeyRegistry()
+        self.wallet_manager = WalletManager(key_registry=self.registry)
+
+        self.alice = self.wallet_manager.create_wallet("Alice")
+        self.bob = self.wallet_manager.create_wallet("Bob")
+        self.alice.balance = 1000.0
+        self.bob.balance = 1000.0
+
+        # Alternate senders so chunks mix keys
+        self.transactions = []
+        for i in range(10):
+            sender, receiver = (self.alice, self.bob) if i % 2 == 0 else (self.bob, self.alice)
+            self.transactions.append(TransactionManager.create_transaction(
+                sender_wallet=sender,
+                receiver_wallet=receiver,
+                amount=1.0 + i,
+                key_registry=self.registry
+            ))
+
+        # Tamper with a few transactions
+        self.transactions[3].amount = 500.0
+        self.transactions[7].signature = "not_hex"
+        self.transactions[8].sender = "unknown_wallet"
+        self.expected = bytearray(0 if i in (3, 7, 8) else 1 for i in range(10))
+
+    def test_serial_bitmap(self):
+        bitmap = verify_batch(self.transactions, workers=1, key_registry=self.registry)
+        self.assertEqual(bitmap, self.expected)
+
+    def test_pool_preserves_order(self):
+        with BatchVerifier(workers=2, chunk_size=3, key_registry=self.registry) as verifier:
+            self.assertEqual(verifier.verify(self.transactions), self.expected)
+            # The pool is reused across calls
+            self.assertEqual(verifier.verify(self.transactions[:4]), self.expected[:4])
+
+    def test_empty_batch(self):
+        self.assertEqual(verify_batch([], workers=2, key_registry=self.registry), bytearray())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,78 @@
+# n1c_core/tests/test_wal.py
+
+import os
+import tempfile
+import unittest
+from n1c_core.ledger import Ledger
+from n1c_core.wal import WriteAheadLog
+
+
+class TestWriteAheadLog(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmpdir.name, "ledger.wal")
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def _populate(self, wal):
+        ledger = Ledger(wal=wal)
+        ledger.create_wallet("alice")
+        ledger.create_wallet("bob")
+        ledger.register_anchor("anchor1", spread=5.0, tax_rate=2.0)
+        ledger.deposit("alice", 100.0)
+        ledger.add_transaction("tx1", "alice", "bob", 10.0, "sig", anchor_id="anchor1")
+        ledger.add_transactions([("tx2", "bob", "alice", 4.0, "sig"), ("tx3", "alice", "bob", 1.0, "sig")])
+        return ledger
+
+    # ---------------------------
+    # Replay
+    # ---------------------------
+    def test_replay_restores_state(self):
+        with WriteAheadLog(self.path, group_commit_size=4) as wal:
+            original = self._populate(wal)
+
+        with WriteAheadLog(self.path) as wal:
+            restored = Ledger(wal=wal)
+            self.assertEqual(set(restored.transactions), {"tx1", "tx2", "tx3"})
+            self.assertAlmostEqual(restored.get_wallet("alice").balance, original.get_wallet("alice").balance)
+            self.assertAlmostEqual(restored.get_wallet("bob").balance, original.get_wallet("bob").balance)
+            self.assertEqual(
+                restored.get_transaction("tx1").timestamp,
+                original.get_transaction("tx1").timestamp
+            )
+
+            # Replayed ledgers keep logging new operations
+            restored.add_transaction("tx4", "bob", "alice", 1.0, "sig")
+        with WriteAheadLog(self.path) as wal:
+            self.assertIn("tx4", Ledger(wal=wal).transactions)
+
+    def test_torn_tail_is_truncated(self):
+        with WriteAheadLog(self.path) as wal:
+            self._populate(wal)
+            intact_size = wal.end_offset
+
+        # Simulate a crash in the middle of writing a record
+        with open(self.path, "ab") as f:
+            f.write(b"\x40\x00\x00\x00\x01\x02")
+
+        with WriteAheadLog(self.path) as wal:
+            self.assertEqual(wal.end_offset, intact_size)
+            self.assertEqual(len(Ledger(wal=wal).transactions), 3)
+        self.assertEqual(os.path.getsize(self.path), intact_size)
+
+    # ---------------------------
+    # Group Commit
+    # ---------------------------
+    def test_group_commit_batches_fsyncs(self):
+        wal = WriteAheadLog(self.path, group_commit_size=10, group_commit_interval_ms=0)
+        for i in range(25):
+            wal.append({"op": "noop", "i": i})
+        self.assertEqual(wal.fsyncs, 2)
+        wal.close()
+        self.assertEqual(wal.fsyncs, 3)
+
+
+if __name__ == "__main__":
+    unittest.main()